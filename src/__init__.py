@@ -46,7 +46,10 @@ __description__ = "Sistema multi-agente de IA para transparência pública brasi
 
 # Key exports for external usage
 from src.core.config import get_settings
-from src.core.exceptions import CidadaoAIException
+from src.core.exceptions import CidadaoAIError
+
+# Backwards-compatible name for the base exception
+CidadaoAIException = CidadaoAIError
 
 # Version info tuple
 VERSION = (1, 0, 0)
@@ -66,5 +69,6 @@ __all__ = [
     "VERSION",
     "VERSION_INFO",
     "get_settings",
+    "CidadaoAIError",
     "CidadaoAIException",
 ]
\ No newline at end of file
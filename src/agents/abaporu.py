@@ -15,6 +15,7 @@ from pydantic import BaseModel, Field as PydanticField
 
 from src.core import AgentStatus, ReflectionType, get_logger
 from src.core.exceptions import AgentExecutionError, InvestigationError
+from src.core.profiling import profile_investigation, profile_span
 from .deodoro import (
     AgentContext,
     AgentMessage,
@@ -239,65 +240,70 @@ class MasterAgent(ReflectiveAgent):
             query=query,
         )
         
-        # Step 1: Create investigation plan
-        plan = await self._plan_investigation({"query": query}, context)
-        self.active_investigations[investigation_id] = plan
-        
-        # Step 2: Execute investigation steps
-        findings = []
-        sources = []
-        
-        for i, step in enumerate(plan.steps):
-            step_result = await self._execute_step(step, context)
+        async with profile_investigation(investigation_id, name="master.investigate"):
+            # Step 1: Create investigation plan
+            async with profile_span("planning"):
+                plan = await self._plan_investigation({"query": query}, context)
+            self.active_investigations[investigation_id] = plan
             
-            if step_result.status == AgentStatus.COMPLETED:
-                findings.extend(step_result.result.get("findings", []))
-                sources.extend(step_result.result.get("sources", []))
-            else:
-                self.logger.warning(
-                    "investigation_step_failed",
-                    investigation_id=investigation_id,
-                    step_index=i,
-                    step=step,
-                    error=step_result.error,
-                )
-        
-        # Step 3: Generate explanation
-        explanation = await self._generate_explanation(findings, query, context)
-        
-        # Step 4: Calculate confidence score
-        confidence_score = self._calculate_confidence_score(findings, sources)
-        
-        # Step 5: Create result
-        processing_time = (datetime.utcnow() - start_time).total_seconds() * 1000
-        
-        result = InvestigationResult(
-            investigation_id=investigation_id,
-            query=query,
-            findings=findings,
-            confidence_score=confidence_score,
-            sources=list(set(sources)),
-            explanation=explanation,
-            metadata={
-                "plan": plan.model_dump(),
-                "steps_executed": len(plan.steps),
-                "agents_used": plan.required_agents,
-            },
-            processing_time_ms=processing_time,
-        )
-        
-        # Store in memory
-        await self.memory_agent.store_investigation(result, context)
-        
-        self.logger.info(
-            "investigation_completed",
-            investigation_id=investigation_id,
-            findings_count=len(findings),
-            confidence_score=confidence_score,
-            processing_time_ms=processing_time,
-        )
-        
-        return result
+            # Step 2: Execute investigation steps
+            findings = []
+            sources = []
+            
+            for i, step in enumerate(plan.steps):
+                async with profile_span(f"step.{i}", agent=step.get("agent"), action=step.get("action")):
+                    step_result = await self._execute_step(step, context)
+                
+                if step_result.status == AgentStatus.COMPLETED:
+                    findings.extend(step_result.result.get("findings", []))
+                    sources.extend(step_result.result.get("sources", []))
+                else:
+                    self.logger.warning(
+                        "investigation_step_failed",
+                        investigation_id=investigation_id,
+                        step_index=i,
+                        step=step,
+                        error=step_result.error,
+                    )
+            
+            # Step 3: Generate explanation
+            async with profile_span("explanation", findings=len(findings)):
+                explanation = await self._generate_explanation(findings, query, context)
+            
+            # Step 4: Calculate confidence score
+            confidence_score = self._calculate_confidence_score(findings, sources)
+            
+            # Step 5: Create result
+            processing_time = (datetime.utcnow() - start_time).total_seconds() * 1000
+            
+            result = InvestigationResult(
+                investigation_id=investigation_id,
+                query=query,
+                findings=findings,
+                confidence_score=confidence_score,
+                sources=list(set(sources)),
+                explanation=explanation,
+                metadata={
+                    "plan": plan.model_dump(),
+                    "steps_executed": len(plan.steps),
+                    "agents_used": plan.required_agents,
+                },
+                processing_time_ms=processing_time,
+            )
+            
+            # Store in memory
+            async with profile_span("memory.store"):
+                await self.memory_agent.store_investigation(result, context)
+            
+            self.logger.info(
+                "investigation_completed",
+                investigation_id=investigation_id,
+                findings_count=len(findings),
+                confidence_score=confidence_score,
+                processing_time_ms=processing_time,
+            )
+            
+            return result
     
     async def _plan_investigation(
         self,
@@ -14,13 +14,17 @@ from dataclasses import dataclass
 from collections import defaultdict, Counter
 
 import numpy as np
+import pandas as pd
 from pydantic import BaseModel, Field as PydanticField
 
-from src.agents.deodoro import BaseAgent, AgentContext, AgentMessage
+from src.agents.deodoro import BaseAgent, AgentContext, AgentMessage, AgentResponse, AgentStatus
 from src.core import get_logger
 from src.core.exceptions import AgentExecutionError, DataAnalysisError
+from src.core.profiling import profile_investigation, profile_span
 from src.tools.transparency_api import TransparencyAPIClient, TransparencyAPIFilter
+from src.tools.warehouse import get_warehouse
 from src.ml.spectral_analyzer import SpectralAnalyzer, SpectralFeatures, PeriodicPattern
+from src.infrastructure.agent_pool import run_cpu_bound
 
 
 @dataclass
@@ -54,6 +58,28 @@ class CorrelationResult:
     recommendations: List[str]
 
 
+def compute_org_spectrum(
+    values: np.ndarray,
+    dates: List[datetime],
+    entity_name: str
+) -> Tuple[SpectralFeatures, List[PeriodicPattern]]:
+    """
+    Compute spectral features and periodic patterns for one organization.
+    
+    CPU-bound, kept at module level so it can run in the agent process pool;
+    the spectra in SpectralFeatures come back through shared memory.
+    """
+    analyzer = SpectralAnalyzer()
+    spending_data = pd.Series(values)
+    timestamps = pd.DatetimeIndex(dates)
+    
+    spectral_features = analyzer.analyze_time_series(spending_data, timestamps)
+    periodic_patterns = analyzer.find_periodic_patterns(
+        spending_data, timestamps, entity_name=entity_name
+    )
+    return spectral_features, periodic_patterns
+
+
 class AnalysisRequest(BaseModel):
     """Request for pattern and correlation analysis."""
     
@@ -97,7 +123,24 @@ class AnalystAgent(BaseAgent):
             significance_threshold: P-value threshold for statistical significance
             trend_detection_window: Number of periods for trend analysis
         """
-        super().__init__(agent_id)
+        super().__init__(
+            name=agent_id,
+            description="Analisa padrões e correlações em gastos públicos",
+            capabilities=[
+                "analyze",
+                "analyze_patterns",
+                "spending_trends",
+                "organizational_patterns",
+                "vendor_behavior",
+                "seasonal_patterns",
+                "spectral_patterns",
+                "cross_spectral_analysis",
+                "value_distribution",
+                "correlation_analysis",
+                "efficiency_metrics",
+            ],
+        )
+        self.agent_id = agent_id
         self.correlation_threshold = min_correlation_threshold
         self.significance_threshold = significance_threshold
         self.trend_window = trend_detection_window
@@ -126,95 +169,112 @@ class AnalystAgent(BaseAgent):
             significance_threshold=significance_threshold,
         )
     
-    async def execute(
+    # Actions answered by ``process`` (``analyze_patterns`` is what Abaporu plans)
+    ANALYSIS_ACTIONS = ("analyze", "analyze_patterns")
+    
+    async def initialize(self) -> None:
+        """Initialize agent resources."""
+        self.status = AgentStatus.IDLE
+    
+    async def shutdown(self) -> None:
+        """Cleanup agent resources."""
+    
+    async def process(
         self,
         message: AgentMessage,
         context: AgentContext
-    ) -> AgentMessage:
+    ) -> AgentResponse:
         """
-        Execute pattern analysis based on the incoming message.
+        Run the pattern analysis described by the message payload.
         
         Args:
-            message: Analysis request message
+            message: Message whose payload is an ``AnalysisRequest``
             context: Agent execution context
             
         Returns:
-            Analysis results with patterns and correlations
+            Response whose ``result`` holds patterns, correlations and insights
         """
         try:
             self.logger.info(
                 "analysis_started",
                 investigation_id=context.investigation_id,
                 agent_id=self.agent_id,
-                message_type=message.message_type,
+                action=message.action,
             )
             
             # Parse analysis request
-            if message.message_type == "analysis_request":
-                request = AnalysisRequest(**message.content)
+            if message.action in self.ANALYSIS_ACTIONS:
+                request = AnalysisRequest(**message.payload)
             else:
                 raise AgentExecutionError(
-                    f"Unsupported message type: {message.message_type}",
-                    agent_id=self.agent_id
+                    f"Unsupported action: {message.action}",
+                    details={"agent": self.agent_id, "action": message.action},
                 )
             
-            # Fetch data for analysis
-            analysis_data = await self._fetch_analysis_data(request, context)
-            
-            if not analysis_data:
-                return AgentMessage(
-                    message_type="analysis_result",
-                    content={
-                        "status": "no_data",
-                        "message": "No data found for the specified criteria",
-                        "patterns": [],
-                        "correlations": [],
-                        "summary": {"total_records": 0, "patterns_found": 0}
-                    },
+            async with profile_investigation(context.investigation_id, name="anita.analyze"):
+                # Fetch data for analysis
+                async with profile_span("fetch"):
+                    analysis_data = await self._fetch_analysis_data(request, context)
+                
+                if not analysis_data:
+                    return AgentResponse(
+                        agent_name=self.name,
+                        status=AgentStatus.COMPLETED,
+                        result={
+                            "status": "no_data",
+                            "message": "No data found for the specified criteria",
+                            "patterns": [],
+                            "correlations": [],
+                            "summary": {"total_records": 0, "patterns_found": 0}
+                        },
+                        metadata={"investigation_id": context.investigation_id}
+                    )
+                
+                # Perform pattern analysis
+                async with profile_span("patterns", records=len(analysis_data)):
+                    patterns = await self._run_pattern_analysis(analysis_data, request, context)
+                
+                # Perform correlation analysis
+                async with profile_span("correlations", records=len(analysis_data)):
+                    correlations = await self._run_correlation_analysis(analysis_data, request, context)
+                
+                # Generate insights and recommendations
+                async with profile_span("insights"):
+                    insights = self._generate_insights(patterns, correlations, analysis_data)
+                
+                # Create result message
+                result = {
+                    "status": "completed",
+                    "query": request.query,
+                    "patterns": [self._pattern_to_dict(p) for p in patterns],
+                    "correlations": [self._correlation_to_dict(c) for c in correlations],
+                    "insights": insights,
+                    "summary": self._generate_analysis_summary(analysis_data, patterns, correlations),
+                    "metadata": {
+                        "investigation_id": context.investigation_id,
+                        "timestamp": datetime.utcnow().isoformat(),
+                        "agent_id": self.agent_id,
+                        "records_analyzed": len(analysis_data),
+                        "patterns_found": len(patterns),
+                        "correlations_found": len(correlations),
+                    }
+                }
+                
+                self.logger.info(
+                    "analysis_completed",
+                    investigation_id=context.investigation_id,
+                    records_analyzed=len(analysis_data),
+                    patterns_found=len(patterns),
+                    correlations_found=len(correlations),
+                )
+                
+                return AgentResponse(
+                    agent_name=self.name,
+                    status=AgentStatus.COMPLETED,
+                    result=result,
                     metadata={"investigation_id": context.investigation_id}
                 )
             
-            # Perform pattern analysis
-            patterns = await self._run_pattern_analysis(analysis_data, request, context)
-            
-            # Perform correlation analysis
-            correlations = await self._run_correlation_analysis(analysis_data, request, context)
-            
-            # Generate insights and recommendations
-            insights = self._generate_insights(patterns, correlations, analysis_data)
-            
-            # Create result message
-            result = {
-                "status": "completed",
-                "query": request.query,
-                "patterns": [self._pattern_to_dict(p) for p in patterns],
-                "correlations": [self._correlation_to_dict(c) for c in correlations],
-                "insights": insights,
-                "summary": self._generate_analysis_summary(analysis_data, patterns, correlations),
-                "metadata": {
-                    "investigation_id": context.investigation_id,
-                    "timestamp": datetime.utcnow().isoformat(),
-                    "agent_id": self.agent_id,
-                    "records_analyzed": len(analysis_data),
-                    "patterns_found": len(patterns),
-                    "correlations_found": len(correlations),
-                }
-            }
-            
-            self.logger.info(
-                "analysis_completed",
-                investigation_id=context.investigation_id,
-                records_analyzed=len(analysis_data),
-                patterns_found=len(patterns),
-                correlations_found=len(correlations),
-            )
-            
-            return AgentMessage(
-                message_type="analysis_result",
-                content=result,
-                metadata={"investigation_id": context.investigation_id}
-            )
-            
         except Exception as e:
             self.logger.error(
                 "analysis_failed",
@@ -223,13 +283,15 @@ class AnalystAgent(BaseAgent):
                 agent_id=self.agent_id,
             )
             
-            return AgentMessage(
-                message_type="analysis_error",
-                content={
+            return AgentResponse(
+                agent_name=self.name,
+                status=AgentStatus.ERROR,
+                result={
                     "status": "error",
                     "error": str(e),
                     "investigation_id": context.investigation_id,
                 },
+                error=str(e),
                 metadata={"investigation_id": context.investigation_id}
             )
     
@@ -260,6 +322,28 @@ class AnalystAgent(BaseAgent):
             "30000",  # Ministério da Justiça
         ]
         
+        # Prefer the local warehouse when it has been populated (`cidadao ingest`)
+        warehouse = get_warehouse()
+        if warehouse is not None and warehouse.has_data("contratos"):
+            all_contracts = await warehouse.query_records(
+                "contratos",
+                org_codes=org_codes,
+                start_date="01/01/2024",
+                end_date="31/12/2024",
+                limit=request.max_records,
+            )
+            for contract in all_contracts:
+                signed = datetime.strptime(contract["dataAssinatura"], "%d/%m/%Y")
+                contract["_month"] = signed.month
+                contract["_year"] = signed.year
+            if all_contracts:
+                self.logger.info(
+                    "analysis_data_loaded_from_warehouse",
+                    records=len(all_contracts),
+                    investigation_id=context.investigation_id,
+                )
+                return all_contracts
+        
         async with TransparencyAPIClient() as client:
             for org_code in org_codes:
                 try:
@@ -332,7 +416,8 @@ class AnalystAgent(BaseAgent):
             if analysis_type in self.analysis_methods:
                 try:
                     method = self.analysis_methods[analysis_type]
-                    patterns = await method(data, context)
+                    async with profile_span(f"analysis.{analysis_type}"):
+                        patterns = await method(data, context)
                     all_patterns.extend(patterns)
                     
                     self.logger.info(
@@ -994,18 +1079,12 @@ class AnalystAgent(BaseAgent):
                 if len(time_series_data) < 20:
                     continue
                 
-                # Extract spending values and timestamps
-                spending_data = pd.Series([item['value'] for item in time_series_data])
-                timestamps = pd.DatetimeIndex([item['date'] for item in time_series_data])
-                
-                # Perform spectral analysis
-                spectral_features = self.spectral_analyzer.analyze_time_series(
-                    spending_data, timestamps
-                )
-                
-                # Find periodic patterns
-                periodic_patterns = self.spectral_analyzer.find_periodic_patterns(
-                    spending_data, timestamps, entity_name=f"Org_{org_code}"
+                # Perform spectral analysis and find periodic patterns
+                spectral_features, periodic_patterns = await run_cpu_bound(
+                    compute_org_spectrum,
+                    np.array([item['value'] for item in time_series_data], dtype=float),
+                    [item['date'] for item in time_series_data],
+                    f"Org_{org_code}"
                 )
                 
                 # Convert to PatternResult objects
@@ -17,6 +17,7 @@ from pydantic import BaseModel, Field as PydanticField
 
 from src.core import AgentStatus, get_logger
 from src.core.exceptions import AgentError, AgentExecutionError
+from src.core.profiling import profile_span
 
 
 @dataclass
@@ -179,7 +180,8 @@ class BaseAgent(ABC):
                 )
                 
                 # Process the message
-                response = await self.process(message, context)
+                async with profile_span(f"agent.{self.name}", action=action, retry=retries):
+                    response = await self.process(message, context)
                 
                 # Calculate processing time
                 processing_time = (datetime.utcnow() - start_time).total_seconds() * 1000
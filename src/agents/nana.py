@@ -8,6 +8,7 @@ License: Proprietary - All rights reserved
 """
 
 import json
+import time
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional, Tuple
 
@@ -15,6 +16,7 @@ from pydantic import BaseModel, Field as PydanticField
 
 from src.core import AgentStatus, MemoryImportance, get_logger
 from src.core.exceptions import MemoryError, MemoryStorageError, MemoryRetrievalError
+from src.memory.vector_index import LocalVectorStore
 from .deodoro import (
     AgentContext,
     AgentMessage,
@@ -23,6 +25,11 @@ from .deodoro import (
 )
 
 
+def _decode(value: Any) -> str:
+    """Redis replies are bytes unless the client decodes responses."""
+    return value.decode() if isinstance(value, bytes) else str(value)
+
+
 class MemoryEntry(BaseModel):
     """Base memory entry."""
     
@@ -75,7 +82,7 @@ class ContextMemoryAgent(BaseAgent):
     def __init__(
         self,
         redis_client: Any,
-        vector_store: Any,
+        vector_store: Optional[Any] = None,
         max_episodic_memories: int = 1000,
         max_conversation_turns: int = 50,
         memory_decay_days: int = 30,
@@ -86,7 +93,8 @@ class ContextMemoryAgent(BaseAgent):
         
         Args:
             redis_client: Redis client for fast access
-            vector_store: Vector store for semantic search
+            vector_store: Vector store for semantic search (defaults to an
+                in-process LocalVectorStore)
             max_episodic_memories: Maximum episodic memories to keep
             max_conversation_turns: Maximum conversation turns to remember
             memory_decay_days: Days after which memories start to decay
@@ -110,7 +118,7 @@ class ContextMemoryAgent(BaseAgent):
         )
         
         self.redis_client = redis_client
-        self.vector_store = vector_store
+        self.vector_store = vector_store if vector_store is not None else LocalVectorStore()
         self.max_episodic_memories = max_episodic_memories
         self.max_conversation_turns = max_conversation_turns
         self.memory_decay_days = memory_decay_days
@@ -120,6 +128,11 @@ class ContextMemoryAgent(BaseAgent):
         self.semantic_key = "cidadao:memory:semantic"
         self.conversation_key = "cidadao:memory:conversation"
         
+        # Sorted-set indexes: recency (score = stored at) and retention
+        # (score = importance-weighted expiry), so eviction never scans keys
+        self.episodic_timeline_key = "cidadao:memory:index:episodic:timeline"
+        self.episodic_retention_key = "cidadao:memory:index:episodic:retention"
+        
         self.logger.info(
             "context_memory_agent_initialized",
             max_episodic=max_episodic_memories,
@@ -255,7 +268,7 @@ class ContextMemoryAgent(BaseAgent):
         )
         
         await self._store_episodic_memory(
-            {"memory_entry": memory_entry.model_dump()},
+            {"memory_entry": memory_entry.model_dump(mode="json")},
             context
         )
     
@@ -313,13 +326,20 @@ class ContextMemoryAgent(BaseAgent):
             if not memory_entry:
                 raise MemoryStorageError("No memory entry provided")
             
-            # Store in Redis for fast access
-            key = f"{self.episodic_key}:{memory_entry['id']}"
-            await self.redis_client.setex(
-                key,
-                timedelta(days=self.memory_decay_days),
+            # Store in Redis for fast access, with an importance-weighted
+            # lifetime, and index it for recency queries and eviction
+            memory_id = memory_entry["id"]
+            now = time.time()
+            retention = self._retention_seconds(memory_entry.get("importance"))
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.setex(
+                f"{self.episodic_key}:{memory_id}",
+                timedelta(seconds=retention),
                 json.dumps(memory_entry)
             )
+            pipe.zadd(self.episodic_timeline_key, {memory_id: now})
+            pipe.zadd(self.episodic_retention_key, {memory_id: now + retention})
+            await pipe.execute()
             
             # Store in vector store for semantic search
             content = memory_entry.get("content", {})
@@ -362,7 +382,7 @@ class ContextMemoryAgent(BaseAgent):
             results = await self.vector_store.similarity_search(
                 query=query,
                 limit=limit,
-                filter_metadata={"type": "investigation_result"}
+                filter_metadata={"content.type": "investigation_result"}
             )
             
             memories = []
@@ -415,14 +435,14 @@ class ContextMemoryAgent(BaseAgent):
             await self.redis_client.setex(
                 key,
                 timedelta(days=self.memory_decay_days * 2),  # Semantic memories last longer
-                json.dumps(memory_entry.model_dump())
+                json.dumps(memory_entry.model_dump(mode="json"))
             )
             
             # Store in vector store
             await self.vector_store.add_documents([{
                 "id": memory_entry.id,
                 "content": f"{concept}: {json.dumps(content)}",
-                "metadata": memory_entry.model_dump(),
+                "metadata": memory_entry.model_dump(mode="json"),
             }])
             
             self.logger.info(
@@ -510,11 +530,16 @@ class ContextMemoryAgent(BaseAgent):
             
             # Store in Redis with conversation-specific key
             key = f"{self.conversation_key}:{conversation_id}:{turn_number}"
-            await self.redis_client.setex(
+            index_key = self._conversation_index_key(conversation_id)
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.setex(
                 key,
                 timedelta(hours=24),  # Conversations expire after 24 hours
-                json.dumps(memory_entry.model_dump())
+                json.dumps(memory_entry.model_dump(mode="json"))
             )
+            pipe.zadd(index_key, {str(turn_number): turn_number})
+            pipe.expire(index_key, timedelta(hours=24))
+            await pipe.execute()
             
             # Manage conversation size
             await self._manage_conversation_size(conversation_id)
@@ -544,18 +569,13 @@ class ContextMemoryAgent(BaseAgent):
             if not conversation_id:
                 return []
             
-            # Get recent conversation turns
-            pattern = f"{self.conversation_key}:{conversation_id}:*"
-            keys = await self.redis_client.keys(pattern)
-            
-            # Sort by turn number (descending)
-            keys.sort(key=lambda k: int(k.split(":")[-1]), reverse=True)
-            
-            memories = []
-            for key in keys[:limit]:
-                memory_data = await self.redis_client.get(key)
-                if memory_data:
-                    memories.append(json.loads(memory_data))
+            # Get recent conversation turns (highest turn numbers first)
+            turns = await self.redis_client.zrevrange(
+                self._conversation_index_key(conversation_id), 0, limit - 1
+            )
+            memories = await self._get_many(
+                f"{self.conversation_key}:{conversation_id}:{_decode(turn)}" for turn in turns
+            )
             
             # Reverse to get chronological order
             memories.reverse()
@@ -628,59 +648,102 @@ class ContextMemoryAgent(BaseAgent):
         text_lower = text.lower()
         return [keyword for keyword in keywords if keyword in text_lower]
     
+    def _retention_seconds(self, importance: Any) -> float:
+        """
+        Lifetime of an episodic memory, scaled by importance.
+        
+        A MEDIUM memory lives ``memory_decay_days``; the lifetime grows or
+        shrinks linearly with the importance level (CRITICAL lives twice as
+        long, LOW a bit over half), which also sets its eviction order.
+        """
+        if isinstance(importance, str):
+            try:
+                importance = MemoryImportance[importance.upper()]
+            except KeyError:
+                importance = None
+        try:
+            level = int(importance)
+        except (TypeError, ValueError):
+            level = MemoryImportance.MEDIUM
+        return self.memory_decay_days * 86400 * level / MemoryImportance.MEDIUM
+    
+    def _conversation_index_key(self, conversation_id: str) -> str:
+        return f"{self.conversation_key}:index:{conversation_id}"
+    
+    async def _get_many(self, keys: Any) -> List[Dict[str, Any]]:
+        """Fetch and decode JSON values in one round trip, skipping expired keys."""
+        pipe = self.redis_client.pipeline(transaction=False)
+        queued = 0
+        for key in keys:
+            pipe.get(key)
+            queued += 1
+        if not queued:
+            return []
+        return [json.loads(value) for value in await pipe.execute() if value]
+    
     async def _manage_memory_size(self) -> None:
-        """Manage memory size by removing old/unimportant memories."""
-        # Get count of episodic memories
-        pattern = f"{self.episodic_key}:*"
-        keys = await self.redis_client.keys(pattern)
+        """
+        Evict expired and lowest-retention episodic memories.
         
-        if len(keys) > self.max_episodic_memories:
-            # Remove oldest memories first
-            # In production, would consider importance scores
-            keys_to_remove = keys[:-self.max_episodic_memories]
-            for key in keys_to_remove:
-                await self.redis_client.delete(key)
-            
-            self.logger.info(
-                "episodic_memories_cleaned",
-                removed_count=len(keys_to_remove),
-                remaining_count=self.max_episodic_memories,
-            )
+        Uses the retention sorted set instead of scanning the keyspace:
+        expired entries are dropped by score range and the excess is taken
+        with ZPOPMIN, so each removal is O(log n). Deletes are pipelined.
+        """
+        now = time.time()
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.zrangebyscore(self.episodic_retention_key, "-inf", now)
+        pipe.zremrangebyscore(self.episodic_retention_key, "-inf", now)
+        pipe.zcard(self.episodic_retention_key)
+        expired, _, remaining = await pipe.execute()
+        
+        evicted = []
+        excess = remaining - self.max_episodic_memories
+        if excess > 0:
+            popped = await self.redis_client.zpopmin(self.episodic_retention_key, excess)
+            evicted = [_decode(member) for member, _ in popped]
+        
+        removed = [_decode(member) for member in expired] + evicted
+        if not removed:
+            return
+        
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.zrem(self.episodic_timeline_key, *removed)
+        if evicted:
+            pipe.delete(*(f"{self.episodic_key}:{memory_id}" for memory_id in evicted))
+        await pipe.execute()
+        
+        # Keep the vector index in step so searches don't return evicted ids
+        if hasattr(self.vector_store, 'delete'):
+            await self.vector_store.delete(removed)
+        
+        self.logger.info(
+            "episodic_memories_cleaned",
+            expired_count=len(expired),
+            removed_count=len(evicted),
+            remaining_count=remaining - len(evicted),
+        )
     
     async def _manage_conversation_size(self, conversation_id: str) -> None:
-        """Manage conversation memory size."""
-        pattern = f"{self.conversation_key}:{conversation_id}:*"
-        keys = await self.redis_client.keys(pattern)
+        """Manage conversation memory size, dropping the oldest turns."""
+        index_key = self._conversation_index_key(conversation_id)
+        excess = await self.redis_client.zcard(index_key) - self.max_conversation_turns
         
-        if len(keys) > self.max_conversation_turns:
-            # Sort by turn number and keep only recent ones
-            keys.sort(key=lambda k: int(k.split(":")[-1]))
-            keys_to_remove = keys[:-self.max_conversation_turns]
-            
-            for key in keys_to_remove:
-                await self.redis_client.delete(key)
+        if excess > 0:
+            popped = await self.redis_client.zpopmin(index_key, excess)
+            await self.redis_client.delete(*(
+                f"{self.conversation_key}:{conversation_id}:{_decode(turn)}"
+                for turn, _ in popped
+            ))
             
             self.logger.info(
                 "conversation_memory_cleaned",
                 conversation_id=conversation_id,
-                removed_count=len(keys_to_remove),
+                removed_count=len(popped),
             )
     
     async def _get_recent_memories(self, limit: int) -> List[Dict[str, Any]]:
-        """Get recent episodic memories."""
-        pattern = f"{self.episodic_key}:*"
-        keys = await self.redis_client.keys(pattern)
-        
-        memories = []
-        for key in keys[:limit]:
-            memory_data = await self.redis_client.get(key)
-            if memory_data:
-                memories.append(json.loads(memory_data))
-        
-        # Sort by timestamp (most recent first)
-        memories.sort(
-            key=lambda m: m.get("timestamp", ""),
-            reverse=True
+        """Get recent episodic memories (most recent first)."""
+        memory_ids = await self.redis_client.zrevrange(self.episodic_timeline_key, 0, limit - 1)
+        return await self._get_many(
+            f"{self.episodic_key}:{_decode(memory_id)}" for memory_id in memory_ids
         )
-        
-        return memories[:limit]
\ No newline at end of file
@@ -15,9 +15,10 @@ from enum import Enum
 
 from pydantic import BaseModel, Field as PydanticField
 
-from src.agents.deodoro import BaseAgent, AgentContext, AgentMessage
+from src.agents.deodoro import BaseAgent, AgentContext, AgentMessage, AgentResponse, AgentStatus
 from src.core import get_logger
 from src.core.exceptions import AgentExecutionError
+from src.core.profiling import profile_investigation, profile_span
 
 
 class ReportFormat(str, Enum):
@@ -95,7 +96,12 @@ class ReporterAgent(BaseAgent):
             default_language: Default language for reports
             max_report_length: Maximum report length in words
         """
-        super().__init__(agent_id)
+        super().__init__(
+            name=agent_id,
+            description="Gera relatórios em linguagem natural a partir de investigações e análises",
+            capabilities=["generate_report"] + [report_type.value for report_type in ReportType],
+        )
+        self.agent_id = agent_id
         self.default_language = default_language
         self.max_length = max_report_length
         self.logger = get_logger(__name__)
@@ -125,55 +131,57 @@ class ReporterAgent(BaseAgent):
             max_length=max_report_length,
         )
     
-    async def execute(
+    async def initialize(self) -> None:
+        """Initialize agent resources."""
+        self.status = AgentStatus.IDLE
+    
+    async def shutdown(self) -> None:
+        """Cleanup agent resources."""
+    
+    async def process(
         self,
         message: AgentMessage,
         context: AgentContext
-    ) -> AgentMessage:
+    ) -> AgentResponse:
         """
-        Execute report generation based on the incoming message.
+        Generate the report described by the message payload.
         
         Args:
-            message: Report request message
+            message: ``generate_report`` message whose payload is a ``ReportRequest``
             context: Agent execution context
             
         Returns:
-            Generated report message
+            Response whose ``result`` holds the rendered report under ``content``
         """
         try:
             self.logger.info(
                 "report_generation_started",
                 investigation_id=context.investigation_id,
                 agent_id=self.agent_id,
-                message_type=message.message_type,
+                action=message.action,
             )
             
             # Parse report request
-            if message.message_type == "report_request":
-                request = ReportRequest(**message.content)
+            if message.action == "generate_report":
+                request = ReportRequest(**message.payload)
             else:
                 raise AgentExecutionError(
-                    f"Unsupported message type: {message.message_type}",
-                    agent_id=self.agent_id
+                    f"Unsupported action: {message.action}",
+                    details={"agent": self.agent_id, "action": message.action},
                 )
             
             # Validate input data
             if not request.investigation_results and not request.analysis_results:
-                return AgentMessage(
-                    message_type="report_error",
-                    content={
-                        "status": "error",
-                        "error": "No data provided for report generation",
-                        "investigation_id": context.investigation_id,
-                    },
-                    metadata={"investigation_id": context.investigation_id}
-                )
+                return self._error_response(context, "No data provided for report generation")
             
-            # Generate report content
-            report_sections = await self._generate_report_content(request, context)
-            
-            # Render report in requested format
-            formatted_report = await self._render_report(report_sections, request, context)
+            async with profile_investigation(context.investigation_id, name="tiradentes.report"):
+                # Generate report content
+                async with profile_span("content", report_type=request.report_type):
+                    report_sections = await self._generate_report_content(request, context)
+                
+                # Render report in requested format
+                async with profile_span("render", format=request.format):
+                    formatted_report = await self._render_report(report_sections, request, context)
             
             # Create result message
             result = {
@@ -200,9 +208,10 @@ class ReporterAgent(BaseAgent):
                 sections_count=len(report_sections),
             )
             
-            return AgentMessage(
-                message_type="report_result",
-                content=result,
+            return AgentResponse(
+                agent_name=self.name,
+                status=AgentStatus.COMPLETED,
+                result=result,
                 metadata={"investigation_id": context.investigation_id}
             )
             
@@ -214,15 +223,20 @@ class ReporterAgent(BaseAgent):
                 agent_id=self.agent_id,
             )
             
-            return AgentMessage(
-                message_type="report_error",
-                content={
-                    "status": "error",
-                    "error": str(e),
-                    "investigation_id": context.investigation_id,
-                },
-                metadata={"investigation_id": context.investigation_id}
-            )
+            return self._error_response(context, str(e))
+    
+    def _error_response(self, context: AgentContext, error: str) -> AgentResponse:
+        return AgentResponse(
+            agent_name=self.name,
+            status=AgentStatus.ERROR,
+            result={
+                "status": "error",
+                "error": error,
+                "investigation_id": context.investigation_id,
+            },
+            error=error,
+            metadata={"investigation_id": context.investigation_id}
+        )
     
     async def _generate_report_content(
         self,
@@ -245,7 +259,7 @@ class ReporterAgent(BaseAgent):
         else:
             raise AgentExecutionError(
                 f"Unsupported report type: {request.report_type}",
-                agent_id=self.agent_id
+                details={"agent": self.agent_id, "report_type": request.report_type},
             )
     
     async def _generate_investigation_report(
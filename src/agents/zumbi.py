@@ -8,20 +8,29 @@ License: Proprietary - All rights reserved
 """
 
 import asyncio
+import hashlib
+import json
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Tuple
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
 from dataclasses import dataclass
 
 import numpy as np
 import pandas as pd
 from pydantic import BaseModel, Field as PydanticField
 
-from src.agents.deodoro import BaseAgent, AgentContext, AgentMessage
+from src.agents.deodoro import BaseAgent, AgentContext, AgentMessage, AgentResponse, AgentStatus
 from src.core import get_logger
 from src.core.exceptions import AgentExecutionError, DataAnalysisError
+from src.core.profiling import profile_investigation, profile_span
 from src.tools.transparency_api import TransparencyAPIClient, TransparencyAPIFilter
 from src.tools.models_client import ModelsClient, get_models_client
-from src.ml.spectral_analyzer import SpectralAnalyzer, SpectralAnomaly
+from src.tools.warehouse import get_warehouse
+from src.ml.spectral_analyzer import SpectralAnalyzer, SpectralAnomaly, PeriodicPattern
+from src.ml.incremental_detection import IncrementalDetectionState
+from src.ml.streaming_detection import StreamFinding, StreamingDetectionPipeline
+from src.infrastructure.agent_pool import run_cpu_bound
 
 
 @dataclass
@@ -39,6 +48,97 @@ class AnomalyResult:
     financial_impact: Optional[float] = None
 
 
+def find_duplicate_pairs(
+    objetos: List[str],
+    threshold: float,
+    min_length: int = 20
+) -> List[Tuple[int, int, float]]:
+    """
+    Find pairs of contract descriptions whose word sets are similar.
+    
+    CPU-bound (quadratic in the number of contracts), kept at module level
+    so it can run in the agent process pool.
+    
+    Args:
+        objetos: Lower-cased contract descriptions
+        threshold: Minimum Jaccard similarity
+        min_length: Descriptions shorter than this are ignored
+        
+    Returns:
+        List of (index1, index2, similarity) tuples
+    """
+    word_sets = [
+        set(objeto.split()) if len(objeto) >= min_length else None
+        for objeto in objetos
+    ]
+    
+    pairs = []
+    for i, words1 in enumerate(word_sets):
+        if not words1:
+            continue
+        for j in range(i + 1, len(word_sets)):
+            words2 = word_sets[j]
+            if not words2:
+                continue
+            
+            intersection = len(words1 & words2)
+            union = len(words1) + len(words2) - intersection
+            similarity = intersection / union if union > 0 else 0
+            
+            if similarity > threshold:
+                pairs.append((i, j, similarity))
+    
+    return pairs
+
+
+def compute_spectral_findings(
+    values: np.ndarray,
+    dates: List[datetime],
+    entity_name: Optional[str] = None
+) -> Tuple[List[SpectralAnomaly], List[PeriodicPattern]]:
+    """
+    Run spectral anomaly detection and periodic pattern search.
+    
+    CPU-bound (FFTs over the daily series), kept at module level so it can
+    run in the agent process pool.
+    """
+    analyzer = SpectralAnalyzer()
+    spending_data = pd.Series(values)
+    timestamps = pd.DatetimeIndex(dates)
+    
+    spectral_anomalies = analyzer.detect_anomalies(
+        spending_data,
+        timestamps,
+        context={'entity_name': entity_name or 'Unknown'}
+    )
+    periodic_patterns = analyzer.find_periodic_patterns(
+        spending_data,
+        timestamps,
+        entity_name=entity_name
+    )
+    return spectral_anomalies, periodic_patterns
+
+
+_NOT_CACHED = object()
+
+DEFAULT_ORGANIZATION_CODES = ["26000", "20000", "25000"]  # Health, Presidency, Education
+
+
+class _IncrementalScope:
+    """Incremental state of one organization set and the lock serializing its runs."""
+
+    def __init__(self, state: IncrementalDetectionState):
+        self.state = state
+        self.lock = asyncio.Lock()
+        self.loaded = False
+
+
+# Incremental state per (organization set, duplicate threshold), shared by all
+# InvestigatorAgents of the process: the API and the CLI build an agent per
+# request, so state kept on the instance would never be reused
+_incremental_scopes: "OrderedDict[Tuple[Tuple[str, ...], float], _IncrementalScope]" = OrderedDict()
+
+
 class InvestigationRequest(BaseModel):
     """Request for investigation with specific parameters."""
     
@@ -48,6 +148,10 @@ class InvestigationRequest(BaseModel):
     value_threshold: Optional[float] = PydanticField(default=None, description="Minimum value threshold for contracts")
     anomaly_types: Optional[List[str]] = PydanticField(default=None, description="Specific types of anomalies to look for")
     max_records: int = PydanticField(default=100, description="Maximum records to analyze")
+    incremental: bool = PydanticField(default=False, description="Reuse results of earlier runs over the same organizations")
+    streaming: bool = PydanticField(default=False, description="Analyze pages as they arrive instead of loading all records first")
+    records: Optional[List[Dict[str, Any]]] = PydanticField(default=None, description="Contract records to analyze instead of fetching them (e.g. a local dump)")
+    offline: bool = PydanticField(default=False, description="Use only local data; never call the Portal da Transparência API")
 
 
 class InvestigatorAgent(BaseAgent):
@@ -63,12 +167,19 @@ class InvestigatorAgent(BaseAgent):
     - Explainable AI for transparency
     """
     
+    # Investigation scopes (organization sets) whose incremental state is kept
+    MAX_INCREMENTAL_SCOPES = 8
+    
+    # Actions answered by ``process`` (``detect_anomalies`` is what Abaporu plans)
+    INVESTIGATION_ACTIONS = ("investigate", "detect_anomalies")
+    
     def __init__(
         self,
         agent_id: str = "investigator",
         price_anomaly_threshold: float = 2.5,  # Standard deviations
         concentration_threshold: float = 0.7,   # 70% concentration trigger
         duplicate_similarity_threshold: float = 0.85,  # 85% similarity
+        incremental_state_dir: Optional[Union[str, Path]] = None,
     ):
         """
         Initialize the Investigator Agent.
@@ -78,11 +189,28 @@ class InvestigatorAgent(BaseAgent):
             price_anomaly_threshold: Number of standard deviations for price anomalies
             concentration_threshold: Threshold for vendor concentration (0-1)
             duplicate_similarity_threshold: Threshold for duplicate detection (0-1)
+            incremental_state_dir: Directory where incremental state is also
+                saved, so it outlives the process (e.g. across CLI runs)
         """
-        super().__init__(agent_id)
+        super().__init__(
+            name=agent_id,
+            description="Detecta anomalias e padrões suspeitos em contratos públicos",
+            capabilities=[
+                "investigate",
+                "detect_anomalies",
+                "price_anomaly",
+                "vendor_concentration",
+                "temporal_patterns",
+                "spectral_patterns",
+                "duplicate_contracts",
+                "payment_patterns",
+            ],
+        )
+        self.agent_id = agent_id
         self.price_threshold = price_anomaly_threshold
         self.concentration_threshold = concentration_threshold
         self.duplicate_threshold = duplicate_similarity_threshold
+        self.incremental_state_dir = Path(incremental_state_dir) if incremental_state_dir else None
         self.logger = get_logger(__name__)
         
         # Initialize models client for ML inference (only if enabled)
@@ -106,6 +234,16 @@ class InvestigatorAgent(BaseAgent):
             "payment_patterns": self._detect_payment_anomalies,
         }
         
+        # Detectors that can be answered from incremental aggregates; the
+        # others are recomputed on the full input when it changed
+        self.incremental_detectors = {
+            "price_anomaly": self._incremental_price_anomalies,
+            "vendor_concentration": self._incremental_vendor_concentration,
+            "temporal_patterns": self._incremental_temporal_anomalies,
+            "duplicate_contracts": self._incremental_duplicate_contracts,
+            "payment_patterns": self._incremental_payment_anomalies,
+        }
+        
         self.logger.info(
             "zumbi_initialized",
             agent_id=agent_id,
@@ -113,91 +251,114 @@ class InvestigatorAgent(BaseAgent):
             concentration_threshold=concentration_threshold,
         )
     
-    async def execute(
+    async def initialize(self) -> None:
+        """Initialize agent resources."""
+        self.status = AgentStatus.IDLE
+    
+    async def shutdown(self) -> None:
+        """Nothing to release: the models client and the incremental state are shared."""
+    
+    async def process(
         self,
         message: AgentMessage,
         context: AgentContext
-    ) -> AgentMessage:
+    ) -> AgentResponse:
         """
-        Execute investigation based on the incoming message.
+        Run an investigation described by the message payload.
         
         Args:
-            message: Investigation request message
+            message: Message whose payload is an ``InvestigationRequest``
             context: Agent execution context
             
         Returns:
-            Investigation results with detected anomalies
+            Response whose ``result`` holds the detected anomalies and summary
+            (``status`` is ``completed``, ``no_data`` or ``error``)
         """
         try:
             self.logger.info(
                 "investigation_started",
                 investigation_id=context.investigation_id,
                 agent_id=self.agent_id,
-                message_type=message.message_type,
+                action=message.action,
             )
             
             # Parse investigation request
-            if message.message_type == "investigation_request":
-                request = InvestigationRequest(**message.content)
+            if message.action in self.INVESTIGATION_ACTIONS:
+                request = InvestigationRequest(**message.payload)
             else:
                 raise AgentExecutionError(
-                    f"Unsupported message type: {message.message_type}",
-                    agent_id=self.agent_id
+                    f"Unsupported action: {message.action}",
+                    details={"agent": self.agent_id, "action": message.action},
                 )
             
-            # Fetch data for investigation
-            contracts_data = await self._fetch_investigation_data(request, context)
-            
-            if not contracts_data:
-                return AgentMessage(
-                    message_type="investigation_result",
-                    content={
-                        "status": "no_data",
-                        "message": "No data found for the specified criteria",
-                        "anomalies": [],
-                        "summary": {"total_records": 0, "anomalies_found": 0}
-                    },
+            async with profile_investigation(context.investigation_id, name="zumbi.investigate"):
+                incremental_stats = None
+                if request.streaming:
+                    # Pages are analyzed as they arrive; the full dataset is never held
+                    async with profile_span("stream"):
+                        anomalies, summary = await self._run_streaming_detection(request, context)
+                    records_analyzed = summary["total_records"]
+                    if not records_analyzed:
+                        return self._no_data_message(context)
+                else:
+                    # Fetch data for investigation
+                    async with profile_span("fetch"):
+                        contracts_data = await self._fetch_investigation_data(request, context)
+                    
+                    if not contracts_data:
+                        return self._no_data_message(context)
+                    
+                    # Run anomaly detection
+                    async with profile_span("detect", records=len(contracts_data)):
+                        if request.incremental:
+                            anomalies, incremental_stats = await self._run_incremental_detection(
+                                contracts_data,
+                                request,
+                                context
+                            )
+                        else:
+                            anomalies = await self._run_anomaly_detection(
+                                contracts_data, 
+                                request, 
+                                context
+                            )
+                    
+                    # Generate investigation summary
+                    async with profile_span("summary"):
+                        summary = self._generate_investigation_summary(contracts_data, anomalies)
+                    records_analyzed = len(contracts_data)
+                
+                # Create result message
+                result = {
+                    "status": "completed",
+                    "query": request.query,
+                    "anomalies": [self._anomaly_to_dict(a) for a in anomalies],
+                    "summary": summary,
+                    "metadata": {
+                        "investigation_id": context.investigation_id,
+                        "timestamp": datetime.utcnow().isoformat(),
+                        "agent_id": self.agent_id,
+                        "records_analyzed": records_analyzed,
+                        "anomalies_detected": len(anomalies),
+                    }
+                }
+                if incremental_stats is not None:
+                    result["metadata"]["incremental"] = incremental_stats
+                
+                self.logger.info(
+                    "investigation_completed",
+                    investigation_id=context.investigation_id,
+                    records_analyzed=records_analyzed,
+                    anomalies_found=len(anomalies),
+                )
+                
+                return AgentResponse(
+                    agent_name=self.name,
+                    status=AgentStatus.COMPLETED,
+                    result=result,
                     metadata={"investigation_id": context.investigation_id}
                 )
             
-            # Run anomaly detection
-            anomalies = await self._run_anomaly_detection(
-                contracts_data, 
-                request, 
-                context
-            )
-            
-            # Generate investigation summary
-            summary = self._generate_investigation_summary(contracts_data, anomalies)
-            
-            # Create result message
-            result = {
-                "status": "completed",
-                "query": request.query,
-                "anomalies": [self._anomaly_to_dict(a) for a in anomalies],
-                "summary": summary,
-                "metadata": {
-                    "investigation_id": context.investigation_id,
-                    "timestamp": datetime.utcnow().isoformat(),
-                    "agent_id": self.agent_id,
-                    "records_analyzed": len(contracts_data),
-                    "anomalies_detected": len(anomalies),
-                }
-            }
-            
-            self.logger.info(
-                "investigation_completed",
-                investigation_id=context.investigation_id,
-                records_analyzed=len(contracts_data),
-                anomalies_found=len(anomalies),
-            )
-            
-            return AgentMessage(
-                message_type="investigation_result",
-                content=result,
-                metadata={"investigation_id": context.investigation_id}
-            )
-            
         except Exception as e:
             self.logger.error(
                 "investigation_failed",
@@ -206,16 +367,31 @@ class InvestigatorAgent(BaseAgent):
                 agent_id=self.agent_id,
             )
             
-            return AgentMessage(
-                message_type="investigation_error",
-                content={
+            return AgentResponse(
+                agent_name=self.name,
+                status=AgentStatus.ERROR,
+                result={
                     "status": "error",
                     "error": str(e),
                     "investigation_id": context.investigation_id,
                 },
+                error=str(e),
                 metadata={"investigation_id": context.investigation_id}
             )
     
+    def _no_data_message(self, context: AgentContext) -> AgentResponse:
+        return AgentResponse(
+            agent_name=self.name,
+            status=AgentStatus.COMPLETED,
+            result={
+                "status": "no_data",
+                "message": "No data found for the specified criteria",
+                "anomalies": [],
+                "summary": {"total_records": 0, "anomalies_found": 0}
+            },
+            metadata={"investigation_id": context.investigation_id}
+        )
+    
     async def _fetch_investigation_data(
         self,
         request: InvestigationRequest,
@@ -231,10 +407,40 @@ class InvestigatorAgent(BaseAgent):
         Returns:
             List of contract records for analysis
         """
+        if request.records is not None:
+            return request.records[:request.max_records]
+        
         all_contracts = []
         
         # Default organization codes if not specified
-        org_codes = request.organization_codes or ["26000", "20000", "25000"]  # Health, Presidency, Education
+        org_codes = request.organization_codes or DEFAULT_ORGANIZATION_CODES
+        
+        # Prefer the local warehouse when it has been populated (`cidadao ingest`)
+        warehouse = get_warehouse()
+        if warehouse is not None and warehouse.has_data("contratos"):
+            start_date, end_date = request.date_range or (None, None)
+            all_contracts = await warehouse.query_records(
+                "contratos",
+                org_codes=org_codes,
+                start_date=start_date,
+                end_date=end_date,
+                min_value=request.value_threshold,
+                limit=request.max_records,
+            )
+            if all_contracts:
+                self.logger.info(
+                    "data_loaded_from_warehouse",
+                    records=len(all_contracts),
+                    investigation_id=context.investigation_id,
+                )
+                return all_contracts
+        
+        if request.offline:
+            self.logger.info(
+                "offline_no_local_data",
+                investigation_id=context.investigation_id,
+            )
+            return all_contracts
         
         async with TransparencyAPIClient() as client:
             for org_code in org_codes:
@@ -309,7 +515,8 @@ class InvestigatorAgent(BaseAgent):
             if anomaly_type in self.anomaly_detectors:
                 try:
                     detector = self.anomaly_detectors[anomaly_type]
-                    anomalies = await detector(contracts_data, context)
+                    async with profile_span(f"detector.{anomaly_type}"):
+                        anomalies = await detector(contracts_data, context)
                     all_anomalies.extend(anomalies)
                     
                     self.logger.info(
@@ -332,6 +539,405 @@ class InvestigatorAgent(BaseAgent):
         
         return all_anomalies
     
+    def _incremental_scope(self, scope: Tuple[str, ...]) -> _IncrementalScope:
+        """Process-wide state for an organization set, least recently used scopes evicted."""
+        key = (scope, self.duplicate_threshold)
+        entry = _incremental_scopes.get(key)
+        if entry is None:
+            entry = _incremental_scopes[key] = _IncrementalScope(IncrementalDetectionState(self.duplicate_threshold))
+            while len(_incremental_scopes) > self.MAX_INCREMENTAL_SCOPES:
+                _incremental_scopes.popitem(last=False)
+        _incremental_scopes.move_to_end(key)
+        return entry
+    
+    def _incremental_state_path(self, scope: Tuple[str, ...]) -> Optional[Path]:
+        if self.incremental_state_dir is None:
+            return None
+        digest = hashlib.sha1(json.dumps([scope, self.duplicate_threshold]).encode()).hexdigest()[:16]
+        return self.incremental_state_dir / f"scope-{digest}.pkl"
+    
+    async def _run_incremental_detection(
+        self,
+        contracts_data: List[Dict[str, Any]],
+        request: InvestigationRequest,
+        context: AgentContext
+    ) -> Tuple[List[AnomalyResult], Dict[str, Any]]:
+        """
+        Run anomaly detection reusing what earlier runs over the same
+        organizations computed.
+        
+        Input contracts are fingerprinted and diffed against the scope's
+        state; only added, changed and removed contracts update the
+        aggregates (price baseline, vendor shares, month buckets, duplicate
+        candidates), and per-contract results are kept for unchanged
+        contracts. When nothing changed, every detector output is reused.
+        The state is shared by every agent of the process and, with
+        ``incremental_state_dir``, loaded from and saved to disk.
+        
+        Args:
+            contracts_data: Contract records to analyze
+            request: Investigation parameters
+            context: Agent context
+            
+        Returns:
+            Detected anomalies and a summary of the delta
+        """
+        scope = tuple(sorted(request.organization_codes or []))
+        entry = self._incremental_scope(scope)
+        path = self._incremental_state_path(scope)
+        all_anomalies = []
+        reused = []
+        
+        async with entry.lock:
+            if not entry.loaded and path is not None:
+                entry.state = await asyncio.to_thread(IncrementalDetectionState.load, path) or entry.state
+            entry.loaded = True
+            state = entry.state
+            
+            async with profile_span("incremental.update", records=len(contracts_data)):
+                delta = await asyncio.to_thread(state.update, contracts_data)
+            
+            types_to_run = request.anomaly_types or list(self.anomaly_detectors.keys())
+            for anomaly_type in types_to_run:
+                if anomaly_type not in self.anomaly_detectors:
+                    continue
+                try:
+                    anomalies = state.group_result(anomaly_type)
+                    if anomalies is not None:
+                        reused.append(anomaly_type)
+                    else:
+                        async with profile_span(f"detector.{anomaly_type}"):
+                            if anomaly_type in self.incremental_detectors:
+                                anomalies = self.incremental_detectors[anomaly_type](state)
+                            else:
+                                anomalies = await self.anomaly_detectors[anomaly_type](contracts_data, context)
+                        state.store_group_result(anomaly_type, anomalies)
+                    all_anomalies.extend(anomalies)
+                    
+                except Exception as e:
+                    self.logger.error(
+                        "anomaly_detection_failed",
+                        type=anomaly_type,
+                        error=str(e),
+                        investigation_id=context.investigation_id,
+                    )
+            
+            if path is not None:
+                try:
+                    await asyncio.to_thread(state.save, path)
+                except OSError as e:
+                    self.logger.warning("incremental_state_save_failed", path=str(path), error=str(e))
+        
+        stats = {
+            "added": len(delta.added),
+            "changed": len(delta.changed),
+            "removed": len(delta.removed),
+            "unchanged": delta.unchanged,
+            "reused_detectors": reused,
+        }
+        self.logger.info(
+            "incremental_detection_completed",
+            investigation_id=context.investigation_id,
+            **stats,
+        )
+        
+        # Sort anomalies by severity (descending)
+        all_anomalies.sort(key=lambda x: x.severity, reverse=True)
+        
+        return all_anomalies, stats
+    
+    def _incremental_price_anomalies(self, state: IncrementalDetectionState) -> List[AnomalyResult]:
+        outliers = state.price_outliers(self.price_threshold)
+        if not outliers:
+            return []
+        baseline = state.price_baseline()
+        percentile_95 = state.price_percentile(95)
+        return [
+            self._price_anomaly(state.contracts[key], value, z_score, baseline.mean, baseline.std, percentile_95)
+            for key, value, z_score in outliers
+        ]
+    
+    def _incremental_vendor_concentration(self, state: IncrementalDetectionState) -> List[AnomalyResult]:
+        if not state.vendor_stats or state.total_value == 0:
+            return []
+        anomalies = []
+        for stats in state.vendor_stats.values():
+            concentration = stats["total_value"] / state.total_value
+            if concentration > self.concentration_threshold:
+                anomalies.append(self._vendor_anomaly(dict(stats), concentration))
+        return anomalies
+    
+    def _incremental_temporal_anomalies(self, state: IncrementalDetectionState) -> List[AnomalyResult]:
+        if len(state.month_stats) < 3:  # Need minimum periods for comparison
+            return []
+        counts = [stats["count"] for stats in state.month_stats.values()]
+        mean_count = np.mean(counts)
+        std_count = np.std(counts)
+        if std_count == 0:
+            return []
+        anomalies = []
+        for date_key, stats in state.month_stats.items():
+            z_score = (stats["count"] - mean_count) / std_count
+            if z_score > 2.0:
+                anomalies.append(self._temporal_anomaly(date_key, dict(stats), z_score, mean_count))
+        return anomalies
+    
+    def _incremental_duplicate_contracts(self, state: IncrementalDetectionState) -> List[AnomalyResult]:
+        anomalies = []
+        for (key1, key2), similarity in state.duplicate_pairs.items():
+            # Report each pair in input order, as the full detector does
+            if state.positions[key1] > state.positions[key2]:
+                key1, key2 = key2, key1
+            contract1, contract2 = state.contracts[key1], state.contracts[key2]
+            anomalies.append(self._duplicate_anomaly(
+                contract1,
+                contract2,
+                contract1.get("objeto", "").lower(),
+                contract2.get("objeto", "").lower(),
+                similarity,
+            ))
+        return anomalies
+    
+    def _incremental_payment_anomalies(self, state: IncrementalDetectionState) -> List[AnomalyResult]:
+        anomalies = []
+        for key, contract in state.contracts.items():
+            anomaly = state.cached("payment_patterns", key, _NOT_CACHED)
+            if anomaly is _NOT_CACHED:
+                anomaly = self._payment_anomaly(contract)
+                state.store("payment_patterns", key, anomaly)
+            if anomaly is not None:
+                anomalies.append(anomaly)
+        return anomalies
+    
+    async def _iter_investigation_pages(
+        self,
+        request: InvestigationRequest,
+        context: AgentContext,
+        page_size: int = 500
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Yield contract pages for investigation as they become available.
+        
+        Same sources as ``_fetch_investigation_data`` (warehouse first, then
+        the Portal da Transparência API), but pages are handed over one at a
+        time instead of being accumulated.
+        
+        Args:
+            request: Investigation parameters
+            context: Agent context
+            page_size: Records per page
+            
+        Yields:
+            Lists of contract records
+        """
+        if request.records is not None:
+            records = request.records[:request.max_records]
+            for start in range(0, len(records), page_size):
+                yield records[start:start + page_size]
+            return
+        
+        org_codes = request.organization_codes or DEFAULT_ORGANIZATION_CODES
+        remaining = request.max_records
+        
+        warehouse = get_warehouse()
+        if warehouse is not None and warehouse.has_data("contratos"):
+            start_date, end_date = request.date_range or (None, None)
+            parts = warehouse.scan_parts(
+                "contratos",
+                org_codes=org_codes,
+                start_date=start_date,
+                end_date=end_date,
+                min_value=request.value_threshold,
+                limit=request.max_records,
+            )
+            streamed = 0
+            try:
+                # One part is read (off the event loop) per step, never the whole result
+                while True:
+                    table = await asyncio.to_thread(next, parts, None)
+                    if table is None:
+                        break
+                    streamed += len(table)
+                    for start in range(0, len(table), page_size):
+                        yield table.slice(start, start + page_size).to_records()
+            finally:
+                parts.close()
+            if streamed:
+                self.logger.info(
+                    "data_streamed_from_warehouse",
+                    records=streamed,
+                    investigation_id=context.investigation_id,
+                )
+                return
+        
+        if request.offline:
+            return
+        
+        async with TransparencyAPIClient() as client:
+            for org_code in org_codes:
+                page = 1
+                while remaining > 0:
+                    size = min(page_size, remaining)
+                    try:
+                        filters = TransparencyAPIFilter(
+                            codigo_orgao=org_code,
+                            ano=2024,  # Current year
+                            pagina=page,
+                            tamanho_pagina=size
+                        )
+                        if request.date_range:
+                            filters.data_inicio = request.date_range[0]
+                            filters.data_fim = request.date_range[1]
+                        if request.value_threshold:
+                            filters.valor_inicial = request.value_threshold
+                        
+                        response = await client.get_contracts(filters)
+                    
+                    except Exception as e:
+                        self.logger.warning(
+                            "data_fetch_failed",
+                            org_code=org_code,
+                            page=page,
+                            error=str(e),
+                            investigation_id=context.investigation_id,
+                        )
+                        break
+                    
+                    contracts = response.data[:remaining]
+                    for contract in contracts:
+                        contract["_org_code"] = org_code
+                    if contracts:
+                        remaining -= len(contracts)
+                        yield contracts
+                    if len(response.data) < size:
+                        break
+                    page += 1
+    
+    async def stream_anomalies(
+        self,
+        request: InvestigationRequest,
+        context: AgentContext,
+        pages: Optional[AsyncIterator[List[Dict[str, Any]]]] = None
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Detect anomalies while contract pages arrive.
+        
+        Each page is folded into a ``StreamingDetectionPipeline`` and then
+        dropped. Duplicates and payment anomalies are final as soon as they
+        are seen; price anomalies are provisional until the stream ends,
+        when they are confirmed or retracted against the final baseline.
+        Vendor concentration and temporal patterns need the whole population
+        and are reported at the end. Spectral analysis needs the complete
+        time series and is not run in streaming mode.
+        
+        Args:
+            request: Investigation parameters
+            context: Agent context
+            pages: Page source; defaults to ``_iter_investigation_pages``
+            
+        Yields:
+            ``("anomaly", AnomalyResult)`` for each new finding,
+            ``("retracted", AnomalyResult)`` for provisional findings the
+            final baseline does not support, and finally
+            ``("completed", {"anomalies": [...], "summary": {...}})``
+        """
+        types_to_run = [
+            anomaly_type
+            for anomaly_type in (request.anomaly_types or list(self.anomaly_detectors.keys()))
+            if anomaly_type in self.anomaly_detectors
+        ]
+        pipeline = StreamingDetectionPipeline(
+            price_threshold=self.price_threshold,
+            concentration_threshold=self.concentration_threshold,
+            duplicate_threshold=self.duplicate_threshold,
+            anomaly_types=[t for t in types_to_run if t in StreamingDetectionPipeline.STREAM_TYPES],
+        )
+        check_payments = "payment_patterns" in types_to_run
+        skipped = [
+            t for t in types_to_run
+            if t not in StreamingDetectionPipeline.STREAM_TYPES and t != "payment_patterns"
+        ]
+        
+        emitted: Dict[Tuple[str, str], AnomalyResult] = {}
+        payments: List[AnomalyResult] = []
+        pages_seen = 0
+        
+        if pages is None:
+            pages = self._iter_investigation_pages(request, context)
+        async for page in pages:
+            pages_seen += 1
+            findings = await asyncio.to_thread(pipeline.add_page, page)
+            for finding in findings:
+                anomaly = self._finding_to_anomaly(finding)
+                emitted[(finding.anomaly_type, finding.key)] = anomaly
+                yield "anomaly", anomaly
+            if check_payments:
+                for contract in page:
+                    anomaly = self._payment_anomaly(contract)
+                    if anomaly is not None:
+                        payments.append(anomaly)
+                        yield "anomaly", anomaly
+        
+        reconciliation = pipeline.finish()
+        for finding in reconciliation.retracted:
+            yield "retracted", emitted[(finding.anomaly_type, finding.key)]
+        
+        anomalies = [self._finding_to_anomaly(f) for f in reconciliation.confirmed]
+        for finding in reconciliation.final:
+            anomaly = self._finding_to_anomaly(finding)
+            anomalies.append(anomaly)
+            yield "anomaly", anomaly
+        anomalies.extend(payments)
+        
+        # Sort anomalies by severity (descending)
+        anomalies.sort(key=lambda x: x.severity, reverse=True)
+        
+        summary = self._summarize(pipeline.records, pipeline.total_value, anomalies)
+        summary["streaming"] = {
+            "pages": pages_seen,
+            "retracted": len(reconciliation.retracted),
+            "skipped_detectors": skipped,
+        }
+        self.logger.info(
+            "streaming_detection_completed",
+            investigation_id=context.investigation_id,
+            records=pipeline.records,
+            anomalies_found=len(anomalies),
+            **summary["streaming"],
+        )
+        yield "completed", {"anomalies": anomalies, "summary": summary}
+    
+    async def _run_streaming_detection(
+        self,
+        request: InvestigationRequest,
+        context: AgentContext
+    ) -> Tuple[List[AnomalyResult], Dict[str, Any]]:
+        """Drain ``stream_anomalies`` and return its final anomalies and summary."""
+        async for event, payload in self.stream_anomalies(request, context):
+            if event == "completed":
+                return payload["anomalies"], payload["summary"]
+        return [], self._summarize(0, 0.0, [])
+    
+    def _finding_to_anomaly(self, finding: StreamFinding) -> AnomalyResult:
+        """Build the report for a streaming pipeline finding."""
+        data = finding.data
+        if finding.anomaly_type == "price_anomaly":
+            return self._price_anomaly(
+                data["contract"], data["value"], data["z_score"], data["mean"], data["std"], data["percentile_95"]
+            )
+        if finding.anomaly_type == "vendor_concentration":
+            return self._vendor_anomaly(data["stats"], data["concentration"])
+        if finding.anomaly_type == "temporal_patterns":
+            return self._temporal_anomaly(finding.key, data["stats"], data["z_score"], data["mean_count"])
+        contract1, contract2 = data["contract1"], data["contract2"]
+        return self._duplicate_anomaly(
+            contract1,
+            contract2,
+            contract1.get("objeto", "").lower(),
+            contract2.get("objeto", "").lower(),
+            data["similarity"],
+        )
+    
     async def _detect_price_anomalies(
         self,
         contracts_data: List[Dict[str, Any]],
@@ -372,45 +978,57 @@ class InvestigatorAgent(BaseAgent):
         
         for i, (contract, value, z_score) in enumerate(zip(valid_contracts, values, z_scores)):
             if z_score > self.price_threshold:
-                severity = min(z_score / 5.0, 1.0)  # Normalize to 0-1
-                confidence = min(z_score / 3.0, 1.0)
-                
-                anomaly = AnomalyResult(
-                    anomaly_type="price_anomaly",
-                    severity=severity,
-                    confidence=confidence,
-                    description=f"Contrato com valor suspeito: R$ {value:,.2f}",
-                    explanation=(
-                        f"O valor deste contrato está {z_score:.1f} desvios padrão acima da média "
-                        f"(R$ {mean_value:,.2f}). Valores muito acima do padrão podem indicar "
-                        f"superfaturamento ou irregularidades no processo licitatório."
-                    ),
-                    evidence={
-                        "contract_value": value,
-                        "mean_value": mean_value,
-                        "std_deviation": std_value,
-                        "z_score": z_score,
-                        "percentile": np.percentile(values_array, 95),
-                    },
-                    recommendations=[
-                        "Investigar justificativas para o valor elevado",
-                        "Comparar com contratos similares de outros órgãos",
-                        "Verificar processo licitatório e documentação",
-                        "Analisar histórico do fornecedor",
-                    ],
-                    affected_entities=[{
-                        "contract_id": contract.get("id"),
-                        "object": contract.get("objeto", "")[:100],
-                        "supplier": contract.get("fornecedor", {}).get("nome", "N/A"),
-                        "organization": contract.get("_org_code"),
-                    }],
-                    financial_impact=value - mean_value,
-                )
-                
-                anomalies.append(anomaly)
+                anomalies.append(self._price_anomaly(
+                    contract, value, z_score, mean_value, std_value, np.percentile(values_array, 95)
+                ))
         
         return anomalies
     
+    def _price_anomaly(
+        self,
+        contract: Dict[str, Any],
+        value: float,
+        z_score: float,
+        mean_value: float,
+        std_value: float,
+        percentile_95: float
+    ) -> AnomalyResult:
+        """Build the price anomaly for one outlier contract."""
+        severity = min(z_score / 5.0, 1.0)  # Normalize to 0-1
+        confidence = min(z_score / 3.0, 1.0)
+        
+        return AnomalyResult(
+            anomaly_type="price_anomaly",
+            severity=severity,
+            confidence=confidence,
+            description=f"Contrato com valor suspeito: R$ {value:,.2f}",
+            explanation=(
+                f"O valor deste contrato está {z_score:.1f} desvios padrão acima da média "
+                f"(R$ {mean_value:,.2f}). Valores muito acima do padrão podem indicar "
+                f"superfaturamento ou irregularidades no processo licitatório."
+            ),
+            evidence={
+                "contract_value": value,
+                "mean_value": mean_value,
+                "std_deviation": std_value,
+                "z_score": z_score,
+                "percentile": percentile_95,
+            },
+            recommendations=[
+                "Investigar justificativas para o valor elevado",
+                "Comparar com contratos similares de outros órgãos",
+                "Verificar processo licitatório e documentação",
+                "Analisar histórico do fornecedor",
+            ],
+            affected_entities=[{
+                "contract_id": contract.get("id"),
+                "object": contract.get("objeto", "")[:100],
+                "supplier": contract.get("fornecedor", {}).get("nome", "N/A"),
+                "organization": contract.get("_org_code"),
+            }],
+            financial_impact=value - mean_value,
+        )
+    
     async def _detect_vendor_concentration(
         self,
         contracts_data: List[Dict[str, Any]],
@@ -464,47 +1082,49 @@ class InvestigatorAgent(BaseAgent):
             concentration = stats["total_value"] / total_value
             
             if concentration > self.concentration_threshold:
-                severity = min(concentration * 1.5, 1.0)
-                confidence = concentration
-                
-                anomaly = AnomalyResult(
-                    anomaly_type="vendor_concentration",
-                    severity=severity,
-                    confidence=confidence,
-                    description=f"Concentração excessiva de contratos: {stats['name']}",
-                    explanation=(
-                        f"O fornecedor {stats['name']} concentra {concentration:.1%} do valor total "
-                        f"dos contratos analisados ({stats['contract_count']} contratos). "
-                        f"Alta concentração pode indicar direcionamento de licitações ou "
-                        f"falta de competitividade no processo."
-                    ),
-                    evidence={
-                        "vendor_name": stats["name"],
-                        "vendor_cnpj": stats["cnpj"],
-                        "concentration_percentage": concentration * 100,
-                        "total_value": stats["total_value"],
-                        "contract_count": stats["contract_count"],
-                        "market_share": concentration,
-                    },
-                    recommendations=[
-                        "Verificar se houve direcionamento nas licitações",
-                        "Analisar competitividade do mercado",
-                        "Investigar relacionamento entre órgão e fornecedor",
-                        "Revisar critérios de seleção de fornecedores",
-                    ],
-                    affected_entities=[{
-                        "vendor_name": stats["name"],
-                        "vendor_cnpj": stats["cnpj"],
-                        "contract_count": stats["contract_count"],
-                        "total_value": stats["total_value"],
-                    }],
-                    financial_impact=stats["total_value"],
-                )
-                
-                anomalies.append(anomaly)
+                anomalies.append(self._vendor_anomaly(stats, concentration))
         
         return anomalies
     
+    def _vendor_anomaly(self, stats: Dict[str, Any], concentration: float) -> AnomalyResult:
+        """Build the concentration anomaly for one vendor."""
+        severity = min(concentration * 1.5, 1.0)
+        confidence = concentration
+        
+        return AnomalyResult(
+            anomaly_type="vendor_concentration",
+            severity=severity,
+            confidence=confidence,
+            description=f"Concentração excessiva de contratos: {stats['name']}",
+            explanation=(
+                f"O fornecedor {stats['name']} concentra {concentration:.1%} do valor total "
+                f"dos contratos analisados ({stats['contract_count']} contratos). "
+                f"Alta concentração pode indicar direcionamento de licitações ou "
+                f"falta de competitividade no processo."
+            ),
+            evidence={
+                "vendor_name": stats["name"],
+                "vendor_cnpj": stats["cnpj"],
+                "concentration_percentage": concentration * 100,
+                "total_value": stats["total_value"],
+                "contract_count": stats["contract_count"],
+                "market_share": concentration,
+            },
+            recommendations=[
+                "Verificar se houve direcionamento nas licitações",
+                "Analisar competitividade do mercado",
+                "Investigar relacionamento entre órgão e fornecedor",
+                "Revisar critérios de seleção de fornecedores",
+            ],
+            affected_entities=[{
+                "vendor_name": stats["name"],
+                "vendor_cnpj": stats["cnpj"],
+                "contract_count": stats["contract_count"],
+                "total_value": stats["total_value"],
+            }],
+            financial_impact=stats["total_value"],
+        )
+    
     async def _detect_temporal_anomalies(
         self,
         contracts_data: List[Dict[str, Any]],
@@ -575,45 +1195,53 @@ class InvestigatorAgent(BaseAgent):
                 z_score = (stats["count"] - mean_count) / std_count
                 
                 if z_score > 2.0:  # More than 2 standard deviations
-                    severity = min(z_score / 4.0, 1.0)
-                    confidence = min(z_score / 3.0, 1.0)
-                    
-                    anomaly = AnomalyResult(
-                        anomaly_type="temporal_patterns",
-                        severity=severity,
-                        confidence=confidence,
-                        description=f"Atividade contratual suspeita em {date_key}",
-                        explanation=(
-                            f"Em {date_key} foram assinados {stats['count']} contratos, "
-                            f"{z_score:.1f} desvios padrão acima da média ({mean_count:.1f}). "
-                            f"Picos de atividade podem indicar direcionamento ou urgência "
-                            f"inadequada nos processos."
-                        ),
-                        evidence={
-                            "period": date_key,
-                            "contract_count": stats["count"],
-                            "mean_count": mean_count,
-                            "z_score": z_score,
-                            "total_value": stats["total_value"],
-                        },
-                        recommendations=[
-                            "Investigar justificativas para a concentração temporal",
-                            "Verificar se houve emergência ou urgência",
-                            "Analisar qualidade dos processos licitatórios",
-                            "Revisar planejamento de contratações",
-                        ],
-                        affected_entities=[{
-                            "period": date_key,
-                            "contract_count": stats["count"],
-                            "total_value": stats["total_value"],
-                        }],
-                        financial_impact=stats["total_value"],
-                    )
-                    
-                    anomalies.append(anomaly)
+                    anomalies.append(self._temporal_anomaly(date_key, stats, z_score, mean_count))
         
         return anomalies
     
+    def _temporal_anomaly(
+        self,
+        date_key: str,
+        stats: Dict[str, Any],
+        z_score: float,
+        mean_count: float
+    ) -> AnomalyResult:
+        """Build the temporal anomaly for one busy month."""
+        severity = min(z_score / 4.0, 1.0)
+        confidence = min(z_score / 3.0, 1.0)
+        
+        return AnomalyResult(
+            anomaly_type="temporal_patterns",
+            severity=severity,
+            confidence=confidence,
+            description=f"Atividade contratual suspeita em {date_key}",
+            explanation=(
+                f"Em {date_key} foram assinados {stats['count']} contratos, "
+                f"{z_score:.1f} desvios padrão acima da média ({mean_count:.1f}). "
+                f"Picos de atividade podem indicar direcionamento ou urgência "
+                f"inadequada nos processos."
+            ),
+            evidence={
+                "period": date_key,
+                "contract_count": stats["count"],
+                "mean_count": mean_count,
+                "z_score": z_score,
+                "total_value": stats["total_value"],
+            },
+            recommendations=[
+                "Investigar justificativas para a concentração temporal",
+                "Verificar se houve emergência ou urgência",
+                "Analisar qualidade dos processos licitatórios",
+                "Revisar planejamento de contratações",
+            ],
+            affected_entities=[{
+                "period": date_key,
+                "contract_count": stats["count"],
+                "total_value": stats["total_value"],
+            }],
+            financial_impact=stats["total_value"],
+        )
+    
     async def _detect_duplicate_contracts(
         self,
         contracts_data: List[Dict[str, Any]],
@@ -632,78 +1260,71 @@ class InvestigatorAgent(BaseAgent):
         anomalies = []
         
         # Simple similarity detection based on object description
-        for i, contract1 in enumerate(contracts_data):
-            objeto1 = contract1.get("objeto", "").lower()
-            if len(objeto1) < 20:  # Skip very short descriptions
-                continue
-                
-            for j, contract2 in enumerate(contracts_data[i+1:], start=i+1):
-                objeto2 = contract2.get("objeto", "").lower()
-                if len(objeto2) < 20:
-                    continue
-                
-                # Calculate simple similarity (Jaccard similarity of words)
-                words1 = set(objeto1.split())
-                words2 = set(objeto2.split())
-                
-                if len(words1) == 0 or len(words2) == 0:
-                    continue
-                
-                intersection = len(words1.intersection(words2))
-                union = len(words1.union(words2))
-                similarity = intersection / union if union > 0 else 0
-                
-                if similarity > self.duplicate_threshold:
-                    severity = similarity
-                    confidence = similarity
-                    
-                    valor1 = contract1.get("valorInicial") or contract1.get("valorGlobal") or 0
-                    valor2 = contract2.get("valorInicial") or contract2.get("valorGlobal") or 0
-                    
-                    anomaly = AnomalyResult(
-                        anomaly_type="duplicate_contracts",
-                        severity=severity,
-                        confidence=confidence,
-                        description="Contratos potencialmente duplicados detectados",
-                        explanation=(
-                            f"Dois contratos com {similarity:.1%} de similaridade foram "
-                            f"encontrados. Contratos similares podem indicar pagamentos "
-                            f"duplicados ou direcionamento inadequado."
-                        ),
-                        evidence={
-                            "similarity_score": similarity,
-                            "contract1_id": contract1.get("id"),
-                            "contract2_id": contract2.get("id"),
-                            "contract1_value": valor1,
-                            "contract2_value": valor2,
-                            "object1": objeto1[:100],
-                            "object2": objeto2[:100],
-                        },
-                        recommendations=[
-                            "Verificar se são contratos distintos ou duplicados",
-                            "Analisar justificativas para objetos similares",
-                            "Investigar fornecedores envolvidos",
-                            "Revisar controles internos de contratação",
-                        ],
-                        affected_entities=[
-                            {
-                                "contract_id": contract1.get("id"),
-                                "object": objeto1[:100],
-                                "value": valor1,
-                            },
-                            {
-                                "contract_id": contract2.get("id"),
-                                "object": objeto2[:100],
-                                "value": valor2,
-                            },
-                        ],
-                        financial_impact=float(valor1) + float(valor2) if isinstance(valor1, (int, float)) and isinstance(valor2, (int, float)) else None,
-                    )
-                    
-                    anomalies.append(anomaly)
+        objetos = [contract.get("objeto", "").lower() for contract in contracts_data]
+        pairs = await run_cpu_bound(find_duplicate_pairs, objetos, self.duplicate_threshold)
+        
+        for i, j, similarity in pairs:
+            anomalies.append(self._duplicate_anomaly(
+                contracts_data[i], contracts_data[j], objetos[i], objetos[j], similarity
+            ))
         
         return anomalies
     
+    def _duplicate_anomaly(
+        self,
+        contract1: Dict[str, Any],
+        contract2: Dict[str, Any],
+        objeto1: str,
+        objeto2: str,
+        similarity: float
+    ) -> AnomalyResult:
+        """Build the anomaly for one pair of near-duplicate contracts."""
+        severity = similarity
+        confidence = similarity
+        
+        valor1 = contract1.get("valorInicial") or contract1.get("valorGlobal") or 0
+        valor2 = contract2.get("valorInicial") or contract2.get("valorGlobal") or 0
+        
+        return AnomalyResult(
+            anomaly_type="duplicate_contracts",
+            severity=severity,
+            confidence=confidence,
+            description="Contratos potencialmente duplicados detectados",
+            explanation=(
+                f"Dois contratos com {similarity:.1%} de similaridade foram "
+                f"encontrados. Contratos similares podem indicar pagamentos "
+                f"duplicados ou direcionamento inadequado."
+            ),
+            evidence={
+                "similarity_score": similarity,
+                "contract1_id": contract1.get("id"),
+                "contract2_id": contract2.get("id"),
+                "contract1_value": valor1,
+                "contract2_value": valor2,
+                "object1": objeto1[:100],
+                "object2": objeto2[:100],
+            },
+            recommendations=[
+                "Verificar se são contratos distintos ou duplicados",
+                "Analisar justificativas para objetos similares",
+                "Investigar fornecedores envolvidos",
+                "Revisar controles internos de contratação",
+            ],
+            affected_entities=[
+                {
+                    "contract_id": contract1.get("id"),
+                    "object": objeto1[:100],
+                    "value": valor1,
+                },
+                {
+                    "contract_id": contract2.get("id"),
+                    "object": objeto2[:100],
+                    "value": valor2,
+                },
+            ],
+            financial_impact=float(valor1) + float(valor2) if isinstance(valor1, (int, float)) and isinstance(valor2, (int, float)) else None,
+        )
+    
     async def _detect_payment_anomalies(
         self,
         contracts_data: List[Dict[str, Any]],
@@ -723,60 +1344,66 @@ class InvestigatorAgent(BaseAgent):
         
         # Look for contracts with unusual value patterns
         for contract in contracts_data:
-            valor_inicial = contract.get("valorInicial")
-            valor_global = contract.get("valorGlobal")
-            
-            if valor_inicial and valor_global:
-                try:
-                    inicial = float(valor_inicial)
-                    global_val = float(valor_global)
-                    
-                    # Check for significant discrepancies
-                    if inicial > 0 and global_val > 0:
-                        ratio = abs(inicial - global_val) / max(inicial, global_val)
-                        
-                        if ratio > 0.5:  # 50% discrepancy threshold
-                            severity = min(ratio, 1.0)
-                            confidence = ratio
-                            
-                            anomaly = AnomalyResult(
-                                anomaly_type="payment_patterns",
-                                severity=severity,
-                                confidence=confidence,
-                                description="Discrepância significativa entre valores do contrato",
-                                explanation=(
-                                    f"Diferença de {ratio:.1%} entre valor inicial "
-                                    f"(R$ {inicial:,.2f}) e valor global (R$ {global_val:,.2f}). "
-                                    f"Grandes discrepâncias podem indicar aditivos excessivos "
-                                    f"ou irregularidades nos pagamentos."
-                                ),
-                                evidence={
-                                    "valor_inicial": inicial,
-                                    "valor_global": global_val,
-                                    "discrepancy_ratio": ratio,
-                                    "absolute_difference": abs(inicial - global_val),
-                                },
-                                recommendations=[
-                                    "Investigar justificativas para alterações de valor",
-                                    "Verificar aditivos contratuais",
-                                    "Analisar execução e pagamentos realizados",
-                                    "Revisar controles de alteração contratual",
-                                ],
-                                affected_entities=[{
-                                    "contract_id": contract.get("id"),
-                                    "object": contract.get("objeto", "")[:100],
-                                    "supplier": contract.get("fornecedor", {}).get("nome", "N/A"),
-                                }],
-                                financial_impact=abs(inicial - global_val),
-                            )
-                            
-                            anomalies.append(anomaly)
-                            
-                except (ValueError, TypeError):
-                    continue
+            anomaly = self._payment_anomaly(contract)
+            if anomaly is not None:
+                anomalies.append(anomaly)
         
         return anomalies
     
+    def _payment_anomaly(self, contract: Dict[str, Any]) -> Optional[AnomalyResult]:
+        """Payment anomaly of one contract, if its initial and global values diverge."""
+        valor_inicial = contract.get("valorInicial")
+        valor_global = contract.get("valorGlobal")
+        
+        if not (valor_inicial and valor_global):
+            return None
+        try:
+            inicial = float(valor_inicial)
+            global_val = float(valor_global)
+        except (ValueError, TypeError):
+            return None
+        
+        # Check for significant discrepancies
+        if inicial <= 0 or global_val <= 0:
+            return None
+        ratio = abs(inicial - global_val) / max(inicial, global_val)
+        if ratio <= 0.5:  # 50% discrepancy threshold
+            return None
+        
+        severity = min(ratio, 1.0)
+        confidence = ratio
+        
+        return AnomalyResult(
+            anomaly_type="payment_patterns",
+            severity=severity,
+            confidence=confidence,
+            description="Discrepância significativa entre valores do contrato",
+            explanation=(
+                f"Diferença de {ratio:.1%} entre valor inicial "
+                f"(R$ {inicial:,.2f}) e valor global (R$ {global_val:,.2f}). "
+                f"Grandes discrepâncias podem indicar aditivos excessivos "
+                f"ou irregularidades nos pagamentos."
+            ),
+            evidence={
+                "valor_inicial": inicial,
+                "valor_global": global_val,
+                "discrepancy_ratio": ratio,
+                "absolute_difference": abs(inicial - global_val),
+            },
+            recommendations=[
+                "Investigar justificativas para alterações de valor",
+                "Verificar aditivos contratuais",
+                "Analisar execução e pagamentos realizados",
+                "Revisar controles de alteração contratual",
+            ],
+            affected_entities=[{
+                "contract_id": contract.get("id"),
+                "object": contract.get("objeto", "")[:100],
+                "supplier": contract.get("fornecedor", {}).get("nome", "N/A"),
+            }],
+            financial_impact=abs(inicial - global_val),
+        )
+    
     async def _detect_spectral_anomalies(
         self,
         contracts_data: List[Dict[str, Any]],
@@ -804,13 +1431,14 @@ class InvestigatorAgent(BaseAgent):
             
             # Extract spending values and timestamps
             spending_data = pd.Series([item['value'] for item in time_series_data])
-            timestamps = pd.DatetimeIndex([item['date'] for item in time_series_data])
+            entity_name = context.investigation_id if hasattr(context, 'investigation_id') else None
             
-            # Perform spectral anomaly detection
-            spectral_anomalies = self.spectral_analyzer.detect_anomalies(
-                spending_data, 
-                timestamps,
-                context={'entity_name': context.investigation_id if hasattr(context, 'investigation_id') else 'Unknown'}
+            # Perform spectral anomaly detection and find periodic patterns
+            spectral_anomalies, periodic_patterns = await run_cpu_bound(
+                compute_spectral_findings,
+                spending_data.to_numpy(),
+                [item['date'] for item in time_series_data],
+                entity_name
             )
             
             # Convert SpectralAnomaly objects to AnomalyResult objects
@@ -833,13 +1461,6 @@ class InvestigatorAgent(BaseAgent):
                 )
                 anomalies.append(anomaly)
             
-            # Find periodic patterns
-            periodic_patterns = self.spectral_analyzer.find_periodic_patterns(
-                spending_data,
-                timestamps,
-                entity_name=context.investigation_id if hasattr(context, 'investigation_id') else None
-            )
-            
             # Convert suspicious periodic patterns to anomalies
             for pattern in periodic_patterns:
                 if pattern.pattern_type == "suspicious" or pattern.amplitude > 0.5:
@@ -1055,7 +1676,6 @@ class InvestigatorAgent(BaseAgent):
     ) -> Dict[str, Any]:
         """Generate summary statistics for the investigation."""
         total_value = 0
-        suspicious_value = 0
         
         # Calculate total contract value
         for contract in contracts_data:
@@ -1063,6 +1683,17 @@ class InvestigatorAgent(BaseAgent):
             if isinstance(valor, (int, float)):
                 total_value += float(valor)
         
+        return self._summarize(len(contracts_data), total_value, anomalies)
+    
+    def _summarize(
+        self,
+        total_records: int,
+        total_value: float,
+        anomalies: List[AnomalyResult]
+    ) -> Dict[str, Any]:
+        """Summary statistics from record totals and the detected anomalies."""
+        suspicious_value = 0
+        
         # Calculate suspicious value
         for anomaly in anomalies:
             if anomaly.financial_impact:
@@ -1075,10 +1706,10 @@ class InvestigatorAgent(BaseAgent):
             anomaly_counts[anomaly_type] = anomaly_counts.get(anomaly_type, 0) + 1
         
         # Calculate risk score
-        risk_score = min(len(anomalies) / max(len(contracts_data), 1) * 10, 10)
+        risk_score = min(len(anomalies) / max(total_records, 1) * 10, 10)
         
         return {
-            "total_records": len(contracts_data),
+            "total_records": total_records,
             "anomalies_found": len(anomalies),
             "total_value": total_value,
             "suspicious_value": suspicious_value,
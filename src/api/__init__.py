@@ -1,4 +1,4 @@
-"""FastAPI-based REST API for Cidado.AI.
+"""FastAPI-based REST API for Cidadão.AI.
 
 This module provides a comprehensive REST API for the multi-agent transparency
 platform, featuring enterprise-grade security, comprehensive monitoring,
@@ -21,19 +21,27 @@ Main Components:
 - models: Pydantic models for request/response validation
 
 Usage:
-    from src.api import create_app, get_api_router
+    from src.api import create_app
     
     app = create_app()
-    router = get_api_router()
 
 Status: Production-ready with comprehensive enterprise features.
 """
 
-from src.api.app import create_app
-from src.api.routes import get_api_router
+
+
+def create_app():
+    """Return the configured FastAPI application.
+    
+    Imported lazily so that importing submodules (middleware, routes) does not
+    build the whole application.
+    """
+    from src.api.app import app
+    
+    return app
+
 
 # Key exports for application setup
 __all__ = [
     "create_app",
-    "get_api_router",
 ]
\ No newline at end of file
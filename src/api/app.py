@@ -7,6 +7,7 @@ License: Proprietary - All rights reserved
 """
 
 import asyncio
+import tracemalloc
 from contextlib import asynccontextmanager
 from typing import Dict, Any
 
@@ -20,7 +21,7 @@ from fastapi.openapi.utils import get_openapi
 from src.core import get_logger, settings
 from src.core.exceptions import CidadaoAIError, create_error_response
 from src.core.audit import audit_logger, AuditEventType, AuditSeverity, AuditContext
-from src.api.routes import investigations, analysis, reports, health, auth, oauth, audit
+from src.api.routes import investigations, analysis, reports, health, auth, oauth, audit, profiling
 from src.api.middleware.rate_limiting import RateLimitMiddleware
 from src.api.middleware.authentication import AuthenticationMiddleware
 from src.api.middleware.logging_middleware import LoggingMiddleware
@@ -49,6 +50,10 @@ async def lifespan(app: FastAPI):
         }
     )
     
+    # Allocation tracking for investigation profiles (opt-in, adds overhead)
+    if settings.profiling_trace_allocations and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    
     # Initialize global resources here
     # - Database connections
     # - Background tasks
@@ -66,6 +71,9 @@ async def lifespan(app: FastAPI):
         severity=AuditSeverity.LOW
     )
     
+    # Write pending audit events before exiting
+    await audit_logger.close()
+    
     # Cleanup resources here
     # - Close database connections
     # - Stop background tasks
@@ -207,6 +215,12 @@ app.include_router(
     tags=["Health Check"]
 )
 
+app.include_router(
+    profiling.router,
+    prefix="/health/profiler",
+    tags=["Health Check"]
+)
+
 app.include_router(
     auth.router,
     prefix="/auth",
@@ -8,7 +8,7 @@ License: Proprietary - All rights reserved
 
 import time
 import uuid
-from typing import Callable
+from typing import Callable, List
 
 from fastapi import Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware
@@ -16,6 +16,28 @@ from starlette.middleware.base import BaseHTTPMiddleware
 from src.core import get_logger
 
 
+# Callbacks (duration_seconds, endpoint, status_code) run for every finished
+# request; registered by the observability layer once it is initialized.
+_request_observers: List[Callable[[float, str, int], None]] = []
+
+
+def add_request_observer(observer: Callable[[float, str, int], None]) -> None:
+    """Report every request's duration, route template and status to ``observer``."""
+    if observer not in _request_observers:
+        _request_observers.append(observer)
+
+
+def remove_request_observer(observer: Callable[[float, str, int], None]) -> None:
+    if observer in _request_observers:
+        _request_observers.remove(observer)
+
+
+def _route_template(request: Request) -> str:
+    """Matched route path (e.g. ``/investigations/{investigation_id}``), keeping label cardinality bounded."""
+    route = request.scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
 class LoggingMiddleware(BaseHTTPMiddleware):
     """Middleware for logging API requests and responses."""
     
@@ -74,6 +96,8 @@ class LoggingMiddleware(BaseHTTPMiddleware):
             response.headers["X-Request-ID"] = request_id
             response.headers["X-Process-Time"] = f"{process_time:.4f}"
             
+            self._notify_observers(request, process_time, response.status_code)
+            
             return response
             
         except Exception as exc:
@@ -92,9 +116,22 @@ class LoggingMiddleware(BaseHTTPMiddleware):
                 client_ip=client_ip,
             )
             
+            self._notify_observers(request, process_time, 500)
+            
             # Re-raise the exception
             raise exc
     
+    def _notify_observers(self, request: Request, process_time: float, status_code: int):
+        """Report the request to registered metrics observers."""
+        if not _request_observers:
+            return
+        endpoint = _route_template(request)
+        for observer in list(_request_observers):
+            try:
+                observer(process_time, endpoint, status_code)
+            except Exception as e:
+                self.logger.warning("request_observer_failed", error=str(e))
+    
     def _get_client_ip(self, request: Request) -> str:
         """Extract client IP address from request."""
         # Check for forwarded headers first (for proxy/load balancer setups)
@@ -74,11 +74,29 @@ class SecurityConfig:
         r"exec\s*\(",  # Command injection
         r"system\s*\(",  # Command injection
         r"eval\s*\(",  # Code injection
-        r"../",  # Path traversal
+        r"\.\./",  # Path traversal
         r"\.\.\\",  # Path traversal (Windows)
         r"file://",  # Local file inclusion
         r"ftp://",  # FTP access
     ]
+    
+    # Body scanning
+    BODY_SCAN_CHUNK_SIZE = 64 * 1024  # Bytes searched per window
+    BODY_SCAN_OVERLAP = 4096  # Window overlap so boundary-straddling matches are found
+    
+    # Media types (and prefixes) that cannot carry the textual payloads above,
+    # skipped only when the first BODY_SNIFF_SIZE bytes are binary as well
+    BODY_SNIFF_SIZE = 512
+    UNSCANNED_CONTENT_TYPES = (
+        "image/",
+        "audio/",
+        "video/",
+        "font/",
+        "application/octet-stream",
+        "application/pdf",
+        "application/zip",
+        "application/gzip",
+    )
 
 
 class IPBlockList:
@@ -205,11 +223,159 @@ class RateLimiter:
         }
 
 
+class SuspiciousPatternScanner:
+    """
+    Case-folded scanner for the suspicious patterns.
+    
+    Each input is lowercased once and the patterns are matched without
+    ``re.IGNORECASE``, which lets the regex engine use each pattern's literal
+    prefix ("<script", "union", "../", ...) as a fast skip instead of testing
+    every position. Patterns must therefore be written in lowercase. Bodies
+    are scanned as raw bytes (ASCII case folding, no decode) in bounded,
+    overlapping windows. Bodies and multipart parts whose declared content
+    type cannot carry the payloads are skipped, unless their first bytes
+    sniff as text: the client picks the content type, not the content.
+    """
+    
+    def __init__(
+        self,
+        patterns: List[str],
+        chunk_size: int = SecurityConfig.BODY_SCAN_CHUNK_SIZE,
+        overlap: int = SecurityConfig.BODY_SCAN_OVERLAP,
+        unscanned_content_types: Tuple[str, ...] = SecurityConfig.UNSCANNED_CONTENT_TYPES,
+        sniff_size: int = SecurityConfig.BODY_SNIFF_SIZE,
+    ):
+        self.patterns = list(patterns)
+        self.chunk_size = chunk_size
+        self.overlap = overlap
+        self.unscanned_content_types = unscanned_content_types
+        self.sniff_size = sniff_size
+        
+        self._text_regexes = [re.compile(pattern) for pattern in self.patterns]
+        self._bytes_regexes = [re.compile(pattern.encode("ascii")) for pattern in self.patterns]
+    
+    def _first_match(self, regexes: list, folded) -> Optional[str]:
+        for pattern, regex in zip(self.patterns, regexes):
+            if regex.search(folded):
+                return pattern
+        return None
+    
+    def search_text(self, text: str) -> Optional[str]:
+        """Return the first pattern found in ``text``, or None."""
+        return self._first_match(self._text_regexes, text.lower())
+    
+    def search_bytes(self, data: bytes, start: int = 0, end: Optional[int] = None) -> Optional[str]:
+        """
+        Return the first pattern found in ``data[start:end]``, or None.
+        
+        The range is folded and searched in windows of ``chunk_size`` bytes,
+        each extended by ``overlap`` bytes so a match crossing a window
+        boundary is still seen. Only one window is copied at a time, and
+        windows also bound how far a match attempt can backtrack.
+        """
+        end = len(data) if end is None else end
+        pos = start
+        while pos < end:
+            window_end = min(end, pos + self.chunk_size + self.overlap)
+            found = self._first_match(self._bytes_regexes, data[pos:window_end].lower())
+            if found:
+                return found
+            if window_end == end:
+                break
+            pos += self.chunk_size
+        return None
+    
+    def is_scannable(self, content_type: Optional[str]) -> bool:
+        """Whether a body of this media type can carry the suspicious payloads."""
+        if not content_type:
+            return True
+        media_type = content_type.split(";")[0].strip().lower()
+        return not media_type.startswith(self.unscanned_content_types)
+    
+    def looks_binary(self, data: bytes, start: int = 0, end: Optional[int] = None) -> bool:
+        """Whether the first ``sniff_size`` bytes of ``data[start:end]`` are not text."""
+        end = len(data) if end is None else end
+        head = data[start:min(end, start + self.sniff_size)]
+        if b"\x00" in head:
+            return True
+        try:
+            head.decode("utf-8")
+        except UnicodeDecodeError as e:
+            # A character cut by the sniff window is still text
+            return e.start < len(head) - 3
+        return False
+    
+    def scan_body(self, body: bytes, content_type: Optional[str] = None) -> Optional[str]:
+        """Return the first pattern found in a request body, or None."""
+        if not body or (not self.is_scannable(content_type) and self.looks_binary(body)):
+            return None
+        
+        if content_type and content_type.lower().startswith("multipart/"):
+            boundary = self._multipart_boundary(content_type)
+            if boundary:
+                return self._scan_multipart(body, boundary)
+        
+        return self.search_bytes(body)
+    
+    @staticmethod
+    def _multipart_boundary(content_type: str) -> Optional[bytes]:
+        for param in content_type.split(";")[1:]:
+            name, _, value = param.strip().partition("=")
+            if name.lower() == "boundary" and value:
+                return value.strip('"').encode("latin-1")
+        return None
+    
+    def _scan_multipart(self, body: bytes, boundary: bytes) -> Optional[str]:
+        """Scan each multipart part in place, skipping binary uploads."""
+        delimiter = b"--" + boundary
+        pos = body.find(delimiter)
+        if pos < 0:
+            return self.search_bytes(body)
+        
+        # Preamble is scanned like any other text
+        found = self.search_bytes(body, 0, pos)
+        if found:
+            return found
+        
+        while True:
+            part_start = pos + len(delimiter)
+            if body.startswith(b"--", part_start):
+                # Closing delimiter: scan the epilogue and stop
+                return self.search_bytes(body, part_start + 2)
+            
+            next_pos = body.find(delimiter, part_start)
+            part_end = len(body) if next_pos < 0 else next_pos
+            
+            headers_end = body.find(b"\r\n\r\n", part_start, part_end)
+            if headers_end < 0:
+                found = self.search_bytes(body, part_start, part_end)
+            else:
+                found = self.search_bytes(body, part_start, headers_end)
+                content_start = headers_end + 4
+                if not found and (
+                    self.is_scannable(self._part_content_type(body[part_start:headers_end]))
+                    or not self.looks_binary(body, content_start, part_end)
+                ):
+                    found = self.search_bytes(body, content_start, part_end)
+            
+            if found or next_pos < 0:
+                return found
+            pos = next_pos
+    
+    @staticmethod
+    def _part_content_type(headers: bytes) -> Optional[str]:
+        for line in headers.split(b"\r\n"):
+            name, _, value = line.partition(b":")
+            if name.strip().lower() == b"content-type":
+                return value.strip().decode("latin-1")
+        return None
+
+
 class RequestValidator:
     """Request validation and security scanning."""
     
     def __init__(self):
-        self.suspicious_patterns = [re.compile(pattern, re.IGNORECASE) for pattern in SecurityConfig.SUSPICIOUS_PATTERNS]
+        self.scanner = SuspiciousPatternScanner(SecurityConfig.SUSPICIOUS_PATTERNS)
     
     def validate_request_size(self, request: Request) -> bool:
         """Validate request size."""
@@ -232,7 +398,7 @@ class RequestValidator:
         
         # Check for suspicious headers
         for name, value in request.headers.items():
-            if any(pattern.search(value) for pattern in self.suspicious_patterns):
+            if self.scanner.search_text(value):
                 return False, f"Suspicious content in header {name}"
         
         return True, None
@@ -247,9 +413,8 @@ class RequestValidator:
             return False, "URL too long"
         
         # Check for suspicious patterns in URL
-        for pattern in self.suspicious_patterns:
-            if pattern.search(url):
-                return False, "Suspicious pattern in URL"
+        if self.scanner.search_text(url):
+            return False, "Suspicious pattern in URL"
         
         # Check for double encoding
         if "%25" in url:
@@ -266,22 +431,19 @@ class RequestValidator:
         
         return content_type.lower() in SecurityConfig.ALLOWED_CONTENT_TYPES
     
-    async def scan_request_body(self, body: bytes) -> Tuple[bool, Optional[str]]:
+    async def scan_request_body(
+        self,
+        body: bytes,
+        content_type: Optional[str] = None
+    ) -> Tuple[bool, Optional[str]]:
         """Scan request body for suspicious content."""
         if not body:
             return True, None
         
-        try:
-            body_text = body.decode("utf-8", errors="ignore")
-            
-            for pattern in self.suspicious_patterns:
-                if pattern.search(body_text):
-                    return False, "Suspicious pattern in request body"
-            
-            return True, None
-            
-        except Exception:
-            return False, "Invalid request body encoding"
+        if self.scanner.scan_body(body, content_type):
+            return False, "Suspicious pattern in request body"
+        
+        return True, None
 
 
 class SecurityMiddleware(BaseHTTPMiddleware):
@@ -490,7 +652,9 @@ class SecurityMiddleware(BaseHTTPMiddleware):
         if request.method in ["POST", "PUT", "PATCH"]:
             try:
                 body = await request.body()
-                body_valid, body_error = await self.request_validator.scan_request_body(body)
+                body_valid, body_error = await self.request_validator.scan_request_body(
+                    body, request.headers.get("content-type")
+                )
                 
                 if not body_valid:
                     await self._log_security_event(
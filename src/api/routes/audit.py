@@ -8,7 +8,6 @@ from typing import Optional, List
 from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-import io
 
 from src.core.audit import (
     audit_logger,
@@ -179,42 +178,53 @@ async def get_audit_statistics(
 
 @router.get("/export")
 async def export_audit_events(
-    format: str = Query("json", regex="^(json|csv)$", description="Export format"),
+    format: str = Query("json", regex="^(json|ndjson|csv)$", description="Export format"),
     start_date: Optional[datetime] = Query(None, description="Start date filter"),
     end_date: Optional[datetime] = Query(None, description="End date filter"),
     event_type: Optional[AuditEventType] = Query(None, description="Event type filter"),
     severity: Optional[AuditSeverity] = Query(None, description="Severity filter"),
     user_email: Optional[str] = Query(None, description="User email filter"),
+    compress: bool = Query(False, description="Gzip the export on the fly"),
+    after: Optional[str] = Query(None, description="Resume after this event id"),
     current_user: User = Depends(get_current_user)
 ):
-    """Export audit events (admin only)."""
+    """Export audit events as a stream, oldest first (admin only)."""
     
     require_admin(current_user)
     
-    # Build filter
+    # Build filter (the whole range is exported; no pagination)
     filter_options = AuditFilter(
         start_date=start_date,
         end_date=end_date,
         event_types=[event_type] if event_type else None,
         severity_levels=[severity] if severity else None,
-        user_email=user_email,
-        limit=10000  # Allow larger exports
+        user_email=user_email
     )
     
-    # Export events
-    exported_data = await audit_logger.export_events(filter_options, format)
+    try:
+        chunks = await audit_logger.export_stream(
+            filter_options,
+            format,
+            compress=compress,
+            after=after
+        )
+    except KeyError:
+        raise HTTPException(status_code=400, detail="Unknown export cursor")
     
     # Set appropriate content type and filename
-    if format == "json":
-        media_type = "application/json"
-        filename = f"audit_events_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-    else:  # csv
-        media_type = "text/csv"
-        filename = f"audit_events_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-    
-    # Create streaming response
+    media_types = {
+        "json": "application/json",
+        "ndjson": "application/x-ndjson",
+        "csv": "text/csv"
+    }
+    media_type = media_types[format]
+    filename = f"audit_events_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{format}"
+    if compress:
+        media_type = "application/gzip"
+        filename += ".gz"
+    
     return StreamingResponse(
-        io.StringIO(exported_data),
+        chunks,
         media_type=media_type,
         headers={"Content-Disposition": f"attachment; filename={filename}"}
     )
@@ -230,11 +240,7 @@ async def get_audit_event(
     require_admin(current_user)
     
     # Find event by ID
-    event = None
-    for e in audit_logger.events:
-        if e.id == event_id:
-            event = e
-            break
+    event = await audit_logger.get_event(event_id)
     
     if not event:
         raise HTTPException(status_code=404, detail="Audit event not found")
@@ -261,13 +267,14 @@ async def get_audit_event(
 
 @router.get("/integrity")
 async def verify_audit_integrity(
+    full: bool = Query(False, description="Re-verify all history instead of resuming from checkpoints"),
     current_user: User = Depends(get_current_user)
 ):
     """Verify audit log integrity (admin only)."""
     
     require_admin(current_user)
     
-    integrity_report = await audit_logger.verify_integrity()
+    integrity_report = await audit_logger.verify_integrity(full=full)
     
     return integrity_report
 
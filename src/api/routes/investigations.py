@@ -17,6 +17,8 @@ from pydantic import BaseModel, Field as PydanticField, validator
 import json
 
 from src.core import get_logger
+from src.core.exceptions import AgentExecutionError
+from src.core.profiling import get_profile, profile_investigation, profile_span
 from src.agents import InvestigatorAgent, AgentContext
 from src.api.middleware.authentication import get_current_user
 from src.tools import TransparencyAPIFilter
@@ -39,6 +41,7 @@ class InvestigationRequest(BaseModel):
     )
     include_explanations: bool = PydanticField(default=True, description="Include AI explanations")
     stream_results: bool = PydanticField(default=False, description="Stream results as they're found")
+    incremental: bool = PydanticField(default=False, description="Reuse results of earlier runs over the same organization")
     
     @validator('data_source')
     def validate_data_source(cls, v):
@@ -311,6 +314,34 @@ async def get_investigation_results(
     )
 
 
+@router.get("/{investigation_id}/profile")
+async def get_investigation_profile(
+    investigation_id: str,
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """
+    Get the timing profile of an investigation.
+    
+    Returns the stage tree (fetch, detectors, explanation, report...) with
+    wall time, CPU time, allocated bytes and external-call counts per stage.
+    Available while the investigation runs and for recent ones afterwards.
+    """
+    if investigation_id not in _active_investigations:
+        raise HTTPException(status_code=404, detail="Investigation not found")
+    
+    investigation = _active_investigations[investigation_id]
+    
+    # Check user authorization
+    if investigation["user_id"] != current_user.get("user_id"):
+        raise HTTPException(status_code=403, detail="Access denied")
+    
+    profile = get_profile(investigation_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not available")
+    
+    return {"investigation_id": investigation_id, "profile": profile}
+
+
 @router.get("/", response_model=List[InvestigationStatus])
 async def list_investigations(
     status: Optional[str] = Query(None, description="Filter by status"),
@@ -388,6 +419,34 @@ async def cancel_investigation(
     return {"message": "Investigation cancelled successfully"}
 
 
+# Route anomaly types and the InvestigatorAgent detectors answering them
+_DETECTORS = {
+    "price": "price_anomaly",
+    "vendor": "vendor_concentration",
+    "temporal": "temporal_patterns",
+    "payment": "payment_patterns",
+    "duplicate": "duplicate_contracts",
+    "pattern": "spectral_patterns",
+}
+
+
+def _investigation_payload(request: InvestigationRequest, filters: TransparencyAPIFilter) -> Dict[str, Any]:
+    """InvestigatorAgent ``investigate`` payload for a route request."""
+    payload: Dict[str, Any] = {
+        "query": request.query,
+        "anomaly_types": [_DETECTORS[anomaly_type] for anomaly_type in request.anomaly_types],
+        "incremental": request.incremental,
+    }
+    organization = filters.codigo_orgao or filters.orgao
+    if organization:
+        payload["organization_codes"] = [organization]
+    if filters.data_inicio and filters.data_fim:
+        payload["date_range"] = (filters.data_inicio, filters.data_fim)
+    if filters.valor_inicial is not None:
+        payload["value_threshold"] = filters.valor_inicial
+    return payload
+
+
 async def _run_investigation(investigation_id: str, request: InvestigationRequest):
     """
     Execute the investigation in the background.
@@ -397,78 +456,88 @@ async def _run_investigation(investigation_id: str, request: InvestigationReques
     investigation = _active_investigations[investigation_id]
     
     try:
-        # Update status
-        investigation["status"] = "running"
-        investigation["current_phase"] = "data_retrieval"
-        investigation["progress"] = 0.1
-        
-        # Create agent context
-        context = AgentContext(
-            conversation_id=investigation_id,
-            user_id=investigation["user_id"],
-            session_data={"investigation_query": request.query}
-        )
-        
-        # Initialize InvestigatorAgent
-        investigator = InvestigatorAgent()
-        
-        # Prepare filters for data retrieval
-        filters = TransparencyAPIFilter(**request.filters)
-        
-        investigation["current_phase"] = "anomaly_detection"
-        investigation["progress"] = 0.3
-        
-        # Execute investigation
-        results = await investigator.investigate_anomalies(
-            query=request.query,
-            data_source=request.data_source,
-            filters=filters,
-            anomaly_types=request.anomaly_types,
-            context=context
-        )
-        
-        investigation["current_phase"] = "analysis"
-        investigation["progress"] = 0.7
-        
-        # Process results
-        investigation["results"] = [
-            {
-                "anomaly_id": str(uuid4()),
-                "type": result.anomaly_type,
-                "severity": result.severity,
-                "confidence": result.confidence,
-                "description": result.description,
-                "explanation": result.explanation if request.include_explanations else "",
-                "affected_records": result.affected_data,
-                "suggested_actions": result.recommendations,
-                "metadata": result.metadata,
-            }
-            for result in results
-        ]
-        
-        investigation["anomalies_detected"] = len(results)
-        investigation["records_processed"] = sum(len(r.affected_data) for r in results)
-        
-        # Generate summary
-        investigation["current_phase"] = "summary_generation"
-        investigation["progress"] = 0.9
-        
-        summary = await investigator.generate_summary(results, context)
-        investigation["summary"] = summary
-        investigation["confidence_score"] = sum(r.confidence for r in results) / len(results) if results else 0.0
-        
-        # Mark as completed
-        investigation["status"] = "completed"
-        investigation["completed_at"] = datetime.utcnow()
-        investigation["progress"] = 1.0
-        investigation["current_phase"] = "completed"
-        
-        logger.info(
-            "investigation_completed",
-            investigation_id=investigation_id,
-            anomalies_found=len(results),
-            records_analyzed=investigation["records_processed"],
-        )
+        async with profile_investigation(investigation_id, name="api.investigation", data_source=request.data_source):
+            # Update status
+            investigation["status"] = "running"
+            investigation["current_phase"] = "data_retrieval"
+            investigation["progress"] = 0.1
+            
+            # Create agent context
+            context = AgentContext(
+                investigation_id=investigation_id,
+                user_id=investigation["user_id"],
+                metadata={"investigation_query": request.query}
+            )
+            
+            # Initialize InvestigatorAgent
+            investigator = InvestigatorAgent()
+            
+            # Prepare filters for data retrieval
+            filters = TransparencyAPIFilter(**request.filters)
+            
+            investigation["current_phase"] = "anomaly_detection"
+            investigation["progress"] = 0.3
+            
+            # Execute investigation
+            async with profile_span("investigate", anomaly_types=",".join(request.anomaly_types)):
+                response = await investigator.execute(
+                    "investigate",
+                    _investigation_payload(request, filters),
+                    context
+                )
+            outcome = response.result
+            if outcome.get("status") == "error":
+                raise AgentExecutionError(outcome.get("error", "Investigation failed"))
+            
+            investigation["current_phase"] = "analysis"
+            investigation["progress"] = 0.7
+            
+            # Process results
+            anomalies = outcome.get("anomalies", [])
+            investigation["results"] = [
+                {
+                    "anomaly_id": str(uuid4()),
+                    "type": anomaly["type"],
+                    "severity": anomaly["severity"],
+                    "confidence": anomaly["confidence"],
+                    "description": anomaly["description"],
+                    "explanation": anomaly["explanation"] if request.include_explanations else "",
+                    "affected_records": anomaly["affected_entities"],
+                    "suggested_actions": anomaly["recommendations"],
+                    "metadata": {
+                        "evidence": anomaly["evidence"],
+                        "financial_impact": anomaly["financial_impact"],
+                    },
+                }
+                for anomaly in anomalies
+            ]
+            
+            investigation["anomalies_detected"] = len(anomalies)
+            investigation["records_processed"] = outcome.get("summary", {}).get("total_records", 0)
+            
+            # Generate summary
+            investigation["current_phase"] = "summary_generation"
+            investigation["progress"] = 0.9
+            
+            investigation["summary"] = (
+                f"{len(anomalies)} anomalies found in {investigation['records_processed']} records"
+            )
+            investigation["confidence_score"] = (
+                sum(a["confidence"] for a in anomalies) / len(anomalies) if anomalies else 0.0
+            )
+            
+            # Mark as completed
+            investigation["status"] = "completed"
+            investigation["completed_at"] = datetime.utcnow()
+            investigation["progress"] = 1.0
+            investigation["current_phase"] = "completed"
+            
+            logger.info(
+                "investigation_completed",
+                investigation_id=investigation_id,
+                anomalies_found=len(anomalies),
+                records_analyzed=investigation["records_processed"],
+            )
         
     except Exception as e:
         logger.error(
@@ -0,0 +1,66 @@
+"""
+Module: api.routes.profiling
+Description: Admin endpoint for on-demand sampling profiles of the running process
+Author: Anderson H. Silva
+Date: 2025-01-24
+License: Proprietary - All rights reserved
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from src.core import get_logger, settings
+from src.core.sampling_profiler import ProfilerBusyError, capture_profile
+from src.api.auth import get_current_user, require_admin, User
+
+
+logger = get_logger(__name__)
+
+router = APIRouter()
+
+
+@router.post("/sample", response_class=PlainTextResponse)
+async def sample_profile(
+    duration: float = Query(10.0, gt=0, description="Capture length in seconds"),
+    rate: int = Query(100, ge=1, description="Samples per second"),
+    max_depth: int = Query(64, ge=1, le=256, description="Frames kept per stack"),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Sample every thread of this worker for ``duration`` seconds.
+
+    Returns collapsed stacks (``frame;frame count`` per line) ready for
+    flamegraph.pl or speedscope. Event-loop samples are prefixed with the
+    investigation and agent that were running. Disabled unless
+    ``ENABLE_PROFILING`` is set; only one capture runs at a time.
+    """
+    require_admin(current_user)
+
+    if not settings.enable_profiling:
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+    if duration > settings.sampling_profiler_max_duration:
+        raise HTTPException(
+            status_code=400,
+            detail=f"duration must be at most {settings.sampling_profiler_max_duration}s"
+        )
+    if rate > settings.sampling_profiler_max_rate:
+        raise HTTPException(
+            status_code=400,
+            detail=f"rate must be at most {settings.sampling_profiler_max_rate}Hz"
+        )
+
+    logger.info(
+        "sampling_profile_requested",
+        user_id=current_user.id,
+        duration=duration,
+        rate=rate,
+    )
+
+    try:
+        result = await capture_profile(duration, interval=1.0 / rate, max_depth=max_depth)
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    summary = result.summary()
+    headers = {f"X-Profile-{key.replace('_', '-').title()}": str(value) for key, value in summary.items()}
+    return PlainTextResponse(result.collapsed(), headers=headers)
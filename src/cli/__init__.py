@@ -1,7 +1,7 @@
-"""Command-line interface for Cidado.AI.
+"""Command-line interface for Cidadão.AI.
 
 This module provides a comprehensive CLI for interacting with the multi-agent
-transparency platform. Built with Typer and Rich for beautiful, professional
+transparency platform. Built with Click and Rich for beautiful, professional
 command-line experience.
 
 Available Commands:
@@ -14,7 +14,7 @@ Available Commands:
 
 Features:
 - Rich formatting with colors and panels
-- Tab completion support
+- Tab completion support (click shell completion)
 - Comprehensive help system
 - Professional error handling
 - Verbose output modes
@@ -29,7 +29,7 @@ Usage:
     from src.cli.commands import investigate_command
 
 Entry Point:
-    Configured in pyproject.toml as: cidadao = "src.cli.main:app"
+    Configured in pyproject.toml as: cidadao = "src.cli.main:cli_main"
 
 Status: Professional implementation with comprehensive command structure.
 """
@@ -1,7 +1,8 @@
-"""CLI commands for Cidado.AI.
+"""CLI commands for Cidadão.AI.
 
 This module provides command-line interface commands for:
 - Investigation operations
+- Warehouse ingestion
 - Data analysis
 - Report generation
 - System monitoring
@@ -10,12 +11,14 @@ Status: Stub implementation - Full CLI planned for production phase.
 """
 
 from .investigate import investigate_command
+from .ingest import ingest_command
 from .analyze import analyze_command
 from .report import report_command
 from .watch import watch_command
 
 __all__ = [
     "investigate_command",
+    "ingest_command",
     "analyze_command", 
     "report_command",
     "watch_command"
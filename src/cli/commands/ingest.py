@@ -0,0 +1,81 @@
+"""Ingestion command for CLI."""
+
+import asyncio
+from pathlib import Path
+from typing import Optional, Tuple
+
+import click
+
+from src.core import settings
+from src.tools.delta_sync import sync_to_warehouse
+from src.tools.warehouse import ENDPOINTS, TransparencyWarehouse, ingest
+
+
+@click.command()
+@click.argument('endpoint', type=click.Choice(sorted(ENDPOINTS)))
+@click.option('--org', 'orgs', multiple=True, required=True, help='Organization code (repeatable)')
+@click.option('--year', type=int, required=True, help='Year to ingest')
+@click.option('--warehouse', type=click.Path(file_okay=False, path_type=Path),
+              help='Warehouse directory (default: TRANSPARENCY_WAREHOUSE_PATH)')
+@click.option('--page-size', type=int, default=500, help='Records per API page')
+@click.option('--max-pages', type=int, default=10, help='Maximum pages per organization')
+@click.option('--incremental', is_flag=True, help='Fetch only what changed since the last sync')
+@click.option('--lookback-days', type=int, default=30, help='Days re-read before the watermark (incremental)')
+def ingest_command(
+    endpoint: str,
+    orgs: Tuple[str, ...],
+    year: int,
+    warehouse: Optional[Path] = None,
+    page_size: int = 500,
+    max_pages: int = 10,
+    incremental: bool = False,
+    lookback_days: int = 30
+):
+    """Land Portal da Transparência data into the local warehouse.
+    
+    ENDPOINT: contratos, despesas, licitacoes or convenios
+
+    With --incremental, each organization resumes from its watermark and
+    only new or changed records are upserted; interrupted runs continue
+    where they stopped.
+    """
+    root = warehouse or settings.transparency_warehouse_path
+    if root is None:
+        raise click.UsageError("Informe --warehouse ou defina TRANSPARENCY_WAREHOUSE_PATH")
+    
+    if incremental:
+        click.echo(f"🔄 Sincronizando {endpoint} {year} de {len(orgs)} órgão(s) em {root}")
+        totals = asyncio.run(sync_to_warehouse(
+            TransparencyWarehouse(root),
+            endpoint,
+            list(orgs),
+            year,
+            page_size=page_size,
+            lookback_days=lookback_days,
+            max_pages=max_pages,
+        ))
+        click.echo(
+            f"✅ {totals['records_new']} novos, {totals['records_changed']} alterados; "
+            f"{totals['pages_fetched']} página(s) lidas, {totals['pages_unchanged']} sem alteração"
+        )
+        return
+    
+    click.echo(f"📥 Ingerindo {endpoint} {year} de {len(orgs)} órgão(s) em {root}")
+    
+    totals = asyncio.run(ingest(
+        TransparencyWarehouse(root),
+        endpoint,
+        list(orgs),
+        year,
+        page_size=page_size,
+        max_pages=max_pages,
+    ))
+    
+    click.echo(
+        f"✅ {totals['written']} registros gravados em {totals['partitions']} partição(ões), "
+        f"{totals['rejected']} rejeitados"
+    )
+
+
+if __name__ == '__main__':
+    ingest_command()
@@ -1,41 +1,296 @@
 """Investigation command for CLI."""
 
+import asyncio
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
 import click
-from typing import Optional
+
+from src.agents.deodoro import AgentContext
+from src.agents.tiradentes import ReporterAgent
+from src.agents.zumbi import DEFAULT_ORGANIZATION_CODES, InvestigatorAgent
+from src.core import settings
+from src.core.profiling import profile_investigation, profile_span
+from src.infrastructure.agent_pool import get_process_runner
+from src.tools.warehouse import parse_date
+
+
+def _load_dump(path: Path) -> List[Dict[str, Any]]:
+    """Contracts from a JSON array, a ``{"data": [...]}`` payload or JSON lines."""
+    with open(path, encoding="utf-8") as f:
+        if path.suffix == ".jsonl":
+            return [json.loads(line) for line in f if line.strip()]
+        data = json.load(f)
+    return data.get("data", []) if isinstance(data, dict) else data
+
+
+def _org_code(contract: Dict[str, Any]) -> Optional[str]:
+    code = contract.get("_org_code") or (contract.get("orgao") or {}).get("codigo")
+    return str(code) if code is not None else None
+
+
+def _signed_in(contract: Dict[str, Any], year: int) -> bool:
+    try:
+        signed = parse_date(contract.get("dataAssinatura"))
+    except (TypeError, ValueError):
+        return False
+    return signed is not None and signed.year == year
+
+
+def _group_dump(
+    contracts: List[Dict[str, Any]],
+    orgs: Tuple[str, ...],
+    year: Optional[int]
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Dump records per organization, restricted to ``orgs`` and ``year`` when given."""
+    groups: Dict[str, List[Dict[str, Any]]] = {org: [] for org in orgs}
+    for contract in contracts:
+        org = _org_code(contract)
+        if org is None or (orgs and org not in groups):
+            continue
+        if year is not None and not _signed_in(contract, year):
+            continue
+        contract.setdefault("_org_code", org)
+        groups.setdefault(org, []).append(contract)
+    return groups
+
+
+def _merge_results(query: str, investigation_id: str, results: Dict[str, Dict[str, Any]], threshold: float) -> Dict[str, Any]:
+    """One investigation result out of the per-organization ones, in Zumbi's shape."""
+    anomalies = [
+        anomaly
+        for result in results.values()
+        for anomaly in result.get("anomalies", [])
+        if anomaly.get("severity", 0) >= threshold
+    ]
+    anomalies.sort(key=lambda a: a.get("severity", 0), reverse=True)
+
+    summaries = [result.get("summary", {}) for result in results.values()]
+    total_records = sum(s.get("total_records", 0) for s in summaries)
+    anomaly_counts: Dict[str, int] = {}
+    for anomaly in anomalies:
+        anomaly_counts[anomaly["type"]] = anomaly_counts.get(anomaly["type"], 0) + 1
+
+    return {
+        "status": "completed",
+        "query": query,
+        "anomalies": anomalies,
+        "summary": {
+            "total_records": total_records,
+            "anomalies_found": len(anomalies),
+            "total_value": sum(s.get("total_value", 0) for s in summaries),
+            "suspicious_value": sum(a.get("financial_impact") or 0 for a in anomalies),
+            "risk_score": min(len(anomalies) / max(total_records, 1) * 10, 10),
+            "anomaly_types": anomaly_counts,
+            "high_severity_count": len([a for a in anomalies if a["severity"] > 0.7]),
+            "medium_severity_count": len([a for a in anomalies if 0.3 < a["severity"] <= 0.7]),
+            "low_severity_count": len([a for a in anomalies if a["severity"] <= 0.3]),
+        },
+        "metadata": {
+            "investigation_id": investigation_id,
+            "timestamp": datetime.utcnow().isoformat(),
+            "organizations": sorted(results),
+            "records_analyzed": total_records,
+        },
+    }
+
+
+def _print_timings(span: Dict[str, Any], depth: int = 0):
+    """Stage tree of the profile: wall time, CPU time on the event loop and record counts."""
+    label = span["name"]
+    org = span["attributes"].get("org")
+    if org:
+        label += f" [{org}]"
+    cpu = f", cpu {span['cpu_ms']:.0f}ms" if span.get("cpu_ms") is not None else ""
+    records = span["attributes"].get("records")
+    extra = f", {records} registros" if records is not None else ""
+    click.echo(f"   {'  ' * depth}{label}: {span['wall_ms']:.0f}ms{cpu}{extra}")
+    for child in span["children"]:
+        _print_timings(child, depth + 1)
+
+
+async def _investigate(
+    query: str,
+    orgs: Tuple[str, ...],
+    year: Optional[int],
+    offline: bool,
+    data: Optional[Path],
+    max_records: int,
+    anomaly_types: Tuple[str, ...],
+    threshold: float,
+    output: str,
+    state_dir: Optional[Path] = None
+) -> Tuple[Optional[str], Dict[str, Any], Dict[str, Any]]:
+    """
+    Run one investigation per organization concurrently, then render the joint report.
+
+    The detectors are synchronous CPU work, so each organization runs on its
+    own event loop in a worker thread instead of sharing this one; with
+    ``--workers`` the heaviest detectors also go to the process pool.
+    """
+    context = AgentContext(user_id="cli")
+    dumped: Optional[Dict[str, List[Dict[str, Any]]]] = None
+
+    async with profile_investigation(context.investigation_id, name="cli.investigate") as root:
+        if data is not None and data.is_file():
+            async with profile_span("load", source=str(data)) as span:
+                dumped = _group_dump(await asyncio.to_thread(_load_dump, data), orgs, year)
+                if span is not None:
+                    span.attributes["records"] = sum(len(records) for records in dumped.values())
+            org_codes = sorted(dumped)
+        else:
+            org_codes = list(orgs) or DEFAULT_ORGANIZATION_CODES
+
+        def run(org: str) -> Dict[str, Any]:
+            request = {
+                "query": query,
+                "organization_codes": [org],
+                "max_records": max_records,
+                "offline": offline,
+            }
+            if year:
+                request["date_range"] = (f"01/01/{year}", f"31/12/{year}")
+            if anomaly_types:
+                request["anomaly_types"] = list(anomaly_types)
+            if dumped is not None:
+                request["records"] = dumped[org]
+            if state_dir is not None:
+                request["incremental"] = True
+            async def investigate() -> Dict[str, Any]:
+                async with profile_span("org", org=org):
+                    response = await InvestigatorAgent(incremental_state_dir=state_dir).execute(
+                        "investigate",
+                        request,
+                        AgentContext(investigation_id=context.investigation_id, user_id="cli", parent_agent="cli"),
+                    )
+                return response.result
+
+            return asyncio.run(investigate())
+
+        outcomes = await asyncio.gather(*(asyncio.to_thread(run, org) for org in org_codes))
+        results = {}
+        for org, outcome in zip(org_codes, outcomes):
+            if outcome.get("status") == "completed":
+                results[org] = outcome
+                delta = outcome["metadata"].get("incremental")
+                if delta:
+                    click.echo(
+                        f"♻️  {org}: {delta['unchanged']} contrato(s) inalterado(s), "
+                        f"{delta['added'] + delta['changed']} novo(s) ou alterado(s)"
+                    )
+            elif outcome.get("status") == "no_data":
+                click.echo(f"⚠️  {org}: nenhum contrato encontrado")
+            else:
+                click.echo(f"❌ {org}: {outcome.get('error', 'falha na investigação')}")
+
+        merged = _merge_results(query, context.investigation_id, results, threshold)
+        report = None
+        if results:
+            reporter = ReporterAgent()
+            response = await reporter.execute(
+                "generate_report",
+                {
+                    "report_type": "investigation_report",
+                    "format": output,
+                    "investigation_results": merged,
+                },
+                context,
+            )
+            report = response.result.get("content")
+
+    return report, merged, root.to_dict()
 
 
 @click.command()
 @click.argument('query', required=True)
-@click.option('--org', help='Organization code to focus investigation')
+@click.option('--org', 'orgs', multiple=True, help='Organization code (repeatable); organizations run concurrently, one thread each')
 @click.option('--year', type=int, help='Year to investigate')
-@click.option('--threshold', type=float, default=0.7, help='Anomaly detection threshold')
+@click.option('--offline', is_flag=True, help='Use only local data (--data or the warehouse); never call the API')
+@click.option('--data', type=click.Path(exists=True, path_type=Path),
+              help='Contract dump (.json/.jsonl) or warehouse directory')
+@click.option('--workers', type=int, default=0, help='Processes for CPU-bound detectors (0 = in-process)')
+@click.option('--max-records', type=int, default=1000, help='Maximum records per organization')
+@click.option('--anomaly-type', 'anomaly_types', multiple=True, help='Detector to run (repeatable; default: all)')
+@click.option('--threshold', type=float, default=0.0, help='Minimum severity (0-1) of reported anomalies')
 @click.option('--output', type=click.Choice(['json', 'markdown', 'html']), default='markdown')
+@click.option('--incremental', is_flag=True, help='Reuse detector results of earlier runs over the same organizations')
+@click.option('--state-dir', type=click.Path(file_okay=False, path_type=Path),
+              default=Path.home() / '.cidadao' / 'incremental', show_default=True,
+              help='Incremental detection state kept between runs')
+@click.option('--out', 'out_path', type=click.Path(dir_okay=False, path_type=Path),
+              help='Write the report to this file instead of stdout')
 def investigate_command(
     query: str,
-    org: Optional[str] = None,
+    orgs: Tuple[str, ...] = (),
     year: Optional[int] = None,
-    threshold: float = 0.7,
-    output: str = 'markdown'
+    offline: bool = False,
+    data: Optional[Path] = None,
+    workers: int = 0,
+    max_records: int = 1000,
+    anomaly_types: Tuple[str, ...] = (),
+    threshold: float = 0.0,
+    output: str = 'markdown',
+    incremental: bool = False,
+    state_dir: Path = Path.home() / '.cidadao' / 'incremental',
+    out_path: Optional[Path] = None
 ):
     """Start an investigation on government spending.
-    
+
     QUERY: Natural language description of what to investigate
+
+    Each --org is investigated by Zumbi in its own thread and the findings are
+    joined into one Tiradentes report. --data accepts a contract dump
+    (JSON array, {"data": [...]} payload or JSON lines) or a warehouse
+    directory populated by `cidadao ingest`. With --incremental, each
+    organization's detector state is kept in --state-dir and only the
+    contracts that changed since the previous run are re-analyzed.
     """
+    if data is not None and data.is_dir():
+        settings.transparency_warehouse_path = data
+    if offline and data is None and settings.transparency_warehouse_path is None:
+        raise click.UsageError("--offline requer --data ou TRANSPARENCY_WAREHOUSE_PATH")
+    if workers > 0:
+        settings.cpu_process_pool_enabled = True
+        settings.cpu_process_pool_workers = workers
+
     click.echo(f"🔍 Iniciando investigação: {query}")
-    
-    if org:
-        click.echo(f"📊 Organização: {org}")
-    
+    if orgs:
+        click.echo(f"📊 Organizações: {', '.join(orgs)}")
     if year:
         click.echo(f"📅 Ano: {year}")
-    
-    click.echo(f"⚖️ Limite de anomalia: {threshold}")
-    click.echo(f"📄 Formato de saída: {output}")
-    
-    # TODO: Implement actual investigation logic
-    click.echo("⚠️  Funcionalidade em desenvolvimento")
-    click.echo("📋 Status: Implementação planejada para fase de produção")
+    if offline:
+        click.echo("📦 Modo offline: apenas dados locais")
+
+    try:
+        report, merged, profile = asyncio.run(_investigate(
+            query, orgs, year, offline, data, max_records, anomaly_types, threshold, output,
+            state_dir if incremental else None
+        ))
+    finally:
+        runner = get_process_runner() if workers > 0 else None
+        if runner is not None:
+            runner.shutdown()
+
+    summary = merged["summary"]
+    click.echo(
+        f"✅ {summary['total_records']} contratos analisados em "
+        f"{len(merged['metadata']['organizations'])} órgão(s), {summary['anomalies_found']} anomalia(s)"
+    )
+    click.echo(f"⏱️  Tempo por etapa ({profile['wall_ms']:.0f}ms no total):")
+    for child in profile["children"]:
+        _print_timings(child)
+
+    if report is None:
+        click.echo("⚠️  Nenhum dado para gerar relatório")
+        return
+    if out_path is not None:
+        out_path.write_text(report, encoding="utf-8")
+        click.echo(f"📄 Relatório ({output}) salvo em {out_path}")
+    else:
+        click.echo(report)
 
 
 if __name__ == '__main__':
-    investigate_command()
\ No newline at end of file
+    investigate_command()
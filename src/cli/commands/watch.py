@@ -1,51 +1,123 @@
 """Watch command for monitoring anomalies."""
 
+import asyncio
+import signal
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
 import click
-import time
-from typing import Optional
+
+from src.agents.deodoro import AgentContext
+from src.agents.zumbi import DEFAULT_ORGANIZATION_CODES, InvestigatorAgent
+from src.tools.contract_monitor import ContractMonitor, JsonlAlertSink, WatchAlert, WebhookAlertSink
+
+
+async def _escalate(org_code: str, contracts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # Agente novo a cada escalonamento: execute() guarda mensagens e respostas
+    # no histórico do agente, que cresceria sem limite num monitor de longa duração
+    investigator = InvestigatorAgent()
+    response = await investigator.execute(
+        "investigate",
+        {
+            "query": f"Monitoramento contínuo do órgão {org_code}",
+            "organization_codes": [org_code],
+            "records": contracts,
+            "max_records": len(contracts),
+            "offline": True,
+        },
+        AgentContext(user_id="cli", parent_agent="watch"),
+    )
+    return response.result.get("anomalies", [])
+
+
+async def _watch(monitor: ContractMonitor, interval: int, once: bool):
+    if once:
+        await monitor.poll()
+        return
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:  # Windows
+            pass
+    await monitor.run(interval, stop)
 
 
 @click.command()
-@click.option('--threshold', type=float, default=0.8, help='Anomaly detection threshold')
+@click.option('--threshold', type=float, default=0.8, help='Minimum severity (0-1) that raises an alert')
 @click.option('--interval', type=int, default=300, help='Check interval in seconds')
-@click.option('--org', help='Monitor specific organization')
-@click.option('--notify', is_flag=True, help='Enable notifications')
-@click.option('--log-file', help='Log monitoring results to file')
+@click.option('--org', 'orgs', multiple=True, help='Organization code to monitor (repeatable)')
+@click.option('--notify', is_flag=True, help='Print alerts to the terminal')
+@click.option('--log-file', type=click.Path(dir_okay=False, path_type=Path),
+              help='Append alerts to this file (JSON lines)')
+@click.option('--webhook', help='POST alerts as JSON to this URL')
+@click.option('--state-dir', type=click.Path(file_okay=False, path_type=Path),
+              default=Path.home() / '.cidadao' / 'watch', show_default=True,
+              help='Rolling baselines and sync watermarks')
+@click.option('--lookback-days', type=int, default=30, help='Days re-read before the watermark')
+@click.option('--escalate-after', type=int, default=1, help='Alerts in one poll that trigger the full detectors')
+@click.option('--once', is_flag=True, help='Poll once and exit (e.g. from cron)')
 def watch_command(
     threshold: float = 0.8,
     interval: int = 300,
-    org: Optional[str] = None,
+    orgs: Tuple[str, ...] = (),
     notify: bool = False,
-    log_file: Optional[str] = None
+    log_file: Optional[Path] = None,
+    webhook: Optional[str] = None,
+    state_dir: Path = Path.home() / '.cidadao' / 'watch',
+    lookback_days: int = 30,
+    escalate_after: int = 1,
+    once: bool = False
 ):
     """Monitor for anomalies in real-time.
-    
+
     Continuously monitor government spending for suspicious patterns.
+
+    Each poll fetches only what changed since the previous one and checks
+    new contracts against rolling per-organization baselines; organizations
+    that raise alerts get a full Zumbi investigation over their recent
+    contracts. Baselines live in --state-dir, so restarts resume.
     """
+    org_codes = list(orgs) or DEFAULT_ORGANIZATION_CODES
+    async def echo(alert: WatchAlert):
+        click.echo(f"🚨 [{alert.org_code}] {alert.description} (severidade {alert.severity:.2f}, {alert.source})")
+
+    sinks = []
+    if notify:
+        sinks.append(echo)
+    if log_file:
+        sinks.append(JsonlAlertSink(log_file))
+    if webhook:
+        sinks.append(WebhookAlertSink(webhook))
+
+    monitor = ContractMonitor(
+        state_dir,
+        org_codes,
+        sinks=sinks,
+        escalate=_escalate,
+        threshold=threshold,
+        lookback_days=lookback_days,
+        escalate_after=escalate_after,
+    )
+
     click.echo("👁️  Iniciando monitoramento de anomalias")
     click.echo(f"⚖️  Limite: {threshold}")
     click.echo(f"⏱️  Intervalo: {interval} segundos")
-    
-    if org:
-        click.echo(f"🏛️  Monitorando organização: {org}")
-    
+    click.echo(f"🏛️  Monitorando: {', '.join(org_codes)}")
     if notify:
         click.echo("🔔 Notificações ativadas")
-    
     if log_file:
         click.echo(f"📝 Log: {log_file}")
-    
-    click.echo("🚀 Monitor ativo. Pressione Ctrl+C para parar.")
-    
-    try:
-        # TODO: Implement actual monitoring logic
-        while True:
-            click.echo(f"🔍 Verificando anomalias... {time.strftime('%H:%M:%S')}")
-            click.echo("⚠️  Funcionalidade em desenvolvimento")
-            time.sleep(interval)
-    except KeyboardInterrupt:
-        click.echo("\n⏹️  Monitor parado pelo usuário")
+    if webhook:
+        click.echo(f"🌐 Webhook: {webhook}")
+    if not once:
+        click.echo("🚀 Monitor ativo. Pressione Ctrl+C para parar.")
+
+    asyncio.run(_watch(monitor, interval, once))
+    click.echo("⏹️  Monitor parado")
 
 
 if __name__ == '__main__':
-    watch_command()
\ No newline at end of file
+    watch_command()
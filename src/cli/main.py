@@ -1,7 +1,9 @@
 """Main CLI application entry point for Cidadão.AI.
 
-This module provides the main Typer application that serves as the entry point
-for all CLI commands as defined in pyproject.toml.
+This module provides the main click group that serves as the entry point
+for all CLI commands as defined in pyproject.toml. The subcommands are click
+commands, so the group is plain click as well (typer ships its own click and
+cannot host them).
 
 Usage:
     cidadao --help
@@ -9,6 +11,7 @@ Usage:
     cidadao analyze --help
     cidadao report --help
     cidadao watch --help
+    cidadao ingest --help
 
 Status: Professional implementation with comprehensive command structure.
 """
@@ -17,7 +20,7 @@ import sys
 from pathlib import Path
 from typing import Optional
 
-import typer
+import click
 from rich.console import Console
 from rich.panel import Panel
 
@@ -26,29 +29,56 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from src.cli.commands import (
     analyze_command,
+    ingest_command,
     investigate_command,
     report_command,
     watch_command,
 )
 from src.core.config import get_settings
 
-# Initialize Typer app with rich formatting
-app = typer.Typer(
-    name="cidadao",
-    help="🏛️ Cidadão.AI - Sistema multi-agente de IA para transparência pública brasileira",
-    add_completion=True,
-    rich_markup_mode="rich",
-    no_args_is_help=True,
-)
-
 # Initialize Rich console for beautiful output
 console = Console()
 
+
+@click.group(name="cidadao", no_args_is_help=True)
+@click.option("--verbose", "-v", is_flag=True, help="Enable verbose output")
+@click.option("--config", "-c", "config_file", type=click.Path(path_type=Path), help="Custom configuration file path")
+def app(verbose: bool, config_file: Optional[Path]) -> None:
+    """
+    🏛️ Cidadão.AI - Sistema multi-agente de IA para transparência pública brasileira.
+    
+    Sistema enterprise-grade para detecção de anomalias e análise de transparência 
+    em dados governamentais brasileiros usando múltiplos agentes de IA especializados.
+    
+    \b
+    Agentes Disponíveis:
+    - 🏹 Zumbi dos Palmares: Investigação e detecção de anomalias
+    - 🎭 Anita Garibaldi: Análise de padrões revolucionária
+    - 📝 Tiradentes: Geração de relatórios pela liberdade de informação
+    - 🏎️ Ayrton Senna: Roteamento semântico de alta performance
+    - E mais 13 agentes especializados com identidade cultural brasileira
+    
+    \b
+    Para começar:
+        cidadao status      # Verificar status do sistema
+        cidadao --help      # Ver todos os comandos disponíveis
+    """
+    if verbose:
+        console.print(f"[dim]Verbose mode enabled[/dim]")
+        console.print(f"[dim]Config file: {config_file or 'default'}[/dim]")
+
+
 # Add commands to main app
-app.command("investigate", help="🔍 Executar investigações de anomalias em dados públicos")(investigate_command)
-app.command("analyze", help="📊 Analisar padrões e correlações em dados governamentais")(analyze_command)
-app.command("report", help="📋 Gerar relatórios detalhados de investigações")(report_command)
-app.command("watch", help="👀 Monitorar dados em tempo real para anomalias")(watch_command)
+app.add_command(investigate_command, "investigate")
+app.add_command(analyze_command, "analyze")
+app.add_command(report_command, "report")
+app.add_command(watch_command, "watch")
+app.add_command(ingest_command, "ingest")
+investigate_command.short_help = "🔍 Executar investigações de anomalias em dados públicos"
+analyze_command.short_help = "📊 Analisar padrões e correlações em dados governamentais"
+report_command.short_help = "📋 Gerar relatórios detalhados de investigações"
+watch_command.short_help = "👀 Monitorar dados em tempo real para anomalias"
+ingest_command.short_help = "📥 Carregar dados do Portal da Transparência no warehouse local"
 
 
 @app.command("version")
@@ -80,43 +110,16 @@ def status() -> None:
     )
 
 
-@app.callback()
-def main(
-    verbose: bool = typer.Option(False, "--verbose", "-v", help="Enable verbose output"),
-    config_file: Optional[Path] = typer.Option(None, "--config", "-c", help="Custom configuration file path"),
-) -> None:
-    """
-    🏛️ Cidadão.AI - Sistema multi-agente de IA para transparência pública brasileira.
-    
-    Sistema enterprise-grade para detecção de anomalias e análise de transparência 
-    em dados governamentais brasileiros usando múltiplos agentes de IA especializados.
-    
-    Agentes Disponíveis:
-    - 🏹 Zumbi dos Palmares: Investigação e detecção de anomalias
-    - 🎭 Anita Garibaldi: Análise de padrões revolucionária
-    - 📝 Tiradentes: Geração de relatórios pela liberdade de informação
-    - 🏎️ Ayrton Senna: Roteamento semântico de alta performance
-    - E mais 13 agentes especializados com identidade cultural brasileira
-    
-    Para começar:
-        cidadao status      # Verificar status do sistema
-        cidadao --help      # Ver todos os comandos disponíveis
-    """
-    if verbose:
-        console.print(f"[dim]Verbose mode enabled[/dim]")
-        console.print(f"[dim]Config file: {config_file or 'default'}[/dim]")
-
-
 def cli_main() -> None:
     """Entry point for the CLI when installed as a package."""
     try:
-        app()
+        app(prog_name="cidadao")
     except KeyboardInterrupt:
         console.print("\n[yellow]⚠️  Operação cancelada pelo usuário[/yellow]")
-        raise typer.Exit(1)
+        sys.exit(1)
     except Exception as e:
         console.print(f"[red]❌ Erro: {e}[/red]")
-        raise typer.Exit(1)
+        sys.exit(1)
 
 
 if __name__ == "__main__":
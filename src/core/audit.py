@@ -6,13 +6,17 @@ Date: 2025-01-15
 License: Proprietary - All rights reserved
 """
 
+import csv
+import io
 import json
 import hashlib
 import asyncio
-from datetime import datetime, timezone
+import zlib
+from datetime import datetime, timedelta, timezone
+from itertools import islice
 from enum import Enum
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple, Union
 from dataclasses import dataclass, asdict
 from uuid import uuid4
 
@@ -20,6 +24,7 @@ from pydantic import BaseModel, Field
 import structlog
 
 from src.core import get_logger, settings
+from src.core.audit_store import AuditSegmentStore, AuditWriter
 
 
 class AuditEventType(str, Enum):
@@ -156,11 +161,12 @@ class AuditEvent(BaseModel):
     
     # Data integrity
     checksum: Optional[str] = None
+    chain_hash: Optional[str] = None  # Set by the store when the event is written
     
     def calculate_checksum(self) -> str:
         """Calculate checksum for data integrity."""
         # Create a deterministic string representation
-        data_dict = self.model_dump(exclude={"checksum"})
+        data_dict = self.model_dump(exclude={"checksum", "chain_hash"})
         data_str = json.dumps(data_dict, sort_keys=True, default=str)
         return hashlib.sha256(data_str.encode()).hexdigest()
     
@@ -188,6 +194,33 @@ class AuditFilter(BaseModel):
     offset: int = Field(default=0, ge=0)
 
 
+AUDIT_CSV_HEADER = [
+    "id", "timestamp", "event_type", "severity", "message",
+    "user_id", "user_email", "success", "error_code",
+    "resource_type", "resource_id", "ip_address"
+]
+
+EXPORT_FORMATS = ("json", "ndjson", "csv")
+
+
+def _event_csv_row(event: "AuditEvent") -> List[Any]:
+    """Flatten an event into an export CSV row."""
+    return [
+        event.id,
+        event.timestamp.isoformat(),
+        event.event_type.value,
+        event.severity.value,
+        event.message,
+        event.user_id or "",
+        event.user_email or "",
+        event.success,
+        event.error_code or "",
+        event.resource_type or "",
+        event.resource_id or "",
+        event.context.ip_address if event.context else ""
+    ]
+
+
 class AuditStatistics(BaseModel):
     """Audit statistics."""
     
@@ -204,18 +237,28 @@ class AuditStatistics(BaseModel):
 class AuditLogger:
     """Comprehensive audit logging system."""
     
-    def __init__(self):
+    def __init__(self, audit_path: Optional[Path] = None):
         """Initialize audit logger."""
         self.logger = get_logger(__name__)
         self.audit_logger = structlog.get_logger("audit")
-        self.audit_path = settings.audit_log_path
-        self.events: List[AuditEvent] = []  # In-memory storage for demo
+        self.audit_path = Path(audit_path or settings.audit_log_path)
         
-        # Ensure audit directory exists
-        self.audit_path.mkdir(parents=True, exist_ok=True)
+        # Daily JSONL segments with sidecar indexes; creates the directory
+        self.store = AuditSegmentStore(
+            self.audit_path,
+            parse_event=AuditEvent.model_validate_json,
+            retention_days=settings.audit_log_retention_days
+        )
         
-        # Initialize audit file
-        self.audit_file = self.audit_path / f"audit_{datetime.now().strftime('%Y%m%d')}.jsonl"
+        # Group-commit writer so log_event never waits on disk
+        self.writer = AuditWriter(
+            self.store,
+            queue_size=settings.audit_writer_queue_size,
+            batch_size=settings.audit_writer_batch_size,
+            flush_interval=settings.audit_writer_flush_interval_ms / 1000,
+            fsync_policy=settings.audit_fsync_policy,
+            fsync_interval=settings.audit_fsync_interval_seconds
+        )
     
     async def log_event(
         self,
@@ -259,10 +302,7 @@ class AuditLogger:
         # Calculate and set checksum for integrity
         event.checksum = event.calculate_checksum()
         
-        # Store event (in production, use database)
-        self.events.append(event)
-        
-        # Write to file for persistence
+        # Queue for the background writer (also indexes the event)
         await self._write_to_file(event)
         
         # Log to structured logger
@@ -284,11 +324,9 @@ class AuditLogger:
         return event
     
     async def _write_to_file(self, event: AuditEvent):
-        """Write audit event to file."""
+        """Queue audit event for the batched file writer."""
         try:
-            with open(self.audit_file, "a", encoding="utf-8") as f:
-                event_json = event.model_dump_json()
-                f.write(f"{event_json}\n")
+            await self.writer.submit(event)
         except Exception as e:
             self.logger.error(
                 "audit_file_write_error",
@@ -316,23 +354,21 @@ class AuditLogger:
         if not event.context or not event.context.ip_address:
             return
         
-        # Count recent login failures from same IP
-        recent_failures = [
-            e for e in self.events[-100:]  # Last 100 events
-            if e.event_type == AuditEventType.LOGIN_FAILURE
-            and e.context
-            and e.context.ip_address == event.context.ip_address
-            and (datetime.now(timezone.utc) - e.timestamp).total_seconds() < 3600  # Last hour
-        ]
+        # Count recent login failures from same IP (the index plus events not yet written)
+        failure_count = self.writer.count(AuditFilter(
+            event_types=[AuditEventType.LOGIN_FAILURE],
+            ip_address=event.context.ip_address,
+            start_date=datetime.now(timezone.utc) - timedelta(hours=1)  # Last hour
+        ))
         
-        if len(recent_failures) >= 5:  # 5 failures in 1 hour
+        if failure_count >= 5:  # 5 failures in 1 hour
             await self.log_event(
                 event_type=AuditEventType.BRUTE_FORCE_DETECTED,
                 message=f"Brute force attack detected from IP {event.context.ip_address}",
                 severity=AuditSeverity.CRITICAL,
                 details={
                     "ip_address": event.context.ip_address,
-                    "failure_count": len(recent_failures),
+                    "failure_count": failure_count,
                     "time_window_hours": 1
                 },
                 context=event.context
@@ -359,79 +395,25 @@ class AuditLogger:
         )
     
     async def query_events(self, filter_options: AuditFilter) -> List[AuditEvent]:
-        """Query audit events with filtering."""
-        
-        filtered_events = self.events.copy()
-        
-        # Apply filters
-        if filter_options.start_date:
-            filtered_events = [
-                e for e in filtered_events
-                if e.timestamp >= filter_options.start_date
-            ]
-        
-        if filter_options.end_date:
-            filtered_events = [
-                e for e in filtered_events
-                if e.timestamp <= filter_options.end_date
-            ]
-        
-        if filter_options.event_types:
-            filtered_events = [
-                e for e in filtered_events
-                if e.event_type in filter_options.event_types
-            ]
-        
-        if filter_options.severity_levels:
-            filtered_events = [
-                e for e in filtered_events
-                if e.severity in filter_options.severity_levels
-            ]
-        
-        if filter_options.user_id:
-            filtered_events = [
-                e for e in filtered_events
-                if e.user_id == filter_options.user_id
-            ]
-        
-        if filter_options.user_email:
-            filtered_events = [
-                e for e in filtered_events
-                if e.user_email == filter_options.user_email
-            ]
-        
-        if filter_options.resource_type:
-            filtered_events = [
-                e for e in filtered_events
-                if e.resource_type == filter_options.resource_type
-            ]
-        
-        if filter_options.resource_id:
-            filtered_events = [
-                e for e in filtered_events
-                if e.resource_id == filter_options.resource_id
-            ]
-        
-        if filter_options.success_only is not None:
-            filtered_events = [
-                e for e in filtered_events
-                if e.success == filter_options.success_only
-            ]
-        
-        if filter_options.ip_address:
-            filtered_events = [
-                e for e in filtered_events
-                if e.context and e.context.ip_address == filter_options.ip_address
-            ]
-        
-        # Sort by timestamp (newest first)
-        filtered_events.sort(key=lambda x: x.timestamp, reverse=True)
-        
-        # Apply pagination
+        """Query audit events with filtering (newest first)."""
+        
+        await self.writer.flush()
+        
+        # Segments are read lazily, so only offset + limit events are parsed
         start = filter_options.offset
         end = start + filter_options.limit
         
-        return filtered_events[start:end]
+        return list(islice(self.store.iter_events(filter_options), start, end))
+    
+    async def get_event(self, event_id: str) -> Optional[AuditEvent]:
+        """Get a single audit event by id."""
+        await self.writer.flush()
+        return self.store.get(event_id)
+    
+    async def close(self):
+        """Write pending events and close the current segment."""
+        await self.writer.close()
+        self.store.close()
     
     async def get_statistics(
         self,
@@ -440,43 +422,18 @@ class AuditLogger:
     ) -> AuditStatistics:
         """Get audit statistics."""
         
-        events = self.events
-        
-        if start_date:
-            events = [e for e in events if e.timestamp >= start_date]
-        
-        if end_date:
-            events = [e for e in events if e.timestamp <= end_date]
-        
-        total_events = len(events)
-        
-        # Events by type
-        events_by_type = {}
-        for event in events:
-            event_type = event.event_type.value
-            events_by_type[event_type] = events_by_type.get(event_type, 0) + 1
-        
-        # Events by severity
-        events_by_severity = {}
-        for event in events:
-            severity = event.severity.value
-            events_by_severity[severity] = events_by_severity.get(severity, 0) + 1
+        await self.writer.flush()
         
-        # Events by user
-        events_by_user = {}
-        for event in events:
-            if event.user_email:
-                events_by_user[event.user_email] = events_by_user.get(event.user_email, 0) + 1
+        # Hourly counters kept by the store; no pass over the events
+        totals, events_by_hour = self.store.statistics(start_date, end_date)
         
-        # Events by hour
-        events_by_hour = {}
-        for event in events:
-            hour = event.timestamp.strftime("%Y-%m-%d %H:00")
-            events_by_hour[hour] = events_by_hour.get(hour, 0) + 1
+        total_events = totals["total"]
+        events_by_type = totals["types"]
+        events_by_severity = totals["severities"]
+        events_by_user = totals["users"]
         
         # Success rate
-        successful_events = sum(1 for e in events if e.success)
-        success_rate = (successful_events / total_events * 100) if total_events > 0 else 0
+        success_rate = (totals["success"] / total_events * 100) if total_events > 0 else 0
         
         # Most active users
         most_active_users = [
@@ -485,14 +442,9 @@ class AuditLogger:
         ]
         
         # Most common errors
-        error_counts = {}
-        for event in events:
-            if not event.success and event.error_code:
-                error_counts[event.error_code] = error_counts.get(event.error_code, 0) + 1
-        
         most_common_errors = [
             {"error_code": error, "count": count}
-            for error, count in sorted(error_counts.items(), key=lambda x: x[1], reverse=True)[:10]
+            for error, count in sorted(totals["errors"].items(), key=lambda x: x[1], reverse=True)[:10]
         ]
         
         return AuditStatistics(
@@ -519,57 +471,133 @@ class AuditLogger:
             return json.dumps([event.model_dump() for event in events], indent=2, default=str)
         
         elif format.lower() == "csv":
-            import csv
-            import io
-            
             output = io.StringIO()
             writer = csv.writer(output)
             
-            # Write header
-            writer.writerow([
-                "id", "timestamp", "event_type", "severity", "message",
-                "user_id", "user_email", "success", "error_code",
-                "resource_type", "resource_id", "ip_address"
-            ])
-            
-            # Write events
+            writer.writerow(AUDIT_CSV_HEADER)
             for event in events:
-                writer.writerow([
-                    event.id,
-                    event.timestamp.isoformat(),
-                    event.event_type.value,
-                    event.severity.value,
-                    event.message,
-                    event.user_id or "",
-                    event.user_email or "",
-                    event.success,
-                    event.error_code or "",
-                    event.resource_type or "",
-                    event.resource_id or "",
-                    event.context.ip_address if event.context else ""
-                ])
+                writer.writerow(_event_csv_row(event))
             
             return output.getvalue()
         
         else:
             raise ValueError(f"Unsupported export format: {format}")
     
-    async def verify_integrity(self) -> Dict[str, Any]:
-        """Verify integrity of all audit events."""
+    async def export_stream(
+        self,
+        filter_options: AuditFilter,
+        format: str = "ndjson",
+        compress: bool = False,
+        after: Optional[str] = None,
+        chunk_size: int = 500
+    ) -> AsyncIterator[bytes]:
+        """
+        Export matching events as a byte stream, oldest first.
+        
+        Storage is read lazily in chunks of ``chunk_size`` events in a worker
+        thread, so memory does not depend on the size of the range. Passing
+        the id of the last received event as ``after`` resumes an interrupted
+        export. Pagination fields of the filter are ignored.
+        
+        Raises:
+            ValueError: Unsupported export format
+            KeyError: Unknown ``after`` event id
+        """
+        format = format.lower()
+        if format not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {format}")
+        
+        await self.writer.flush()
         
-        total_events = len(self.events)
-        valid_events = 0
-        invalid_events = []
+        position = None
+        if after:
+            position = await asyncio.to_thread(self.store.locate, after)
+            if position is None:
+                raise KeyError(f"Unknown audit event: {after}")
         
-        for event in self.events:
-            if event.validate_integrity():
-                valid_events += 1
-            else:
-                invalid_events.append({
-                    "id": event.id,
-                    "timestamp": event.timestamp.isoformat(),
-                    "event_type": event.event_type.value
-                })
+        events = self.store.iter_positions(filter_options, newest_first=False, after=position)
+        return self._export_chunks(events, format, compress, chunk_size)
+    
+    async def _export_chunks(
+        self,
+        events: Iterator[Tuple[str, int, AuditEvent]],
+        format: str,
+        compress: bool,
+        chunk_size: int
+    ) -> AsyncIterator[bytes]:
+        """Encode (and optionally gzip) events chunk by chunk."""
+        
+        # wbits=31 writes a gzip container
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+        
+        def encode(text: str) -> bytes:
+            data = text.encode("utf-8")
+            return compressor.compress(data) if compressor else data
+        
+        def next_chunk() -> List[AuditEvent]:
+            return [event for _, _, event in islice(events, chunk_size)]
+        
+        try:
+            if format == "csv":
+                output = io.StringIO()
+                csv.writer(output).writerow(AUDIT_CSV_HEADER)
+                yield encode(output.getvalue())
+            elif format == "json":
+                yield encode("[")
+            
+            first = True
+            while True:
+                chunk = await asyncio.to_thread(next_chunk)
+                if not chunk:
+                    break
+                
+                if format == "ndjson":
+                    text = "".join(event.model_dump_json() + "\n" for event in chunk)
+                elif format == "json":
+                    text = ("" if first else ",") + ",".join(event.model_dump_json() for event in chunk)
+                else:
+                    output = io.StringIO()
+                    writer = csv.writer(output)
+                    for event in chunk:
+                        writer.writerow(_event_csv_row(event))
+                    text = output.getvalue()
+                first = False
+                
+                data = encode(text)
+                if data:
+                    yield data
+            
+            if format == "json":
+                yield encode("]")
+            if compressor:
+                yield compressor.flush()
+        finally:
+            events.close()
+    
+    async def verify_integrity(self, full: bool = False) -> Dict[str, Any]:
+        """
+        Verify integrity of audit events.
+        
+        Checks each event checksum and the hash chain linking events in write
+        order, so deleted or reordered events are detected too. Segments are
+        verified in parallel, each resuming from its last verified checkpoint
+        unless ``full`` is set.
+        """
+        
+        await self.writer.flush()
+        
+        reports = await asyncio.gather(*(
+            asyncio.to_thread(self.store.verify_segment, day, full)
+            for day in self.store.segment_days()
+        ))
+        
+        total_events = sum(report["events"] for report in reports)
+        invalid_events = [item for report in reports for item in report["invalid"]]
+        chain_breaks = [
+            {"segment": report["day"], **item}
+            for report in reports for item in report["chain_breaks"]
+        ]
+        valid_events = total_events - len(invalid_events)
         
         integrity_percentage = (valid_events / total_events * 100) if total_events > 0 else 100
         
@@ -578,7 +606,12 @@ class AuditLogger:
             "valid_events": valid_events,
             "invalid_events": len(invalid_events),
             "integrity_percentage": integrity_percentage,
-            "invalid_event_details": invalid_events
+            "invalid_event_details": invalid_events,
+            "chain_valid": not chain_breaks,
+            "chain_breaks": chain_breaks,
+            "segments_verified": len(reports),
+            "events_checked": sum(report["checked"] for report in reports),
+            "full_verification": full
         }
 
 
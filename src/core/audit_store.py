@@ -0,0 +1,1095 @@
+"""
+Module: core.audit_store
+Description: Append-only segmented storage for audit events with sidecar indexes
+Author: Anderson H. Silva
+Date: 2025-01-15
+License: Proprietary - All rights reserved
+"""
+
+import asyncio
+import hashlib
+import heapq
+import json
+import os
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.core import get_logger
+
+logger = get_logger(__name__)
+
+SEGMENT_PREFIX = "audit_"
+SEGMENT_SUFFIX = ".jsonl"
+INDEX_SUFFIX = ".idx.json"
+ANCHOR_FILE = "audit_chain_anchor.json"
+INDEX_VERSION = 2
+
+GENESIS_HASH = "0" * 64
+
+HOUR_FORMAT = "%Y-%m-%d %H:00"
+DAY_SECONDS = 86400
+
+FSYNC_POLICIES = ("none", "batch", "interval")
+
+
+class AuditWriteError(Exception):
+    """
+    Audit events could not be written.
+
+    ``written`` is how many events at the start of the batch did reach the
+    segment (and the hash chain) before the failure.
+    """
+
+    def __init__(self, message: str, written: int = 0):
+        super().__init__(message)
+        self.written = written
+
+
+def _epoch(value: datetime) -> float:
+    """Convert a datetime to epoch seconds, treating naive values as UTC."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _segment_day(value: datetime) -> str:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.strftime("%Y%m%d")
+
+
+def chain_hash(previous: str, checksum: str) -> str:
+    """Link an event checksum to the previous chain hash."""
+    return hashlib.sha256(f"{previous}:{checksum}".encode()).hexdigest()
+
+
+def _new_counters() -> Dict[str, Any]:
+    return {"total": 0, "success": 0, "types": {}, "severities": {}, "users": {}, "errors": {}}
+
+
+def _increment(bucket: Dict[str, int], key: str, amount: int = 1):
+    bucket[key] = bucket.get(key, 0) + amount
+
+
+def count_event(counters: Dict[str, Any], event: Any):
+    """Add one event to a statistics counter set."""
+    counters["total"] += 1
+    if event.success:
+        counters["success"] += 1
+    _increment(counters["types"], event.event_type.value)
+    _increment(counters["severities"], event.severity.value)
+    if event.user_email:
+        _increment(counters["users"], event.user_email)
+    if not event.success and event.error_code:
+        _increment(counters["errors"], event.error_code)
+
+
+def merge_counters(target: Dict[str, Any], source: Dict[str, Any]):
+    """Add ``source`` counters into ``target``."""
+    target["total"] += source["total"]
+    target["success"] += source["success"]
+    for name in ("types", "severities", "users", "errors"):
+        for key, value in source[name].items():
+            _increment(target[name], key, value)
+
+
+def event_ip(event: Any) -> Optional[str]:
+    return event.context.ip_address if event.context else None
+
+
+def matches_filter(event: Any, filter_options: Any) -> bool:
+    """Check an event against every field of an ``AuditFilter``."""
+    f = filter_options
+    if f.start_date and _epoch(event.timestamp) < _epoch(f.start_date):
+        return False
+    if f.end_date and _epoch(event.timestamp) > _epoch(f.end_date):
+        return False
+    if f.event_types and event.event_type not in f.event_types:
+        return False
+    if f.severity_levels and event.severity not in f.severity_levels:
+        return False
+    if f.user_id and event.user_id != f.user_id:
+        return False
+    if f.user_email and event.user_email != f.user_email:
+        return False
+    if f.resource_type and event.resource_type != f.resource_type:
+        return False
+    if f.resource_id and event.resource_id != f.resource_id:
+        return False
+    if f.success_only is not None and event.success != f.success_only:
+        return False
+    if f.ip_address and event_ip(event) != f.ip_address:
+        return False
+    return True
+
+
+@dataclass
+class TimeWindow:
+    """Filter selecting every event in a time range (``AuditFilter`` shape)."""
+
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+    event_types: Optional[List[Any]] = None
+    severity_levels: Optional[List[Any]] = None
+    user_id: Optional[str] = None
+    user_email: Optional[str] = None
+    resource_type: Optional[str] = None
+    resource_id: Optional[str] = None
+    success_only: Optional[bool] = None
+    ip_address: Optional[str] = None
+
+
+def _is_index_only(filter_options: Any) -> bool:
+    """Whether the filter can be answered from the index without reading events."""
+    f = filter_options
+    return not (
+        f.severity_levels or f.resource_type or f.resource_id
+        or f.success_only is not None
+    )
+
+
+class SegmentIndex:
+    """
+    Index of one daily segment.
+
+    Events are addressed by ordinal (append position). Postings map user,
+    e-mail, event type and IP to ascending ordinal lists; ``offsets`` and
+    ``times`` give each ordinal's byte offset and timestamp. Hourly counters
+    make statistics incremental.
+
+    ``root`` is the chain hash of the segment's last event. The verified
+    checkpoint (count, byte size and chain hash) marks how far the segment
+    has been checked, so verification resumes from there.
+    """
+
+    def __init__(self, day: str):
+        self.day = day
+        self.size = 0  # Segment bytes covered by the index
+        self.offsets: List[int] = []
+        self.times: List[float] = []
+        self.monotonic = True
+        self.by_user_id: Dict[str, List[int]] = {}
+        self.by_user_email: Dict[str, List[int]] = {}
+        self.by_type: Dict[str, List[int]] = {}
+        self.by_ip: Dict[str, List[int]] = {}
+        self.by_id: Dict[str, int] = {}
+        self.hourly: Dict[str, Dict[str, Any]] = {}
+        self.root: Optional[str] = None
+        self.verified_count = 0
+        self.verified_size = 0
+        self.verified_root: Optional[str] = None
+        self.verified_anchor: Optional[str] = None  # Chain head before the first event
+        self._hour_slot: Optional[int] = None
+        self._hour_counters: Optional[Dict[str, Any]] = None
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def add(self, event: Any, offset: int, length: int, timestamp: Optional[float] = None):
+        ordinal = len(self.offsets)
+        if timestamp is None:
+            timestamp = _epoch(event.timestamp)
+
+        if self.times and timestamp < self.times[-1]:
+            self.monotonic = False
+        self.offsets.append(offset)
+        self.times.append(timestamp)
+        self.size = offset + length
+
+        self.by_id[event.id] = ordinal
+        if getattr(event, "chain_hash", None):
+            self.root = event.chain_hash
+        self.by_type.setdefault(event.event_type.value, []).append(ordinal)
+        if event.user_id:
+            self.by_user_id.setdefault(event.user_id, []).append(ordinal)
+        if event.user_email:
+            self.by_user_email.setdefault(event.user_email, []).append(ordinal)
+        ip = event_ip(event)
+        if ip:
+            self.by_ip.setdefault(ip, []).append(ordinal)
+
+        slot = int(timestamp // 3600)
+        if slot != self._hour_slot:
+            hour = datetime.fromtimestamp(slot * 3600, timezone.utc).strftime(HOUR_FORMAT)
+            counters = self.hourly.get(hour)
+            if counters is None:
+                counters = self.hourly[hour] = _new_counters()
+            self._hour_slot, self._hour_counters = slot, counters
+        count_event(self._hour_counters, event)
+
+    def candidates(self, filter_options: Any) -> List[int]:
+        """Ordinals that may match ``filter_options`` (ascending)."""
+        f = filter_options
+        postings: List[Iterable[int]] = []
+
+        if f.user_id:
+            postings.append(self.by_user_id.get(f.user_id, []))
+        if f.user_email:
+            postings.append(self.by_user_email.get(f.user_email, []))
+        if f.ip_address:
+            postings.append(self.by_ip.get(f.ip_address, []))
+        if f.event_types:
+            lists = [self.by_type.get(t.value, []) for t in f.event_types]
+            postings.append(list(heapq.merge(*lists)) if len(lists) > 1 else lists[0])
+
+        lo, hi = 0, len(self.offsets)
+        start = _epoch(f.start_date) if f.start_date else None
+        end = _epoch(f.end_date) if f.end_date else None
+        if self.monotonic:
+            if start is not None:
+                lo = bisect_left(self.times, start)
+            if end is not None:
+                hi = bisect_right(self.times, end)
+
+        if postings:
+            postings.sort(key=len)
+            first = postings[0]
+            others = [set(p) for p in postings[1:]]
+            result = [
+                o for o in first[bisect_left(first, lo):bisect_left(first, hi)]
+                if all(o in other for other in others)
+            ]
+        else:
+            result = list(range(lo, hi))
+
+        if not self.monotonic and (start is not None or end is not None):
+            times = self.times
+            result = [
+                o for o in result
+                if (start is None or times[o] >= start) and (end is None or times[o] <= end)
+            ]
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "version": INDEX_VERSION,
+            "day": self.day,
+            "size": self.size,
+            "offsets": self.offsets,
+            "times": self.times,
+            "monotonic": self.monotonic,
+            "by_user_id": self.by_user_id,
+            "by_user_email": self.by_user_email,
+            "by_type": self.by_type,
+            "by_ip": self.by_ip,
+            "by_id": self.by_id,
+            "hourly": self.hourly,
+            "root": self.root,
+            "verified_count": self.verified_count,
+            "verified_size": self.verified_size,
+            "verified_root": self.verified_root,
+            "verified_anchor": self.verified_anchor,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SegmentIndex":
+        index = cls(data["day"])
+        index.size = data["size"]
+        index.offsets = data["offsets"]
+        index.times = data["times"]
+        index.monotonic = data["monotonic"]
+        index.by_user_id = data["by_user_id"]
+        index.by_user_email = data["by_user_email"]
+        index.by_type = data["by_type"]
+        index.by_ip = data["by_ip"]
+        index.by_id = data["by_id"]
+        index.hourly = data["hourly"]
+        index.root = data["root"]
+        index.verified_count = data["verified_count"]
+        index.verified_size = data["verified_size"]
+        index.verified_root = data["verified_root"]
+        index.verified_anchor = data["verified_anchor"]
+        return index
+
+
+class AuditSegmentStore:
+    """
+    Append-only audit storage split into daily JSONL segments.
+
+    Each ``audit_YYYYMMDD.jsonl`` segment has an ``.idx.json`` sidecar with a
+    :class:`SegmentIndex`. Only the segment being written and a small LRU of
+    recently queried segments are held in memory, so memory does not grow
+    with retention. Queries select segments by day, narrow candidates with
+    the index, then seek to and parse only those lines.
+
+    Segments without a sidecar (or with a stale one) are indexed from the
+    segment file on first use.
+
+    Every appended event is hash-chained to the previous one in write order,
+    across segments. Segments are strictly append-only: an event older than
+    the open segment's day is written to the open segment.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        parse_event: Callable[[str], Any],
+        cached_segments: int = 4,
+        index_flush_every: int = 1000,
+        retention_days: Optional[int] = None,
+    ):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.parse_event = parse_event
+        self.cached_segments = cached_segments
+        self.index_flush_every = index_flush_every
+        self.retention_days = retention_days
+
+        self._lock = threading.RLock()
+        self._cache: "OrderedDict[str, SegmentIndex]" = OrderedDict()
+        self._current: Optional[SegmentIndex] = None
+        self._current_file = None
+        self._current_start = 0.0  # Epoch bounds of the open segment's day
+        self._current_end = 0.0
+        self._unsaved = 0
+        self._head: Optional[str] = None  # Chain hash of the last written event
+
+    # Paths -----------------------------------------------------------------
+
+    def segment_path(self, day: str) -> Path:
+        return self.path / f"{SEGMENT_PREFIX}{day}{SEGMENT_SUFFIX}"
+
+    def index_path(self, day: str) -> Path:
+        return self.path / f"{SEGMENT_PREFIX}{day}{INDEX_SUFFIX}"
+
+    def _read_anchor(self) -> Optional[Dict[str, str]]:
+        try:
+            with open(self.path / ANCHOR_FILE, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def segment_days(self) -> List[str]:
+        """Days with a segment file, oldest first."""
+        days = []
+        for entry in self.path.glob(f"{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}"):
+            day = entry.name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]
+            if len(day) == 8 and day.isdigit():
+                days.append(day)
+        return sorted(days)
+
+    # Index loading ---------------------------------------------------------
+
+    def _load_index(self, day: str) -> SegmentIndex:
+        if self._current is not None and self._current.day == day:
+            return self._current
+        cached = self._cache.get(day)
+        if cached is not None:
+            self._cache.move_to_end(day)
+            return cached
+
+        index = None
+        index_path = self.index_path(day)
+        if index_path.exists():
+            try:
+                with open(index_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") == INDEX_VERSION:
+                    index = SegmentIndex.from_dict(data)
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning("audit_index_unreadable", day=day, error=str(e))
+
+        if index is None:
+            index = SegmentIndex(day)
+        if self._catch_up(index):
+            self._save_index(index)
+
+        self._cache[day] = index
+        while len(self._cache) > self.cached_segments:
+            self._cache.popitem(last=False)
+        return index
+
+    def _catch_up(self, index: SegmentIndex) -> bool:
+        """Index segment lines written after the sidecar was saved."""
+        segment = self.segment_path(index.day)
+        if not segment.exists() or segment.stat().st_size <= index.size:
+            return False
+
+        added = 0
+        with open(segment, "rb") as f:
+            f.seek(index.size)
+            offset = index.size
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # Partial write; picked up once completed
+                if line.strip():
+                    try:
+                        event = self.parse_event(line.decode("utf-8"))
+                    except Exception as e:
+                        logger.warning("audit_segment_bad_line", day=index.day, offset=offset, error=str(e))
+                    else:
+                        index.add(event, offset, len(line))
+                        added += 1
+                offset += len(line)
+                index.size = offset
+        return added > 0
+
+    def chain_head_before(self, day: str) -> str:
+        """Chain hash preceding the first event of ``day``'s segment."""
+        with self._lock:
+            for previous in reversed(self.segment_days()):
+                if previous >= day:
+                    continue
+                root = self._load_index(previous).root
+                if root:
+                    return root
+        anchor = self._read_anchor()
+        if anchor and anchor["day"] < day:
+            return anchor["root"]
+        return GENESIS_HASH
+
+    def _save_index(self, index: SegmentIndex):
+        index_path = self.index_path(index.day)
+        tmp_path = index_path.with_suffix(".tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(index.to_dict(), f, separators=(",", ":"))
+            os.replace(tmp_path, index_path)
+        except OSError as e:
+            logger.error("audit_index_write_error", day=index.day, error=str(e))
+
+    # Writing ---------------------------------------------------------------
+
+    def _open_segment(self, day: str):
+        if self._current is not None:
+            if self._current.day == day:
+                return
+            self._close_current()
+
+        index = self._load_index(day)
+        self._cache.pop(day, None)
+
+        segment = self.segment_path(day)
+        if segment.exists() and segment.stat().st_size > index.size:
+            # Drop a partial line left by an interrupted write
+            logger.warning("audit_segment_truncated", day=day, size=index.size)
+            os.truncate(segment, index.size)
+
+        if self._head is None:
+            self._head = index.root or self.chain_head_before(day)
+
+        self._current = index
+        self._current_file = open(segment, "ab")
+        self._current_start = datetime.strptime(day, "%Y%m%d").replace(tzinfo=timezone.utc).timestamp()
+        self._current_end = self._current_start + DAY_SECONDS
+        self._unsaved = 0
+        self.enforce_retention()
+
+    def _close_current(self):
+        if self._current_file is not None:
+            self._current_file.flush()
+            os.fsync(self._current_file.fileno())
+            self._current_file.close()
+            self._current_file = None
+        if self._current is not None:
+            self._save_index(self._current)
+            self._current = None
+        self._unsaved = 0
+
+    def append(self, event: Any):
+        """Append one event to its day's segment."""
+        self.append_many([event])
+
+    def append_many(self, events: List[Any], sync: bool = False):
+        """
+        Append events, updating indexes once the lines are written.
+
+        The day's segment is only re-resolved when an event falls past the
+        open segment's day. Each event gets its checksum (if missing) and its
+        chain hash before being written. With ``sync`` the segment is fsynced.
+
+        Events are written per segment as one group: a group that fails is
+        truncated away and neither the index nor the chain head move, so a
+        retry chains onto the last event actually on disk.
+
+        Raises:
+            AuditWriteError: With the number of events written before the failure
+        """
+        with self._lock:
+            written = 0
+            group: List[Tuple[Any, float]] = []
+            try:
+                for event in events:
+                    timestamp = _epoch(event.timestamp)
+                    if self._current is None:
+                        days = self.segment_days()
+                        day = _segment_day(event.timestamp)
+                        self._open_segment(max(day, days[-1]) if days else day)
+                    elif timestamp >= self._current_end:
+                        written += self._write_group(group)
+                        group = []
+                        self._open_segment(_segment_day(event.timestamp))
+                    group.append((event, timestamp))
+                written += self._write_group(group, sync)
+            except Exception as e:
+                raise AuditWriteError(
+                    f"Audit write failed after {written} of {len(events)} events: {e}", written
+                ) from e
+
+            if self._current is not None and self._checkpoint_due():
+                self._save_index(self._current)
+                self._unsaved = 0
+
+    def _checkpoint_due(self) -> bool:
+        """
+        Whether the open segment's sidecar should be rewritten.
+
+        The sidecar is a checkpoint: events after it are re-indexed from the
+        segment on open. It is rewritten once the unsaved tail reaches both
+        ``index_flush_every`` and the size of the last checkpoint, so
+        checkpoints double in spacing and a day's rewrites stay linear in its
+        event count while the tail to rebuild is at most half the segment.
+        """
+        saved = len(self._current) - self._unsaved
+        return self._unsaved >= max(self.index_flush_every, saved)
+
+    def _write_group(self, group: List[Tuple[Any, float]], sync: bool = False) -> int:
+        """Write events of the open segment; index and chain head advance only on success."""
+        if not group:
+            return 0
+
+        head = self._head
+        lines = []
+        for event, _ in group:
+            if not event.checksum:
+                event.checksum = event.calculate_checksum()
+            head = chain_hash(head, event.checksum)
+            event.chain_hash = head
+            lines.append((event.model_dump_json() + "\n").encode("utf-8"))
+
+        start = self._current.size
+        try:
+            self._current_file.write(b"".join(lines))
+            self._current_file.flush()
+            if sync:
+                os.fsync(self._current_file.fileno())
+        except Exception:
+            self._discard_current(start)
+            raise
+
+        offset = start
+        for (event, timestamp), line in zip(group, lines):
+            self._current.add(event, offset, len(line), timestamp)
+            offset += len(line)
+        self._unsaved += len(group)
+        self._head = head
+        return len(group)
+
+    def _discard_current(self, size: int):
+        """Drop a partially written group: close the segment and cut it back to ``size``."""
+        day = self._current.day
+        try:
+            self._current_file.close()
+        except OSError:
+            pass
+        self._current_file = None
+        self._current = None
+        self._unsaved = 0
+        try:
+            os.truncate(self.segment_path(day), size)
+        except OSError as e:
+            logger.error("audit_segment_truncate_error", day=day, size=size, error=str(e))
+
+    def close(self):
+        with self._lock:
+            self._close_current()
+
+    def enforce_retention(self):
+        """Delete segments older than ``retention_days``."""
+        if not self.retention_days:
+            return
+        cutoff = _segment_day(datetime.now(timezone.utc) - timedelta(days=self.retention_days))
+        for day in self.segment_days():
+            if day >= cutoff:
+                break
+            # Keep the chain verifiable from the oldest remaining segment
+            root = self._load_index(day).root
+            if root:
+                with open(self.path / ANCHOR_FILE, "w", encoding="utf-8") as f:
+                    json.dump({"day": day, "root": root}, f)
+            self._cache.pop(day, None)
+            for path in (self.segment_path(day), self.index_path(day)):
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+            logger.info("audit_segment_expired", day=day)
+
+    # Reading ---------------------------------------------------------------
+
+    def _days_for_range(self, start: Optional[datetime], end: Optional[datetime]) -> List[str]:
+        # One day of slack on each side covers late events and segments
+        # named by local date
+        low = _segment_day(start - timedelta(days=1)) if start else None
+        high = _segment_day(end + timedelta(days=1)) if end else None
+        return [
+            day for day in self.segment_days()
+            if (low is None or day >= low) and (high is None or day <= high)
+        ]
+
+    def _matching(
+        self,
+        filter_options: Any,
+        newest_first: bool = True,
+        after: Optional[Tuple[str, int]] = None,
+    ) -> Iterator[Tuple[str, List[int], List[int]]]:
+        """
+        Lazily yield (day, candidate ordinals, offsets) per segment.
+
+        Candidates are computed one segment at a time so long ranges never
+        hold more than one segment's candidate list. ``after`` skips
+        everything up to and including that (day, ordinal) position in the
+        iteration order.
+        """
+        days = self._days_for_range(filter_options.start_date, filter_options.end_date)
+        if newest_first:
+            days.reverse()
+        for day in days:
+            if after is not None and (day > after[0] if newest_first else day < after[0]):
+                continue
+            with self._lock:
+                index = self._load_index(day)
+                candidates = index.candidates(filter_options)
+                offsets = index.offsets
+            if after is not None and day == after[0]:
+                split = bisect_left(candidates, after[1]) if newest_first else bisect_right(candidates, after[1])
+                candidates = candidates[:split] if newest_first else candidates[split:]
+            if candidates:
+                yield day, candidates, offsets
+
+    def _read(self, day: str, offsets: List[int], ordinals: Iterable[int]) -> Iterator[Any]:
+        with open(self.segment_path(day), "rb") as f:
+            for ordinal in ordinals:
+                f.seek(offsets[ordinal])
+                yield self.parse_event(f.readline().decode("utf-8"))
+
+    def iter_positions(
+        self,
+        filter_options: Any,
+        newest_first: bool = True,
+        after: Optional[Tuple[str, int]] = None,
+    ) -> Iterator[Tuple[str, int, Any]]:
+        """
+        Lazily yield (day, ordinal, event) for events matching ``filter_options``.
+
+        Segments are visited by day and events in append order (reversed
+        when ``newest_first``); pagination fields of the filter are ignored.
+        A position from a previous run can be passed as ``after`` to resume.
+        """
+        for day, candidates, offsets in self._matching(filter_options, newest_first, after):
+            ordinals = candidates[::-1] if newest_first else candidates
+            for ordinal, event in zip(ordinals, self._read(day, offsets, ordinals)):
+                if matches_filter(event, filter_options):
+                    yield day, ordinal, event
+
+    def iter_events(self, filter_options: Any, newest_first: bool = True) -> Iterator[Any]:
+        """Lazily yield events matching ``filter_options`` (see ``iter_positions``)."""
+        for _, _, event in self.iter_positions(filter_options, newest_first):
+            yield event
+
+    def count(self, filter_options: Any) -> int:
+        """Count matching events, from the index alone when possible."""
+        if _is_index_only(filter_options):
+            return sum(len(candidates) for _, candidates, _ in self._matching(filter_options))
+        return sum(1 for _ in self.iter_events(filter_options))
+
+    def locate(self, event_id: str) -> Optional[Tuple[str, int]]:
+        """(day, ordinal) of an event, searching newest segments first."""
+        for day in reversed(self.segment_days()):
+            with self._lock:
+                ordinal = self._load_index(day).by_id.get(event_id)
+            if ordinal is not None:
+                return day, ordinal
+        return None
+
+    def get(self, event_id: str) -> Optional[Any]:
+        """Find an event by id, newest segments first."""
+        position = self.locate(event_id)
+        if position is None:
+            return None
+        day, ordinal = position
+        with self._lock:
+            offsets = self._load_index(day).offsets
+        return next(self._read(day, offsets, [ordinal]))
+
+    def verify_segment(self, day: str, full: bool = False) -> Dict[str, Any]:
+        """
+        Verify event checksums and chain links of one segment.
+
+        Resumes from the segment's verified checkpoint unless ``full``, so
+        the cost is proportional to events appended since the last run; the
+        link to the previous segment is re-checked from the indexes alone.
+        On success the checkpoint advances to the end of the checked data.
+        Deleted, inserted or reordered events break the chain; edited
+        events fail their checksum.
+        """
+        anchor = self.chain_head_before(day)
+        with self._lock:
+            index = self._load_index(day)
+            size, total, root = index.size, len(index), index.root
+            resume = not full and index.verified_count > 0
+            if resume:
+                count, offset = index.verified_count, index.verified_size
+                previous = index.verified_root or anchor
+            else:
+                count, offset, previous = 0, 0, anchor
+
+        report: Dict[str, Any] = {"day": day, "events": total, "checked": 0, "invalid": [], "chain_breaks": []}
+        breaks = report["chain_breaks"]
+
+        if resume and index.verified_anchor != anchor:
+            breaks.append({"reason": "segment_link_mismatch"})
+
+        segment = self.segment_path(day)
+        actual_size = segment.stat().st_size if segment.exists() else 0
+        if actual_size < size:
+            breaks.append({"reason": "segment_truncated", "expected_size": size, "actual_size": actual_size})
+
+        position = offset
+        if offset <= actual_size:
+            with open(segment, "rb") as f:
+                f.seek(offset)
+                while position < size:
+                    line = f.readline()
+                    if not line:
+                        break
+                    position += len(line)
+                    if not line.strip():
+                        continue
+                    try:
+                        event = self.parse_event(line.decode("utf-8"))
+                    except Exception:
+                        report["invalid"].append({"offset": position - len(line), "reason": "unparseable"})
+                        continue
+
+                    count += 1
+                    report["checked"] += 1
+                    if not event.validate_integrity():
+                        report["invalid"].append({
+                            "id": event.id,
+                            "timestamp": event.timestamp.isoformat(),
+                            "event_type": event.event_type.value
+                        })
+
+                    link = getattr(event, "chain_hash", None)
+                    if link is None:
+                        continue  # Written before hash chaining
+                    if link != chain_hash(previous, event.checksum):
+                        breaks.append({"reason": "chain_mismatch", "id": event.id, "position": count})
+                    previous = link
+
+        if count != total:
+            breaks.append({"reason": "event_count_mismatch", "expected": total, "found": count})
+        if root and previous != root:
+            breaks.append({"reason": "root_mismatch"})
+
+        report["valid"] = not report["invalid"] and not breaks
+        if report["valid"]:
+            with self._lock:
+                index.verified_count = count
+                index.verified_size = position
+                index.verified_root = previous if root else None
+                index.verified_anchor = anchor
+                if index is not self._current:
+                    self._save_index(index)
+        return report
+
+    def statistics(
+        self,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+    ) -> Tuple[Dict[str, Any], Dict[str, int]]:
+        """
+        Aggregate counters for a time range.
+
+        Hours fully inside the range use the stored hourly counters; only
+        events in partially covered edge hours are read from disk.
+
+        Returns:
+            Tuple of (totals, events per hour)
+        """
+        start = _epoch(start_date) if start_date else None
+        end = _epoch(end_date) if end_date else None
+        totals = _new_counters()
+        by_hour: Dict[str, int] = {}
+        edge_hours: List[Tuple[str, float]] = []
+
+        with self._lock:
+            for day in self._days_for_range(start_date, end_date):
+                index = self._load_index(day)
+                for hour, counters in index.hourly.items():
+                    hour_start = datetime.strptime(hour, HOUR_FORMAT).replace(tzinfo=timezone.utc).timestamp()
+                    hour_end = hour_start + 3600
+                    if (start is not None and hour_end <= start) or (end is not None and hour_start > end):
+                        continue
+                    if (start is None or hour_start >= start) and (end is None or hour_end <= end):
+                        merge_counters(totals, counters)
+                        _increment(by_hour, hour, counters["total"])
+                    else:
+                        edge_hours.append((hour, hour_start))
+
+        for hour, hour_start in edge_hours:
+            window = TimeWindow(
+                start_date=datetime.fromtimestamp(max(hour_start, start or hour_start), timezone.utc),
+                end_date=datetime.fromtimestamp(min(hour_start + 3599.999999, end or hour_start + 3600), timezone.utc),
+            )
+            for event in self.iter_events(window, newest_first=False):
+                count_event(totals, event)
+                _increment(by_hour, hour)
+
+        return totals, dict(sorted(by_hour.items()))
+
+
+class _FlushRequest:
+    """Queue marker: write the pending batch now, then resolve ``future``."""
+
+    __slots__ = ("future",)
+
+    def __init__(self, future: asyncio.Future):
+        self.future = future
+
+
+class AuditWriter:
+    """
+    Background group-commit writer for an :class:`AuditSegmentStore`.
+
+    ``submit`` only enqueues, so callers never wait on disk unless the
+    bounded queue is full. A single task drains the queue in batches of up
+    to ``batch_size`` events, waiting at most ``flush_interval`` seconds to
+    fill one, and writes each batch in a worker thread.
+
+    fsync policies: ``"none"`` leaves it to the OS, ``"batch"`` syncs every
+    batch and ``"interval"`` syncs at most every ``fsync_interval`` seconds.
+
+    A failed batch is retried ``max_write_retries`` times with exponential
+    backoff. Events that still fail are kept (up to ``queue_size``) and
+    prepended to the next batch, and flushers waiting on them get the
+    :class:`AuditWriteError`.
+    """
+
+    def __init__(
+        self,
+        store: AuditSegmentStore,
+        queue_size: int = 10000,
+        batch_size: int = 256,
+        flush_interval: float = 0.05,
+        fsync_policy: str = "none",
+        fsync_interval: float = 1.0,
+        max_write_retries: int = 3,
+        retry_backoff: float = 0.05,
+    ):
+        if fsync_policy not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy: {fsync_policy}")
+        self.store = store
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.fsync_policy = fsync_policy
+        self.fsync_interval = fsync_interval
+        self.max_write_retries = max_write_retries
+        self.retry_backoff = retry_backoff
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._space: Optional[asyncio.Event] = None  # Set when the queue drops below queue_size
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._last_sync = time.monotonic()
+        self._unwritten: List[Any] = []  # Events of batches that exhausted their retries
+        self._in_flight: List[Any] = []  # Events taken from the queue but not yet in the store
+
+        self.stats = {
+            "events_written": 0,
+            "batches": 0,
+            "max_batch": 0,
+            "write_errors": 0,
+            "events_dropped": 0,
+        }
+
+    def _ensure_started(self) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._loop is not loop:
+            if self._loop is not loop:
+                # Unbounded so flush markers never wait behind producers;
+                # submit applies the queue_size bound
+                self._queue = asyncio.Queue()
+                self._space = asyncio.Event()
+                self._loop = loop
+            self._task = loop.create_task(self._run())
+        return self._queue
+
+    @property
+    def pending(self) -> int:
+        queued = self._queue.qsize() if self._queue is not None else 0
+        return queued + len(self._unwritten)
+
+    def _pending_events(self) -> List[Any]:
+        queued = list(self._queue._queue) if self._queue is not None else []
+        events = [item for item in queued if not isinstance(item, _FlushRequest)]
+        return self._unwritten + self._in_flight + events
+
+    def count(self, filter_options: Any) -> int:
+        """
+        Count matching events written or still pending, without flushing.
+
+        Holds the store lock so an event being written is counted either in
+        the store's index or as in flight, never both.
+        """
+        with self.store._lock:
+            written = self.store.count(filter_options)
+            pending = sum(1 for event in self._pending_events() if matches_filter(event, filter_options))
+        return written + pending
+
+    async def submit(self, event: Any):
+        """Queue an event; waits only when the queue is full (backpressure)."""
+        queue = self._ensure_started()
+        while queue.qsize() >= self.queue_size:
+            self._space.clear()
+            await self._space.wait()
+        queue.put_nowait(event)
+
+    async def flush(self):
+        """
+        Wait until every event submitted so far is written.
+
+        Only waits for events queued before the call, so it returns under
+        steady traffic too.
+
+        Raises:
+            AuditWriteError: Some of those events could not be written
+        """
+        if self._queue is None or self._loop is not asyncio.get_running_loop():
+            return
+        queue = self._ensure_started()
+        future = self._loop.create_future()
+        await queue.put(_FlushRequest(future))
+        await future
+
+    async def close(self):
+        """Flush pending events and stop the writer task."""
+        try:
+            await self.flush()
+        finally:
+            if self._task is not None:
+                self._task.cancel()
+                try:
+                    await self._task
+                except asyncio.CancelledError:
+                    pass
+                self._task = None
+
+    async def _run(self):
+        queue = self._queue
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await queue.get()
+            batch: List[Any] = []
+            self._in_flight = batch
+            flushes: List[_FlushRequest] = []
+            deadline = loop.time() + self.flush_interval
+
+            while True:
+                if isinstance(item, _FlushRequest):
+                    flushes.append(item)
+                    break  # Write what came before the flush right away
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+
+            self._space.set()
+            error = await self._write(batch)
+            for request in flushes:
+                if request.future.done():
+                    continue
+                if error is None:
+                    request.future.set_result(None)
+                else:
+                    request.future.set_exception(error)
+
+    async def _write(self, batch: List[Any]) -> Optional[AuditWriteError]:
+        """Write earlier unwritten events plus ``batch``; returns the error if some remain unwritten."""
+        events = self._unwritten + batch
+        self._unwritten = []
+        self._in_flight = events
+        if not events:
+            return None
+
+        sync = self.fsync_policy == "batch"
+        if self.fsync_policy == "interval" and time.monotonic() - self._last_sync >= self.fsync_interval:
+            sync = True
+
+        attempt = 0
+        while True:
+            try:
+                await asyncio.to_thread(self._append, events, sync)
+                break
+            except Exception as e:
+                written = e.written if isinstance(e, AuditWriteError) else 0
+                self._record_written(events[:written])
+                events = events[written:]
+                self.stats["write_errors"] += 1
+
+                if attempt >= self.max_write_retries:
+                    self._in_flight = []
+                    self._keep_unwritten(events)
+                    logger.error(
+                        "audit_batch_write_error",
+                        error=str(e),
+                        attempts=attempt + 1,
+                        unwritten=len(self._unwritten)
+                    )
+                    return AuditWriteError(f"{len(events)} audit events not written: {e}")
+
+                logger.warning("audit_batch_write_retry", error=str(e), attempt=attempt + 1)
+                await asyncio.sleep(self.retry_backoff * 2 ** attempt)
+                attempt += 1
+
+        if sync:
+            self._last_sync = time.monotonic()
+        self._record_written(events)
+        return None
+
+    def _append(self, events: List[Any], sync: bool):
+        """Write in the worker thread; written events leave ``_in_flight`` under the store lock."""
+        with self.store._lock:
+            try:
+                self.store.append_many(events, sync)
+            except AuditWriteError as e:
+                self._in_flight = events[e.written:]
+                raise
+            self._in_flight = []
+
+    def _record_written(self, events: List[Any]):
+        if not events:
+            return
+        self.stats["events_written"] += len(events)
+        self.stats["batches"] += 1
+        self.stats["max_batch"] = max(self.stats["max_batch"], len(events))
+
+    def _keep_unwritten(self, events: List[Any]):
+        """Hold failed events for the next batch, bounded by ``queue_size``."""
+        overflow = len(events) - self.queue_size
+        if overflow > 0:
+            self.stats["events_dropped"] += overflow
+            logger.error(
+                "audit_events_dropped",
+                count=overflow,
+                event_ids=[getattr(event, "id", None) for event in events[:overflow]]
+            )
+            events = events[overflow:]
+        self._unwritten = events
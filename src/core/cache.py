@@ -6,11 +6,20 @@ Provides multi-level caching, cache warming, and performance optimization.
 import json
 import hashlib
 import asyncio
+import inspect
+import itertools
+import random
 import time
-from typing import Any, Dict, List, Optional, Union, Callable
-from datetime import datetime, timedelta
+import uuid
+import weakref
+from typing import Any, Awaitable, Dict, List, Optional, Union, Callable
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from enum import Enum
 from functools import wraps
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, is_dataclass
+
+from pydantic import BaseModel
 
 import redis.asyncio as redis
 from redis.asyncio import Redis
@@ -308,20 +317,21 @@ class MultiLevelCache:
         self.cache_stats["misses"] += 1
         return None
     
-    async def set(self, namespace: str, key: str, value: Any):
-        """Set item in multi-level cache."""
+    async def set(self, namespace: str, key: str, value: Any, ttl: Optional[int] = None):
+        """Set item in multi-level cache (``ttl`` overrides the namespace default)."""
         config = CACHE_CONFIGS.get(namespace, CacheConfig(ttl=300))
         cache_key = self._get_cache_key(namespace, key)
+        ttl = ttl or config.ttl
         
         # Store in Redis
         await self.redis_cache.set(
-            cache_key, value, config.ttl, 
+            cache_key, value, ttl, 
             config.compress, config.serialize_method
         )
         
         # Store in memory cache if configured
         if config.max_memory_items > 0:
-            self.memory_cache.set(cache_key, value, min(config.ttl, 300))
+            self.memory_cache.set(cache_key, value, min(ttl, 300))
     
     async def delete(self, namespace: str, key: str):
         """Delete item from multi-level cache."""
@@ -369,39 +379,275 @@ class MultiLevelCache:
 cache = MultiLevelCache()
 
 
+def _canonicalize(value: Any) -> Any:
+    """Reduce a value to JSON-compatible data that is stable across processes."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, BaseModel):
+        return {
+            "__model__": type(value).__name__,
+            "fields": _canonicalize(value.model_dump(mode="json")),
+        }
+    if is_dataclass(value) and not isinstance(value, type):
+        return {"__dataclass__": type(value).__name__, "fields": _canonicalize(asdict(value))}
+    if isinstance(value, Enum):
+        return _canonicalize(value.value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, bytes):
+        return hashlib.sha256(value).hexdigest()
+    if isinstance(value, dict):
+        return {str(k): _canonicalize(v) for k, v in sorted(value.items(), key=lambda kv: str(kv[0]))}
+    if isinstance(value, (set, frozenset)):
+        items = [_canonicalize(v) for v in value]
+        return sorted(items, key=lambda v: json.dumps(v, sort_keys=True))
+    if isinstance(value, (list, tuple)):
+        return [_canonicalize(v) for v in value]
+    return f"{type(value).__qualname__}:{value}"
+
+
 def cache_key_generator(*args, **kwargs) -> str:
     """Generate consistent cache key from arguments."""
     key_data = {
-        "args": args,
-        "kwargs": sorted(kwargs.items())
+        "args": _canonicalize(args),
+        "kwargs": _canonicalize(kwargs)
     }
-    key_string = json.dumps(key_data, sort_keys=True, default=str)
-    return hashlib.md5(key_string.encode()).hexdigest()
+    key_string = json.dumps(key_data, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(key_string.encode()).hexdigest()
+
+
+_PROCESS_TOKEN = uuid.uuid4().hex[:12]
+_receiver_counter = itertools.count()
+_receiver_tokens: "weakref.WeakKeyDictionary[Any, str]" = weakref.WeakKeyDictionary()
+
+
+def receiver_identity(receiver: Any) -> str:
+    """
+    Stable identity of a method receiver for cache keys.
+    
+    Classes are identified by their qualified name. Instances can define a
+    ``cache_identity`` attribute or method (e.g. a tenant or base URL) so that
+    equivalent instances, also across processes, share entries; otherwise each
+    instance gets a token unique to this process and is never shared.
+    """
+    if isinstance(receiver, type):
+        return f"{receiver.__module__}.{receiver.__qualname__}"
+    
+    identity = getattr(receiver, "cache_identity", None)
+    if identity is not None:
+        return str(identity() if callable(identity) else identity)
+    
+    try:
+        token = _receiver_tokens.get(receiver)
+        if token is None:
+            token = _receiver_tokens[receiver] = f"{_PROCESS_TOKEN}:{next(_receiver_counter)}"
+    except TypeError:
+        # Unhashable or not weak-referenceable receivers fall back to id()
+        token = f"{_PROCESS_TOKEN}:id{id(receiver)}"
+    return f"{type(receiver).__qualname__}@{token}"
+
+
+def function_cache_key(func: Callable, args: tuple, kwargs: dict,
+                       ignore_receiver: bool = False) -> str:
+    """
+    Derive a cache key for a call to ``func``.
+    
+    Arguments are bound to the signature with defaults applied, so ``f(1)``
+    and ``f(x=1)`` share a key. A leading ``self``/``cls`` is keyed by
+    ``receiver_identity``, so different instances don't share entries, unless
+    ``ignore_receiver`` is set for methods whose result doesn't depend on the
+    instance. Pydantic models (e.g. ``TransparencyAPIFilter``) are keyed by
+    their field values rather than their ``repr``.
+    """
+    try:
+        bound = inspect.signature(func).bind(*args, **kwargs)
+        bound.apply_defaults()
+        arguments = dict(bound.arguments)
+        first = next(iter(inspect.signature(func).parameters), None)
+        if first in ("self", "cls") and first in arguments:
+            receiver = arguments.pop(first)
+            if not ignore_receiver:
+                arguments["__receiver__"] = receiver_identity(receiver)
+    except (TypeError, ValueError):
+        arguments = {"args": args, "kwargs": kwargs}
+    
+    return cache_key_generator(f"{func.__module__}.{func.__qualname__}", **arguments)
+
+
+class SingleFlight:
+    """Coalesce concurrent computations of the same key into a single call."""
+    
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.coalesced = 0
+    
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Run ``func`` unless a call for ``key`` is already in flight, then share its result."""
+        while key in self._inflight:
+            future = self._inflight[key]
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # The leader was cancelled: retry and possibly lead ourselves
+                if future.cancelled():
+                    continue
+                raise
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved when nobody was waiting
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._inflight.pop(key, None)
 
 
-def cached(namespace: str, ttl: Optional[int] = None, 
-          key_generator: Optional[Callable] = None):
-    """Decorator for caching function results."""
+class NamespacedCacheBackend:
+    """Expose a ``MultiLevelCache`` namespace as a flat key/value backend."""
+    
+    def __init__(self, cache_instance: "MultiLevelCache", namespace: str):
+        self.cache = cache_instance
+        self.namespace = namespace
+    
+    async def get(self, key: str) -> Optional[Any]:
+        return await self.cache.get(self.namespace, key)
+    
+    async def set(self, key: str, value: Any, ttl: int):
+        await self.cache.set(self.namespace, key, value, ttl=ttl)
+
+
+NEGATIVE_CACHE_MARKER = "__cidadao_ai_negative__"
+
+
+def jittered_ttl(ttl: int, jitter: float) -> int:
+    """Spread TTLs downwards by up to ``jitter`` so entries don't expire together."""
+    if jitter <= 0:
+        return ttl
+    return max(1, int(ttl * random.uniform(1.0 - jitter, 1.0)))
+
+
+def cache_aside(backend: Optional[Any] = None,
+                ttl: int = 300,
+                *,
+                backend_factory: Optional[Callable[[], Awaitable[Any]]] = None,
+                key_prefix: str = "",
+                key_generator: Optional[Callable] = None,
+                negative_ttl: Optional[int] = 60,
+                is_negative: Callable[[Any], bool] = lambda result: result is None,
+                ttl_jitter: float = 0.1,
+                single_flight: bool = True,
+                ignore_receiver: bool = False):
+    """
+    Cache-aside decorator for async functions.
+    
+    On a miss only one of N concurrent callers with the same key computes the
+    value (single-flight); the others await its result. Results for which
+    ``is_negative`` holds ("not found") are cached for ``negative_ttl``
+    seconds, or not at all when it is None. TTLs are jittered to avoid
+    synchronized expiry.
+    
+    Args:
+        backend: Object with ``async get(key)`` and ``async set(key, value, ttl)``
+        ttl: Base TTL in seconds for positive results
+        backend_factory: Async callable returning the backend, resolved per call
+        key_prefix: Prefix for generated keys
+        key_generator: Custom ``(*args, **kwargs) -> str`` key builder
+        negative_ttl: TTL for negative results (None disables negative caching)
+        is_negative: Predicate identifying negative results
+        ttl_jitter: Fraction by which TTLs are randomly shortened
+        single_flight: Coalesce concurrent misses for the same key
+        ignore_receiver: Share entries across instances for methods whose
+            result doesn't depend on ``self`` (see ``function_cache_key``)
+    """
+    if backend is None and backend_factory is None:
+        raise ValueError("cache_aside requires a backend or a backend_factory")
     
     def decorator(func):
+        if not asyncio.iscoroutinefunction(func):
+            raise TypeError("cache_aside only supports async functions")
+        
+        flight = SingleFlight()
+        
+        async def resolve_backend():
+            return backend if backend is not None else await backend_factory()
+        
+        async def compute(cache_backend, cache_key, args, kwargs):
+            result = await func(*args, **kwargs)
+            try:
+                if is_negative(result):
+                    if negative_ttl:
+                        await cache_backend.set(
+                            cache_key,
+                            {NEGATIVE_CACHE_MARKER: True, "value": result},
+                            jittered_ttl(negative_ttl, ttl_jitter)
+                        )
+                else:
+                    await cache_backend.set(cache_key, result, jittered_ttl(ttl, ttl_jitter))
+            except Exception as e:
+                logger.error(f"Cache set error for key {cache_key}: {e}")
+            return result
+        
         @wraps(func)
-        async def async_wrapper(*args, **kwargs):
-            # Generate cache key
+        async def wrapper(*args, **kwargs):
             if key_generator:
                 cache_key = key_generator(*args, **kwargs)
             else:
-                cache_key = cache_key_generator(func.__name__, *args, **kwargs)
+                cache_key = function_cache_key(func, args, kwargs, ignore_receiver)
+            if key_prefix:
+                cache_key = f"{key_prefix}:{cache_key}"
             
-            # Try to get from cache
-            result = await cache.get(namespace, cache_key)
-            if result is not None:
-                return result
+            cache_backend = await resolve_backend()
             
-            # Execute function and cache result
-            result = await func(*args, **kwargs)
-            await cache.set(namespace, cache_key, result)
+            try:
+                cached_value = await cache_backend.get(cache_key)
+            except Exception as e:
+                logger.error(f"Cache get error for key {cache_key}: {e}")
+                cached_value = None
             
-            return result
+            if cached_value is not None:
+                if isinstance(cached_value, dict) and cached_value.get(NEGATIVE_CACHE_MARKER):
+                    return cached_value.get("value")
+                return cached_value
+            
+            if not single_flight:
+                return await compute(cache_backend, cache_key, args, kwargs)
+            
+            return await flight.do(
+                cache_key, lambda: compute(cache_backend, cache_key, args, kwargs)
+            )
+        
+        wrapper.single_flight = flight
+        return wrapper
+    
+    return decorator
+
+
+def cached(namespace: str, ttl: Optional[int] = None, 
+          key_generator: Optional[Callable] = None,
+          negative_ttl: Optional[int] = 60):
+    """Decorator for caching function results."""
+    
+    def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+            config = CACHE_CONFIGS.get(namespace, CacheConfig(ttl=300))
+            return cache_aside(
+                NamespacedCacheBackend(cache, namespace),
+                ttl=ttl or config.ttl,
+                key_generator=key_generator,
+                negative_ttl=negative_ttl
+            )(func)
         
         @wraps(func)
         def sync_wrapper(*args, **kwargs):
@@ -417,7 +663,7 @@ def cached(namespace: str, ttl: Optional[int] = None,
             
             return result
         
-        return async_wrapper if asyncio.iscoroutinefunction(func) else sync_wrapper
+        return sync_wrapper
     
     return decorator
 
@@ -122,6 +122,12 @@ class Settings(BaseSettings):
         description="Vector index path"
     )
     
+    # Local columnar warehouse (populated with `cidadao ingest`)
+    transparency_warehouse_path: Optional[Path] = Field(
+        default=None,
+        description="Warehouse root; when set, agents query it before the Transparency API"
+    )
+    
     # ChromaDB
     chroma_persist_directory: Path = Field(
         default=Path("./chroma_db"),
@@ -207,6 +213,11 @@ class Settings(BaseSettings):
     audit_log_rotation: str = Field(default="daily", description="Log rotation")
     audit_log_retention_days: int = Field(default=90, description="Log retention days")
     audit_hash_algorithm: str = Field(default="sha256", description="Hash algorithm")
+    audit_writer_queue_size: int = Field(default=10000, description="Pending audit events before log_event waits")
+    audit_writer_batch_size: int = Field(default=256, description="Max audit events per group commit")
+    audit_writer_flush_interval_ms: int = Field(default=50, description="Max wait to fill an audit batch")
+    audit_fsync_policy: str = Field(default="none", description="Audit fsync policy: none, batch or interval")
+    audit_fsync_interval_seconds: float = Field(default=1.0, description="fsync period for the interval policy")
     
     # Models API Configuration
     models_api_enabled: bool = Field(default=True, description="Enable models API")
@@ -231,6 +242,36 @@ class Settings(BaseSettings):
     cache_ttl_seconds: int = Field(default=3600, description="Cache TTL")
     cache_max_size: int = Field(default=1000, description="Max cache size")
     
+    # CPU-bound agent work
+    cpu_process_pool_enabled: bool = Field(
+        default=False,
+        description="Run CPU-heavy detectors (spectral, duplicates) in a process pool"
+    )
+    cpu_process_pool_workers: int = Field(default=2, description="Process pool size")
+    cpu_process_max_tasks_per_child: int = Field(
+        default=100,
+        description="Recycle pool processes after this many tasks"
+    )
+    cpu_process_shared_memory_min_bytes: int = Field(
+        default=1024 * 1024,
+        description="NumPy results at least this large are returned via shared memory"
+    )
+    
+    # Investigation profiling
+    profiling_max_profiles: int = Field(default=256, description="Investigation profiles kept in memory")
+    profiling_trace_allocations: bool = Field(
+        default=False,
+        description="Start tracemalloc so profile spans report allocated bytes"
+    )
+    sampling_profiler_max_duration: float = Field(
+        default=60.0,
+        description="Longest capture accepted by the sampling profiler endpoint (seconds)"
+    )
+    sampling_profiler_max_rate: int = Field(
+        default=250,
+        description="Highest sampling rate accepted by the sampling profiler endpoint (Hz)"
+    )
+    
     # Feature Flags
     enable_fine_tuning: bool = Field(default=False, description="Enable fine-tuning")
     enable_autonomous_crawling: bool = Field(default=False, description="Enable crawling")
@@ -0,0 +1,369 @@
+"""
+Module: core.histogram
+Description: Fixed-memory log-bucketed latency histograms with mergeable snapshots
+Author: Anderson H. Silva
+Date: 2025-01-15
+License: Proprietary - All rights reserved
+"""
+
+import math
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    from prometheus_client.core import GaugeMetricFamily, HistogramMetricFamily
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+
+DEFAULT_EXPORT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0
+)
+DEFAULT_EXPORT_QUANTILES = (0.5, 0.95, 0.99)
+
+
+def _sub_bucket_bits(significant_digits: int) -> int:
+    """Bits of linear sub-buckets per power of two for the requested precision."""
+    return max(1, math.ceil(math.log2(2 * 10 ** significant_digits)))
+
+
+def bucket_index(ticks: int, bits: int) -> int:
+    """
+    Map a non-negative integer value to its bucket.
+
+    Values below ``2**bits`` get one bucket each. Above that, every power of
+    two is split into ``2**(bits-1)`` linear sub-buckets, so the relative
+    error stays below ``2**-(bits-1)`` at any magnitude.
+    """
+    sub_count = 1 << bits
+    if ticks < sub_count:
+        return ticks
+    shift = ticks.bit_length() - bits
+    half = sub_count >> 1
+    return sub_count + (shift - 1) * half + (ticks >> shift) - half
+
+
+def bucket_upper(index: int, bits: int) -> int:
+    """Highest integer value that maps to ``index``."""
+    sub_count = 1 << bits
+    if index < sub_count:
+        return index
+    half = sub_count >> 1
+    shift, offset = divmod(index - sub_count, half)
+    shift += 1
+    return ((offset + half + 1) << shift) - 1
+
+
+@dataclass
+class HistogramSnapshot:
+    """
+    Point-in-time, sparse copy of a histogram.
+
+    Snapshots from histograms with the same resolution can be merged (e.g.
+    across workers) or subtracted (to get the activity between two points
+    in time), and round-trip through plain dicts for transport.
+    """
+
+    unit: float
+    bits: int
+    counts: Dict[int, int] = field(default_factory=dict)
+    total: int = 0
+    sum: float = 0.0
+    min: float = math.inf
+    max: float = 0.0
+
+    def _check_compatible(self, other: "HistogramSnapshot"):
+        if (self.unit, self.bits) != (other.unit, other.bits):
+            raise ValueError("Histogram snapshots have different resolutions")
+
+    def merge(self, other: "HistogramSnapshot") -> "HistogramSnapshot":
+        """Return the combined distribution of both snapshots."""
+        self._check_compatible(other)
+        counts = dict(self.counts)
+        for index, count in other.counts.items():
+            counts[index] = counts.get(index, 0) + count
+        return HistogramSnapshot(
+            unit=self.unit,
+            bits=self.bits,
+            counts=counts,
+            total=self.total + other.total,
+            sum=self.sum + other.sum,
+            min=min(self.min, other.min),
+            max=max(self.max, other.max),
+        )
+
+    def subtract(self, earlier: "HistogramSnapshot") -> "HistogramSnapshot":
+        """
+        Return what was recorded after ``earlier`` (a snapshot of the same
+        histogram). Min/max stay the lifetime extremes and only bound the result.
+        """
+        self._check_compatible(earlier)
+        counts = {}
+        for index, count in self.counts.items():
+            remaining = count - earlier.counts.get(index, 0)
+            if remaining > 0:
+                counts[index] = remaining
+        total = sum(counts.values())
+        return HistogramSnapshot(
+            unit=self.unit,
+            bits=self.bits,
+            counts=counts,
+            total=total,
+            sum=self.sum - earlier.sum if total else 0.0,
+            min=self.min if total else math.inf,
+            max=self.max if total else 0.0,
+        )
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.total if self.total else 0.0
+
+    def quantile(self, q: float) -> float:
+        """Value at quantile ``q`` (0..1), within the histogram's precision."""
+        if not self.total:
+            return 0.0
+        rank = max(1, math.ceil(q * self.total))
+        cumulative = 0
+        for index in sorted(self.counts):
+            cumulative += self.counts[index]
+            if cumulative >= rank:
+                value = bucket_upper(index, self.bits) * self.unit
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def quantiles(self, qs: Iterable[float]) -> Dict[float, float]:
+        """Several quantiles in a single pass over the buckets."""
+        wanted = sorted(qs)
+        result = {q: 0.0 for q in wanted}
+        if not self.total:
+            return result
+        ranks = [(max(1, math.ceil(q * self.total)), q) for q in wanted]
+        cumulative = 0
+        position = 0
+        for index in sorted(self.counts):
+            cumulative += self.counts[index]
+            while position < len(ranks) and cumulative >= ranks[position][0]:
+                value = bucket_upper(index, self.bits) * self.unit
+                result[ranks[position][1]] = min(max(value, self.min), self.max)
+                position += 1
+            if position == len(ranks):
+                break
+        return result
+
+    def cumulative_counts(self, bounds: Sequence[float]) -> List[int]:
+        """Observations at or below each bound (Prometheus ``le`` semantics)."""
+        edges = sorted((bucket_upper(i, self.bits) * self.unit, c) for i, c in self.counts.items())
+        result = []
+        cumulative = 0
+        position = 0
+        for bound in bounds:
+            while position < len(edges) and edges[position][0] <= bound:
+                cumulative += edges[position][1]
+                position += 1
+            result.append(cumulative)
+        return result
+
+    def to_dict(self) -> Dict:
+        return {
+            "unit": self.unit,
+            "bits": self.bits,
+            "counts": {str(i): c for i, c in self.counts.items()},
+            "total": self.total,
+            "sum": self.sum,
+            "min": self.min if self.total else None,
+            "max": self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "HistogramSnapshot":
+        return cls(
+            unit=data["unit"],
+            bits=data["bits"],
+            counts={int(i): c for i, c in data["counts"].items()},
+            total=data["total"],
+            sum=data["sum"],
+            min=math.inf if data["min"] is None else data["min"],
+            max=data["max"],
+        )
+
+
+class LatencyHistogram:
+    """
+    HDR-style histogram of durations in seconds.
+
+    Memory is fixed at construction (one counter per bucket between
+    ``lowest`` and ``highest``), recording is O(1) integer arithmetic with
+    no locks, and quantiles are answered for any ``q`` from the counts.
+    Values above ``highest`` are clamped to it. Meant to be written from a
+    single thread (the event loop); other threads or processes keep their
+    own instance and merge snapshots.
+    """
+
+    def __init__(self, lowest: float = 1e-6, highest: float = 3600.0, significant_digits: int = 2):
+        if lowest <= 0 or highest <= lowest:
+            raise ValueError("Histogram needs 0 < lowest < highest")
+        self.unit = lowest
+        self.bits = _sub_bucket_bits(significant_digits)
+        self._max_ticks = int(highest / lowest)
+        self._counts = [0] * (bucket_index(self._max_ticks, self.bits) + 1)
+        self.reset()
+
+    def reset(self):
+        for i in range(len(self._counts)):
+            self._counts[i] = 0
+        self.total = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def record(self, seconds: float, count: int = 1):
+        ticks = int(seconds / self.unit) if seconds > 0 else 0
+        if ticks > self._max_ticks:
+            ticks = self._max_ticks
+        self._counts[bucket_index(ticks, self.bits)] += count
+        self.total += count
+        self.sum += seconds * count
+        if seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def snapshot(self) -> HistogramSnapshot:
+        return HistogramSnapshot(
+            unit=self.unit,
+            bits=self.bits,
+            counts={i: c for i, c in enumerate(self._counts) if c},
+            total=self.total,
+            sum=self.sum,
+            min=self.min,
+            max=self.max,
+        )
+
+    def merge(self, snapshot: HistogramSnapshot):
+        """Add a compatible snapshot (e.g. from another worker) into this histogram."""
+        if (snapshot.unit, snapshot.bits) != (self.unit, self.bits):
+            raise ValueError("Histogram snapshots have different resolutions")
+        last = len(self._counts) - 1
+        for index, count in snapshot.counts.items():
+            self._counts[min(index, last)] += count
+        self.total += snapshot.total
+        self.sum += snapshot.sum
+        self.min = min(self.min, snapshot.min)
+        self.max = max(self.max, snapshot.max)
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.total if self.total else 0.0
+
+    def quantile(self, q: float) -> float:
+        return self.snapshot().quantile(q)
+
+    def __len__(self) -> int:
+        return self.total
+
+
+class HistogramFamily:
+    """
+    One ``LatencyHistogram`` per key (endpoint, model, ...).
+
+    At most ``max_keys`` keys get their own histogram so that unbounded label
+    values (raw paths with ids) cannot grow memory; later keys are folded
+    into ``overflow_key``.
+    """
+
+    def __init__(self, max_keys: int = 256, overflow_key: str = "other", **histogram_kwargs):
+        self.max_keys = max_keys
+        self.overflow_key = overflow_key
+        self.histogram_kwargs = histogram_kwargs
+        self._histograms: Dict[str, LatencyHistogram] = {}
+
+    def get(self, key: str) -> LatencyHistogram:
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            if len(self._histograms) >= self.max_keys:
+                key = self.overflow_key
+                histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = LatencyHistogram(**self.histogram_kwargs)
+        return histogram
+
+    def record(self, key: str, seconds: float):
+        self.get(key).record(seconds)
+
+    def keys(self) -> List[str]:
+        return list(self._histograms)
+
+    def items(self) -> Iterator[Tuple[str, LatencyHistogram]]:
+        return iter(list(self._histograms.items()))
+
+    @property
+    def total(self) -> int:
+        return sum(h.total for h in self._histograms.values())
+
+    def snapshot(self, key: Optional[str] = None) -> HistogramSnapshot:
+        """Snapshot of one key, or of all keys merged when ``key`` is None."""
+        if key is not None:
+            histogram = self._histograms.get(key)
+            return histogram.snapshot() if histogram else self.empty_snapshot()
+        merged = self.empty_snapshot()
+        for histogram in list(self._histograms.values()):
+            merged = merged.merge(histogram.snapshot())
+        return merged
+
+    def snapshots(self) -> Dict[str, HistogramSnapshot]:
+        return {key: histogram.snapshot() for key, histogram in self.items()}
+
+    def empty_snapshot(self) -> HistogramSnapshot:
+        lowest = self.histogram_kwargs.get("lowest", 1e-6)
+        digits = self.histogram_kwargs.get("significant_digits", 2)
+        return HistogramSnapshot(unit=lowest, bits=_sub_bucket_bits(digits))
+
+
+class HistogramCollector:
+    """
+    Prometheus collector exporting a ``HistogramFamily``.
+
+    Each key becomes a label value. The histogram is exported with the given
+    ``le`` bounds (aggregatable across instances) plus a ``<name>_quantile``
+    gauge with the exact quantiles from the log buckets.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        family: HistogramFamily,
+        label: str = "endpoint",
+        buckets: Sequence[float] = DEFAULT_EXPORT_BUCKETS,
+        quantiles: Sequence[float] = DEFAULT_EXPORT_QUANTILES,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.family = family
+        self.label = label
+        self.buckets = tuple(buckets)
+        self.quantiles = tuple(quantiles)
+
+    def describe(self):
+        return []
+
+    def collect(self):
+        if not PROMETHEUS_AVAILABLE:
+            return
+        histogram = HistogramMetricFamily(self.name, self.documentation, labels=[self.label])
+        quantiles = GaugeMetricFamily(
+            f"{self.name}_quantile",
+            f"{self.documentation} (quantiles)",
+            labels=[self.label, "quantile"],
+        )
+        for key, snapshot in self.family.snapshots().items():
+            cumulative = snapshot.cumulative_counts(self.buckets)
+            buckets = [(str(bound), float(count)) for bound, count in zip(self.buckets, cumulative)]
+            buckets.append(("+Inf", float(snapshot.total)))
+            histogram.add_metric([key], buckets, snapshot.sum)
+            for q, value in snapshot.quantiles(self.quantiles).items():
+                quantiles.add_metric([key, str(q)], value)
+        yield histogram
+        yield quantiles
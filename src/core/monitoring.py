@@ -12,7 +12,7 @@ from collections import defaultdict, deque
 from contextlib import asynccontextmanager
 import logging
 
-from prometheus_client import Counter, Histogram, Gauge, generate_latest, CONTENT_TYPE_LATEST
+from prometheus_client import Counter, Histogram, Gauge, generate_latest, CONTENT_TYPE_LATEST, REGISTRY
 from opentelemetry import trace, baggage
 from opentelemetry.exporter.jaeger.thrift import JaegerExporter
 from opentelemetry.sdk.trace import TracerProvider
@@ -23,6 +23,7 @@ from opentelemetry.instrumentation.redis import RedisInstrumentor
 
 from src.core.config import get_settings
 from src.core import get_logger
+from src.core.histogram import HistogramCollector, HistogramFamily, HistogramSnapshot
 
 logger = get_logger(__name__)
 settings = get_settings()
@@ -101,37 +102,76 @@ ACTIVE_CONNECTIONS = Gauge(
 
 
 class PerformanceMetrics:
-    """System performance metrics collector."""
+    """
+    System performance metrics collector.
     
-    def __init__(self):
-        self.response_times = deque(maxlen=1000)
+    Latencies go into per-endpoint log-bucketed histograms (fixed memory,
+    O(1) record). Quantiles and averages cover a sliding window of
+    ``window_seconds`` to ``2 * window_seconds``, obtained by subtracting
+    the cumulative snapshot taken at the start of the window.
+    
+    Like the histograms, request and error counts keep at most
+    ``max_endpoints`` endpoints; later ones are counted under
+    ``overflow_key``.
+    """
+    
+    def __init__(self, window_seconds: float = 300.0, max_endpoints: int = 256, overflow_key: str = "other"):
+        self.latency = HistogramFamily(max_keys=max_endpoints, overflow_key=overflow_key)
+        self.max_endpoints = max_endpoints
+        self.overflow_key = overflow_key
+        self.request_counts = defaultdict(int)
         self.error_rates = defaultdict(int)
         self.throughput_counter = 0
         self.last_throughput_reset = time.time()
+        self.window_seconds = window_seconds
+        self._window_marks = deque([(time.time(), {})], maxlen=2)
+    
+    def _endpoint_key(self, endpoint: str) -> str:
+        if endpoint in self.request_counts or len(self.request_counts) < self.max_endpoints:
+            return endpoint
+        return self.overflow_key
     
     def record_request(self, duration: float, status_code: int, endpoint: str):
         """Record request metrics."""
-        self.response_times.append(duration)
+        endpoint = self._endpoint_key(endpoint)
+        self.latency.record(endpoint, duration)
+        self.request_counts[endpoint] += 1
         
         if status_code >= 400:
             self.error_rates[endpoint] += 1
         
         self.throughput_counter += 1
     
+    def observe_request(self, duration: float, endpoint: str, status_code: int):
+        """Request observer for ``LoggingMiddleware`` (its argument order)."""
+        self.record_request(duration, status_code, endpoint)
+    
+    def recent_snapshot(self, endpoint: Optional[str] = None) -> HistogramSnapshot:
+        """Latency distribution over the recent window, overall or for one endpoint."""
+        now = time.time()
+        if now - self._window_marks[-1][0] >= self.window_seconds:
+            self._window_marks.append((now, self.latency.snapshots()))
+        window_start = self._window_marks[0][1]
+        
+        keys = [endpoint] if endpoint is not None else self.latency.keys()
+        recent = self.latency.empty_snapshot()
+        for key in keys:
+            current = self.latency.snapshot(key)
+            earlier = window_start.get(key)
+            recent = recent.merge(current.subtract(earlier) if earlier else current)
+        return recent
+    
     def get_avg_response_time(self) -> float:
         """Get average response time."""
-        if not self.response_times:
-            return 0.0
-        return sum(self.response_times) / len(self.response_times)
+        return self.recent_snapshot().mean
+    
+    def get_response_time_quantile(self, q: float, endpoint: Optional[str] = None) -> float:
+        """Get any response time quantile (0..1)."""
+        return self.recent_snapshot(endpoint).quantile(q)
     
     def get_p95_response_time(self) -> float:
         """Get 95th percentile response time."""
-        if not self.response_times:
-            return 0.0
-        
-        sorted_times = sorted(self.response_times)
-        index = int(0.95 * len(sorted_times))
-        return sorted_times[min(index, len(sorted_times) - 1)]
+        return self.get_response_time_quantile(0.95)
     
     def get_throughput(self) -> float:
         """Get requests per second."""
@@ -143,12 +183,10 @@ class PerformanceMetrics:
     def get_error_rate(self, endpoint: str = None) -> float:
         """Get error rate for endpoint or overall."""
         if endpoint:
-            total_requests = sum(1 for _ in self.response_times)  # Approximate
-            errors = self.error_rates.get(endpoint, 0)
-            return errors / max(total_requests, 1)
+            return self.error_rates.get(endpoint, 0) / max(self.request_counts.get(endpoint, 0), 1)
         
         total_errors = sum(self.error_rates.values())
-        total_requests = sum(1 for _ in self.response_times)
+        total_requests = sum(self.request_counts.values())
         return total_errors / max(total_requests, 1)
     
     def reset_throughput_counter(self):
@@ -488,11 +526,30 @@ class AlertManager:
 
 # Global instances
 performance_metrics = PerformanceMetrics()
+REGISTRY.register(HistogramCollector(
+    'cidadao_ai_request_latency_seconds',
+    'Request latency in seconds (log-bucketed)',
+    performance_metrics.latency,
+    label='endpoint'
+))
 health_monitor = SystemHealthMonitor()
 distributed_tracing = DistributedTracing()
 alert_manager = AlertManager()
 
 
+def _register_request_observer():
+    """Feed ``performance_metrics`` with every request seen by LoggingMiddleware."""
+    try:
+        from src.api.middleware.logging_middleware import add_request_observer
+    except ImportError as e:
+        logger.warning("request_observer_unavailable", error=str(e))
+        return
+    add_request_observer(performance_metrics.observe_request)
+
+
+_register_request_observer()
+
+
 def get_metrics_data() -> str:
     """Get Prometheus metrics data."""
     return generate_latest()
@@ -0,0 +1,277 @@
+"""
+Module: core.profiling
+Description: Hierarchical per-investigation timing and resource profiling
+Author: Anderson H. Silva
+Date: 2025-01-15
+License: Proprietary - All rights reserved
+"""
+
+import asyncio
+import time
+import tracemalloc
+import weakref
+from collections import OrderedDict, defaultdict
+from contextlib import AsyncExitStack, asynccontextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from enum import Enum
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from src.core import get_logger, settings
+
+
+logger = get_logger(__name__)
+
+
+def _plain(value: Any) -> Any:
+    """JSON- and tracing-friendly attribute value."""
+    if isinstance(value, Enum):
+        value = value.value
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+class ProfileSpan:
+    """
+    One timed stage of an investigation.
+
+    Records wall time, thread CPU time, traced memory growth (only while
+    ``tracemalloc`` is tracing) and external-call counts. CPU and memory are
+    measured on the event loop thread, so stages that interleave with other
+    tasks also absorb some of their cost.
+    """
+
+    __slots__ = (
+        "name", "attributes", "children", "calls", "started_at",
+        "_wall_start", "_cpu_start", "_mem_start",
+        "wall_ms", "cpu_ms", "allocated_bytes", "error",
+    )
+
+    def __init__(self, name: str, attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.attributes = {key: _plain(value) for key, value in (attributes or {}).items()}
+        self.children: List["ProfileSpan"] = []
+        self.calls: Dict[str, int] = defaultdict(int)
+        self.started_at = datetime.utcnow()
+        self.wall_ms: Optional[float] = None
+        self.cpu_ms: Optional[float] = None
+        self.allocated_bytes: Optional[int] = None
+        self.error: Optional[str] = None
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.thread_time()
+        self._mem_start = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+
+    def finish(self, error: Optional[BaseException] = None):
+        self.wall_ms = (time.perf_counter() - self._wall_start) * 1000
+        self.cpu_ms = (time.thread_time() - self._cpu_start) * 1000
+        if self._mem_start is not None and tracemalloc.is_tracing():
+            self.allocated_bytes = max(0, tracemalloc.get_traced_memory()[0] - self._mem_start)
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+
+    @property
+    def finished(self) -> bool:
+        return self.wall_ms is not None
+
+    def total_calls(self) -> Dict[str, int]:
+        """External calls made by this span and all of its descendants."""
+        totals = defaultdict(int, self.calls)
+        for child in self.children:
+            for kind, count in child.total_calls().items():
+                totals[kind] += count
+        return dict(totals)
+
+    def to_dict(self) -> Dict[str, Any]:
+        wall_ms = self.wall_ms
+        if wall_ms is None:
+            wall_ms = (time.perf_counter() - self._wall_start) * 1000
+        children_wall = sum(c.wall_ms or 0.0 for c in self.children)
+        return {
+            "name": self.name,
+            "attributes": self.attributes,
+            "started_at": self.started_at.isoformat(),
+            "finished": self.finished,
+            "wall_ms": round(wall_ms, 3),
+            # Concurrent children can overlap, so self time is clamped at zero
+            "self_wall_ms": round(max(0.0, wall_ms - children_wall), 3),
+            "cpu_ms": None if self.cpu_ms is None else round(self.cpu_ms, 3),
+            "allocated_bytes": self.allocated_bytes,
+            "calls": dict(self.calls),
+            "total_calls": self.total_calls(),
+            "error": self.error,
+            "children": [child.to_dict() for child in self.children],
+        }
+
+
+_current_span: ContextVar[Optional[ProfileSpan]] = ContextVar("profile_span", default=None)
+_current_investigation: ContextVar[Optional[str]] = ContextVar("profile_investigation", default=None)
+
+# Optional factory (name, attributes) -> async context manager yielding a
+# tracing span; set by the observability layer once tracing is configured.
+_span_exporter: Optional[Callable[[str, Dict[str, Any]], Any]] = None
+
+
+def set_span_exporter(exporter: Optional[Callable[[str, Dict[str, Any]], Any]]) -> None:
+    """Mirror every profile span as a tracing span through ``exporter``."""
+    global _span_exporter
+    _span_exporter = exporter
+
+
+class ProfileRegistry:
+    """Most recent investigation profiles, bounded by count."""
+
+    def __init__(self, max_profiles: int = 256):
+        self.max_profiles = max_profiles
+        self._profiles: "OrderedDict[str, ProfileSpan]" = OrderedDict()
+
+    def add(self, investigation_id: str, root: ProfileSpan):
+        self._profiles[investigation_id] = root
+        self._profiles.move_to_end(investigation_id)
+        while len(self._profiles) > self.max_profiles:
+            self._profiles.popitem(last=False)
+
+    def get(self, investigation_id: str) -> Optional[ProfileSpan]:
+        return self._profiles.get(investigation_id)
+
+    def __contains__(self, investigation_id: str) -> bool:
+        return investigation_id in self._profiles
+
+    def __len__(self) -> int:
+        return len(self._profiles)
+
+
+profile_registry = ProfileRegistry(settings.profiling_max_profiles)
+
+
+# Task -> (investigation_id, agent) so that samplers on other threads, which
+# cannot read a task's context variables, can attribute what it is running.
+_task_tags: "weakref.WeakKeyDictionary[asyncio.Task, Tuple[Optional[str], Optional[str]]]" = weakref.WeakKeyDictionary()
+
+
+def task_tag(task: Optional["asyncio.Task"]) -> Optional[Tuple[Optional[str], Optional[str]]]:
+    """(investigation_id, agent) last activated by ``task``, if any."""
+    if task is None:
+        return None
+    try:
+        return _task_tags.get(task)
+    except TypeError:
+        return None
+
+
+def _tag_current_task(span: ProfileSpan):
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        return None, None
+    if task is None:
+        return None, None
+    previous = _task_tags.get(task)
+    agent = span.name[len("agent."):] if span.name.startswith("agent.") else (previous or (None, None))[1]
+    _task_tags[task] = (_current_investigation.get(), agent)
+    return task, previous
+
+
+def current_investigation_id() -> Optional[str]:
+    """Investigation whose profile the running task is feeding, if any."""
+    return _current_investigation.get()
+
+
+def record_external_call(kind: str, count: int = 1) -> None:
+    """Count an outbound call (HTTP API, LLM, database) on the current span."""
+    span = _current_span.get()
+    if span is not None:
+        span.calls[kind] += count
+
+
+def _export_attributes(trace_span, span: ProfileSpan):
+    if trace_span is None or not hasattr(trace_span, "set_attribute"):
+        return
+    trace_span.set_attribute("profile.wall_ms", span.wall_ms)
+    trace_span.set_attribute("profile.cpu_ms", span.cpu_ms)
+    if span.allocated_bytes is not None:
+        trace_span.set_attribute("profile.allocated_bytes", span.allocated_bytes)
+    for kind, count in span.calls.items():
+        trace_span.set_attribute(f"profile.calls.{kind}", count)
+
+
+@asynccontextmanager
+async def profile_span(name: str, **attributes) -> AsyncIterator[Optional[ProfileSpan]]:
+    """
+    Time a stage as a child of the current span.
+
+    A no-op (yielding None) when no investigation profile is active, so it
+    can wrap agent code unconditionally.
+    """
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+
+    span = ProfileSpan(name, attributes)
+    parent.children.append(span)
+    async with _activate(span) as active:
+        yield active
+
+
+@asynccontextmanager
+async def profile_investigation(investigation_id: str, name: str = "investigation", **attributes) -> AsyncIterator[ProfileSpan]:
+    """
+    Root profile for an investigation.
+
+    Registers a new tree under ``investigation_id`` unless a profile is
+    already active in this context, in which case it nests as a regular span
+    (e.g. an agent invoked from the API task or from the master agent).
+    """
+    if _current_span.get() is not None:
+        if investigation_id != _current_investigation.get():
+            attributes["investigation_id"] = investigation_id
+        async with profile_span(name, **attributes) as span:
+            yield span
+        return
+
+    root = ProfileSpan(name, {"investigation_id": investigation_id, **attributes})
+    profile_registry.add(investigation_id, root)
+    investigation_token = _current_investigation.set(investigation_id)
+    try:
+        async with _activate(root) as active:
+            yield active
+    finally:
+        _current_investigation.reset(investigation_token)
+
+
+@asynccontextmanager
+async def _activate(span: ProfileSpan) -> AsyncIterator[ProfileSpan]:
+    token = _current_span.set(span)
+    task, previous_tag = _tag_current_task(span)
+    async with AsyncExitStack() as stack:
+        trace_span = None
+        if _span_exporter is not None:
+            try:
+                trace_span = await stack.enter_async_context(
+                    _span_exporter(span.name, {k: str(v) for k, v in span.attributes.items()})
+                )
+            except Exception as e:
+                logger.debug("profile_span_export_failed", span=span.name, error=str(e))
+        try:
+            yield span
+        except BaseException as e:
+            span.finish(e)
+            _export_attributes(trace_span, span)
+            raise
+        else:
+            span.finish()
+            _export_attributes(trace_span, span)
+        finally:
+            _current_span.reset(token)
+            if task is not None:
+                if previous_tag is None:
+                    _task_tags.pop(task, None)
+                else:
+                    _task_tags[task] = previous_tag
+
+
+def get_profile(investigation_id: str) -> Optional[Dict[str, Any]]:
+    """Profile tree of an investigation as a dict, or None if unknown."""
+    root = profile_registry.get(investigation_id)
+    return root.to_dict() if root is not None else None
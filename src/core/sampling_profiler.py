@@ -0,0 +1,206 @@
+"""
+Module: core.sampling_profiler
+Description: Opt-in in-process sampling profiler producing collapsed stacks
+Author: Anderson H. Silva
+Date: 2025-01-15
+License: Proprietary - All rights reserved
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from src.core import get_logger
+from src.core.profiling import task_tag
+
+
+logger = get_logger(__name__)
+
+try:
+    from asyncio.tasks import _current_tasks as _running_tasks
+except ImportError:  # pragma: no cover - private API moved
+    _running_tasks = {}
+
+
+TRUNCATED_STACK = "[truncated]"
+
+
+class ProfilerBusyError(RuntimeError):
+    """A capture is already running in this process."""
+
+
+@dataclass
+class SamplingResult:
+    """Aggregated samples of one capture."""
+
+    stacks: Counter = field(default_factory=Counter)
+    samples: int = 0
+    duration: float = 0.0
+    interval: float = 0.0
+    sampler_cpu_seconds: float = 0.0
+    dropped_stacks: int = 0
+
+    @property
+    def overhead(self) -> float:
+        """Sampler CPU time as a fraction of the capture's wall time."""
+        return self.sampler_cpu_seconds / self.duration if self.duration else 0.0
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's collapsed format: ``frame;frame;frame count`` per line."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "samples": self.samples,
+            "unique_stacks": len(self.stacks),
+            "dropped_stacks": self.dropped_stacks,
+            "duration_seconds": round(self.duration, 3),
+            "interval_ms": round(self.interval * 1000, 3),
+            "overhead_ratio": round(self.overhead, 5),
+        }
+
+
+class SamplingProfiler:
+    """
+    Thread-based sampler over ``sys._current_frames()``.
+
+    Every ``interval`` seconds a daemon thread snapshots the stack of each
+    other thread and counts it in collapsed form. Samples from the event
+    loop thread are prefixed with the investigation/agent of the task that
+    was running, when the profiling spans have tagged it. Overhead is
+    bounded by the interval floor, the stack depth and the number of
+    distinct stacks kept (extra ones are counted under ``[truncated]``).
+    """
+
+    MIN_INTERVAL = 0.001
+
+    def __init__(
+        self,
+        interval: float = 0.01,
+        max_depth: int = 64,
+        max_stacks: int = 20000,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        loop_thread_id: Optional[int] = None,
+    ):
+        self.interval = max(interval, self.MIN_INTERVAL)
+        self.max_depth = max_depth
+        self.max_stacks = max_stacks
+        self.loop = loop
+        self.loop_thread_id = loop_thread_id
+        self.result = SamplingResult(interval=self.interval)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started = 0.0
+        self._frame_names: Dict[object, str] = {}
+
+    def start(self):
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> SamplingResult:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.result.duration = time.perf_counter() - self._started
+        return self.result
+
+    def _run(self):
+        own_id = threading.get_ident()
+        cpu_start = time.thread_time()
+        next_tick = time.perf_counter()
+        while not self._stop.is_set():
+            self.sample(exclude=own_id)
+            next_tick += self.interval
+            delay = next_tick - time.perf_counter()
+            if delay < 0:
+                # Fell behind (e.g. GIL contention): skip missed ticks instead of bursting
+                next_tick = time.perf_counter()
+                delay = 0
+            self._stop.wait(delay)
+        self.result.sampler_cpu_seconds = time.thread_time() - cpu_start
+
+    def sample(self, exclude: Optional[int] = None):
+        """Take one sample of every thread except ``exclude``."""
+        thread_names = {t.ident: t.name for t in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == exclude:
+                continue
+            frames = self._collapse(frame)
+            prefix = self._tag(thread_id) or f"thread:{thread_names.get(thread_id, thread_id)}"
+            self._count(f"{prefix};{frames}" if frames else prefix)
+        self.result.samples += 1
+
+    def _tag(self, thread_id: int) -> Optional[str]:
+        if thread_id != self.loop_thread_id or self.loop is None:
+            return None
+        tag = task_tag(_running_tasks.get(self.loop))
+        if not tag:
+            return "thread:event-loop"
+        investigation_id, agent = tag
+        parts = ["thread:event-loop"]
+        if investigation_id:
+            parts.append(f"investigation:{investigation_id}")
+        if agent:
+            parts.append(f"agent:{agent}")
+        return ";".join(parts)
+
+    def _collapse(self, frame) -> str:
+        names: List[str] = []
+        while frame is not None and len(names) < self.max_depth:
+            code = frame.f_code
+            name = self._frame_names.get(code)
+            if name is None:
+                module = frame.f_globals.get("__name__", "?")
+                name = self._frame_names[code] = f"{module}.{code.co_qualname}".replace(";", ":")
+            names.append(name)
+            frame = frame.f_back
+        names.reverse()
+        return ";".join(names)
+
+    def _count(self, stack: str):
+        stacks = self.result.stacks
+        if stack not in stacks and len(stacks) >= self.max_stacks:
+            self.result.dropped_stacks += 1
+            stack = TRUNCATED_STACK
+        stacks[stack] += 1
+
+
+_capture_lock = threading.Lock()
+
+
+async def capture_profile(
+    duration: float,
+    interval: float = 0.01,
+    max_depth: int = 64,
+    max_stacks: int = 20000,
+) -> SamplingResult:
+    """
+    Sample this process for ``duration`` seconds and return the aggregate.
+
+    Only one capture runs at a time per process; a concurrent request
+    raises ``ProfilerBusyError``.
+    """
+    if not _capture_lock.acquire(blocking=False):
+        raise ProfilerBusyError("A profile capture is already running")
+    try:
+        profiler = SamplingProfiler(
+            interval=interval,
+            max_depth=max_depth,
+            max_stacks=max_stacks,
+            loop=asyncio.get_running_loop(),
+            loop_thread_id=threading.get_ident(),
+        )
+        profiler.start()
+        try:
+            await asyncio.sleep(duration)
+        finally:
+            result = profiler.stop()
+        logger.info("sampling_profile_captured", **result.summary())
+        return result
+    finally:
+        _capture_lock.release()
@@ -4,21 +4,42 @@ Arquitetura distribuída para escalabilidade horizontal de agentes
 """
 
 import asyncio
+import bisect
+import copy
+import dataclasses
+import heapq
+import importlib
+import itertools
 import logging
+import math
+import os
+import pickle
+import shutil
+import sys
+import tempfile
 import time
 import uuid
-from typing import Dict, List, Optional, Any, Type, Callable, Union
+from collections import OrderedDict, deque
+from typing import Deque, Dict, List, Optional, Any, Type, Callable, Tuple, Union
 from datetime import datetime, timedelta
 from contextlib import asynccontextmanager
 from enum import Enum
 import json
 from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 import multiprocessing as mp
+from multiprocessing import resource_tracker, shared_memory
 from dataclasses import dataclass, field
 
 from pydantic import BaseModel, Field
 import structlog
 
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
 logger = structlog.get_logger(__name__)
 
 
@@ -87,6 +108,635 @@ class AgentInstance:
     thread_id: Optional[int] = None
 
 
+@dataclass
+class ProcessTaskDescriptor:
+    """
+    Descrição picklável de uma tarefa executada no process pool.
+    
+    ``target`` é uma referência ``"modulo:atributo"`` (ou um callable
+    picklável). Sem ``method``, o alvo é chamado diretamente; com
+    ``method``, o alvo é uma factory de agente instanciada uma vez por
+    processo (com ``factory_kwargs``) e o método é chamado nessa instância.
+    """
+    
+    target: Union[str, Callable]
+    method: Optional[str] = None
+    args: tuple = field(default_factory=tuple)
+    kwargs: dict = field(default_factory=dict)
+    factory_kwargs: dict = field(default_factory=dict)
+    task_id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    shared_memory_min_bytes: int = 1024 * 1024
+
+
+@dataclass
+class SharedArrayRef:
+    """Referência a um array NumPy devolvido via memória compartilhada"""
+    
+    name: str
+    shape: Tuple[int, ...]
+    dtype: str
+
+
+# Agentes instanciados neste processo (apenas nos workers do process pool)
+_process_local_agents: Dict[Tuple[str, str], Any] = {}
+
+
+def _resolve_target(target: Union[str, Callable]) -> Callable:
+    """Resolver referência ``"modulo:atributo"``"""
+    if not isinstance(target, str):
+        return target
+    module_name, _, attribute = target.partition(":")
+    obj = importlib.import_module(module_name)
+    for part in attribute.split("."):
+        obj = getattr(obj, part)
+    return obj
+
+
+def _target_name(target: Union[str, Callable]) -> str:
+    if isinstance(target, str):
+        return target
+    return f"{target.__module__}:{target.__qualname__}"
+
+
+def _map_structure(obj: Any, convert: Callable[[Any], Any]) -> Any:
+    """Aplicar ``convert`` às folhas de dicts, listas, tuplas e dataclasses"""
+    converted = convert(obj)
+    if converted is not obj:
+        return converted
+    if isinstance(obj, dict):
+        return {key: _map_structure(value, convert) for key, value in obj.items()}
+    if isinstance(obj, list):
+        return [_map_structure(value, convert) for value in obj]
+    if isinstance(obj, tuple) and not hasattr(obj, "_fields"):
+        return tuple(_map_structure(value, convert) for value in obj)
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        changed = {}
+        for f in dataclasses.fields(obj):
+            value = getattr(obj, f.name)
+            new_value = _map_structure(value, convert)
+            if new_value is not value:
+                changed[f.name] = new_value
+        if changed:
+            obj = copy.copy(obj)
+            for name, value in changed.items():
+                object.__setattr__(obj, name, value)
+    return obj
+
+
+def export_shared_arrays(result: Any, min_bytes: int) -> Any:
+    """
+    Mover arrays NumPy grandes do resultado para memória compartilhada.
+    
+    Executado no processo filho: cada array com ``nbytes >= min_bytes`` é
+    copiado para um segmento ``SharedMemory`` e substituído por uma
+    ``SharedArrayRef``; o processo pai lê e libera o segmento.
+    """
+    if not NUMPY_AVAILABLE:
+        return result
+    
+    def convert(value):
+        if isinstance(value, np.ndarray) and value.nbytes >= min_bytes and value.dtype != object:
+            segment = shared_memory.SharedMemory(create=True, size=max(1, value.nbytes))
+            np.ndarray(value.shape, dtype=value.dtype, buffer=segment.buf)[...] = value
+            ref = SharedArrayRef(name=segment.name, shape=value.shape, dtype=value.dtype.str)
+            segment.close()
+            # The parent owns the segment now: keep this process's tracker
+            # from unlinking it when the worker is recycled
+            resource_tracker.unregister(segment._name, "shared_memory")
+            return ref
+        return value
+    
+    return _map_structure(result, convert)
+
+
+def import_shared_arrays(result: Any) -> Any:
+    """Substituir ``SharedArrayRef`` por cópias locais e liberar os segmentos"""
+    
+    def convert(value):
+        if isinstance(value, SharedArrayRef):
+            segment = shared_memory.SharedMemory(name=value.name)
+            try:
+                return np.ndarray(value.shape, dtype=np.dtype(value.dtype), buffer=segment.buf).copy()
+            finally:
+                segment.close()
+                segment.unlink()
+        return value
+    
+    return _map_structure(result, convert)
+
+
+def run_process_task(descriptor: ProcessTaskDescriptor) -> Any:
+    """Ponto de entrada executado dentro dos processos do pool"""
+    
+    target = _resolve_target(descriptor.target)
+    
+    if descriptor.method is None:
+        call = target
+    else:
+        key = (_target_name(descriptor.target), repr(sorted(descriptor.factory_kwargs.items())))
+        agent = _process_local_agents.get(key)
+        if agent is None:
+            agent = target(**descriptor.factory_kwargs)
+            _process_local_agents[key] = agent
+        call = getattr(agent, descriptor.method)
+    
+    result = call(*descriptor.args, **descriptor.kwargs)
+    if asyncio.iscoroutine(result):
+        result = asyncio.run(result)
+    
+    return export_shared_arrays(result, descriptor.shared_memory_min_bytes)
+
+
+def run_serialized_process_task(payload: bytes) -> Any:
+    """
+    Executar, no processo worker do pool, um descritor serializado no pai
+    
+    ProcessTaskRunner.run faz o pickle antes de enviar, para que falhas de
+    serialização sejam detectadas no processo pai; aqui ele é desfeito.
+    """
+    return run_process_task(pickle.loads(payload))
+
+
+class ProcessTaskRunner:
+    """
+    Process pool para tarefas CPU-bound.
+    
+    Processos são reciclados após ``max_tasks_per_child`` tarefas, agentes
+    são instanciados uma vez por processo e arrays grandes voltam por
+    memória compartilhada.
+    """
+    
+    def __init__(self,
+                 max_workers: int = 2,
+                 max_tasks_per_child: Optional[int] = 100,
+                 shared_memory_min_bytes: int = 1024 * 1024):
+        self.max_workers = max_workers
+        self.max_tasks_per_child = max_tasks_per_child
+        self.shared_memory_min_bytes = shared_memory_min_bytes
+        self.executor = self._create_executor()
+        self.tasks_completed = 0
+    
+    def _create_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            max_tasks_per_child=self.max_tasks_per_child
+        )
+    
+    async def run(self, descriptor: ProcessTaskDescriptor) -> Any:
+        """Executar descritor em um processo do pool"""
+        
+        descriptor.shared_memory_min_bytes = self.shared_memory_min_bytes
+        
+        # Serializar aqui: falhas de pickle (funções locais, lambdas, locks nos
+        # argumentos) aparecem como PicklingError, e não se confundem com
+        # AttributeError/TypeError levantados pela própria tarefa no worker
+        try:
+            payload = pickle.dumps(descriptor, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, AttributeError, TypeError) as e:
+            raise pickle.PicklingError(f"Tarefa {descriptor.task_id} não serializável: {e}") from e
+        
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(self.executor, run_serialized_process_task, payload)
+        except BrokenProcessPool:
+            logger.error("❌ Process pool quebrado, recriando workers")
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = self._create_executor()
+            raise
+        
+        self.tasks_completed += 1
+        return import_shared_arrays(result)
+    
+    def shutdown(self, wait: bool = True):
+        self.executor.shutdown(wait=wait)
+
+
+_process_runner: Optional[ProcessTaskRunner] = None
+
+
+def get_process_runner() -> Optional[ProcessTaskRunner]:
+    """Runner compartilhado, ou None se o process pool estiver desabilitado"""
+    
+    global _process_runner
+    
+    if _process_runner is None:
+        from src.core import settings
+        if not settings.cpu_process_pool_enabled:
+            return None
+        _process_runner = ProcessTaskRunner(
+            max_workers=settings.cpu_process_pool_workers,
+            max_tasks_per_child=settings.cpu_process_max_tasks_per_child,
+            shared_memory_min_bytes=settings.cpu_process_shared_memory_min_bytes
+        )
+        logger.info(f"✅ Process pool para tarefas CPU-bound criado ({settings.cpu_process_pool_workers} workers)")
+    
+    return _process_runner
+
+
+async def run_cpu_bound(target: Union[str, Callable], *args, **kwargs) -> Any:
+    """
+    Executar função CPU-bound no process pool, se configurado.
+    
+    ``target`` deve ser uma função de módulo (ou referência
+    ``"modulo:atributo"``). Sem process pool, ou se alvo ou argumentos não
+    forem serializáveis (lambdas, funções locais, locks), executa no
+    processo atual. Exceções da própria função são propagadas.
+    """
+    runner = get_process_runner()
+    if runner is not None:
+        try:
+            return await runner.run(ProcessTaskDescriptor(target=target, args=args, kwargs=kwargs))
+        except (BrokenProcessPool, pickle.PicklingError) as e:
+            logger.warning(f"⚠️ Execução em processo falhou, executando localmente: {e}")
+    
+    return _resolve_target(target)(*args, **kwargs)
+
+
+class DurationHistogram:
+    """Histograma de durações com buckets fixos (segundos)"""
+    
+    DEFAULT_BUCKETS = (
+        0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+        1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0
+    )
+    
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Último bucket = +Inf
+        self.count = 0
+        self.sum = 0.0
+    
+    def record(self, seconds: float):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+    
+    def quantile(self, q: float) -> float:
+        """Quantil aproximado (limite superior do bucket)"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for i, bucket_count in enumerate(self.counts):
+            cumulative += bucket_count
+            if cumulative >= rank:
+                return self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+        return self.buckets[-1]
+    
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "avg": self.sum / self.count if self.count else 0.0,
+            "p50": self.quantile(0.50),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "buckets": {
+                ("+Inf" if i == len(self.buckets) else str(self.buckets[i])): c
+                for i, c in enumerate(self.counts)
+            }
+        }
+
+
+class ReadyQueue:
+    """Fila de prontos de um tipo de agente (heap por prioridade, FIFO no empate)"""
+    
+    def __init__(self):
+        self._heap: List[Tuple[int, int, float, AgentTask]] = []
+    
+    def push(self, priority_value: int, seq: int, task: AgentTask):
+        heapq.heappush(self._heap, (priority_value, seq, time.time(), task))
+    
+    def peek_key(self) -> Tuple[int, int]:
+        priority_value, seq, _, _ = self._heap[0]
+        return priority_value, seq
+    
+    def pop(self) -> Tuple[float, AgentTask]:
+        _, _, queued_at, task = heapq.heappop(self._heap)
+        return queued_at, task
+    
+    def __len__(self) -> int:
+        return len(self._heap)
+
+
+class TimerWheel:
+    """
+    Timer wheel hash para agendamentos atrasados com inserção O(1).
+    
+    Usado para reenfileirar tentativas sem bloquear workers com sleep.
+    """
+    
+    def __init__(self, tick: float = 0.05, slots: int = 512):
+        self.tick = tick
+        self.slots = slots
+        self._wheel: List[List[Tuple[int, Any]]] = [[] for _ in range(slots)]
+        self._origin = time.monotonic()
+        self._current_tick = 0
+        self._pending = 0
+    
+    def _tick_at(self, now: float) -> int:
+        return int((now - self._origin) / self.tick)
+    
+    def schedule(self, delay: float, item: Any, now: Optional[float] = None):
+        """Agendar ``item`` para daqui a ``delay`` segundos"""
+        now = time.monotonic() if now is None else now
+        if not self._pending:
+            # Wheel ocioso: sincroniza o cursor sem percorrer slots vazios
+            self._current_tick = max(self._current_tick, self._tick_at(now))
+        target = max(self._current_tick + 1, self._tick_at(now) + max(1, math.ceil(delay / self.tick)))
+        self._wheel[target % self.slots].append((target, item))
+        self._pending += 1
+    
+    def advance(self, now: Optional[float] = None) -> List[Any]:
+        """Avançar o cursor até ``now`` e retornar os itens vencidos"""
+        now_tick = self._tick_at(time.monotonic() if now is None else now)
+        if not self._pending:
+            self._current_tick = max(self._current_tick, now_tick)
+            return []
+        
+        due: List[Any] = []
+        # Nunca visitar um slot mais de uma vez por avanço
+        steps = min(now_tick - self._current_tick, self.slots)
+        for offset in range(1, steps + 1):
+            index = (self._current_tick + offset) % self.slots
+            bucket = self._wheel[index]
+            if not bucket:
+                continue
+            keep = []
+            for target, item in bucket:
+                if target <= now_tick:
+                    due.append(item)
+                else:
+                    keep.append((target, item))
+            self._wheel[index] = keep
+        
+        self._current_tick = max(self._current_tick, now_tick)
+        self._pending -= len(due)
+        return due
+    
+    def __len__(self) -> int:
+        return self._pending
+
+
+@dataclass
+class _StoredResult:
+    """Entrada do TaskResultStore"""
+    
+    task: AgentTask  # Sem o resultado (mantido em ``result`` ou em disco)
+    result: Any
+    size: int
+    expires_at: float
+    path: Optional[str] = None
+    offloading: bool = False  # Sendo gravado em disco por uma thread
+
+
+# Itens examinados por contêiner ao estimar tamanhos
+_SIZE_SAMPLE = 32
+
+
+def estimate_size(value: Any, depth: int = 3) -> int:
+    """
+    Estimativa barata do tamanho em bytes de um resultado.
+    
+    Contêineres grandes são amostrados (``_SIZE_SAMPLE`` itens, extrapolados
+    para o total) até ``depth`` níveis; arrays usam ``nbytes``. Serve para
+    limites de memória, sem serializar.
+    """
+    if value is None:
+        return 0
+    if isinstance(value, (bytes, bytearray, str)):
+        return sys.getsizeof(value)
+    nbytes = getattr(value, "nbytes", None)
+    if isinstance(nbytes, int):
+        return nbytes
+    
+    size = sys.getsizeof(value, 64)
+    if depth <= 0:
+        return size
+    
+    if isinstance(value, dict):
+        sample = list(itertools.islice(value.items(), _SIZE_SAMPLE))
+        if sample:
+            sampled = sum(estimate_size(k, depth - 1) + estimate_size(v, depth - 1) for k, v in sample)
+            size += sampled * len(value) // len(sample)
+    elif isinstance(value, (list, tuple, set, frozenset, deque)):
+        sample = list(itertools.islice(value, _SIZE_SAMPLE))
+        if sample:
+            size += sum(estimate_size(v, depth - 1) for v in sample) * len(value) // len(sample)
+    elif hasattr(value, "__dict__"):
+        size += estimate_size(vars(value), depth - 1)
+    return size
+
+
+class TaskResultStore:
+    """
+    Armazenamento limitado de tarefas concluídas.
+    
+    Entradas expiram após ``ttl`` segundos e as mais antigas são descartadas
+    quando ``max_entries`` ou ``max_bytes`` são excedidos. Tamanhos vêm de
+    ``estimate_size``; resultados maiores que ``offload_threshold`` são
+    serializados em disco (limitados por ``max_offload_bytes``) em vez de
+    ficarem na memória. Dentro do event loop o pickle e a gravação rodam numa
+    thread; até terminarem, o resultado continua legível na memória.
+    """
+    
+    def __init__(self,
+                 max_entries: int = 1000,
+                 ttl: float = 600.0,
+                 max_bytes: int = 64 * 1024 * 1024,
+                 offload_threshold: Optional[int] = 1024 * 1024,
+                 max_offload_bytes: int = 1024 * 1024 * 1024,
+                 offload_dir: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.offload_threshold = offload_threshold
+        self.max_offload_bytes = max_offload_bytes
+        self.offload_dir = offload_dir
+        self._owns_offload_dir = False
+        
+        self._entries: "OrderedDict[str, _StoredResult]" = OrderedDict()
+        self._pending_offloads: set = set()
+        self.memory_bytes = 0
+        self.offloading_bytes = 0
+        self.offloaded_bytes = 0
+        self.evictions = 0
+    
+    def _offload(self, task_id: str, result: Any, offload_dir: str) -> Optional[str]:
+        """Gravar resultado em disco, retornando o caminho (ou None se falhar)"""
+        try:
+            data = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+            path = os.path.join(offload_dir, f"{task_id}.pkl")
+            with open(path, "wb") as f:
+                f.write(data)
+            return path
+        except Exception as e:
+            logger.warning(f"⚠️ Falha ao gravar resultado {task_id} em disco: {e}")
+            return None
+    
+    def put(self, task: AgentTask):
+        """Armazenar tarefa concluída, descartando entradas antigas se preciso"""
+        
+        self._discard(task.id)
+        result = task.result
+        size = estimate_size(result)
+        
+        entry = _StoredResult(
+            task=dataclasses.replace(task, result=None),
+            result=result,
+            size=size,
+            expires_at=time.monotonic() + self.ttl,
+            offloading=self.offload_threshold is not None and size > self.offload_threshold
+        )
+        self._entries[task.id] = entry
+        
+        if entry.offloading:
+            self.offloading_bytes += size
+            if self.offload_dir is None:
+                self.offload_dir = tempfile.mkdtemp(prefix="agent_results_")
+                self._owns_offload_dir = True
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                loop = None
+            
+            if loop is None:
+                self._offload_finished(task.id, entry, self._offload(task.id, result, self.offload_dir))
+            else:
+                pending = loop.create_task(
+                    asyncio.to_thread(self._offload, task.id, result, self.offload_dir)
+                )
+                self._pending_offloads.add(pending)
+                pending.add_done_callback(
+                    lambda done, task_id=task.id, entry=entry: self._on_offload_done(task_id, entry, done)
+                )
+        else:
+            self.memory_bytes += size
+        
+        self._enforce_limits()
+    
+    def _on_offload_done(self, task_id: str, entry: _StoredResult, done: asyncio.Task):
+        self._pending_offloads.discard(done)
+        path = None if done.cancelled() or done.exception() else done.result()
+        self._offload_finished(task_id, entry, path)
+    
+    def _offload_finished(self, task_id: str, entry: _StoredResult, path: Optional[str]):
+        """Trocar a entrada pelo arquivo gravado, ou mantê-la na memória se falhou"""
+        
+        if self._entries.get(task_id) is not entry:
+            # Descartada ou substituída enquanto era gravada
+            if path:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            return
+        
+        entry.offloading = False
+        self.offloading_bytes -= entry.size
+        if path:
+            entry.path = path
+            entry.result = None
+            self.offloaded_bytes += entry.size
+        else:
+            self.memory_bytes += entry.size
+        self._enforce_limits()
+    
+    def _enforce_limits(self):
+        self.purge_expired()
+        while self._entries and (
+            len(self._entries) > self.max_entries
+            or self.memory_bytes > self.max_bytes
+            or self.offloaded_bytes > self.max_offload_bytes
+        ):
+            self._discard(next(iter(self._entries)))
+            self.evictions += 1
+    
+    def get(self, task_id: str) -> Optional[AgentTask]:
+        """Obter tarefa concluída com o resultado (lido do disco se necessário)"""
+        
+        entry = self._entries.get(task_id)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            self._discard(task_id)
+            return None
+        
+        result = entry.result
+        if entry.path:
+            try:
+                with open(entry.path, "rb") as f:
+                    result = pickle.load(f)
+            except Exception as e:
+                logger.error(f"❌ Resultado {task_id} em disco ilegível: {e}")
+                self._discard(task_id)
+                return None
+        
+        return dataclasses.replace(entry.task, result=result)
+    
+    def pop(self, task_id: str) -> Optional[AgentTask]:
+        task = self.get(task_id)
+        self._discard(task_id)
+        return task
+    
+    def _discard(self, task_id: str):
+        entry = self._entries.pop(task_id, None)
+        if entry is None:
+            return
+        if entry.path:
+            self.offloaded_bytes -= entry.size
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+        elif entry.offloading:
+            self.offloading_bytes -= entry.size
+        else:
+            self.memory_bytes -= entry.size
+    
+    def purge_expired(self) -> int:
+        """Remover entradas expiradas (em ordem de conclusão)"""
+        now = time.monotonic()
+        removed = 0
+        while self._entries:
+            task_id, entry = next(iter(self._entries.items()))
+            if entry.expires_at > now:
+                break
+            self._discard(task_id)
+            removed += 1
+        return removed
+    
+    def clear(self):
+        for task_id in list(self._entries):
+            self._discard(task_id)
+        if self._owns_offload_dir and self.offload_dir:
+            shutil.rmtree(self.offload_dir, ignore_errors=True)
+            self.offload_dir = None
+            self._owns_offload_dir = False
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "memory_bytes": self.memory_bytes,
+            "offloaded_bytes": self.offloaded_bytes,
+            "offloaded_entries": sum(1 for e in self._entries.values() if e.path),
+            "offloading_entries": sum(1 for e in self._entries.values() if e.offloading),
+            "evictions": self.evictions
+        }
+    
+    def __contains__(self, task_id: str) -> bool:
+        entry = self._entries.get(task_id)
+        return entry is not None and entry.expires_at > time.monotonic()
+    
+    def __getitem__(self, task_id: str) -> AgentTask:
+        task = self.get(task_id)
+        if task is None:
+            raise KeyError(task_id)
+        return task
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
 class PoolConfig(BaseModel):
     """Configuração do pool de agentes"""
     
@@ -100,17 +750,28 @@ class PoolConfig(BaseModel):
     max_queue_size: int = 1000
     task_timeout_default: float = 300.0  # 5 minutes
     task_retry_delay: float = 1.0
+    retry_wheel_tick: float = 0.05
     
     # Health and monitoring
     health_check_interval: float = 30.0
     agent_idle_timeout: float = 600.0  # 10 minutes
     cleanup_interval: float = 60.0
     
+    # Completed task retention
+    max_completed_tasks: int = 1000
+    result_ttl: float = 600.0  # 10 minutes
+    max_result_memory_bytes: int = 64 * 1024 * 1024
+    result_offload_threshold: Optional[int] = 1024 * 1024  # None disables disk offload
+    max_result_offload_bytes: int = 1024 * 1024 * 1024
+    result_offload_dir: Optional[str] = None  # Temp dir when None
+    
     # Execution modes
     enable_threading: bool = True
     enable_multiprocessing: bool = True
     thread_pool_size: int = 4
     process_pool_size: int = 2
+    process_max_tasks_per_child: Optional[int] = 100  # Recycle worker processes
+    shared_memory_min_bytes: int = 1024 * 1024  # NumPy results >= 1MB via shared memory
     
     # Performance tuning
     batch_size: int = 5
@@ -127,17 +788,35 @@ class AgentPoolManager:
         # Agent pools by type
         self.agent_pools: Dict[str, List[AgentInstance]] = {}
         self.agent_factories: Dict[str, Callable] = {}
+        self.process_factories: Dict[str, Union[str, Callable]] = {}
+        
+        # Dispatching: per-type ready queues and idle free lists
+        self.ready_queues: Dict[str, ReadyQueue] = {}
+        self.idle_agents: Dict[str, Deque[AgentInstance]] = {}
+        self._pending_agents: Dict[str, int] = {}  # Scale-ups reservados
+        self._task_seq = itertools.count()
+        self._work_available = asyncio.Event()
+        
+        # Delayed retries
+        self.retry_wheel = TimerWheel(tick=config.retry_wheel_tick)
+        self._retry_scheduled = asyncio.Event()
+        self._retry_task: Optional[asyncio.Task] = None
         
         # Task management
-        self.task_queue: asyncio.PriorityQueue = asyncio.PriorityQueue(
-            maxsize=config.max_queue_size
-        )
         self.active_tasks: Dict[str, AgentTask] = {}
-        self.completed_tasks: Dict[str, AgentTask] = {}
+        self.completed_tasks = TaskResultStore(
+            max_entries=config.max_completed_tasks,
+            ttl=config.result_ttl,
+            max_bytes=config.max_result_memory_bytes,
+            offload_threshold=config.result_offload_threshold,
+            max_offload_bytes=config.max_result_offload_bytes,
+            offload_dir=config.result_offload_dir
+        )
+        self._task_futures: Dict[str, asyncio.Future] = {}
         
         # Execution pools
         self.thread_pool: Optional[ThreadPoolExecutor] = None
-        self.process_pool: Optional[ProcessPoolExecutor] = None
+        self.process_pool: Optional[ProcessTaskRunner] = None
         
         # Control
         self._running = False
@@ -153,8 +832,11 @@ class AgentPoolManager:
             "avg_task_time": 0.0,
             "avg_queue_time": 0.0,
             "total_agents": 0,
-            "busy_agents": 0
+            "busy_agents": 0,
+            "tasks_retried": 0
         }
+        self.queue_wait_histograms: Dict[str, DurationHistogram] = {}
+        self.execution_histograms: Dict[str, DurationHistogram] = {}
     
     async def initialize(self) -> bool:
         """Inicializar pool de agentes"""
@@ -171,8 +853,10 @@ class AgentPoolManager:
                 logger.info(f"✅ Thread pool criado ({self.config.thread_pool_size} workers)")
             
             if self.config.enable_multiprocessing:
-                self.process_pool = ProcessPoolExecutor(
-                    max_workers=self.config.process_pool_size
+                self.process_pool = ProcessTaskRunner(
+                    max_workers=self.config.process_pool_size,
+                    max_tasks_per_child=self.config.process_max_tasks_per_child,
+                    shared_memory_min_bytes=self.config.shared_memory_min_bytes
                 )
                 logger.info(f"✅ Process pool criado ({self.config.process_pool_size} workers)")
             
@@ -191,10 +875,24 @@ class AgentPoolManager:
             logger.error(f"❌ Falha na inicialização do pool: {e}")
             return False
     
-    def register_agent_factory(self, agent_type: str, factory_function: Callable):
-        """Registrar factory function para tipo de agente"""
+    def register_agent_factory(self,
+                               agent_type: str,
+                               factory_function: Callable,
+                               process_factory: Optional[Union[str, Callable]] = None):
+        """
+        Registrar factory function para tipo de agente.
+        
+        Args:
+            agent_type: Tipo do agente
+            factory_function: Factory usada no processo principal
+            process_factory: Factory picklável (ou ``"modulo:atributo"``) usada
+                para criar uma instância por processo no modo PROCESS. Se
+                omitida, ``factory_function`` é usada quando for picklável.
+        """
         
         self.agent_factories[agent_type] = factory_function
+        if process_factory is not None:
+            self.process_factories[agent_type] = process_factory
         logger.info(f"✅ Factory registrada para agente '{agent_type}'")
     
     async def create_agent_pool(self, agent_type: str, initial_size: int = None) -> bool:
@@ -206,12 +904,14 @@ class AgentPoolManager:
         
         initial_size = initial_size or self.config.min_agents_per_type
         self.agent_pools[agent_type] = []
+        self.idle_agents[agent_type] = deque()
+        self._pending_agents.setdefault(agent_type, 0)
         
         try:
             for i in range(initial_size):
                 agent_instance = await self._create_agent_instance(agent_type)
                 if agent_instance:
-                    self.agent_pools[agent_type].append(agent_instance)
+                    self._add_agent(agent_instance)
             
             logger.info(f"✅ Pool criado para '{agent_type}' com {len(self.agent_pools[agent_type])} agentes")
             return True
@@ -260,43 +960,82 @@ class AgentPoolManager:
             execution_mode=execution_mode
         )
         
-        # Add to queue with priority (lower number = higher priority)
-        priority_value = 5 - priority.value  # Invert for queue (lower = higher priority)
-        
-        try:
-            await self.task_queue.put((priority_value, time.time(), task))
-            self.metrics["tasks_queued"] += 1
-            
-            logger.debug(f"✅ Tarefa submetida: {task.id} para {agent_type}.{method}")
-            return task.id
-            
-        except asyncio.QueueFull:
+        if self.queued_task_count() >= self.config.max_queue_size:
             logger.error(f"❌ Queue cheia! Tarefa rejeitada: {task.id}")
             raise Exception("Task queue is full")
+        
+        future = asyncio.get_running_loop().create_future()
+        # Failures nobody awaits should not be logged as unretrieved
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._task_futures[task.id] = future
+        
+        # Lower number = higher priority
+        priority_value = 5 - priority.value
+        self._enqueue(task, priority_value)
+        self.metrics["tasks_queued"] += 1
+        
+        logger.debug(f"✅ Tarefa submetida: {task.id} para {agent_type}.{method}")
+        return task.id
+    
+    def queued_task_count(self) -> int:
+        """Total de tarefas aguardando em todas as filas de prontos"""
+        return sum(len(queue) for queue in self.ready_queues.values())
+    
+    def _enqueue(self, task: AgentTask, priority_value: int):
+        """Colocar tarefa na fila de prontos do seu tipo e acordar workers"""
+        queue = self.ready_queues.get(task.agent_type)
+        if queue is None:
+            queue = self.ready_queues[task.agent_type] = ReadyQueue()
+        queue.push(priority_value, next(self._task_seq), task)
+        self._work_available.set()
+    
+    def task_future(self, task_id: str) -> asyncio.Future:
+        """
+        Future resolvida com o resultado da tarefa (ou sua exceção).
+        
+        Raises:
+            KeyError: Tarefa desconhecida ou resultado já descartado
+        """
+        
+        future = self._task_futures.get(task_id)
+        if future is not None:
+            return future
+        
+        task = self.completed_tasks.get(task_id)
+        if task is None:
+            raise KeyError(f"Task {task_id} not found or result expired")
+        
+        future = asyncio.get_running_loop().create_future()
+        if task.error:
+            future.set_exception(Exception(f"Task failed: {task.error}"))
+        else:
+            future.set_result(task.result)
+        return future
     
     async def get_task_result(self, task_id: str, timeout: float = None) -> Any:
         """Obter resultado de tarefa"""
         
-        start_time = time.time()
         timeout = timeout or 60.0
+        future = self.task_future(task_id)
         
-        while time.time() - start_time < timeout:
-            # Check if task is completed
-            if task_id in self.completed_tasks:
-                task = self.completed_tasks[task_id]
-                if task.error:
-                    raise Exception(f"Task failed: {task.error}")
-                return task.result
-            
-            # Check if task is still active
-            if task_id in self.active_tasks:
-                await asyncio.sleep(0.1)
-                continue
-            
-            # Task not found
-            break
+        try:
+            # Shielded: a caller timing out must not cancel the shared future
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            raise asyncio.TimeoutError(f"Task {task_id} did not complete within {timeout}s")
+    
+    def _finish_task(self, task: AgentTask):
+        """Arquivar tarefa concluída e resolver sua future"""
+        
+        self.active_tasks.pop(task.id, None)
+        self.completed_tasks.put(task)
         
-        raise asyncio.TimeoutError(f"Task {task_id} did not complete within {timeout}s")
+        future = self._task_futures.pop(task.id, None)
+        if future is not None and not future.done():
+            if task.error:
+                future.set_exception(Exception(f"Task failed: {task.error}"))
+            else:
+                future.set_result(task.result)
     
     async def _start_worker_tasks(self):
         """Iniciar tasks de workers"""
@@ -305,35 +1044,38 @@ class AgentPoolManager:
         num_workers = max(4, len(self.agent_factories) * 2)
         
         for i in range(num_workers):
-            worker_task = asyncio.create_task(self._worker_loop(f"worker_{i}"))
+            worker_task = asyncio.create_task(self._worker_loop(f"worker_{i}", i))
             self._worker_tasks.append(worker_task)
         
+        self._retry_task = asyncio.create_task(self._retry_loop())
+        
         logger.info(f"✅ {num_workers} workers iniciados")
     
-    async def _worker_loop(self, worker_name: str):
+    async def _worker_loop(self, worker_name: str, worker_index: int = 0):
         """Loop principal do worker"""
         
         logger.debug(f"Worker {worker_name} iniciado")
         
         while self._running:
             try:
-                # Get task from queue (with timeout to avoid blocking)
-                try:
-                    priority, queued_time, task = await asyncio.wait_for(
-                        self.task_queue.get(),
-                        timeout=1.0
-                    )
-                except asyncio.TimeoutError:
+                dispatch = self._take_task(worker_index)
+                if dispatch is None:
+                    # Sleep until a submit, retry or agent release wakes us
+                    self._work_available.clear()
+                    await self._work_available.wait()
                     continue
                 
+                task, queued_time, agent_instance, reserved = dispatch
+                
                 # Calculate queue wait time
                 queue_time = time.time() - queued_time
                 self.metrics["avg_queue_time"] = (
                     self.metrics["avg_queue_time"] * 0.9 + queue_time * 0.1
                 )
+                self._histogram(self.queue_wait_histograms, task.agent_type).record(queue_time)
                 
                 # Execute task
-                await self._execute_task(task, worker_name)
+                await self._execute_task(task, worker_name, agent_instance, reserved)
                 
             except Exception as e:
                 logger.error(f"❌ Erro no worker {worker_name}: {e}")
@@ -341,25 +1083,153 @@ class AgentPoolManager:
         
         logger.debug(f"Worker {worker_name} finalizado")
     
-    async def _execute_task(self, task: AgentTask, worker_name: str):
+    def _take_task(self, worker_index: int) -> Optional[Tuple[AgentTask, float, Optional[AgentInstance], bool]]:
+        """
+        Escolher a próxima tarefa para um worker.
+        
+        Cada worker tem um tipo de agente "de casa" e prefere a sua fila:
+        se ela tiver tarefa e capacidade, a cabeça dela é atendida mesmo que
+        outro tipo tenha tarefa de prioridade maior. Se estiver vazia ou sem
+        agentes livres, rouba a tarefa de maior prioridade entre os outros
+        tipos com capacidade. O agente é reservado aqui, de forma síncrona,
+        para que dois workers nunca disputem o mesmo agente ou a mesma vaga
+        de scale-up.
+        
+        Returns:
+            (tarefa, instante de enfileiramento, agente ou None, vaga reservada)
+        """
+        # Filas nunca são removidas, então a casa de cada worker é estável
+        agent_types = list(self.ready_queues)
+        if not agent_types:
+            return None
+        
+        home = agent_types[worker_index % len(agent_types)]
+        best_type = None
+        if self.ready_queues[home] and self._has_capacity(home):
+            best_type = home
+        else:
+            best_key = None
+            for agent_type in agent_types:
+                queue = self.ready_queues[agent_type]
+                if agent_type == home or not queue or not self._has_capacity(agent_type):
+                    continue
+                key = queue.peek_key()
+                if best_key is None or key < best_key:
+                    best_type, best_key = agent_type, key
+        
+        if best_type is None:
+            return None
+        
+        queued_time, task = self.ready_queues[best_type].pop()
+        agent_instance = self._acquire_idle_agent(best_type)
+        reserved = False
+        if agent_instance is None and best_type in self.agent_pools:
+            self._pending_agents[best_type] += 1
+            reserved = True
+        
+        return task, queued_time, agent_instance, reserved
+    
+    def _has_capacity(self, agent_type: str) -> bool:
+        """Há agente livre ou espaço para escalar este tipo?"""
+        
+        if agent_type not in self.agent_pools:
+            # No pool: dispatch anyway so the task fails fast
+            return True
+        
+        idle = self.idle_agents[agent_type]
+        while idle and idle[0].status != AgentStatus.IDLE:
+            idle.popleft()  # Stale entry (removed or marked in error)
+        if idle:
+            return True
+        
+        pool_size = len(self.agent_pools[agent_type]) + self._pending_agents[agent_type]
+        return pool_size < self.config.max_agents_per_type
+    
+    def _acquire_idle_agent(self, agent_type: str) -> Optional[AgentInstance]:
+        """Obter agente livre em O(1) a partir da free list"""
+        
+        idle = self.idle_agents.get(agent_type)
+        while idle:
+            agent = idle.popleft()
+            if agent.status == AgentStatus.IDLE:
+                agent.status = AgentStatus.BUSY
+                return agent
+        return None
+    
+    def _release_agent(self, agent_instance: AgentInstance):
+        """Devolver agente à free list e acordar workers"""
+        
+        agent_instance.current_task_id = None
+        agent_instance.last_activity = datetime.utcnow()
+        
+        if agent_instance.status == AgentStatus.SHUTDOWN:
+            return  # Removed from the pool while busy
+        
+        agent_instance.status = AgentStatus.IDLE
+        self.idle_agents[agent_instance.agent_type].append(agent_instance)
+        self._work_available.set()
+    
+    def _add_agent(self, agent_instance: AgentInstance):
+        """Adicionar agente ao pool e à free list"""
+        
+        self.agent_pools[agent_instance.agent_type].append(agent_instance)
+        self.idle_agents[agent_instance.agent_type].append(agent_instance)
+        self._work_available.set()
+    
+    def _histogram(self, histograms: Dict[str, DurationHistogram], agent_type: str) -> DurationHistogram:
+        histogram = histograms.get(agent_type)
+        if histogram is None:
+            histogram = histograms[agent_type] = DurationHistogram()
+        return histogram
+    
+    async def _retry_loop(self):
+        """Reenfileirar tentativas vencidas do timer wheel"""
+        
+        while self._running:
+            try:
+                if not len(self.retry_wheel):
+                    self._retry_scheduled.clear()
+                    await self._retry_scheduled.wait()
+                    continue
+                
+                await asyncio.sleep(self.retry_wheel.tick)
+                for task in self.retry_wheel.advance():
+                    self._enqueue(task, 1)  # High priority for retry
+                    logger.info(f"🔄 Tentativa {task.retry_count} para tarefa {task.id}")
+            except Exception as e:
+                logger.error(f"❌ Erro no loop de retentativas: {e}")
+                await asyncio.sleep(1.0)
+    
+    async def _execute_task(self,
+                            task: AgentTask,
+                            worker_name: str,
+                            agent_instance: Optional[AgentInstance] = None,
+                            reserved: bool = False):
         """Executar tarefa"""
         
         task.started_at = datetime.utcnow()
+        task.error = None
         self.active_tasks[task.id] = task
+        retrying = False
         
         logger.debug(f"🔄 Executando tarefa {task.id} no worker {worker_name}")
         
         try:
-            # Get available agent
-            agent_instance = await self._get_available_agent(task.agent_type)
+            if reserved:
+                # Scale up into the slot reserved by _take_task
+                try:
+                    agent_instance = await self._create_agent_instance(task.agent_type)
+                finally:
+                    self._pending_agents[task.agent_type] -= 1
+                if agent_instance:
+                    self.agent_pools[task.agent_type].append(agent_instance)
+                    logger.info(
+                        f"✅ Pool '{task.agent_type}' escalado para "
+                        f"{len(self.agent_pools[task.agent_type])} agentes"
+                    )
             
             if not agent_instance:
-                # Try to scale up
-                await self._scale_up_pool(task.agent_type)
-                agent_instance = await self._get_available_agent(task.agent_type)
-                
-                if not agent_instance:
-                    raise Exception(f"No agents available for type {task.agent_type}")
+                raise Exception(f"No agents available for type {task.agent_type}")
             
             # Mark agent as busy
             agent_instance.status = AgentStatus.BUSY
@@ -379,6 +1249,7 @@ class AgentPoolManager:
                 raise Exception(f"Unsupported execution mode: {task.execution_mode}")
             
             execution_time = time.time() - start_time
+            self._histogram(self.execution_histograms, task.agent_type).record(execution_time)
             
             # Update task
             task.result = result
@@ -412,24 +1283,22 @@ class AgentPoolManager:
             
             logger.error(f"❌ Tarefa {task.id} falhou: {e}")
             
-            # Retry if possible
+            # Retry if possible, without holding the worker
             if task.retry_count < task.max_retries:
                 task.retry_count += 1
-                await asyncio.sleep(self.config.task_retry_delay)
-                await self.task_queue.put((1, time.time(), task))  # High priority for retry
-                logger.info(f"🔄 Tentativa {task.retry_count} para tarefa {task.id}")
+                retrying = True
+                self.metrics["tasks_retried"] += 1
+                self.retry_wheel.schedule(self.config.task_retry_delay, task)
+                self._retry_scheduled.set()
         
         finally:
             # Clean up
             if agent_instance:
-                agent_instance.status = AgentStatus.IDLE
-                agent_instance.current_task_id = None
-                agent_instance.last_activity = datetime.utcnow()
+                self._release_agent(agent_instance)
             
-            # Move task to completed
-            if task.id in self.active_tasks:
-                del self.active_tasks[task.id]
-            self.completed_tasks[task.id] = task
+            # Move task to completed (retried tasks stay active)
+            if not retrying:
+                self._finish_task(task)
     
     async def _execute_async(self, agent_instance: AgentInstance, task: AgentTask) -> Any:
         """Executar tarefa assíncrona"""
@@ -463,21 +1332,18 @@ class AgentPoolManager:
         if not self.process_pool:
             raise Exception("Process pool not available")
         
-        # Note: This is a simplified implementation
-        # For full process execution, we'd need to serialize agent state
-        raise NotImplementedError("Process execution not fully implemented")
-    
-    async def _get_available_agent(self, agent_type: str) -> Optional[AgentInstance]:
-        """Obter agente disponível"""
-        
-        if agent_type not in self.agent_pools:
-            return None
-        
-        for agent in self.agent_pools[agent_type]:
-            if agent.status == AgentStatus.IDLE:
-                return agent
+        # The pooled instance only bounds concurrency; the call runs on an
+        # instance owned by the worker process
+        factory = self.process_factories.get(task.agent_type, self.agent_factories.get(task.agent_type))
+        descriptor = ProcessTaskDescriptor(
+            target=factory,
+            method=task.method,
+            args=task.args,
+            kwargs=task.kwargs,
+            task_id=task.id
+        )
         
-        return None
+        return await self.process_pool.run(descriptor)
     
     async def _scale_up_pool(self, agent_type: str) -> bool:
         """Escalar pool para cima"""
@@ -486,13 +1352,13 @@ class AgentPoolManager:
             return False
         
         current_size = len(self.agent_pools[agent_type])
-        if current_size >= self.config.max_agents_per_type:
+        if current_size + self._pending_agents[agent_type] >= self.config.max_agents_per_type:
             return False
         
         # Create new agent
         new_agent = await self._create_agent_instance(agent_type)
         if new_agent:
-            self.agent_pools[agent_type].append(new_agent)
+            self._add_agent(new_agent)
             logger.info(f"✅ Pool '{agent_type}' escalado para {current_size + 1} agentes")
             return True
         
@@ -515,6 +1381,7 @@ class AgentPoolManager:
                 idle_time = (datetime.utcnow() - agent.last_activity).total_seconds()
                 if idle_time > self.config.agent_idle_timeout:
                     self.agent_pools[agent_type].pop(i)
+                    agent.status = AgentStatus.SHUTDOWN  # Skipped lazily by the free list
                     logger.info(f"✅ Pool '{agent_type}' reduzido para {current_size - 1} agentes")
                     return True
         
@@ -585,16 +1452,10 @@ class AgentPoolManager:
     async def _cleanup_completed_tasks(self):
         """Limpar tasks antigas"""
         
-        # Keep only last 1000 completed tasks
-        if len(self.completed_tasks) > 1000:
-            # Sort by completion time and keep newest 1000
-            sorted_tasks = sorted(
-                self.completed_tasks.items(),
-                key=lambda x: x[1].completed_at or datetime.min,
-                reverse=True
-            )
-            
-            self.completed_tasks = dict(sorted_tasks[:1000])
+        # Count and byte limits are enforced on insert; only TTL needs a sweep
+        removed = self.completed_tasks.purge_expired()
+        if removed:
+            logger.debug(f"🧹 {removed} resultados expirados removidos")
     
     def get_pool_status(self) -> Dict[str, Any]:
         """Obter status dos pools"""
@@ -602,9 +1463,11 @@ class AgentPoolManager:
         status = {
             "pools": {},
             "metrics": self.metrics.copy(),
-            "queue_size": self.task_queue.qsize(),
+            "queue_size": self.queued_task_count(),
             "active_tasks": len(self.active_tasks),
-            "completed_tasks": len(self.completed_tasks)
+            "completed_tasks": len(self.completed_tasks),
+            "result_store": self.completed_tasks.stats(),
+            "pending_retries": len(self.retry_wheel)
         }
         
         for agent_type, agents in self.agent_pools.items():
@@ -616,7 +1479,10 @@ class AgentPoolManager:
                 "avg_task_time": sum(a.average_task_time for a in agents) / len(agents) if agents else 0,
                 "total_tasks": sum(a.total_tasks for a in agents),
                 "successful_tasks": sum(a.successful_tasks for a in agents),
-                "failed_tasks": sum(a.failed_tasks for a in agents)
+                "failed_tasks": sum(a.failed_tasks for a in agents),
+                "queued_tasks": len(self.ready_queues.get(agent_type, ())),
+                "queue_wait": self._histogram(self.queue_wait_histograms, agent_type).snapshot(),
+                "execution": self._histogram(self.execution_histograms, agent_type).snapshot()
             }
             status["pools"][agent_type] = pool_status
         
@@ -634,6 +1500,8 @@ class AgentPoolManager:
             self._health_check_task.cancel()
         if self._cleanup_task:
             self._cleanup_task.cancel()
+        if self._retry_task:
+            self._retry_task.cancel()
         
         # Cancel worker tasks
         for task in self._worker_tasks:
@@ -649,6 +1517,13 @@ class AgentPoolManager:
         if self.process_pool:
             self.process_pool.shutdown(wait=True)
         
+        # Unblock callers still waiting on tasks that will never run
+        for future in self._task_futures.values():
+            if not future.done():
+                future.cancel()
+        self._task_futures.clear()
+        self.completed_tasks.clear()
+        
         logger.info("✅ Pool de agentes finalizado")
 
 
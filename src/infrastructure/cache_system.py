@@ -6,16 +6,17 @@ Multi-layer caching com Redis Cluster, invalidação inteligente e otimizações
 import asyncio
 import logging
 import time
-import hashlib
 import json
 import pickle
 import gzip
+import zlib
 from typing import Dict, List, Optional, Any, Union, Callable, Tuple
 from datetime import datetime, timedelta
 from contextlib import asynccontextmanager
 from enum import Enum
 import threading
 from dataclasses import dataclass, field
+from functools import wraps
 
 import redis.asyncio as redis
 from redis.asyncio.cluster import RedisCluster
@@ -26,6 +27,19 @@ import msgpack
 from pydantic import BaseModel, Field
 import structlog
 
+# Optional fast compression codecs
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+try:
+    import lz4.frame
+    LZ4_AVAILABLE = True
+except ImportError:
+    LZ4_AVAILABLE = False
+
 logger = structlog.get_logger(__name__)
 
 
@@ -54,6 +68,155 @@ class SerializationType(Enum):
     COMPRESSED = "compressed"
 
 
+class CompressionCodec(Enum):
+    """Codecs de compressão para valores do L2 (id gravado no cabeçalho)"""
+    NONE = 0
+    GZIP = 1
+    ZLIB = 2
+    LZ4 = 3
+    ZSTD = 4
+
+
+# Ids estáveis de serialização gravados no cabeçalho dos valores L2
+_SERIALIZATION_IDS = {
+    SerializationType.JSON: 1,
+    SerializationType.PICKLE: 2,
+    SerializationType.MSGPACK: 3,
+    SerializationType.COMPRESSED: 4,
+}
+_SERIALIZATION_BY_ID = {v: k for k, v in _SERIALIZATION_IDS.items()}
+
+
+class ValueCodec:
+    """
+    Codificação auto-descritiva de valores do L2.
+    
+    Cada valor gravado no Redis carrega um cabeçalho de 4 bytes:
+    ``MAGIC (2 bytes) | codec id (1 byte) | flags (1 byte)``, onde os flags
+    guardam o id da serialização. Assim a leitura não depende do nome da
+    chave (o antigo prefixo ``compressed:``) e basta um GET por chave.
+    
+    O codec é escolhido por valor conforme o tamanho: valores pequenos vão
+    sem compressão, médios usam o codec mais rápido disponível (lz4/zstd
+    nível 1/zlib nível 1) e grandes usam o de melhor taxa (zstd/gzip).
+    Valores sem cabeçalho são lidos como payload legado sem compressão.
+    """
+    
+    # 0x00 é um msgpack completo de 1 byte, pickle começa com 0x80 e gzip
+    # com 0x1f8b: nenhum payload legado com mais de 1 byte começa assim
+    MAGIC = b"\x00\xca"
+    HEADER_SIZE = 4
+    
+    def __init__(self,
+                 compression_threshold: int = 1024,
+                 large_value_threshold: int = 64 * 1024,
+                 enable_compression: bool = True,
+                 preferred_codec: Optional[CompressionCodec] = None):
+        self.compression_threshold = compression_threshold
+        self.large_value_threshold = large_value_threshold
+        self.enable_compression = enable_compression
+        self.preferred_codec = preferred_codec
+        
+        self._zstd_fast = zstandard.ZstdCompressor(level=1) if ZSTD_AVAILABLE else None
+        self._zstd_strong = zstandard.ZstdCompressor(level=6) if ZSTD_AVAILABLE else None
+        self._zstd_decompressor = zstandard.ZstdDecompressor() if ZSTD_AVAILABLE else None
+    
+    @staticmethod
+    def available_codecs() -> List[CompressionCodec]:
+        """Codecs utilizáveis neste processo"""
+        codecs = [CompressionCodec.NONE, CompressionCodec.GZIP, CompressionCodec.ZLIB]
+        if LZ4_AVAILABLE:
+            codecs.append(CompressionCodec.LZ4)
+        if ZSTD_AVAILABLE:
+            codecs.append(CompressionCodec.ZSTD)
+        return codecs
+    
+    def choose_codec(self, size: int) -> CompressionCodec:
+        """Escolher codec para um payload de ``size`` bytes"""
+        if not self.enable_compression or size <= self.compression_threshold:
+            return CompressionCodec.NONE
+        
+        if self.preferred_codec and self.preferred_codec in self.available_codecs():
+            return self.preferred_codec
+        
+        if size < self.large_value_threshold:
+            # Latência primeiro
+            if LZ4_AVAILABLE:
+                return CompressionCodec.LZ4
+            if ZSTD_AVAILABLE:
+                return CompressionCodec.ZSTD
+            return CompressionCodec.ZLIB
+        
+        # Taxa de compressão primeiro
+        if ZSTD_AVAILABLE:
+            return CompressionCodec.ZSTD
+        return CompressionCodec.GZIP
+    
+    def compress(self, payload: bytes, codec: CompressionCodec, large: bool = False) -> bytes:
+        """Comprimir payload com o codec informado"""
+        if codec == CompressionCodec.NONE:
+            return payload
+        if codec == CompressionCodec.GZIP:
+            return gzip.compress(payload, compresslevel=6)
+        if codec == CompressionCodec.ZLIB:
+            return zlib.compress(payload, 6 if large else 1)
+        if codec == CompressionCodec.LZ4:
+            return lz4.frame.compress(payload)
+        if codec == CompressionCodec.ZSTD:
+            compressor = self._zstd_strong if large else self._zstd_fast
+            return compressor.compress(payload)
+        raise ValueError(f"Codec desconhecido: {codec}")
+    
+    def decompress(self, data: bytes, codec: CompressionCodec) -> bytes:
+        """Descomprimir payload com o codec informado"""
+        if codec == CompressionCodec.NONE:
+            return data
+        if codec == CompressionCodec.GZIP:
+            return gzip.decompress(data)
+        if codec == CompressionCodec.ZLIB:
+            return zlib.decompress(data)
+        if codec == CompressionCodec.LZ4:
+            if not LZ4_AVAILABLE:
+                raise ValueError("Valor comprimido com lz4, mas lz4 não está instalado")
+            return lz4.frame.decompress(data)
+        if codec == CompressionCodec.ZSTD:
+            if not ZSTD_AVAILABLE:
+                raise ValueError("Valor comprimido com zstd, mas zstandard não está instalado")
+            return self._zstd_decompressor.decompress(data)
+        raise ValueError(f"Codec desconhecido: {codec}")
+    
+    def encode(self, payload: bytes, serialization: SerializationType) -> bytes:
+        """Montar valor L2: cabeçalho + payload (comprimido se compensar)"""
+        size = len(payload)
+        codec = self.choose_codec(size)
+        body = payload
+        
+        if codec != CompressionCodec.NONE:
+            compressed = self.compress(payload, codec, large=size >= self.large_value_threshold)
+            if len(compressed) < size:
+                body = compressed
+            else:
+                codec = CompressionCodec.NONE
+        
+        header = self.MAGIC + bytes((codec.value, _SERIALIZATION_IDS[serialization]))
+        return header + body
+    
+    def decode(self, raw: bytes) -> Tuple[bytes, Optional[SerializationType]]:
+        """
+        Abrir valor L2.
+        
+        Returns:
+            Tupla (payload serializado, serialização gravada). A serialização
+            é None para valores legados sem cabeçalho.
+        """
+        if len(raw) < self.HEADER_SIZE or raw[:2] != self.MAGIC:
+            return raw, None
+        
+        codec = CompressionCodec(raw[2])
+        serialization = _SERIALIZATION_BY_ID.get(raw[3])
+        return self.decompress(raw[self.HEADER_SIZE:], codec), serialization
+
+
 @dataclass
 class CacheEntry:
     """Entrada do cache"""
@@ -94,6 +257,8 @@ class CacheConfig(BaseModel):
     
     # Performance settings
     compression_threshold: int = 1024  # Compress values > 1KB
+    large_value_threshold: int = 65536  # Values >= 64KB favor ratio over speed
+    compression_codec: Optional[CompressionCodec] = None  # None = auto per value
     max_value_size_mb: int = 10
     batch_size: int = 100
     pipeline_size: int = 50
@@ -202,6 +367,14 @@ class AdvancedCacheManager:
             SerializationType.COMPRESSED: self._compressed_serializer()
         }
         
+        # Self-describing L2 value encoding
+        self.codec = ValueCodec(
+            compression_threshold=config.compression_threshold,
+            large_value_threshold=config.large_value_threshold,
+            enable_compression=config.enable_compression,
+            preferred_codec=config.compression_codec
+        )
+        
         # Cache entries tracking
         self.l1_entries: Dict[str, CacheEntry] = {}
         
@@ -538,11 +711,7 @@ class AdvancedCacheManager:
             if value is None:
                 return None
             
-            # Deserialize
-            serialization = serialization or self.config.default_serialization
-            serializer = self.serializers[serialization]
-            
-            return serializer.loads(value)
+            return self._decode_l2_value(value, serialization)
             
         except Exception as e:
             logger.error(f"❌ Erro ao deserializar {key}: {e}")
@@ -565,17 +734,7 @@ class AdvancedCacheManager:
             return False
         
         try:
-            # Serialize
-            serialization = serialization or self.config.default_serialization
-            serializer = self.serializers[serialization]
-            
-            serialized_value = serializer.dumps(value)
-            
-            # Compress if needed
-            if (self.config.enable_compression and 
-                len(serialized_value) > self.config.compression_threshold):
-                serialized_value = gzip.compress(serialized_value)
-                key = f"compressed:{key}"
+            serialized_value = self._encode_l2_value(value, serialization)
             
             # Set with TTL
             ttl = ttl or self.config.default_ttl
@@ -601,8 +760,6 @@ class AdvancedCacheManager:
         if self.l2_cache:
             try:
                 result = await self.l2_cache.delete(key)
-                # Also try compressed version
-                await self.l2_cache.delete(f"compressed:{key}")
                 return result > 0
             except Exception:
                 pass
@@ -625,34 +782,20 @@ class AdvancedCacheManager:
             return results
         
         try:
-            # Use pipeline for efficiency
+            # One GET per key: compression is described by the value header
             pipe = self.l2_cache.pipeline()
             for key in keys:
                 pipe.get(key)
-                pipe.get(f"compressed:{key}")  # Also check compressed version
             
             values = await pipe.execute()
             
-            # Process results
-            for i, key in enumerate(keys):
-                value = values[i * 2]  # Regular value
-                compressed_value = values[i * 2 + 1]  # Compressed value
-                
-                if compressed_value:
-                    # Decompress and deserialize
-                    try:
-                        decompressed = gzip.decompress(compressed_value)
-                        serializer = self.serializers[self.config.default_serialization]
-                        results[key] = serializer.loads(decompressed)
-                    except Exception:
-                        pass
-                elif value:
-                    # Regular deserialize
-                    try:
-                        serializer = self.serializers[self.config.default_serialization]
-                        results[key] = serializer.loads(value)
-                    except Exception:
-                        pass
+            for key, value in zip(keys, values):
+                if value is None:
+                    continue
+                try:
+                    results[key] = self._decode_l2_value(value)
+                except Exception as e:
+                    logger.error(f"❌ Erro ao deserializar {key}: {e}")
         
         except Exception as e:
             logger.error(f"❌ Erro batch get L2: {e}")
@@ -676,19 +819,10 @@ class AdvancedCacheManager:
             # Use pipeline for efficiency
             pipe = self.l2_cache.pipeline()
             ttl = ttl or self.config.default_ttl
-            serializer = self.serializers[self.config.default_serialization]
             
             for key, value in items.items():
                 try:
-                    serialized_value = serializer.dumps(value)
-                    
-                    # Compress if needed
-                    if (self.config.enable_compression and 
-                        len(serialized_value) > self.config.compression_threshold):
-                        serialized_value = gzip.compress(serialized_value)
-                        key = f"compressed:{key}"
-                    
-                    pipe.setex(key, ttl, serialized_value)
+                    pipe.setex(key, ttl, self._encode_l2_value(value))
                 
                 except Exception as e:
                     logger.error(f"❌ Erro ao serializar {key}: {e}")
@@ -705,6 +839,20 @@ class AdvancedCacheManager:
         serializer = self.serializers[serialization]
         return serializer.dumps(value)
     
+    def _encode_l2_value(self, value: Any, serialization: Optional[SerializationType] = None) -> bytes:
+        """Serializar e codificar valor para o L2 (cabeçalho + payload)"""
+        serialization = serialization or self.config.default_serialization
+        payload = self._serialize_value(value, serialization)
+        if isinstance(payload, str):
+            payload = payload.encode("utf-8")
+        return self.codec.encode(payload, serialization)
+    
+    def _decode_l2_value(self, raw: bytes, serialization: Optional[SerializationType] = None) -> Any:
+        """Decodificar valor do L2 usando a serialização gravada no cabeçalho"""
+        payload, stored_serialization = self.codec.decode(raw)
+        serialization = stored_serialization or serialization or self.config.default_serialization
+        return self.serializers[serialization].loads(payload)
+    
     async def _update_access_stats(self, key: str):
         """Atualizar estatísticas de acesso"""
         if key in self.l1_entries:
@@ -885,39 +1033,53 @@ class AdvancedCacheManager:
 
 
 # Decorators for caching
-def cached_result(ttl: int = 3600, key_prefix: str = "", tags: List[str] = None):
-    """Decorator para cache automático de resultados de função"""
+class _TaggedCacheBackend:
+    """Adapter exposing AdvancedCacheManager to ``cache_aside`` with fixed tags"""
+    
+    def __init__(self, manager: AdvancedCacheManager, tags: List[str]):
+        self.manager = manager
+        self.tags = tags
+    
+    async def get(self, key: str) -> Any:
+        return await self.manager.get(key)
+    
+    async def set(self, key: str, value: Any, ttl: int):
+        await self.manager.set(key, value, ttl, self.tags)
+
+
+def cached_result(ttl: int = 3600, key_prefix: str = "", tags: List[str] = None,
+                  negative_ttl: Optional[int] = 60, ttl_jitter: float = 0.1):
+    """
+    Decorator para cache automático de resultados de função.
+    
+    Usa o cache-aside unificado de ``src.core.cache``: chamadas concorrentes
+    com a mesma chave computam o valor uma única vez, resultados ``None``
+    são cacheados por ``negative_ttl`` segundos e os TTLs recebem jitter.
+    
+    Funções síncronas continuam suportadas como antes: a função decorada
+    passa a ser uma corrotina (``await f(...)``) que executa a original.
+    """
+    from src.core.cache import cache_aside
+    
+    async def backend_factory():
+        return _TaggedCacheBackend(await get_cache_manager(), tags or [])
     
     def decorator(func):
-        async def wrapper(*args, **kwargs):
-            # Generate cache key
-            key_parts = [key_prefix, func.__name__]
-            if args:
-                key_parts.append(hashlib.md5(str(args).encode()).hexdigest()[:8])
-            if kwargs:
-                key_parts.append(hashlib.md5(str(sorted(kwargs.items())).encode()).hexdigest()[:8])
-            
-            cache_key = ":".join(filter(None, key_parts))
-            
-            # Try to get from cache
-            cache_manager = await get_cache_manager()
-            result = await cache_manager.get(cache_key)
-            
-            if result is not None:
-                return result
-            
-            # Execute function
-            if asyncio.iscoroutinefunction(func):
-                result = await func(*args, **kwargs)
-            else:
-                result = func(*args, **kwargs)
-            
-            # Store in cache
-            await cache_manager.set(cache_key, result, ttl, tags or [])
-            
-            return result
-        
-        return wrapper
+        if asyncio.iscoroutinefunction(func):
+            target = func
+        else:
+            @wraps(func)
+            async def target(*args, **kwargs):
+                return func(*args, **kwargs)
+        
+        return cache_aside(
+            backend_factory=backend_factory,
+            ttl=ttl,
+            key_prefix=":".join(filter(None, [key_prefix, func.__name__])),
+            negative_ttl=negative_ttl,
+            ttl_jitter=ttl_jitter
+        )(target)
+    
     return decorator
 
 
@@ -32,6 +32,9 @@ from prometheus_client import Counter, Histogram, Gauge, CollectorRegistry, gene
 from pydantic import BaseModel, Field
 import structlog
 
+from src.core.histogram import HistogramCollector, HistogramFamily
+from src.core.profiling import set_span_exporter
+
 logger = structlog.get_logger(__name__)
 
 
@@ -98,6 +101,8 @@ class PerformanceMetrics(BaseModel):
     total_requests: int
     failed_requests: int
     average_response_time_ms: float
+    p95_response_time_ms: float = 0.0
+    p99_response_time_ms: float = 0.0
     
     # ML metrics
     ml_inference_time_ms: float
@@ -169,9 +174,12 @@ class ObservabilityManager:
         self.active_alerts: Dict[str, Alert] = {}
         self.alert_history: List[Alert] = []
         
-        # Performance tracking
-        self.request_times: List[float] = []
-        self.ml_inference_times: List[float] = []
+        # Performance tracking (histogramas log-bucketed, memória fixa)
+        self.request_latency = HistogramFamily()
+        self.ml_inference_latency = HistogramFamily()
+        self.failed_requests = 0
+        self._last_request_snapshot = self.request_latency.empty_snapshot()
+        self._last_ml_snapshot = self.ml_inference_latency.empty_snapshot()
         
         self._monitoring_task = None
         self._initialized = False
@@ -194,6 +202,9 @@ class ObservabilityManager:
             # Start monitoring loop
             await self._start_monitoring_loop()
             
+            # Latência e falhas de cada request da API
+            self._register_request_observer()
+            
             self._initialized = True
             logger.info("✅ Sistema de observabilidade inicializado")
             
@@ -203,6 +214,15 @@ class ObservabilityManager:
             logger.error(f"❌ Falha na inicialização do monitoramento: {e}")
             return False
     
+    def _register_request_observer(self):
+        """Receber duração, rota e status de cada request do LoggingMiddleware"""
+        try:
+            from src.api.middleware.logging_middleware import add_request_observer
+        except ImportError as e:
+            logger.warning(f"⚠️ Middleware da API indisponível, latência de requests não será coletada: {e}")
+            return
+        add_request_observer(self.track_request_time)
+    
     async def _setup_tracing(self):
         """Configurar distributed tracing"""
         
@@ -231,6 +251,9 @@ class ObservabilityManager:
         # Get tracer
         self.tracer = trace.get_tracer(__name__)
         
+        # Spans de profiling das investigações viram spans de tracing
+        set_span_exporter(self.trace_span)
+        
         # Auto-instrumentation
         FastAPIInstrumentor.instrument()
         HTTPXClientInstrumentor.instrument()
@@ -314,6 +337,20 @@ class ObservabilityManager:
             )
         }
         
+        # Latências por endpoint/modelo com quantis exatos dos histogramas
+        self.registry.register(HistogramCollector(
+            "http_request_latency_seconds",
+            "HTTP request latency (log-bucketed)",
+            self.request_latency,
+            label="endpoint"
+        ))
+        self.registry.register(HistogramCollector(
+            "ml_inference_latency_seconds",
+            "ML inference latency (log-bucketed)",
+            self.ml_inference_latency,
+            label="model"
+        ))
+        
         logger.info("✅ Métricas Prometheus configuradas")
     
     async def _setup_health_checks(self):
@@ -515,9 +552,14 @@ class ObservabilityManager:
             memory = psutil.virtual_memory()
             disk = psutil.disk_usage('/')
             
-            # Calculate averages
-            avg_response_time = sum(self.request_times[-100:]) / len(self.request_times[-100:]) if self.request_times else 0
-            avg_ml_time = sum(self.ml_inference_times[-50:]) / len(self.ml_inference_times[-50:]) if self.ml_inference_times else 0
+            # Latências do intervalo desde a última coleta
+            request_snapshot = self.request_latency.snapshot()
+            ml_snapshot = self.ml_inference_latency.snapshot()
+            interval_requests = request_snapshot.subtract(self._last_request_snapshot)
+            interval_ml = ml_snapshot.subtract(self._last_ml_snapshot)
+            self._last_request_snapshot = request_snapshot
+            self._last_ml_snapshot = ml_snapshot
+            request_quantiles = interval_requests.quantiles((0.95, 0.99))
             
             # Create metrics object
             metrics = PerformanceMetrics(
@@ -526,10 +568,12 @@ class ObservabilityManager:
                 memory_usage_percent=memory.percent,
                 disk_usage_percent=disk.percent,
                 active_investigations=len(getattr(self, '_active_investigations', [])),
-                total_requests=len(self.request_times),
-                failed_requests=0,  # TODO: track failed requests
-                average_response_time_ms=avg_response_time * 1000,
-                ml_inference_time_ms=avg_ml_time * 1000,
+                total_requests=request_snapshot.total,
+                failed_requests=self.failed_requests,
+                average_response_time_ms=interval_requests.mean * 1000,
+                p95_response_time_ms=request_quantiles[0.95] * 1000,
+                p99_response_time_ms=request_quantiles[0.99] * 1000,
+                ml_inference_time_ms=interval_ml.mean * 1000,
                 anomalies_detected=0,  # TODO: track anomalies
                 detection_accuracy=0.0,  # TODO: track accuracy
                 db_connections_active=0,  # TODO: get from DB manager
@@ -672,17 +716,21 @@ class ObservabilityManager:
                     span.set_attribute(key, value)
             yield span
     
-    def track_request_time(self, duration_seconds: float):
-        """Rastrear tempo de request"""
-        self.request_times.append(duration_seconds)
+    def track_request_time(
+        self,
+        duration_seconds: float,
+        endpoint: str = "all",
+        status_code: Optional[int] = None
+    ):
+        """Rastrear tempo de request (chamado pelo LoggingMiddleware para cada request)"""
+        self.request_latency.record(endpoint, duration_seconds)
         
-        # Keep only last 1000
-        if len(self.request_times) > 1000:
-            self.request_times = self.request_times[-1000:]
+        if status_code is not None and status_code >= 400:
+            self.failed_requests += 1
     
     def track_ml_inference_time(self, duration_seconds: float, model: str = "cidadao-gpt"):
         """Rastrear tempo de inferência ML"""
-        self.ml_inference_times.append(duration_seconds)
+        self.ml_inference_latency.record(model, duration_seconds)
         
         # Update Prometheus metric
         if "ml_inference_duration" in self.metrics:
@@ -691,9 +739,6 @@ class ObservabilityManager:
                 task="inference"
             ).observe(duration_seconds)
         
-        # Keep only last 500
-        if len(self.ml_inference_times) > 500:
-            self.ml_inference_times = self.ml_inference_times[-500:]
     
     def increment_anomaly_count(self, severity: str = "medium"):
         """Incrementar contador de anomalias"""
@@ -741,6 +786,8 @@ class ObservabilityManager:
                 "active_investigations": latest.active_investigations,
                 "total_requests": latest.total_requests,
                 "average_response_time_ms": latest.average_response_time_ms,
+                "p95_response_time_ms": latest.p95_response_time_ms,
+                "p99_response_time_ms": latest.p99_response_time_ms,
                 "ml_inference_time_ms": latest.ml_inference_time_ms
             },
             "alerts": {
@@ -757,6 +804,14 @@ class ObservabilityManager:
         """Cleanup de recursos"""
         
         try:
+            set_span_exporter(None)
+            
+            try:
+                from src.api.middleware.logging_middleware import remove_request_observer
+                remove_request_observer(self.track_request_time)
+            except ImportError:
+                pass
+            
             if self._monitoring_task:
                 self._monitoring_task.cancel()
                 try:
@@ -18,6 +18,7 @@ from pydantic import BaseModel, Field as PydanticField
 
 from src.core import get_logger, settings
 from src.core.exceptions import LLMError, LLMRateLimitError
+from src.core.profiling import record_external_call
 
 
 class LLMProvider(str, Enum):
@@ -146,6 +147,7 @@ class BaseLLMProvider(ABC):
                     attempt=attempt + 1,
                     stream=stream,
                 )
+                record_external_call("llm")
                 
                 if stream:
                     async with self.client.stream(
@@ -1,4 +1,4 @@
-"""Memory system for Cidado.AI agents.
+"""Memory system for Cidadão.AI agents.
 
 This module provides memory management capabilities for AI agents including:
 - Episodic memory for specific events and investigations
@@ -12,10 +12,14 @@ from .base import BaseMemory
 from .episodic import EpisodicMemory
 from .semantic import SemanticMemory
 from .conversational import ConversationalMemory
+from .vector_index import HashingEmbedder, LocalVectorStore, VectorIndex
 
 __all__ = [
     "BaseMemory",
     "EpisodicMemory", 
     "SemanticMemory",
-    "ConversationalMemory"
+    "ConversationalMemory",
+    "HashingEmbedder",
+    "LocalVectorStore",
+    "VectorIndex",
 ]
\ No newline at end of file
@@ -2,15 +2,18 @@
 
 from typing import Any, Dict, List, Optional
 from .base import BaseMemory
+from .vector_index import HashingEmbedder, VectorIndex
 
 
 class SemanticMemory(BaseMemory):
     """Memory for semantic knowledge and patterns."""
     
-    def __init__(self):
+    def __init__(self, embedder: Optional[Any] = None):
         super().__init__()
         self._knowledge_base: Dict[str, Dict] = {}
         self._patterns: List[Dict] = []
+        self._embedder = embedder or HashingEmbedder()
+        self._index = VectorIndex(self._embedder.dimension)
     
     async def store(self, key: str, value: Any, metadata: Optional[Dict] = None) -> bool:
         """Store semantic knowledge."""
@@ -23,6 +26,11 @@ class SemanticMemory(BaseMemory):
         
         self._knowledge_base[key] = knowledge_item
         self._storage[key] = knowledge_item
+        self._index.add(
+            [key],
+            self._embedder.embed([f"{key} {value}"]),
+            metadata=[{"type": knowledge_item["type"]}],
+        )
         
         # Store patterns separately
         if knowledge_item["type"] == "pattern":
@@ -36,23 +44,18 @@ class SemanticMemory(BaseMemory):
         return knowledge["value"] if knowledge else None
     
     async def search(self, query: str, limit: int = 10) -> List[Dict]:
-        """Search knowledge base by query (stub implementation)."""
-        # TODO: Implement vector-based semantic search
-        matching_items = []
-        query_lower = query.lower()
-        
-        for item in list(self._knowledge_base.values())[:limit]:
-            item_text = str(item.get("value", "")).lower()
-            if query_lower in item_text:
-                matching_items.append(item)
-        
-        return matching_items
+        """Search knowledge base by embedding similarity to the query."""
+        if not query:
+            return []
+        hits = self._index.search(self._embedder.embed_one(query), k=limit)
+        return [self._knowledge_base[hit.id] for hit in hits if hit.score > 0]
     
     async def clear(self) -> bool:
         """Clear all semantic memories."""
         self._knowledge_base.clear()
         self._patterns.clear()
         self._storage.clear()
+        self._index = VectorIndex(self._embedder.dimension)
         return True
     
     def get_patterns(self) -> List[Dict]:
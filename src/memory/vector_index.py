@@ -0,0 +1,523 @@
+"""Embedded vector index for agent memory similarity search.
+
+Vectors are kept L2-normalised in a single float32 matrix and compared by
+cosine similarity. Small indexes are searched exhaustively; once the number
+of live vectors reaches ``exact_threshold`` an inverted-file (IVF) index is
+trained with spherical k-means and only the ``n_probe`` closest clusters are
+scored. Deletes are tombstones, compacted once they pile up. ``save`` writes
+a ``.npy`` matrix plus a JSON sidecar that ``load`` memory-maps back.
+"""
+
+import json
+import math
+import os
+import re
+import unicodedata
+import zlib
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def _fold(text: str) -> str:
+    """Lowercase and strip accents so "licitação" matches "licitacao"."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+class HashingEmbedder:
+    """
+    Offline embeddings from hashed word and character-trigram features.
+
+    Deterministic across processes (CRC32, not ``hash()``), so persisted
+    indexes stay valid. Captures lexical rather than semantic similarity;
+    pass a model-backed embedder where one is available.
+    """
+
+    name = "hashing"
+
+    def __init__(self, dimension: int = 384, cache_size: int = 65536):
+        self.dimension = dimension
+        self._token_features = lru_cache(maxsize=cache_size)(self._hash_token)
+
+    def _hash_token(self, token: str) -> Tuple[np.ndarray, np.ndarray]:
+        padded = f"<{token}>"
+        grams = [token] + [padded[i:i + 3] for i in range(len(padded) - 2)]
+        indices = np.empty(len(grams), dtype=np.int64)
+        values = np.empty(len(grams), dtype=np.float32)
+        for i, gram in enumerate(grams):
+            h = zlib.crc32(gram.encode("utf-8"))
+            indices[i] = h % self.dimension
+            values[i] = (1.0 if i == 0 else 0.5) * (-1.0 if h & 0x80000000 else 1.0)
+        return indices, values
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            features = [self._token_features(t) for t in _TOKEN_RE.findall(_fold(text))]
+            if features:
+                np.add.at(
+                    out[row],
+                    np.concatenate([f[0] for f in features]),
+                    np.concatenate([f[1] for f in features]),
+                )
+        return _normalize(out)
+
+    def embed_one(self, text: str) -> np.ndarray:
+        return self.embed([text])[0]
+
+
+class SentenceTransformerEmbedder:
+    """Model-backed embeddings; requires ``sentence-transformers`` and the model files."""
+
+    def __init__(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2"):
+        from sentence_transformers import SentenceTransformer
+
+        self.name = model_name
+        self._model = SentenceTransformer(model_name)
+        self.dimension = self._model.get_sentence_embedding_dimension()
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = self._model.encode(list(texts), convert_to_numpy=True, show_progress_bar=False)
+        return _normalize(np.asarray(vectors, dtype=np.float32))
+
+    def embed_one(self, text: str) -> np.ndarray:
+        return self.embed([text])[0]
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+_MISSING = object()
+
+
+def _lookup(metadata: Dict[str, Any], key: str) -> Any:
+    value: Any = metadata
+    for part in key.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return _MISSING
+        value = value[part]
+    return value
+
+
+def matches_filter(metadata: Optional[Dict[str, Any]], conditions: Optional[Dict[str, Any]]) -> bool:
+    """
+    Mongo-style metadata filter.
+
+    Keys may be dotted paths into nested dicts. Values are matched by
+    equality (membership when the stored value is a list) or with the
+    operators ``$exists``, ``$eq``, ``$ne``, ``$in`` and ``$nin``.
+    """
+    if not conditions:
+        return True
+    metadata = metadata or {}
+    for key, expected in conditions.items():
+        value = _lookup(metadata, key)
+        if isinstance(expected, dict) and expected and all(k.startswith("$") for k in expected):
+            for op, operand in expected.items():
+                if op == "$exists":
+                    if (value is not _MISSING) != bool(operand):
+                        return False
+                elif op == "$eq":
+                    if not _equals(value, operand):
+                        return False
+                elif op == "$ne":
+                    if _equals(value, operand):
+                        return False
+                elif op == "$in":
+                    if not any(_equals(value, option) for option in operand):
+                        return False
+                elif op == "$nin":
+                    if any(_equals(value, option) for option in operand):
+                        return False
+                else:
+                    raise ValueError(f"Unsupported filter operator: {op}")
+        elif not _equals(value, expected):
+            return False
+    return True
+
+
+def _equals(value: Any, expected: Any) -> bool:
+    if value is _MISSING:
+        return False
+    if isinstance(value, list) and not isinstance(expected, list):
+        return expected in value
+    return value == expected
+
+
+class SearchResult(NamedTuple):
+    id: str
+    score: float
+    metadata: Dict[str, Any]
+    document: Optional[str]
+
+
+class _InvertedLists:
+    """IVF cluster centroids and the rows assigned to each cluster."""
+
+    def __init__(self, centroids: np.ndarray):
+        self.centroids = centroids
+        self._rows: List[List[int]] = [[] for _ in range(len(centroids))]
+        self._arrays: List[Optional[np.ndarray]] = [None] * len(centroids)
+
+    def assign(self, vectors: np.ndarray, rows: np.ndarray, chunk: int = 8192):
+        """Append ``rows`` (whose vectors are ``vectors[rows]``) to their nearest cluster."""
+        for start in range(0, len(rows), chunk):
+            block = rows[start:start + chunk]
+            labels = np.argmax(vectors[block] @ self.centroids.T, axis=1)
+            for row, label in zip(block.tolist(), labels.tolist()):
+                self._rows[label].append(row)
+                self._arrays[label] = None
+
+    def candidates(self, query: np.ndarray, n_probe: int) -> np.ndarray:
+        n_probe = min(n_probe, len(self.centroids))
+        closeness = self.centroids @ query
+        probed = np.argpartition(-closeness, n_probe - 1)[:n_probe]
+        arrays = []
+        for label in probed.tolist():
+            array = self._arrays[label]
+            if array is None:
+                array = self._arrays[label] = np.asarray(self._rows[label], dtype=np.int64)
+            arrays.append(array)
+        return np.concatenate(arrays) if arrays else np.empty(0, dtype=np.int64)
+
+
+class VectorIndex:
+    """
+    Cosine-similarity index with exact and IVF search.
+
+    Args:
+        dimension: Vector dimension
+        exact_threshold: Live vectors below which search is exhaustive
+        n_probe: IVF clusters scored per query
+        kmeans_iterations: Lloyd iterations when training the IVF centroids
+        seed: Seed for the k-means sample and initialisation
+    """
+
+    def __init__(
+        self,
+        dimension: int,
+        exact_threshold: int = 20000,
+        n_probe: int = 16,
+        kmeans_iterations: int = 10,
+        seed: int = 0,
+    ):
+        self.dimension = dimension
+        self.exact_threshold = exact_threshold
+        self.n_probe = n_probe
+        self.kmeans_iterations = kmeans_iterations
+        self.seed = seed
+        self._vectors = np.zeros((0, dimension), dtype=np.float32)
+        self._alive = np.zeros(0, dtype=bool)
+        self._size = 0
+        self._ids: List[Optional[str]] = []
+        self._metadata: List[Optional[Dict[str, Any]]] = []
+        self._documents: List[Optional[str]] = []
+        self._rows: Dict[str, int] = {}
+        self._ivf: Optional[_InvertedLists] = None
+        self._ivf_trained_on = 0
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, id: str) -> bool:
+        return id in self._rows
+
+    @property
+    def uses_ivf(self) -> bool:
+        return len(self._rows) >= self.exact_threshold
+
+    def add(
+        self,
+        ids: Sequence[str],
+        vectors: np.ndarray,
+        metadata: Optional[Sequence[Optional[Dict[str, Any]]]] = None,
+        documents: Optional[Sequence[Optional[str]]] = None,
+    ) -> None:
+        """Insert or replace vectors by id; within one batch the last entry for an id wins."""
+        vectors = _normalize(np.atleast_2d(vectors))
+        if vectors.shape != (len(ids), self.dimension):
+            raise ValueError(f"Expected {len(ids)} vectors of dimension {self.dimension}, got {vectors.shape}")
+        metadata = list(metadata) if metadata is not None else [None] * len(ids)
+        documents = list(documents) if documents is not None else [None] * len(ids)
+
+        last = {id: position for position, id in enumerate(ids)}
+        if len(last) < len(ids):
+            keep = sorted(last.values())
+            ids = [ids[i] for i in keep]
+            vectors = vectors[keep]
+            metadata = [metadata[i] for i in keep]
+            documents = [documents[i] for i in keep]
+
+        replaced = [id for id in ids if id in self._rows]
+        if replaced:
+            self.delete(replaced, compact=False)
+
+        self._reserve(self._size + len(ids))
+        first = self._size
+        self._vectors[first:first + len(ids)] = vectors
+        self._alive[first:first + len(ids)] = True
+        for offset, id in enumerate(ids):
+            self._rows[id] = first + offset
+        self._ids.extend(ids)
+        self._metadata.extend(dict(m) if m else {} for m in metadata)
+        self._documents.extend(documents)
+        self._size += len(ids)
+
+        if self._ivf is not None:
+            self._ivf.assign(self._vectors, np.arange(first, self._size))
+
+    def delete(self, ids: Iterable[str], compact: bool = True) -> int:
+        """Remove vectors by id; unknown ids are ignored."""
+        removed = 0
+        for id in ids:
+            row = self._rows.pop(id, None)
+            if row is None:
+                continue
+            self._alive[row] = False
+            self._metadata[row] = None
+            self._documents[row] = None
+            removed += 1
+        if compact and self._size - len(self._rows) > max(1024, self._size // 4):
+            self.compact()
+        return removed
+
+    def get(self, id: str) -> Optional[SearchResult]:
+        row = self._rows.get(id)
+        if row is None:
+            return None
+        return SearchResult(id, 1.0, self._metadata[row], self._documents[row])
+
+    def compact(self) -> None:
+        """Drop tombstoned rows, keeping the trained IVF centroids."""
+        keep = np.flatnonzero(self._alive[:self._size])
+        self._vectors = np.ascontiguousarray(self._vectors[keep])
+        self._alive = np.ones(len(keep), dtype=bool)
+        self._ids = [self._ids[row] for row in keep.tolist()]
+        self._metadata = [self._metadata[row] for row in keep.tolist()]
+        self._documents = [self._documents[row] for row in keep.tolist()]
+        self._rows = {id: row for row, id in enumerate(self._ids)}
+        self._size = len(keep)
+        if self._ivf is not None:
+            self._ivf = _InvertedLists(self._ivf.centroids)
+            self._ivf.assign(self._vectors, np.arange(self._size))
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int = 10,
+        filter: Optional[Dict[str, Any]] = None,
+        exact: Optional[bool] = None,
+    ) -> List[SearchResult]:
+        """
+        Top-``k`` live vectors by cosine similarity to ``query``.
+
+        ``exact`` forces (True) or forbids (False) the exhaustive scan; by
+        default it is used below ``exact_threshold``. Filtered IVF searches
+        widen the probe until ``k`` matches are found or every cluster has
+        been scored.
+        """
+        if k <= 0 or not self._rows:
+            return []
+        query = _normalize(np.asarray(query, dtype=np.float32).reshape(-1))
+        if query.shape[0] != self.dimension:
+            raise ValueError(f"Query dimension {query.shape[0]} != {self.dimension}")
+
+        if exact is None:
+            exact = not self.uses_ivf
+        if exact:
+            scores = self._vectors[:self._size] @ query
+            scores[~self._alive[:self._size]] = -np.inf
+            return self._select(np.arange(self._size), scores, k, filter)
+
+        ivf = self._ensure_ivf()
+        n_probe = self.n_probe
+        while True:
+            rows = ivf.candidates(query, n_probe)
+            rows = rows[self._alive[rows]]
+            scores = self._vectors[rows] @ query
+            results = self._select(rows, scores, k, filter)
+            if len(results) >= k or n_probe >= len(ivf.centroids):
+                return results
+            n_probe *= 2
+
+    def _select(self, rows: np.ndarray, scores: np.ndarray, k: int, filter: Optional[Dict[str, Any]]) -> List[SearchResult]:
+        if filter is None and len(scores) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+            order = top[np.argsort(-scores[top], kind="stable")]
+        else:
+            order = np.argsort(-scores, kind="stable")
+
+        results: List[SearchResult] = []
+        for position in order.tolist():
+            score = float(scores[position])
+            if score == -np.inf:
+                break
+            row = int(rows[position])
+            if filter is not None and not matches_filter(self._metadata[row], filter):
+                continue
+            results.append(SearchResult(self._ids[row], score, self._metadata[row], self._documents[row]))
+            if len(results) == k:
+                break
+        return results
+
+    def _reserve(self, rows: int) -> None:
+        capacity = len(self._vectors)
+        if rows <= capacity:
+            return
+        capacity = max(rows, capacity * 2, 64)
+        vectors = np.zeros((capacity, self.dimension), dtype=np.float32)
+        vectors[:self._size] = self._vectors[:self._size]
+        alive = np.zeros(capacity, dtype=bool)
+        alive[:self._size] = self._alive[:self._size]
+        # Also moves a memory-mapped matrix into RAM on the first add after load
+        self._vectors, self._alive = vectors, alive
+
+    def _ensure_ivf(self) -> _InvertedLists:
+        live = len(self._rows)
+        if self._ivf is None or live > 4 * self._ivf_trained_on:
+            self.train(live)
+        return self._ivf
+
+    def train(self, expected_size: Optional[int] = None) -> None:
+        """(Re)train the IVF centroids with spherical k-means on a sample."""
+        live_rows = np.flatnonzero(self._alive[:self._size])
+        n_lists = int(np.clip(2 * math.sqrt(expected_size or len(live_rows)), 8, 4096))
+        n_lists = min(n_lists, len(live_rows))
+        rng = np.random.default_rng(self.seed)
+        sample_size = min(len(live_rows), 64 * n_lists)
+        sample = np.asarray(self._vectors[rng.choice(live_rows, sample_size, replace=False)])
+
+        centroids = sample[rng.choice(sample_size, n_lists, replace=False)].copy()
+        for _ in range(self.kmeans_iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            empty = np.bincount(labels, minlength=n_lists) == 0
+            sums[empty] = centroids[empty]
+            centroids = _normalize(sums)
+
+        self._ivf = _InvertedLists(centroids)
+        self._ivf.assign(self._vectors, live_rows)
+        self._ivf_trained_on = len(live_rows)
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Write ``<path>.npy`` and ``<path>.json`` atomically."""
+        if self._size != len(self._rows):
+            self.compact()
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        vectors_path, meta_path = _paths(path)
+
+        tmp_vectors = vectors_path.with_name(vectors_path.name + ".tmp")
+        with open(tmp_vectors, "wb") as f:
+            np.save(f, np.asarray(self._vectors[:self._size]))
+        sidecar = {
+            "dimension": self.dimension,
+            "exact_threshold": self.exact_threshold,
+            "n_probe": self.n_probe,
+            "ids": self._ids,
+            "metadata": self._metadata,
+            "documents": self._documents,
+        }
+        tmp_meta = meta_path.with_name(meta_path.name + ".tmp")
+        with open(tmp_meta, "w", encoding="utf-8") as f:
+            json.dump(sidecar, f, ensure_ascii=False, default=str)
+        os.replace(tmp_vectors, vectors_path)
+        os.replace(tmp_meta, meta_path)
+
+    @classmethod
+    def load(cls, path: Union[str, Path], mmap: bool = True, **kwargs) -> "VectorIndex":
+        """Open an index written by ``save``; vectors stay memory-mapped until the next add."""
+        vectors_path, meta_path = _paths(Path(path))
+        with open(meta_path, encoding="utf-8") as f:
+            sidecar = json.load(f)
+        options = {"exact_threshold": sidecar["exact_threshold"], "n_probe": sidecar["n_probe"], **kwargs}
+        index = cls(sidecar["dimension"], **options)
+        vectors = np.load(vectors_path, mmap_mode="r" if mmap else None)
+        if vectors.shape != (len(sidecar["ids"]), index.dimension):
+            raise ValueError(f"Index files at {path} are inconsistent")
+        index._vectors = vectors
+        index._alive = np.ones(len(vectors), dtype=bool)
+        index._size = len(vectors)
+        index._ids = sidecar["ids"]
+        index._metadata = sidecar["metadata"]
+        index._documents = sidecar["documents"]
+        index._rows = {id: row for row, id in enumerate(index._ids)}
+        return index
+
+
+def _paths(path: Path) -> Tuple[Path, Path]:
+    return path.with_name(path.name + ".npy"), path.with_name(path.name + ".json")
+
+
+def exists(path: Union[str, Path]) -> bool:
+    return all(p.exists() for p in _paths(Path(path)))
+
+
+class LocalVectorStore:
+    """
+    Async document store over ``VectorIndex`` with the interface the memory
+    agent expects (``add_documents`` / ``similarity_search`` / ``delete``).
+    Persists to ``path`` on ``close`` when a path is given.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Union[str, Path]] = None,
+        embedder: Optional[Any] = None,
+        **index_options: Any,
+    ):
+        self.path = Path(path) if path is not None else None
+        self.embedder = embedder or HashingEmbedder()
+        self.index = VectorIndex(self.embedder.dimension, **index_options)
+        self._index_options = index_options
+
+    async def initialize(self) -> None:
+        if self.path is not None and exists(self.path):
+            index = VectorIndex.load(self.path, **self._index_options)
+            if index.dimension != self.embedder.dimension:
+                raise ValueError(
+                    f"Index at {self.path} has dimension {index.dimension}, "
+                    f"embedder produces {self.embedder.dimension}"
+                )
+            self.index = index
+
+    async def close(self) -> None:
+        if self.path is not None:
+            self.index.save(self.path)
+
+    async def add_documents(self, documents: List[Dict[str, Any]]) -> List[str]:
+        ids = [str(doc["id"]) for doc in documents]
+        contents = [str(doc.get("content", "")) for doc in documents]
+        self.index.add(
+            ids,
+            self.embedder.embed(contents),
+            metadata=[doc.get("metadata") for doc in documents],
+            documents=contents,
+        )
+        return ids
+
+    async def similarity_search(
+        self,
+        query: str,
+        limit: int = 5,
+        filter_metadata: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        hits = self.index.search(self.embedder.embed_one(query), k=limit, filter=filter_metadata)
+        return [
+            {"id": hit.id, "score": hit.score, "content": hit.document, "metadata": hit.metadata}
+            for hit in hits
+        ]
+
+    async def delete(self, ids: Iterable[str]) -> int:
+        return self.index.delete(ids)
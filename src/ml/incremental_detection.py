@@ -0,0 +1,401 @@
+"""
+Module: ml.incremental_detection
+Description: Incremental aggregates for re-running contract anomaly detection
+Author: Anderson H. Silva
+Date: 2025-01-26
+License: Proprietary - All rights reserved
+"""
+
+import hashlib
+import json
+import math
+import os
+import pickle
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+import numpy as np
+
+from src.core import get_logger
+
+
+logger = get_logger(__name__)
+
+
+def contract_fingerprint(contract: Dict[str, Any]) -> str:
+    """Content hash of a contract record; any field change gives a new fingerprint."""
+    payload = json.dumps(contract, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def contract_value(contract: Dict[str, Any]) -> Any:
+    """``valorInicial`` falling back to ``valorGlobal``, as the detectors read it."""
+    return contract.get("valorInicial") or contract.get("valorGlobal")
+
+
+@dataclass(frozen=True)
+class ContractFeatures:
+    """What each detector reads from one contract, extracted once."""
+
+    fingerprint: str
+    price: Optional[float]          # positive numeric value, for z-scores
+    value: Optional[float]          # numeric value (0 when missing), None when not numeric
+    vendor_key: str
+    vendor_name: str
+    vendor_cnpj: str
+    month: Optional[str]            # YYYY-MM of the signing/publication date
+    words: Optional[frozenset]      # description words, None when too short to compare
+
+
+def _month(contract: Dict[str, Any]) -> Optional[str]:
+    date_str = contract.get("dataAssinatura") or contract.get("dataPublicacao") or contract.get("dataInicio")
+    if not date_str:
+        return None
+    try:
+        parts = date_str.split("/")
+        if len(parts) != 3:
+            return None
+        int(parts[0])
+        return f"{int(parts[2])}-{int(parts[1]):02d}"
+    except (ValueError, AttributeError):
+        return None
+
+
+def extract_features(
+    contract: Dict[str, Any],
+    fingerprint: Optional[str] = None,
+    min_description_length: int = 20,
+) -> ContractFeatures:
+    raw = contract_value(contract)
+    price = float(raw) if raw and isinstance(raw, (int, float)) and raw > 0 else None
+    value = raw or 0
+    supplier = contract.get("fornecedor", {})
+    vendor_name = supplier.get("nome", "Unknown")
+    vendor_cnpj = supplier.get("cnpj", "Unknown")
+    objeto = contract.get("objeto", "").lower()
+    return ContractFeatures(
+        fingerprint=fingerprint if fingerprint is not None else contract_fingerprint(contract),
+        price=price,
+        value=float(value) if isinstance(value, (int, float)) else None,
+        vendor_key=f"{vendor_name}|{vendor_cnpj}",
+        vendor_name=vendor_name,
+        vendor_cnpj=vendor_cnpj,
+        month=_month(contract),
+        words=frozenset(objeto.split()) if len(objeto) >= min_description_length else None,
+    )
+
+
+class DetectionDelta(NamedTuple):
+    """How the current input differs from what the state last saw, by contract key."""
+
+    added: List[str]
+    changed: List[str]
+    removed: List[str]
+    unchanged: int
+
+    @property
+    def empty(self) -> bool:
+        return not (self.added or self.changed or self.removed)
+
+
+class PriceBaseline(NamedTuple):
+    count: int
+    mean: float
+    std: float
+
+
+class SimilarityIndex:
+    """
+    Exact near-duplicate search over word sets (Jaccard > threshold).
+
+    Uses prefix filtering: with overlap o >= ceil(t*|x|), the first
+    |x| - o + 1 tokens of a set in a fixed global order always contain the
+    smallest common token, so only sets sharing a prefix token are
+    compared. The order puts recently first-seen tokens first; ranks never
+    change, and common words (seen early) rarely end up in a prefix, which
+    keeps the candidate lists short.
+    """
+
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+        self._words: Dict[str, frozenset] = {}
+        self._index: Dict[str, Set[str]] = {}
+        self._rank: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+    def _prefix(self, words: frozenset) -> List[str]:
+        ranks = self._rank
+        for word in words:
+            if word not in ranks:
+                ranks[word] = -len(ranks)
+        required = math.ceil(self.threshold * len(words) - 1e-9)
+        return sorted(words, key=ranks.__getitem__)[:len(words) - required + 1]
+
+    def add(self, key: str, words: frozenset) -> List[Tuple[str, float]]:
+        """Index ``words`` under ``key``; returns the already indexed keys it is similar to."""
+        prefix = self._prefix(words)
+        candidates: Set[str] = set()
+        for token in prefix:
+            candidates.update(self._index.get(token, ()))
+
+        matches = []
+        size = len(words)
+        for other in candidates:
+            other_words = self._words[other]
+            # Jaccard > t needs the smaller set to be more than t of the larger
+            if min(size, len(other_words)) < self.threshold * max(size, len(other_words)):
+                continue
+            intersection = len(words & other_words)
+            union = size + len(other_words) - intersection
+            similarity = intersection / union if union > 0 else 0
+            if similarity > self.threshold:
+                matches.append((other, similarity))
+
+        self._words[key] = words
+        for token in prefix:
+            self._index.setdefault(token, set()).add(key)
+        return matches
+
+    def remove(self, key: str):
+        words = self._words.pop(key)
+        for token in self._prefix(words):
+            self._index[token].discard(key)
+
+
+class IncrementalDetectionState:
+    """
+    Detector inputs for one investigation scope, maintained under deltas.
+
+    Contracts are keyed by id (or fingerprint when they have none). On each
+    ``update`` only added, changed and removed contracts touch the
+    aggregates:
+
+    - price baseline: running count/sum/sum of squares of positive values
+      (shifted by the first value seen, to keep the variance stable), plus
+      a slot array so z-scores are one vectorized pass;
+    - vendor totals and the overall total, for concentration shares;
+    - per-month counts and totals;
+    - near-duplicate description pairs, through a ``SimilarityIndex`` so a
+      new or changed contract is only compared with plausible candidates
+      instead of with every contract.
+
+    ``positions`` holds each contract's index in the latest input, so pairs
+    can be reported in the same order as a full recompute.
+
+    Per-contract detector outputs (``cached``/``store``) are dropped for
+    changed contracts only; per-group outputs (``group_result``) are reused
+    while the input is unchanged.
+
+    ``save``/``load`` persist the state so it outlives the process.
+    """
+
+    def __init__(self, duplicate_threshold: float, min_description_length: int = 20):
+        self.duplicate_threshold = duplicate_threshold
+        self.min_description_length = min_description_length
+        self.contracts: Dict[str, Dict[str, Any]] = {}
+        self.features: Dict[str, ContractFeatures] = {}
+        self.positions: Dict[str, int] = {}
+        self.version = 0
+
+        self._slots: Dict[str, int] = {}
+        self._slot_keys: List[Optional[str]] = []
+        self._free: List[int] = []
+        self._prices = np.empty(0, dtype=np.float64)
+        self._shift: Optional[float] = None
+        self._price_count = 0
+        self._price_sum = 0.0
+        self._price_sumsq = 0.0
+
+        self.vendor_stats: Dict[str, Dict[str, Any]] = {}
+        self.total_value = 0.0
+        self.month_stats: Dict[str, Dict[str, float]] = {}
+
+        self.duplicate_pairs: Dict[Tuple[str, str], float] = {}
+        self._pairs_by_key: Dict[str, Set[Tuple[str, str]]] = {}
+        self._similarity = SimilarityIndex(duplicate_threshold)
+
+        self._per_contract: Dict[str, Dict[str, Any]] = {}
+        self._per_group: Dict[str, Tuple[int, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self.contracts)
+
+    # Updating ------------------------------------------------------------
+
+    def update(self, contracts: Iterable[Dict[str, Any]]) -> DetectionDelta:
+        """Make the state describe exactly ``contracts``; returns what changed."""
+        incoming: Dict[str, Tuple[Dict[str, Any], str]] = {}
+        for contract in contracts:
+            fingerprint = contract_fingerprint(contract)
+            contract_id = contract.get("id")
+            key = f"id:{contract_id}" if contract_id is not None else f"fp:{fingerprint}"
+            incoming[key] = (contract, fingerprint)
+
+        removed = [key for key in self.contracts if key not in incoming]
+        added, changed = [], []
+        for key, (_, fingerprint) in incoming.items():
+            current = self.features.get(key)
+            if current is None:
+                added.append(key)
+            elif current.fingerprint != fingerprint:
+                changed.append(key)
+
+        for key in removed + changed:
+            self._remove(key)
+        for key in added + changed:
+            contract, fingerprint = incoming[key]
+            self._add(key, contract, fingerprint)
+
+        self.positions = {key: position for position, key in enumerate(incoming)}
+        delta = DetectionDelta(added, changed, removed, len(incoming) - len(added) - len(changed))
+        if not delta.empty:
+            self.version += 1
+        return delta
+
+    def _add(self, key: str, contract: Dict[str, Any], fingerprint: str):
+        features = extract_features(contract, fingerprint, self.min_description_length)
+        self.contracts[key] = contract
+        self.features[key] = features
+
+        slot = self._free.pop() if self._free else len(self._slot_keys)
+        if slot == len(self._slot_keys):
+            self._slot_keys.append(None)
+            if slot >= len(self._prices):
+                grown = np.full(max(64, 2 * len(self._prices)), np.nan)
+                grown[:len(self._prices)] = self._prices
+                self._prices = grown
+        self._slots[key] = slot
+        self._slot_keys[slot] = key
+        self._prices[slot] = np.nan if features.price is None else features.price
+        if features.price is not None:
+            if self._shift is None:
+                self._shift = features.price
+            shifted = features.price - self._shift
+            self._price_count += 1
+            self._price_sum += shifted
+            self._price_sumsq += shifted * shifted
+
+        if features.value is not None:
+            self.total_value += features.value
+            stats = self.vendor_stats.setdefault(features.vendor_key, {
+                "name": features.vendor_name,
+                "cnpj": features.vendor_cnpj,
+                "total_value": 0.0,
+                "contract_count": 0,
+            })
+            stats["total_value"] += features.value
+            stats["contract_count"] += 1
+
+        if features.month is not None:
+            month = self.month_stats.setdefault(features.month, {"count": 0, "total_value": 0.0})
+            month["count"] += 1
+            month["total_value"] += features.value or 0.0
+
+        if features.words:
+            for other, similarity in self._similarity.add(key, features.words):
+                pair = (min(key, other), max(key, other))
+                self.duplicate_pairs[pair] = similarity
+                self._pairs_by_key.setdefault(key, set()).add(pair)
+                self._pairs_by_key.setdefault(other, set()).add(pair)
+
+    def _remove(self, key: str):
+        features = self.features.pop(key)
+        self.contracts.pop(key)
+        self._per_contract.pop(key, None)
+
+        slot = self._slots.pop(key)
+        self._slot_keys[slot] = None
+        self._prices[slot] = np.nan
+        self._free.append(slot)
+        if features.price is not None:
+            shifted = features.price - self._shift
+            self._price_count -= 1
+            self._price_sum -= shifted
+            self._price_sumsq -= shifted * shifted
+            if not self._price_count:
+                self._shift = None
+                self._price_sum = self._price_sumsq = 0.0
+
+        if features.value is not None:
+            self.total_value -= features.value
+            stats = self.vendor_stats[features.vendor_key]
+            stats["total_value"] -= features.value
+            stats["contract_count"] -= 1
+            if not stats["contract_count"]:
+                del self.vendor_stats[features.vendor_key]
+
+        if features.month is not None:
+            month = self.month_stats[features.month]
+            month["count"] -= 1
+            month["total_value"] -= features.value or 0.0
+            if not month["count"]:
+                del self.month_stats[features.month]
+
+        if features.words:
+            self._similarity.remove(key)
+            for pair in self._pairs_by_key.pop(key, set()):
+                self.duplicate_pairs.pop(pair, None)
+                other = pair[0] if pair[1] == key else pair[1]
+                self._pairs_by_key.get(other, set()).discard(pair)
+
+    # Reading -------------------------------------------------------------
+
+    def price_baseline(self) -> Optional[PriceBaseline]:
+        if not self._price_count:
+            return None
+        n = self._price_count
+        mean = self._price_sum / n
+        variance = max(self._price_sumsq / n - mean * mean, 0.0)
+        return PriceBaseline(n, mean + self._shift, math.sqrt(variance))
+
+    def price_outliers(self, threshold: float, min_samples: int = 10) -> List[Tuple[str, float, float]]:
+        """``(key, value, z_score)`` for contracts above ``threshold`` deviations."""
+        baseline = self.price_baseline()
+        if baseline is None or baseline.count < min_samples or not baseline.std:
+            return []
+        prices = self._prices[:len(self._slot_keys)]
+        with np.errstate(invalid="ignore"):
+            z_scores = np.abs((prices - baseline.mean) / baseline.std)
+            flagged = np.flatnonzero(z_scores > threshold)
+        return [(self._slot_keys[i], float(prices[i]), float(z_scores[i])) for i in flagged]
+
+    def price_percentile(self, q: float) -> float:
+        return float(np.nanpercentile(self._prices[:len(self._slot_keys)], q))
+
+    def cached(self, detector: str, key: str, default: Any = None) -> Any:
+        return self._per_contract.get(key, {}).get(detector, default)
+
+    def store(self, detector: str, key: str, result: Any):
+        self._per_contract.setdefault(key, {})[detector] = result
+
+    def group_result(self, detector: str) -> Optional[Any]:
+        """A per-group output computed at the current version, if any."""
+        cached = self._per_group.get(detector)
+        return cached[1] if cached is not None and cached[0] == self.version else None
+
+    def store_group_result(self, detector: str, result: Any):
+        self._per_group[detector] = (self.version, result)
+
+    def save(self, path: Path):
+        """Write the state to ``path`` atomically."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        staging = path.with_name(f".{path.name}.tmp")
+        with open(staging, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(staging, path)
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["IncrementalDetectionState"]:
+        """State saved at ``path``, or None when missing or unreadable."""
+        try:
+            with open(path, "rb") as f:
+                state = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning("incremental_state_unreadable", path=str(path), error=str(e))
+            return None
+        return state if isinstance(state, cls) else None
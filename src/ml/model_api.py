@@ -9,7 +9,7 @@ from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks, File, Uplo
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse, FileResponse
 from pydantic import BaseModel, Field
-from typing import Dict, List, Optional, Union, Generator
+from typing import Dict, List, Optional, Union, Generator, Tuple
 import asyncio
 import torch
 import json
@@ -157,8 +157,7 @@ class CidadaoAIManager:
                 logger.info("✅ Modelo base criado")
             
             # Carregar tokenizer
-            self.tokenizer = AutoTokenizer.from_pretrained("microsoft/DialoGPT-medium")
-            self.tokenizer.pad_token = self.tokenizer.eos_token
+            self.load_tokenizer()
             
             # Mover para device
             self.model.to(self.device)
@@ -171,6 +170,46 @@ class CidadaoAIManager:
             logger.error(f"❌ Erro ao carregar modelo: {e}")
             raise
 
+    def load_tokenizer(self):
+        """Carregar tokenizer usado pelo modelo"""
+        self.tokenizer = AutoTokenizer.from_pretrained("microsoft/DialoGPT-medium")
+        self.tokenizer.pad_token = self.tokenizer.eos_token
+
+    def run_analyses(
+        self,
+        input_ids: torch.Tensor,
+        attention_mask: torch.Tensor,
+        analysis_type: str = "complete"
+    ) -> Dict[str, Dict]:
+        """
+        Executar as análises solicitadas sobre um lote já tokenizado
+        
+        Cada resultado traz uma predição por linha do lote, na mesma ordem.
+        """
+        
+        results = {}
+        
+        with torch.inference_mode():
+            if analysis_type in ["anomaly", "complete"]:
+                results["anomaly_detection"] = self.model.detect_anomalies(
+                    input_ids=input_ids,
+                    attention_mask=attention_mask
+                )
+            
+            if analysis_type in ["financial", "complete"]:
+                results["financial_analysis"] = self.model.analyze_financial_risk(
+                    input_ids=input_ids,
+                    attention_mask=attention_mask
+                )
+            
+            if analysis_type in ["legal", "complete"]:
+                results["legal_compliance"] = self.model.check_legal_compliance(
+                    input_ids=input_ids,
+                    attention_mask=attention_mask
+                )
+        
+        return results
+
     async def analyze_transparency(
         self, 
         request: TransparencyAnalysisRequest
@@ -193,28 +232,9 @@ class CidadaoAIManager:
             ).to(self.device)
             
             # Executar análises baseadas no tipo solicitado
-            results = {}
-            
-            if request.analysis_type in ["anomaly", "complete"]:
-                anomaly_results = self.model.detect_anomalies(
-                    input_ids=inputs["input_ids"],
-                    attention_mask=inputs["attention_mask"]
-                )
-                results["anomaly_detection"] = anomaly_results
-            
-            if request.analysis_type in ["financial", "complete"]:
-                financial_results = self.model.analyze_financial_risk(
-                    input_ids=inputs["input_ids"],
-                    attention_mask=inputs["attention_mask"]
-                )
-                results["financial_analysis"] = financial_results
-            
-            if request.analysis_type in ["legal", "complete"]:
-                legal_results = self.model.check_legal_compliance(
-                    input_ids=inputs["input_ids"],
-                    attention_mask=inputs["attention_mask"]
-                )
-                results["legal_compliance"] = legal_results
+            results = self.run_analyses(
+                inputs["input_ids"], inputs["attention_mask"], request.analysis_type
+            )
             
             # Gerar resumo executivo e recomendações
             executive_summary, recommendations, overall_confidence = self._generate_summary(
@@ -0,0 +1,256 @@
+"""
+Module: ml.streaming_detection
+Description: Online anomaly statistics over a stream of contract pages
+Author: Anderson H. Silva
+Date: 2025-01-27
+License: Proprietary - All rights reserved
+"""
+
+import math
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set
+
+import numpy as np
+
+from src.core import get_logger
+from .incremental_detection import SimilarityIndex, extract_features
+
+
+logger = get_logger(__name__)
+
+
+class RunningStats:
+    """Welford's online mean and (population) variance."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    @property
+    def variance(self) -> float:
+        return self._m2 / self.count if self.count else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+
+class StreamFinding(NamedTuple):
+    """
+    A detector finding; ``key`` identifies it across the stream (contract
+    key, vendor key, month or contract pair) and ``data`` carries what is
+    needed to build the report.
+    """
+
+    anomaly_type: str
+    key: str
+    data: Dict[str, Any]
+
+
+class StreamReconciliation(NamedTuple):
+    """Outcome of the final pass over the complete statistics."""
+
+    confirmed: List[StreamFinding]   # emitted during the stream, still supported
+    retracted: List[StreamFinding]   # emitted provisionally, not supported by the final baseline
+    final: List[StreamFinding]       # only decidable at the end, or missed while streaming
+
+
+def _compact(contract: Dict[str, Any]) -> Dict[str, Any]:
+    """The fields reports need from a contract, so the full record can be dropped."""
+    supplier = contract.get("fornecedor") or {}
+    return {
+        "id": contract.get("id"),
+        "objeto": (contract.get("objeto") or "")[:100],
+        "fornecedor": {"nome": supplier.get("nome", "N/A")},
+        "_org_code": contract.get("_org_code"),
+        "valorInicial": contract.get("valorInicial"),
+        "valorGlobal": contract.get("valorGlobal"),
+    }
+
+
+class StreamingDetectionPipeline:
+    """
+    Anomaly statistics computed page by page, without holding the pages.
+
+    - ``price_anomaly``: Welford mean/variance of positive values. Once
+      ``min_samples`` values were seen, a contract beyond ``price_threshold``
+      deviations of the running baseline is emitted provisionally.
+    - ``duplicate_contracts``: pairs over the similarity threshold are final
+      as soon as both contracts were seen, so they are emitted immediately.
+    - ``vendor_concentration`` / ``temporal_patterns``: shares and month
+      z-scores depend on the whole population and are only decided by
+      ``finish``.
+
+    ``finish`` reconciles the provisional price findings against the final
+    baseline: confirmed ones get the final figures, the others are
+    retracted, and outliers only visible at the end are reported as final.
+    Only compact contract references and per-vendor/month counters are
+    kept, not the records themselves.
+    """
+
+    STREAM_TYPES = ("price_anomaly", "duplicate_contracts", "vendor_concentration", "temporal_patterns")
+
+    def __init__(
+        self,
+        price_threshold: float = 2.5,
+        concentration_threshold: float = 0.7,
+        duplicate_threshold: float = 0.85,
+        min_samples: int = 30,
+        anomaly_types: Optional[Iterable[str]] = None,
+    ):
+        self.price_threshold = price_threshold
+        self.concentration_threshold = concentration_threshold
+        self.min_samples = max(min_samples, 10)
+        self.anomaly_types = set(anomaly_types or self.STREAM_TYPES)
+
+        self.records = 0
+        self.total_value = 0.0
+        self.prices = RunningStats()
+        self._price_values: List[float] = []
+        self._price_refs: List[Dict[str, Any]] = []
+        self._emitted_prices: Dict[int, StreamFinding] = {}
+
+        self.vendor_stats: Dict[str, Dict[str, Any]] = {}
+        self.vendor_total = 0.0
+        self.month_stats: Dict[str, Dict[str, float]] = {}
+
+        self._similarity = SimilarityIndex(duplicate_threshold)
+        self._refs: Dict[str, Dict[str, Any]] = {}
+        self._emitted_pairs: Set[str] = set()
+        self._duplicates: List[StreamFinding] = []
+
+    def add_page(self, contracts: Iterable[Dict[str, Any]]) -> List[StreamFinding]:
+        """Fold a page into the statistics; returns the findings it justifies now."""
+        findings: List[StreamFinding] = []
+        fresh_prices = []
+        for contract in contracts:
+            position = self.records
+            self.records += 1
+            features = extract_features(contract, fingerprint="")
+            if features.value is not None:
+                self.total_value += features.value
+
+            if features.price is not None and "price_anomaly" in self.anomaly_types:
+                self.prices.add(features.price)
+                fresh_prices.append(len(self._price_values))
+                self._price_values.append(features.price)
+                self._price_refs.append(_compact(contract))
+
+            if "vendor_concentration" in self.anomaly_types and features.value is not None:
+                self.vendor_total += features.value
+                stats = self.vendor_stats.setdefault(features.vendor_key, {
+                    "name": features.vendor_name,
+                    "cnpj": features.vendor_cnpj,
+                    "total_value": 0.0,
+                    "contract_count": 0,
+                })
+                stats["total_value"] += features.value
+                stats["contract_count"] += 1
+
+            if "temporal_patterns" in self.anomaly_types and features.month is not None:
+                month = self.month_stats.setdefault(features.month, {"count": 0, "total_value": 0.0})
+                month["count"] += 1
+                month["total_value"] += features.value or 0.0
+
+            if "duplicate_contracts" in self.anomaly_types and features.words:
+                key = str(position)
+                ref = _compact(contract)
+                for other, similarity in sorted(self._similarity.add(key, features.words), key=lambda m: int(m[0])):
+                    finding = StreamFinding(
+                        "duplicate_contracts",
+                        f"{other}:{key}",
+                        {"contract1": self._refs[other], "contract2": ref, "similarity": similarity},
+                    )
+                    self._duplicates.append(finding)
+                    findings.append(finding)
+                self._refs[key] = ref
+
+        if "price_anomaly" in self.anomaly_types and self.prices.count >= self.min_samples:
+            if self.prices.count - len(fresh_prices) < self.min_samples:
+                # Baseline just became meaningful: judge everything seen so far
+                fresh_prices = range(len(self._price_values))
+            findings.extend(self._provisional_prices(fresh_prices))
+        return findings
+
+    def _price_finding(self, index: int, mean: float, std: float, percentile_95: float) -> StreamFinding:
+        value = self._price_values[index]
+        return StreamFinding("price_anomaly", str(index), {
+            "contract": self._price_refs[index],
+            "value": value,
+            "z_score": abs(value - mean) / std,
+            "mean": mean,
+            "std": std,
+            "percentile_95": percentile_95,
+        })
+
+    def _provisional_prices(self, indices: Iterable[int]) -> List[StreamFinding]:
+        mean, std = self.prices.mean, self.prices.std
+        if not std:
+            return []
+        flagged = [
+            i for i in indices
+            if i not in self._emitted_prices and abs(self._price_values[i] - mean) / std > self.price_threshold
+        ]
+        if not flagged:
+            return []
+        percentile_95 = float(np.percentile(self._price_values, 95))
+        findings = []
+        for i in flagged:
+            finding = self._price_finding(i, mean, std, percentile_95)
+            self._emitted_prices[i] = finding
+            findings.append(finding)
+        return findings
+
+    def finish(self) -> StreamReconciliation:
+        """Decide the population-level findings and settle the provisional ones."""
+        confirmed: List[StreamFinding] = list(self._duplicates)
+        retracted: List[StreamFinding] = []
+        final: List[StreamFinding] = []
+
+        if self._price_values:
+            values = np.asarray(self._price_values)
+            mean, std = self.prices.mean, self.prices.std
+            flagged: Set[int] = set()
+            if self.prices.count >= 10 and std:
+                flagged = set(np.flatnonzero(np.abs(values - mean) / std > self.price_threshold).tolist())
+            percentile_95 = float(np.percentile(values, 95))
+            for i, finding in self._emitted_prices.items():
+                if i in flagged:
+                    confirmed.append(self._price_finding(i, mean, std, percentile_95))
+                else:
+                    retracted.append(finding)
+            for i in sorted(flagged - set(self._emitted_prices)):
+                final.append(self._price_finding(i, mean, std, percentile_95))
+
+        if self.vendor_total:
+            for key, stats in self.vendor_stats.items():
+                concentration = stats["total_value"] / self.vendor_total
+                if concentration > self.concentration_threshold:
+                    final.append(StreamFinding("vendor_concentration", key, {
+                        "stats": dict(stats), "concentration": concentration,
+                    }))
+
+        if len(self.month_stats) >= 3:
+            counts = [stats["count"] for stats in self.month_stats.values()]
+            mean_count, std_count = float(np.mean(counts)), float(np.std(counts))
+            for month, stats in self.month_stats.items():
+                z_score = (stats["count"] - mean_count) / std_count if std_count else 0.0
+                if z_score > 2.0:
+                    final.append(StreamFinding("temporal_patterns", month, {
+                        "stats": dict(stats), "z_score": z_score, "mean_count": mean_count,
+                    }))
+
+        logger.info(
+            "streaming_detection_reconciled",
+            records=self.records,
+            confirmed=len(confirmed),
+            retracted=len(retracted),
+            final=len(final),
+        )
+        return StreamReconciliation(confirmed, retracted, final)
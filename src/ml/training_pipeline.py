@@ -9,7 +9,7 @@ import os
 import json
 import torch
 import torch.nn as nn
-from torch.utils.data import Dataset, DataLoader
+from torch.utils.data import Dataset, DataLoader, Sampler
 from torch.optim import AdamW
 from torch.optim.lr_scheduler import CosineAnnealingLR
 from transformers import AutoTokenizer, get_linear_schedule_with_warmup
@@ -47,6 +47,11 @@ class TrainingConfig:
     train_split: float = 0.8
     val_split: float = 0.1
     test_split: float = 0.1
+    num_workers: int = 4
+    
+    # Datasets pré-tokenizados (PretokenizedTransparencyDataset)
+    length_bucket_multiplier: int = 50  # lotes por bucket de comprimento
+    pad_to_multiple_of: Optional[int] = 8
     
     # Configurações do modelo
     model_size: str = "medium"
@@ -245,6 +250,305 @@ class TransparencyDataset(Dataset):
         return result
 
 
+# Colunas de rótulo gravadas em labels.npy, na ordem das colunas
+LABEL_COLUMNS = {
+    "anomaly_labels": "anomaly_label",
+    "financial_risk_labels": "financial_risk",
+    "legal_compliance_labels": "legal_compliance",
+}
+
+# Features por token gravadas como arrays concatenados + offsets
+FEATURE_COLUMNS = ["entity_types", "corruption_indicators"]
+
+# Rótulo ausente; ignorado por nn.CrossEntropyLoss
+IGNORE_LABEL = -100
+
+
+def pretokenize_transparency_data(
+    data_path: str,
+    tokenizer: AutoTokenizer,
+    output_dir: str,
+    max_length: int = 512,
+    chunk_size: int = 1000
+) -> Path:
+    """
+    Pré-tokenizar um dataset de transparência em arrays memory-mapped
+    
+    Os textos são tokenizados uma única vez, sem padding, e gravados como um
+    array concatenado de token ids com offsets por exemplo, junto com os
+    rótulos e as features de entidade/corrupção. O resultado é lido por
+    PretokenizedTransparencyDataset.
+    
+    Args:
+        data_path: Caminho para dados de treinamento (mesmos formatos de TransparencyDataset)
+        tokenizer: Tokenizer do modelo (recebe os tokens especiais de transparência)
+        output_dir: Diretório de saída
+        max_length: Comprimento máximo de sequência
+        chunk_size: Textos tokenizados por chamada ao tokenizer
+    
+    Returns:
+        Diretório com os arrays gerados
+    """
+    
+    source = TransparencyDataset(data_path, tokenizer, max_length=max_length)
+    data = source.data
+    
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    
+    logger.info(f"🔤 Pré-tokenizando {len(data)} exemplos em {output_dir}")
+    
+    token_chunks = []
+    lengths = np.zeros(len(data), dtype=np.int64)
+    
+    for start in tqdm(range(0, len(data), chunk_size), desc="Pré-tokenização"):
+        texts = [item["text"] for item in data[start:start + chunk_size]]
+        encoded = tokenizer(texts, truncation=True, max_length=max_length)
+        
+        for i, input_ids in enumerate(encoded["input_ids"]):
+            lengths[start + i] = len(input_ids)
+            token_chunks.append(np.asarray(input_ids, dtype=np.int32))
+    
+    offsets = np.zeros(len(data) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    tokens = np.concatenate(token_chunks) if token_chunks else np.zeros(0, dtype=np.int32)
+    np.save(output_dir / "tokens.npy", tokens)
+    np.save(output_dir / "offsets.npy", offsets)
+    
+    # Rótulos: uma coluna por tarefa, IGNORE_LABEL onde o exemplo não tem rótulo
+    labels = np.full((len(data), len(LABEL_COLUMNS)), IGNORE_LABEL, dtype=np.int64)
+    for column, key in enumerate(LABEL_COLUMNS.values()):
+        for i, item in enumerate(data):
+            if key in item:
+                labels[i, column] = item[key]
+    np.save(output_dir / "labels.npy", labels)
+    
+    # Features por token, truncadas no comprimento tokenizado do exemplo
+    features = []
+    for feature in FEATURE_COLUMNS:
+        if not any(feature in item for item in data):
+            continue
+        
+        values = [
+            np.asarray(item.get(feature, [])[:lengths[i]], dtype=np.int64)
+            for i, item in enumerate(data)
+        ]
+        feature_offsets = np.zeros(len(data) + 1, dtype=np.int64)
+        np.cumsum([len(v) for v in values], out=feature_offsets[1:])
+        
+        np.save(output_dir / f"{feature}.npy", np.concatenate(values) if values else np.zeros(0, dtype=np.int64))
+        np.save(output_dir / f"{feature}_offsets.npy", feature_offsets)
+        features.append(feature)
+    
+    metadata = {
+        "source": str(data_path),
+        "num_examples": len(data),
+        "max_length": max_length,
+        "vocab_size": len(tokenizer),
+        "pad_token_id": tokenizer.pad_token_id if tokenizer.pad_token_id is not None else tokenizer.eos_token_id,
+        "labels": [
+            name for column, name in enumerate(LABEL_COLUMNS)
+            if (labels[:, column] != IGNORE_LABEL).any()
+        ],
+        "features": features,
+        "total_tokens": int(offsets[-1]),
+    }
+    
+    with open(output_dir / "metadata.json", "w", encoding="utf-8") as f:
+        json.dump(metadata, f, ensure_ascii=False, indent=2)
+    
+    logger.info(
+        f"✅ {len(data)} exemplos pré-tokenizados - "
+        f"{metadata['total_tokens']} tokens (média {lengths.mean() if len(data) else 0:.0f} por exemplo)"
+    )
+    
+    return output_dir
+
+
+class PretokenizedTransparencyDataset(Dataset):
+    """
+    Dataset lido de arrays gerados por pretokenize_transparency_data
+    
+    Os arrays são abertos com mmap na primeira leitura de cada processo, então
+    workers do DataLoader compartilham as páginas do sistema operacional em vez
+    de copiar o dataset. Os exemplos saem sem padding; use
+    DynamicPaddingCollator para montar os lotes.
+    """
+    
+    def __init__(self, data_dir: str):
+        self.data_dir = Path(data_dir)
+        
+        with open(self.data_dir / "metadata.json", "r", encoding="utf-8") as f:
+            self.metadata = json.load(f)
+        
+        self.max_length = self.metadata["max_length"]
+        self.pad_token_id = self.metadata["pad_token_id"]
+        self.label_names = self.metadata["labels"]
+        self.feature_names = self.metadata["features"]
+        
+        # Comprimentos ficam em memória: são usados pelo sampler a cada época
+        offsets = np.load(self.data_dir / "offsets.npy")
+        self.lengths = np.diff(offsets)
+        
+        self._arrays: Optional[Dict[str, np.ndarray]] = None
+    
+    def _open_arrays(self) -> Dict[str, np.ndarray]:
+        if self._arrays is None:
+            arrays = {
+                "tokens": np.load(self.data_dir / "tokens.npy", mmap_mode="r"),
+                "offsets": np.load(self.data_dir / "offsets.npy", mmap_mode="r"),
+                "labels": np.load(self.data_dir / "labels.npy", mmap_mode="r"),
+            }
+            for feature in self.feature_names:
+                arrays[feature] = np.load(self.data_dir / f"{feature}.npy", mmap_mode="r")
+                arrays[f"{feature}_offsets"] = np.load(
+                    self.data_dir / f"{feature}_offsets.npy", mmap_mode="r"
+                )
+            self._arrays = arrays
+        return self._arrays
+    
+    def __getstate__(self):
+        # Cada worker reabre os arrays; mmaps não são enviados entre processos
+        state = self.__dict__.copy()
+        state["_arrays"] = None
+        return state
+    
+    def __len__(self) -> int:
+        return len(self.lengths)
+    
+    def __getitem__(self, idx: int) -> Dict[str, torch.Tensor]:
+        arrays = self._open_arrays()
+        start, end = arrays["offsets"][idx], arrays["offsets"][idx + 1]
+        
+        result = {
+            "input_ids": torch.from_numpy(arrays["tokens"][start:end].astype(np.int64)),
+        }
+        
+        labels = arrays["labels"][idx]
+        for column, name in enumerate(LABEL_COLUMNS):
+            if name in self.label_names:
+                result[name] = torch.tensor(labels[column], dtype=torch.long)
+        
+        for feature in self.feature_names:
+            feature_offsets = arrays[f"{feature}_offsets"]
+            values = arrays[feature][feature_offsets[idx]:feature_offsets[idx + 1]]
+            result[feature] = torch.from_numpy(np.array(values, dtype=np.int64))
+        
+        return result
+
+
+class LengthBucketSampler(Sampler):
+    """
+    Batch sampler que agrupa exemplos de comprimento parecido
+    
+    A cada época os índices são embaralhados, divididos em buckets de
+    ``batch_size * bucket_multiplier`` exemplos e ordenados por comprimento
+    dentro de cada bucket; os lotes resultantes são embaralhados entre si.
+    Assim cada lote precisa de pouco padding sem perder aleatoriedade.
+    """
+    
+    def __init__(
+        self,
+        lengths: np.ndarray,
+        batch_size: int,
+        shuffle: bool = True,
+        bucket_multiplier: int = 50,
+        drop_last: bool = False,
+        seed: int = 0
+    ):
+        self.lengths = np.asarray(lengths)
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.bucket_size = batch_size * max(1, bucket_multiplier)
+        self.drop_last = drop_last
+        self.seed = seed
+        self.epoch = 0
+    
+    def set_epoch(self, epoch: int):
+        """Definir a época para que cada uma tenha uma ordem diferente e reproduzível"""
+        self.epoch = epoch
+    
+    def __iter__(self):
+        if not self.shuffle:
+            # Avaliação: ordem determinística por comprimento
+            order = np.argsort(self.lengths, kind="stable")
+            batches = [order[i:i + self.batch_size] for i in range(0, len(order), self.batch_size)]
+        else:
+            rng = np.random.default_rng(self.seed + self.epoch)
+            order = rng.permutation(len(self.lengths))
+            
+            batches = []
+            for start in range(0, len(order), self.bucket_size):
+                bucket = order[start:start + self.bucket_size]
+                bucket = bucket[np.argsort(self.lengths[bucket], kind="stable")]
+                batches.extend(
+                    bucket[i:i + self.batch_size] for i in range(0, len(bucket), self.batch_size)
+                )
+            
+            batches = [batches[i] for i in rng.permutation(len(batches))]
+        
+        for batch in batches:
+            if self.drop_last and len(batch) < self.batch_size:
+                continue
+            yield batch.tolist()
+    
+    def __len__(self) -> int:
+        num_examples = len(self.lengths)
+        if not self.drop_last:
+            return -(-num_examples // self.batch_size)
+        if not self.shuffle:
+            return num_examples // self.batch_size
+        
+        # Buckets têm múltiplos de batch_size; só o último pode deixar sobra
+        full_buckets, remainder = divmod(num_examples, self.bucket_size)
+        return full_buckets * (self.bucket_size // self.batch_size) + remainder // self.batch_size
+
+
+class DynamicPaddingCollator:
+    """
+    Montar lotes com padding apenas até o maior exemplo do lote
+    
+    input_ids, attention_mask e as features por token são preenchidos até o
+    mesmo comprimento (arredondado para ``pad_to_multiple_of``); rótulos são
+    empilhados e omitidos quando nenhum exemplo do lote tem rótulo na tarefa.
+    """
+    
+    def __init__(self, pad_token_id: int, pad_to_multiple_of: Optional[int] = None):
+        self.pad_token_id = pad_token_id
+        self.pad_to_multiple_of = pad_to_multiple_of
+    
+    def __call__(self, items: List[Dict[str, torch.Tensor]]) -> Dict[str, torch.Tensor]:
+        max_len = max(len(item["input_ids"]) for item in items)
+        if self.pad_to_multiple_of:
+            max_len = -(-max_len // self.pad_to_multiple_of) * self.pad_to_multiple_of
+        
+        input_ids = torch.full((len(items), max_len), self.pad_token_id, dtype=torch.long)
+        attention_mask = torch.zeros((len(items), max_len), dtype=torch.long)
+        
+        for i, item in enumerate(items):
+            length = len(item["input_ids"])
+            input_ids[i, :length] = item["input_ids"]
+            attention_mask[i, :length] = 1
+        
+        batch = {"input_ids": input_ids, "attention_mask": attention_mask}
+        
+        for name in LABEL_COLUMNS:
+            if name in items[0]:
+                labels = torch.stack([item[name] for item in items])
+                if (labels != IGNORE_LABEL).any():
+                    batch[name] = labels
+        
+        for feature in FEATURE_COLUMNS:
+            if feature in items[0]:
+                values = torch.zeros((len(items), max_len), dtype=torch.long)
+                for i, item in enumerate(items):
+                    feature_values = item[feature][:max_len]
+                    values[i, :len(feature_values)] = feature_values
+                batch[feature] = values
+        
+        return batch
+
+
 class CidadaoTrainer:
     """Trainer especializado para Cidadão.AI"""
     
@@ -293,30 +597,20 @@ class CidadaoTrainer:
     
     def train(
         self,
-        train_dataset: TransparencyDataset,
-        eval_dataset: Optional[TransparencyDataset] = None,
-        test_dataset: Optional[TransparencyDataset] = None
+        train_dataset: Dataset,
+        eval_dataset: Optional[Dataset] = None,
+        test_dataset: Optional[Dataset] = None
     ):
         """Executar treinamento completo"""
         
         logger.info("🚀 Iniciando treinamento do Cidadão.AI")
         
         # Preparar data loaders
-        train_loader = DataLoader(
-            train_dataset,
-            batch_size=self.config.batch_size,
-            shuffle=True,
-            num_workers=4
-        )
+        train_loader = self._create_data_loader(train_dataset, shuffle=True)
         
         eval_loader = None
         if eval_dataset:
-            eval_loader = DataLoader(
-                eval_dataset,
-                batch_size=self.config.batch_size,
-                shuffle=False,
-                num_workers=4
-            )
+            eval_loader = self._create_data_loader(eval_dataset, shuffle=False)
         
         # Configurar scheduler
         total_steps = len(train_loader) * self.config.num_epochs
@@ -332,6 +626,9 @@ class CidadaoTrainer:
         for epoch in range(self.config.num_epochs):
             logger.info(f"📚 Época {epoch + 1}/{self.config.num_epochs}")
             
+            if isinstance(train_loader.batch_sampler, LengthBucketSampler):
+                train_loader.batch_sampler.set_epoch(epoch)
+            
             # Treinamento
             train_loss = self._train_epoch(train_loader, epoch, global_step)
             self.training_history["train_loss"].append(train_loss)
@@ -363,12 +660,7 @@ class CidadaoTrainer:
         
         # Avaliação final
         if test_dataset:
-            test_loader = DataLoader(
-                test_dataset,
-                batch_size=self.config.batch_size,
-                shuffle=False,
-                num_workers=4
-            )
+            test_loader = self._create_data_loader(test_dataset, shuffle=False)
             
             logger.info("🧪 Executando avaliação final no conjunto de teste")
             final_metrics = self._evaluate(test_loader, epoch=-1, is_test=True)
@@ -380,6 +672,41 @@ class CidadaoTrainer:
         # Finalizar treinamento
         self._finalize_training()
     
+    def _create_data_loader(self, dataset: Dataset, shuffle: bool) -> DataLoader:
+        """
+        Criar DataLoader para o dataset
+        
+        Datasets pré-tokenizados usam lotes por comprimento e padding dinâmico;
+        TransparencyDataset mantém o padding fixo em max_length.
+        """
+        
+        num_workers = self.config.num_workers
+        
+        if isinstance(dataset, PretokenizedTransparencyDataset):
+            return DataLoader(
+                dataset,
+                batch_sampler=LengthBucketSampler(
+                    dataset.lengths,
+                    batch_size=self.config.batch_size,
+                    shuffle=shuffle,
+                    bucket_multiplier=self.config.length_bucket_multiplier
+                ),
+                collate_fn=DynamicPaddingCollator(
+                    dataset.pad_token_id,
+                    pad_to_multiple_of=self.config.pad_to_multiple_of
+                ),
+                num_workers=num_workers,
+                pin_memory=self.device.type == "cuda",
+                persistent_workers=num_workers > 0
+            )
+        
+        return DataLoader(
+            dataset,
+            batch_size=self.config.batch_size,
+            shuffle=shuffle,
+            num_workers=num_workers
+        )
+    
     def _train_epoch(self, train_loader: DataLoader, epoch: int, global_step: int) -> float:
         """Treinar uma época"""
         
@@ -555,7 +882,12 @@ class CidadaoTrainer:
         return metrics
     
     def _collect_predictions(self, batch: Dict[str, torch.Tensor], all_predictions: Dict):
-        """Coletar predições para avaliação"""
+        """
+        Coletar predições para avaliação
+        
+        Exemplos sem rótulo na tarefa (IGNORE_LABEL, vindos de lotes mistos do
+        DynamicPaddingCollator) ficam fora das métricas, como ficam fora da loss.
+        """
         
         # Anomaly detection
         if "anomaly_labels" in batch:
@@ -565,10 +897,13 @@ class CidadaoTrainer:
             )
             
             for i, pred in enumerate(anomaly_outputs["predictions"]):
+                label = batch["anomaly_labels"][i].item()
+                if label == IGNORE_LABEL:
+                    continue
                 anomaly_type_map = {"Normal": 0, "Suspeito": 1, "Anômalo": 2}
                 pred_label = anomaly_type_map[pred["anomaly_type"]]
                 all_predictions["anomaly"]["preds"].append(pred_label)
-                all_predictions["anomaly"]["labels"].append(batch["anomaly_labels"][i].item())
+                all_predictions["anomaly"]["labels"].append(label)
         
         # Financial analysis
         if "financial_risk_labels" in batch:
@@ -578,10 +913,13 @@ class CidadaoTrainer:
             )
             
             for i, pred in enumerate(financial_outputs["predictions"]):
+                label = batch["financial_risk_labels"][i].item()
+                if label == IGNORE_LABEL:
+                    continue
                 risk_level_map = {"Muito Baixo": 0, "Baixo": 1, "Médio": 2, "Alto": 3, "Muito Alto": 4}
                 pred_label = risk_level_map[pred["risk_level"]]
                 all_predictions["financial"]["preds"].append(pred_label)
-                all_predictions["financial"]["labels"].append(batch["financial_risk_labels"][i].item())
+                all_predictions["financial"]["labels"].append(label)
         
         # Legal compliance
         if "legal_compliance_labels" in batch:
@@ -591,9 +929,12 @@ class CidadaoTrainer:
             )
             
             for i, pred in enumerate(legal_outputs["predictions"]):
+                label = batch["legal_compliance_labels"][i].item()
+                if label == IGNORE_LABEL:
+                    continue
                 pred_label = 1 if pred["is_compliant"] else 0
                 all_predictions["legal"]["preds"].append(pred_label)
-                all_predictions["legal"]["labels"].append(batch["legal_compliance_labels"][i].item())
+                all_predictions["legal"]["labels"].append(label)
     
     def _compute_task_metrics(self, predictions: List, labels: List, task_name: str) -> Dict[str, float]:
         """Computar métricas para uma tarefa específica"""
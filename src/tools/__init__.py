@@ -15,12 +15,14 @@ from .transparency_api import (
 from .transparency_models import (
     Agreement,
     Bidding,
+    ColumnBatch,
     Contract,
     Expense,
     Organization,
     SanctionedCompany,
     Servant,
     Supplier,
+    parse_api_columns,
     parse_api_data,
     parse_agreement,
     parse_bidding,
@@ -29,6 +31,9 @@ from .transparency_models import (
     parse_sanctioned_company,
     parse_servant,
 )
+from .warehouse import TransparencyWarehouse, get_warehouse
+from .delta_sync import DeltaSync, SyncReport, sync_to_warehouse
+from .contract_monitor import ContractMonitor, WatchAlert
 
 __all__ = [
     # API Client
@@ -47,10 +52,21 @@ __all__ = [
     "Supplier",
     # Parsing Functions
     "parse_api_data",
+    "parse_api_columns",
+    "ColumnBatch",
     "parse_contract",
     "parse_expense",
     "parse_agreement",
     "parse_bidding",
     "parse_servant",
     "parse_sanctioned_company",
+    # Local warehouse
+    "TransparencyWarehouse",
+    "get_warehouse",
+    "DeltaSync",
+    "SyncReport",
+    "sync_to_warehouse",
+    # Monitoring
+    "ContractMonitor",
+    "WatchAlert",
 ]
\ No newline at end of file
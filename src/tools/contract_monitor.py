@@ -0,0 +1,379 @@
+"""
+Module: tools.contract_monitor
+Description: Long-running contract monitor with rolling baselines and alert sinks
+Author: Anderson H. Silva
+Date: 2025-01-27
+License: Proprietary - All rights reserved
+"""
+
+import asyncio
+import json
+import os
+from collections import OrderedDict, deque
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterable, List, Optional, Sequence, Union
+
+from src.core import get_logger
+from .delta_sync import DeltaSync
+from .transparency_api import TransparencyAPIClient
+
+
+logger = get_logger(__name__)
+
+STATE_FILE = "baselines.json"
+
+# (org_code, recent contracts) -> anomaly dicts as produced by the full detectors
+Escalation = Callable[[str, List[Dict[str, Any]]], Awaitable[List[Dict[str, Any]]]]
+
+
+@dataclass
+class WatchAlert:
+    """One alert raised by the monitor."""
+
+    org_code: str
+    anomaly_type: str
+    severity: float
+    description: str
+    evidence: Dict[str, Any] = field(default_factory=dict)
+    source: str = "cheap"  # "cheap" (rolling baselines) or "full" (escalated detectors)
+    timestamp: str = field(default_factory=lambda: datetime.utcnow().isoformat())
+
+
+AlertSink = Callable[[WatchAlert], Awaitable[None]]
+
+
+class JsonlAlertSink:
+    """Append alerts to a JSON lines file."""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+
+    def _append(self, line: str):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+    async def __call__(self, alert: WatchAlert):
+        await asyncio.to_thread(self._append, json.dumps(asdict(alert), ensure_ascii=False, default=str))
+
+
+class WebhookAlertSink:
+    """POST alerts as JSON to a webhook; failures are logged, not raised."""
+
+    def __init__(self, url: str, timeout: float = 10.0):
+        self.url = url
+        self.timeout = timeout
+
+    async def __call__(self, alert: WatchAlert):
+        import httpx
+
+        try:
+            async with httpx.AsyncClient() as client:
+                response = await client.post(self.url, json=asdict(alert), timeout=self.timeout)
+            if response.status_code >= 400:
+                logger.error("watch_webhook_failed", status=response.status_code, url=self.url)
+        except Exception as e:
+            logger.error("watch_webhook_failed", error=str(e), url=self.url)
+
+
+@dataclass
+class OrgBaseline:
+    """
+    Rolling statistics for one organization, small enough to persist
+    after every poll.
+
+    Prices use an exponentially weighted mean/variance (a cumulative mean
+    until ``span`` samples were seen). Vendor values decay with
+    ``half_life_days`` and only the largest ``max_vendors`` are kept.
+    """
+
+    count: int = 0
+    mean: float = 0.0
+    variance: float = 0.0
+    vendor_values: Dict[str, float] = field(default_factory=dict)
+    vendor_names: Dict[str, str] = field(default_factory=dict)
+    vendor_total: float = 0.0
+    decayed_at: Optional[str] = None
+    primed: bool = False  # the first complete sync only builds the baseline
+    polls: int = 0
+    alerts: int = 0
+    last_poll_at: Optional[str] = None
+
+    def z_score(self, value: float) -> Optional[float]:
+        std = self.variance ** 0.5
+        return abs(value - self.mean) / std if std else None
+
+    def add_price(self, value: float, span: int):
+        alpha = max(2.0 / (span + 1), 1.0 / (self.count + 1))
+        diff = value - self.mean
+        increment = alpha * diff
+        self.mean += increment
+        self.variance = (1 - alpha) * (self.variance + diff * increment)
+        self.count += 1
+
+    def decay(self, now: datetime, half_life_days: float):
+        if self.decayed_at is not None:
+            elapsed = (now - datetime.fromisoformat(self.decayed_at)).total_seconds() / 86400
+            factor = 0.5 ** (max(elapsed, 0.0) / half_life_days)
+            self.vendor_total *= factor
+            for key in self.vendor_values:
+                self.vendor_values[key] *= factor
+        self.decayed_at = now.isoformat()
+
+    def share(self, vendor_key: str) -> float:
+        return self.vendor_values.get(vendor_key, 0.0) / self.vendor_total if self.vendor_total else 0.0
+
+    def add_vendor(self, vendor_key: str, vendor_name: str, value: float):
+        self.vendor_values[vendor_key] = self.vendor_values.get(vendor_key, 0.0) + value
+        self.vendor_names[vendor_key] = vendor_name
+        self.vendor_total += value
+
+    def prune_vendors(self, max_vendors: int):
+        if len(self.vendor_values) <= max_vendors:
+            return
+        kept = sorted(self.vendor_values, key=self.vendor_values.get, reverse=True)[:max_vendors]
+        self.vendor_values = {key: self.vendor_values[key] for key in kept}
+        self.vendor_names = {key: self.vendor_names[key] for key in kept}
+
+
+def _value(contract: Dict[str, Any]) -> Optional[float]:
+    value = contract.get("valorInicial") or contract.get("valorGlobal")
+    return float(value) if isinstance(value, (int, float)) and value > 0 else None
+
+
+class ContractMonitor:
+    """
+    Poll organizations for new contracts and alert on suspicious ones.
+
+    Each poll runs a ``DeltaSync`` per organization, so only the recent
+    window is requested and unchanged pages and records are skipped. New
+    and changed contracts go through cheap checks against the
+    organization's rolling baseline (price z-score, vendor share
+    crossing the concentration threshold); the first complete sync of an
+    organization only builds its baseline. When a poll raises at least
+    ``escalate_after`` alerts for an organization, ``escalate`` runs the
+    full detectors over its most recent ``window_size`` contracts.
+
+    Everything held in memory is bounded (baselines, recent window,
+    already-alerted keys) and baselines are written to
+    ``state_dir/baselines.json`` after every poll, so the monitor can run
+    indefinitely and restart where it stopped.
+    """
+
+    def __init__(
+        self,
+        state_dir: Union[str, Path],
+        org_codes: Sequence[str],
+        sinks: Iterable[AlertSink] = (),
+        escalate: Optional[Escalation] = None,
+        threshold: float = 0.8,
+        price_threshold: float = 2.5,
+        concentration_threshold: float = 0.7,
+        min_samples: int = 30,
+        span: int = 1000,
+        half_life_days: float = 30.0,
+        max_vendors: int = 500,
+        window_size: int = 2000,
+        escalate_after: int = 1,
+        page_size: int = 500,
+        lookback_days: int = 30,
+        max_pages: Optional[int] = 20,
+        client: Optional[TransparencyAPIClient] = None,
+    ):
+        self.state_dir = Path(state_dir)
+        self.org_codes = list(org_codes)
+        self.sinks = list(sinks)
+        self.escalate = escalate
+        self.threshold = threshold
+        self.price_threshold = price_threshold
+        self.concentration_threshold = concentration_threshold
+        self.min_samples = min_samples
+        self.span = span
+        self.half_life_days = half_life_days
+        self.max_vendors = max_vendors
+        self.window_size = window_size
+        self.escalate_after = escalate_after
+        self.page_size = page_size
+        self.lookback_days = lookback_days
+        self.max_pages = max_pages
+        self.client = client
+
+        self.baselines: Dict[str, OrgBaseline] = self._load()
+        self._windows: Dict[str, Deque[Dict[str, Any]]] = {}
+        self._alerted: Dict[str, "OrderedDict[str, None]"] = {}
+
+    def _load(self) -> Dict[str, OrgBaseline]:
+        path = self.state_dir / STATE_FILE
+        if not path.exists():
+            return {}
+        with open(path, encoding="utf-8") as f:
+            return {org: OrgBaseline(**data) for org, data in json.load(f).items()}
+
+    def _save(self):
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        staging = self.state_dir / f".{STATE_FILE}.tmp"
+        with open(staging, "w", encoding="utf-8") as f:
+            json.dump({org: asdict(b) for org, b in self.baselines.items()}, f, ensure_ascii=False)
+        os.replace(staging, self.state_dir / STATE_FILE)
+
+    def _first_alert(self, org_code: str, key: str) -> bool:
+        """False when ``key`` was already alerted recently for this organization."""
+        seen = self._alerted.setdefault(org_code, OrderedDict())
+        if key in seen:
+            seen.move_to_end(key)
+            return False
+        seen[key] = None
+        while len(seen) > 10_000:
+            seen.popitem(last=False)
+        return True
+
+    def check(self, org_code: str, contracts: List[Dict[str, Any]], now: Optional[datetime] = None) -> List[WatchAlert]:
+        """Cheap detectors for new contracts; folds them into the baseline."""
+        baseline = self.baselines.setdefault(org_code, OrgBaseline())
+        baseline.decay(now or datetime.utcnow(), self.half_life_days)
+        alerts = []
+        for contract in contracts:
+            value = _value(contract)
+            if value is None:
+                continue
+
+            if baseline.count >= self.min_samples:
+                z_score = baseline.z_score(value)
+                if z_score is not None and z_score > self.price_threshold:
+                    alerts.append(WatchAlert(
+                        org_code=org_code,
+                        anomaly_type="price_anomaly",
+                        severity=min(z_score / 5.0, 1.0),
+                        description=f"Contrato com valor suspeito: R$ {value:,.2f}",
+                        evidence={
+                            "contract_id": contract.get("id"),
+                            "value": value,
+                            "z_score": z_score,
+                            "baseline_mean": baseline.mean,
+                            "baseline_std": baseline.variance ** 0.5,
+                        },
+                    ))
+            baseline.add_price(value, self.span)
+
+            supplier = contract.get("fornecedor") or {}
+            vendor_key = supplier.get("cnpj") or supplier.get("nome") or "Unknown"
+            before = baseline.share(vendor_key)
+            baseline.add_vendor(vendor_key, supplier.get("nome", "Unknown"), value)
+            after = baseline.share(vendor_key)
+            if baseline.count >= self.min_samples and before <= self.concentration_threshold < after:
+                alerts.append(WatchAlert(
+                    org_code=org_code,
+                    anomaly_type="vendor_concentration",
+                    severity=min(after * 1.5, 1.0),
+                    description=f"Concentração excessiva de contratos: {baseline.vendor_names[vendor_key]}",
+                    evidence={"vendor": vendor_key, "share": after, "contract_id": contract.get("id")},
+                ))
+
+        baseline.prune_vendors(self.max_vendors)
+        return [a for a in alerts if a.severity >= self.threshold]
+
+    async def _emit(self, alert: WatchAlert):
+        self.baselines[alert.org_code].alerts += 1
+        logger.warning(
+            "watch_alert",
+            org_code=alert.org_code,
+            anomaly_type=alert.anomaly_type,
+            severity=alert.severity,
+            source=alert.source,
+        )
+        for sink in self.sinks:
+            try:
+                await sink(alert)
+            except Exception as e:
+                logger.error("watch_sink_failed", error=str(e))
+
+    async def _poll_org(self, syncer: DeltaSync, org_code: str, year: int) -> List[WatchAlert]:
+        alerts: List[WatchAlert] = []
+        window = self._windows.setdefault(org_code, deque(maxlen=self.window_size))
+
+        baseline = self.baselines.setdefault(org_code, OrgBaseline())
+        primed = baseline.primed
+
+        def sink(records: List[Dict[str, Any]]):
+            for record in records:
+                record["_org_code"] = org_code
+            window.extend(records)
+            found = self.check(org_code, records)
+            if primed:
+                # Changed contracts come back through the sync; alert each finding once
+                alerts.extend(
+                    alert for alert in found
+                    if self._first_alert(org_code, f"{alert.anomaly_type}:{alert.evidence.get('contract_id')}")
+                )
+
+        report = await syncer.sync("contratos", org_code, year, sink=sink)
+        baseline.primed = baseline.primed or report.complete
+        for alert in alerts:
+            await self._emit(alert)
+
+        if self.escalate is not None and len(alerts) >= self.escalate_after and window:
+            for anomaly in await self.escalate(org_code, list(window)):
+                key = f"{anomaly.get('type')}:{anomaly.get('description')}"
+                if anomaly.get("severity", 0) < self.threshold or not self._first_alert(org_code, key):
+                    continue
+                alert = WatchAlert(
+                    org_code=org_code,
+                    anomaly_type=anomaly.get("type", "unknown"),
+                    severity=anomaly.get("severity", 0),
+                    description=anomaly.get("description", ""),
+                    evidence=anomaly.get("evidence") or {},
+                    source="full",
+                )
+                alerts.append(alert)
+                await self._emit(alert)
+
+        baseline.polls += 1
+        baseline.last_poll_at = datetime.utcnow().isoformat()
+        logger.info(
+            "watch_poll_finished",
+            org_code=org_code,
+            records_new=report.records_new,
+            records_changed=report.records_changed,
+            pages_unchanged=report.pages_unchanged,
+            alerts=len(alerts),
+        )
+        return alerts
+
+    async def poll(self, year: Optional[int] = None) -> List[WatchAlert]:
+        """One pass over every organization; returns the alerts it raised."""
+        year = year or date.today().year
+        alerts: List[WatchAlert] = []
+
+        async def run(api: TransparencyAPIClient):
+            syncer = DeltaSync(
+                self.state_dir / "sync",
+                client=api,
+                page_size=self.page_size,
+                lookback_days=self.lookback_days,
+                max_pages=self.max_pages,
+            )
+            for org_code in self.org_codes:
+                try:
+                    alerts.extend(await self._poll_org(syncer, org_code, year))
+                except Exception as e:
+                    logger.error("watch_poll_failed", org_code=org_code, error=str(e))
+
+        if self.client is not None:
+            await run(self.client)
+        else:
+            # A fresh client per poll keeps connection and cache state from growing
+            async with TransparencyAPIClient() as api:
+                await run(api)
+        self._save()
+        return alerts
+
+    async def run(self, interval: float, stop: Optional[asyncio.Event] = None):
+        """Poll every ``interval`` seconds until ``stop`` is set."""
+        stop = stop or asyncio.Event()
+        while not stop.is_set():
+            await self.poll()
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,334 @@
+"""
+Module: tools.delta_sync
+Description: Incremental, resumable sync of Portal da Transparência datasets
+Author: Anderson H. Silva
+Date: 2025-01-25
+License: Proprietary - All rights reserved
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+from src.core import get_logger
+from .transparency_api import TransparencyAPIClient, TransparencyAPIFilter
+from .warehouse import ENDPOINTS, TransparencyWarehouse, _camel, parse_date
+
+
+logger = get_logger(__name__)
+
+SYNC_DIR = "_sync"
+
+Sink = Callable[[List[Dict[str, Any]]], Union[None, Awaitable[None]]]
+
+
+def record_hash(record: Dict[str, Any]) -> str:
+    """Stable content hash of one API record."""
+    payload = json.dumps(record, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def record_key(record: Dict[str, Any], content_hash: str) -> str:
+    """Dedup key: the record id, or its content hash when the API sends none."""
+    record_id = record.get("id")
+    return f"id:{record_id}" if record_id is not None else f"hash:{content_hash}"
+
+
+@dataclass
+class SyncState:
+    """Checkpoint of one (endpoint, organization, year) scope."""
+
+    watermark: Optional[str] = None
+    window_start: Optional[str] = None
+    next_page: int = 1
+    in_progress: bool = False
+    pending_watermark: Optional[str] = None
+    page_checksums: Dict[str, str] = field(default_factory=dict)
+    last_run_at: Optional[str] = None
+
+
+@dataclass
+class SyncReport:
+    """What one ``DeltaSync.sync`` run fetched and emitted."""
+
+    pages_fetched: int = 0
+    pages_unchanged: int = 0
+    records_new: int = 0
+    records_changed: int = 0
+    records_unchanged: int = 0
+    resumed: bool = False
+    complete: bool = False
+    watermark: Optional[str] = None
+
+    @property
+    def records_emitted(self) -> int:
+        return self.records_new + self.records_changed
+
+
+class _ScopeStore:
+    """
+    On-disk state of one scope: ``state.json`` plus the dedup keys.
+
+    Keys live in a ``keys.json`` snapshot and an append-only ``keys.log``
+    (one ``[key, hash]`` line per new or changed record), so a checkpoint
+    costs a small append instead of rewriting every key. The log is folded
+    into the snapshot once it grows past a quarter of it.
+    """
+
+    COMPACT_RATIO = 0.25
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.keys: Dict[str, str] = {}
+        self._logged = 0
+
+    def load(self) -> SyncState:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        snapshot = self.directory / "keys.json"
+        if snapshot.exists():
+            with open(snapshot, encoding="utf-8") as f:
+                self.keys = json.load(f)
+        log = self.directory / "keys.log"
+        if log.exists():
+            with open(log, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        key, digest = json.loads(line)
+                    except ValueError:
+                        break  # torn write from an interrupted run
+                    self.keys[key] = digest
+                    self._logged += 1
+        state_path = self.directory / "state.json"
+        if not state_path.exists():
+            return SyncState()
+        with open(state_path, encoding="utf-8") as f:
+            return SyncState(**json.load(f))
+
+    def record(self, entries: List[Tuple[str, str]]):
+        if not entries:
+            return
+        with open(self.directory / "keys.log", "a", encoding="utf-8") as f:
+            f.writelines(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries)
+            f.flush()
+            os.fsync(f.fileno())
+        self.keys.update(entries)
+        self._logged += len(entries)
+
+    def save(self, state: SyncState):
+        if self._logged > max(len(self.keys) * self.COMPACT_RATIO, 1000):
+            self._write_json("keys.json", self.keys)
+            (self.directory / "keys.log").unlink(missing_ok=True)
+            self._logged = 0
+        self._write_json("state.json", asdict(state))
+
+    def _write_json(self, name: str, payload: Any):
+        staging = self.directory / f".{name}.tmp"
+        with open(staging, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False)
+        os.replace(staging, self.directory / name)
+
+
+class DeltaSync:
+    """
+    Incremental sync of one endpoint per (organization, year).
+
+    Each scope keeps a watermark (latest record date seen). A run fetches
+    only the window from ``watermark - lookback_days`` to the end of the
+    year, so nightly cost follows recent activity rather than the size of
+    the dataset; the lookback catches late corrections. Pages whose
+    checksum matches the previous run are skipped without touching the
+    sink, and records are deduplicated by id against the stored content
+    hashes, so only new or changed records are emitted.
+
+    Progress is checkpointed after every page (after the sink accepted
+    it), and an interrupted run - or one that stopped at ``max_pages`` -
+    resumes from the next page of the same window.
+    """
+
+    def __init__(
+        self,
+        state_dir: Union[str, Path],
+        client: Optional[TransparencyAPIClient] = None,
+        page_size: int = 500,
+        lookback_days: int = 30,
+        max_pages: Optional[int] = None,
+    ):
+        self.state_dir = Path(state_dir)
+        self.client = client
+        self.page_size = page_size
+        self.lookback_days = lookback_days
+        self.max_pages = max_pages
+
+    def _scope_dir(self, endpoint: str, org_code: str, year: int) -> Path:
+        return self.state_dir / endpoint / f"org={org_code}" / f"year={year}"
+
+    def state(self, endpoint: str, org_code: str, year: int) -> SyncState:
+        return _ScopeStore(self._scope_dir(endpoint, org_code, year)).load()
+
+    def _window_start(self, state: SyncState, year: int) -> date:
+        first_day = date(year, 1, 1)
+        if not state.watermark:
+            return first_day
+        return max(first_day, date.fromisoformat(state.watermark) - timedelta(days=self.lookback_days))
+
+    async def sync(
+        self,
+        endpoint: str,
+        org_code: str,
+        year: int,
+        sink: Optional[Sink] = None,
+    ) -> SyncReport:
+        """Fetch what changed for one scope and hand new/changed records to ``sink``."""
+        if self.client is not None:
+            return await self._sync(self.client, endpoint, org_code, year, sink)
+        async with TransparencyAPIClient() as client:
+            return await self._sync(client, endpoint, org_code, year, sink)
+
+    async def _sync(
+        self,
+        client: TransparencyAPIClient,
+        endpoint: str,
+        org_code: str,
+        year: int,
+        sink: Optional[Sink],
+    ) -> SyncReport:
+        spec = ENDPOINTS[endpoint]
+        date_key = _camel(spec.date_column)
+        store = _ScopeStore(self._scope_dir(endpoint, org_code, year))
+        state = store.load()
+        report = SyncReport(resumed=state.in_progress)
+
+        if not state.in_progress:
+            state.window_start = self._window_start(state, year).isoformat()
+            state.next_page = 1
+            state.pending_watermark = state.watermark
+            state.in_progress = True
+        window_start = date.fromisoformat(state.window_start)
+        # Page numbers are only comparable within the same window
+        checksums = {
+            page: digest for page, digest in state.page_checksums.items()
+            if page.startswith(f"{state.window_start}:")
+        }
+
+        filters = TransparencyAPIFilter(
+            codigo_orgao=org_code,
+            data_inicio=window_start.strftime("%d/%m/%Y"),
+            data_fim=date(year, 12, 31).strftime("%d/%m/%Y"),
+            tamanho_pagina=self.page_size,
+        )
+
+        fetched = 0
+        while self.max_pages is None or fetched < self.max_pages:
+            page = state.next_page
+            filters.pagina = page
+            response = await client.search_data(spec.path, filters)
+            fetched += 1
+            report.pages_fetched += 1
+            records = response.data
+
+            hashes = [record_hash(record) for record in records]
+            checksum = hashlib.sha256("".join(hashes).encode()).hexdigest()[:16]
+            page_id = f"{state.window_start}:{page}"
+            if checksums.get(page_id) == checksum:
+                report.pages_unchanged += 1
+                report.records_unchanged += len(records)
+            else:
+                emitted, entries = [], []
+                for record, digest in zip(records, hashes):
+                    key = record_key(record, digest)
+                    previous = store.keys.get(key)
+                    if previous == digest:
+                        report.records_unchanged += 1
+                        continue
+                    if previous is None:
+                        report.records_new += 1
+                    else:
+                        report.records_changed += 1
+                    emitted.append(record)
+                    entries.append((key, digest))
+                if emitted and sink is not None:
+                    result = sink(emitted)
+                    if asyncio.iscoroutine(result):
+                        await result
+                store.record(entries)
+                checksums[page_id] = checksum
+
+            for record in records:
+                try:
+                    seen = parse_date(record.get(date_key))
+                except (TypeError, ValueError):
+                    continue
+                if seen and seen.year == year and (
+                    state.pending_watermark is None or seen.isoformat() > state.pending_watermark
+                ):
+                    state.pending_watermark = seen.isoformat()
+
+            last_page = (
+                not records
+                or len(records) < self.page_size
+                or 1 < response.total_pages <= page
+            )
+            state.next_page = page + 1
+            state.page_checksums = checksums
+            if last_page:
+                state.in_progress = False
+                state.watermark = state.pending_watermark
+                state.next_page = 1
+            store.save(state)
+            if last_page:
+                report.complete = True
+                break
+
+        state.last_run_at = datetime.utcnow().isoformat()
+        store.save(state)
+        report.watermark = state.watermark
+        logger.info(
+            "delta_sync_finished",
+            endpoint=endpoint,
+            org_code=org_code,
+            year=year,
+            **asdict(report),
+        )
+        return report
+
+
+async def sync_to_warehouse(
+    warehouse: TransparencyWarehouse,
+    endpoint: str,
+    org_codes: List[str],
+    year: int,
+    page_size: int = 500,
+    lookback_days: int = 30,
+    max_pages: Optional[int] = None,
+    client: Optional[TransparencyAPIClient] = None,
+) -> Dict[str, int]:
+    """Delta-sync each organization into the warehouse, upserting changed records."""
+    totals = {"pages_fetched": 0, "pages_unchanged": 0, "records_new": 0, "records_changed": 0}
+
+    async def run(api: TransparencyAPIClient):
+        syncer = DeltaSync(
+            warehouse.root / SYNC_DIR,
+            client=api,
+            page_size=page_size,
+            lookback_days=lookback_days,
+            max_pages=max_pages,
+        )
+        for org_code in org_codes:
+            async def sink(records, _org=org_code):
+                await asyncio.to_thread(warehouse.write, endpoint, records, _org, False, True)
+
+            report = await syncer.sync(endpoint, org_code, year, sink=sink)
+            for key in totals:
+                totals[key] += getattr(report, key)
+
+    if client is not None:
+        await run(client)
+    else:
+        async with TransparencyAPIClient() as api:
+            await run(api)
+    return totals
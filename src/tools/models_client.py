@@ -13,6 +13,7 @@ import httpx
 from pydantic import BaseModel, Field
 
 from src.core import settings
+from src.core.profiling import record_external_call
 
 # Local imports for fallback
 try:
@@ -138,6 +139,7 @@ class ModelsClient:
         # Try API first
         if self.status != ModelAPIStatus.OFFLINE:
             try:
+                record_external_call("models_api")
                 response = await self.client.post(
                     "/v1/detect-anomalies",
                     json={
@@ -187,6 +189,7 @@ class ModelsClient:
         # Try API first
         if self.status != ModelAPIStatus.OFFLINE:
             try:
+                record_external_call("models_api")
                 response = await self.client.post(
                     "/v1/analyze-patterns",
                     json={
@@ -236,6 +239,7 @@ class ModelsClient:
         # Try API first
         if self.status != ModelAPIStatus.OFFLINE:
             try:
+                record_external_call("models_api")
                 response = await self.client.post(
                     "/v1/analyze-spectral",
                     json={
@@ -20,6 +20,7 @@ from src.core.exceptions import (
     DataSourceError,
     TransparencyAPIError,
 )
+from src.core.profiling import record_external_call
 
 
 class APIRateLimit:
@@ -223,6 +224,7 @@ class TransparencyAPIClient:
                     params=params,
                     attempt=attempt + 1,
                 )
+                record_external_call("transparency_api")
                 
                 response = await self.client.get(
                     url,
@@ -6,12 +6,19 @@ Date: 2025-01-24
 License: Proprietary - All rights reserved
 """
 
+import typing
 from datetime import date, datetime
 from decimal import Decimal
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Type, Union
 
+import numpy as np
 from pydantic import BaseModel, Field as PydanticField, validator
 
+from src.core import get_logger
+
+
+logger = get_logger(__name__)
+
 
 class Organization(BaseModel):
     """Government organization model."""
@@ -451,12 +458,277 @@ def parse_api_data(data: List[Dict[str, Any]], data_type: str) -> List[BaseModel
         raise ValueError(f"Unknown data type: {data_type}")
     
     parsed_data = []
-    for item in data:
+    for index, item in enumerate(data):
         try:
             parsed_item = model_class(**item)
             parsed_data.append(parsed_item)
         except Exception as e:
             # Log error but continue processing
+            logger.warning("api_record_rejected", data_type=data_type, row=index, error=str(e))
             continue
     
-    return parsed_data
\ No newline at end of file
+    return parsed_data
+
+
+# Columnar bulk parsing
+#
+# parse_api_data builds one pydantic model per record, which dominates the
+# cost of landing large pages. parse_api_columns converts a whole page into
+# typed numpy columns instead: one Python pass to pull each field out of the
+# dicts, then vectorized conversion. Use the models when an API response
+# needs them; use columns for bulk analysis and storage.
+
+# Column types: float64 (NaN = null), int64 (INT_NULL), datetime64[D] (NaT),
+# and str (object arrays, None = null)
+FLOAT, INT, DATE, STR = "float", "int", "date", "str"
+INT_NULL = np.iinfo(np.int64).min
+
+
+def _camel(name: str) -> str:
+    head, *rest = name.split("_")
+    return head + "".join(part.capitalize() for part in rest)
+
+
+def model_schema(model: Type[BaseModel], prefix: str = "") -> Dict[str, str]:
+    """Flatten a transparency model into ``{column: type}``, nested models as dotted columns."""
+    schema: Dict[str, str] = {}
+    for name, field in model.model_fields.items():
+        args = [a for a in (typing.get_args(field.annotation) or (field.annotation,)) if a is not type(None)]
+        nested = next((a for a in args if isinstance(a, type) and issubclass(a, BaseModel)), None)
+        if nested is not None:
+            schema.update(model_schema(nested, f"{prefix}{name}."))
+        elif date in args:
+            schema[prefix + name] = DATE
+        elif Decimal in args or float in args:
+            schema[prefix + name] = FLOAT
+        elif args == [int]:
+            schema[prefix + name] = INT
+        else:
+            schema[prefix + name] = STR
+    return schema
+
+
+class RowError(NamedTuple):
+    """A value that could not be converted; the column holds null for it."""
+
+    row: int
+    column: str
+    value: Any
+    message: str
+
+
+class ColumnBatch:
+    """A page of records as typed columns plus the per-row conversion errors."""
+
+    def __init__(self, columns: Dict[str, np.ndarray], schema: Dict[str, str], errors: List[RowError], rows: int):
+        self.columns = columns
+        self.schema = schema
+        self.errors = errors
+        self.rows = rows
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.columns[column]
+
+    @property
+    def valid(self) -> np.ndarray:
+        """Boolean mask of rows converted without errors."""
+        mask = np.ones(self.rows, dtype=bool)
+        mask[[error.row for error in self.errors]] = False
+        return mask
+
+    def errors_by_row(self) -> Dict[int, List[RowError]]:
+        report: Dict[int, List[RowError]] = {}
+        for error in self.errors:
+            report.setdefault(error.row, []).append(error)
+        return report
+
+    def cents(self, column: str) -> np.ndarray:
+        """A value column as int64 cents (INT_NULL for missing), exact for sums and comparisons."""
+        values = self.columns[column]
+        missing = np.isnan(values)
+        cents = np.rint(np.where(missing, 0, values) * 100).astype(np.int64)
+        cents[missing] = INT_NULL
+        return cents
+
+
+def _extract(records: Sequence[Any], name: str) -> List[Any]:
+    """One field from every record; keys are camelCase (API) or, page-wide, snake_case."""
+    camel = _camel(name)
+    values = [r.get(camel) for r in records]
+    if camel != name and values.count(None) == len(values):
+        values = [r.get(name) for r in records]
+    return values
+
+
+def _parse_number(value: Any) -> float:
+    if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, str):
+        text = value.strip().replace(" ", "")
+        if "," in text:
+            # Brazilian formatting: 1.234.567,89
+            text = text.replace(".", "").replace(",", ".")
+        return float(text)
+    raise ValueError(f"not a number: {value!r}")
+
+
+def _number_column(
+    values: List[Any], column: str, errors: List[RowError], integral: bool = False
+) -> np.ndarray:
+    try:
+        # None becomes NaN; numeric strings convert too
+        floats = np.array(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        floats = np.empty(len(values), dtype=np.float64)
+        for i, value in enumerate(values):
+            if value is None or value == "":
+                floats[i] = np.nan
+                continue
+            try:
+                floats[i] = _parse_number(value)
+            except (TypeError, ValueError) as e:
+                floats[i] = np.nan
+                errors.append(RowError(i, column, value, str(e)))
+    if not integral:
+        return floats
+
+    missing = np.isnan(floats)
+    fractional = ~missing & (floats != np.round(floats))
+    for i in np.flatnonzero(fractional):
+        errors.append(RowError(int(i), column, values[i], "not an integer"))
+    ints = np.where(missing | fractional, 0, floats).astype(np.int64)
+    ints[missing | fractional] = INT_NULL
+    return ints
+
+
+def _date_column(values: List[Any], column: str, errors: List[RowError]) -> np.ndarray:
+    """
+    DD/MM/YYYY, DD-MM-YYYY and YYYY-MM-DD strings (ISO may carry a time
+    part) decoded from their code points in one vectorized pass.
+    """
+    result = np.full(len(values), np.datetime64("NaT"), dtype="datetime64[D]")
+    strings = np.array([v if isinstance(v, str) else "" for v in values], dtype=str)
+    lengths = np.char.str_len(strings)
+    strings = strings.astype("U10")
+    codes = strings.view(np.uint32).reshape(len(values), 10).astype(np.int64)
+    digit = codes - ord("0")
+
+    def is_digit(*positions):
+        ok = np.ones(len(values), dtype=bool)
+        for p in positions:
+            ok &= (digit[:, p] >= 0) & (digit[:, p] <= 9)
+        return ok
+
+    def number(*positions):
+        total = np.zeros(len(values), dtype=np.int64)
+        for p in positions:
+            total = total * 10 + digit[:, p]
+        return total
+
+    full = lengths == 10
+    day_first = (
+        full & is_digit(0, 1, 3, 4, 6, 7, 8, 9)
+        & (((codes[:, 2] == ord("/")) & (codes[:, 5] == ord("/")))
+           | ((codes[:, 2] == ord("-")) & (codes[:, 5] == ord("-"))))
+    )
+    iso_prefix = is_digit(0, 1, 2, 3, 5, 6, 8, 9) & (codes[:, 4] == ord("-")) & (codes[:, 7] == ord("-"))
+    iso = full & iso_prefix
+
+    year = np.where(iso_prefix, number(0, 1, 2, 3), number(6, 7, 8, 9))
+    month = np.where(iso_prefix, number(5, 6), number(3, 4))
+    day = np.where(iso_prefix, number(8, 9), number(0, 1))
+    in_range = (month >= 1) & (month <= 12) & (day >= 1) & (day <= 31)
+    ok = (day_first | iso) & in_range
+
+    months = ((year - 1970) * 12 + month - 1).astype("datetime64[M]")
+    parsed = months.astype("datetime64[D]") + (day - 1).astype("timedelta64[D]")
+    # 31/02 rolls into March: reject days past the end of the month
+    in_range &= parsed.astype("datetime64[M]") == months
+    ok &= in_range
+    result[ok] = parsed[ok]
+
+    for i in np.flatnonzero(~ok):
+        value = values[i]
+        if value is None or value == "":
+            continue
+        if isinstance(value, datetime):
+            result[i] = np.datetime64(value.date(), "D")
+        elif isinstance(value, date):
+            result[i] = np.datetime64(value, "D")
+        elif iso_prefix[i] and in_range[i] and len(value) > 10 and value[10] in "T ":
+            result[i] = parsed[i]  # ISO timestamp: keep the date part
+        else:
+            errors.append(RowError(int(i), column, value, "unrecognised date"))
+    return result
+
+
+def _string_column(values: List[Any]) -> np.ndarray:
+    column = np.empty(len(values), dtype=object)
+    column[:] = [v if v is None or isinstance(v, str) else str(v) for v in values]
+    return column
+
+
+def parse_api_columns(data: Sequence[Dict[str, Any]], data_type: str) -> ColumnBatch:
+    """
+    Parse a page of API records into typed columns without building models.
+
+    Columns follow ``model_schema`` of the data type's model (nested models
+    as dotted names such as ``orgao.codigo``). Keys may be camelCase, as the
+    API sends them, or snake_case. Values that do not convert become null
+    and are reported in ``ColumnBatch.errors``; records that are not objects
+    are reported once with column ``"*"``.
+
+    Args:
+        data: Raw API data
+        data_type: Type of data (contracts, expenses, etc.)
+
+    Returns:
+        ColumnBatch with one array per column
+    """
+    model_class = MODEL_MAPPING.get(data_type.lower())
+    if not model_class:
+        raise ValueError(f"Unknown data type: {data_type}")
+
+    errors: List[RowError] = []
+    records = []
+    for i, record in enumerate(data):
+        if isinstance(record, dict):
+            records.append(record)
+        else:
+            errors.append(RowError(i, "*", record, "record is not an object"))
+            records.append({})
+
+    schema = model_schema(model_class)
+    columns: Dict[str, np.ndarray] = {}
+    nested: Dict[str, List[Dict[str, Any]]] = {"": records}
+    for column, kind in schema.items():
+        *parents, leaf = column.split(".")
+        path = ""
+        for parent in parents:
+            parent_path = path
+            path = f"{path}{parent}."
+            if path not in nested:
+                nested[path] = [v if isinstance(v, dict) else {} for v in _extract(nested[parent_path], parent)]
+        values = _extract(nested[path], leaf)
+
+        if kind == FLOAT:
+            columns[column] = _number_column(values, column, errors)
+        elif kind == INT:
+            columns[column] = _number_column(values, column, errors, integral=True)
+        elif kind == DATE:
+            columns[column] = _date_column(values, column, errors)
+        else:
+            columns[column] = _string_column(values)
+
+    errors.sort(key=lambda error: error.row)
+    if errors:
+        logger.warning(
+            "api_columns_errors",
+            data_type=data_type,
+            rows=len(records),
+            invalid_rows=len({error.row for error in errors}),
+        )
+    return ColumnBatch(columns, schema, errors, len(records))
@@ -0,0 +1,706 @@
+"""
+Module: tools.warehouse
+Description: Local columnar warehouse for Portal da Transparência data
+Author: Anderson H. Silva
+Date: 2025-01-24
+License: Proprietary - All rights reserved
+"""
+
+import asyncio
+import json
+import os
+import re
+import shutil
+import typing
+import uuid
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Type, Union
+
+import numpy as np
+from pydantic import BaseModel, ValidationError
+
+from src.core import get_logger, settings
+from .transparency_api import TransparencyAPIClient, TransparencyAPIFilter
+from .transparency_models import (
+    DATE,
+    FLOAT,
+    INT,
+    INT_NULL,
+    STR,
+    Agreement,
+    Bidding,
+    Contract,
+    Expense,
+    _camel,
+    model_schema,
+)
+
+
+logger = get_logger(__name__)
+
+
+class EndpointSpec(typing.NamedTuple):
+    """How one API endpoint is mapped onto warehouse partitions."""
+
+    path: str
+    model: Type[BaseModel]
+    date_column: str
+    value_columns: Tuple[str, ...]
+    org_column: str
+
+
+ENDPOINTS: Dict[str, EndpointSpec] = {
+    "contratos": EndpointSpec(
+        "/api-de-dados/contratos", Contract, "data_assinatura", ("valor_inicial", "valor_global"), "orgao.codigo"
+    ),
+    "despesas": EndpointSpec(
+        "/api-de-dados/despesas", Expense, "data_pagamento", ("valor", "valor_pago"), "orgao.codigo"
+    ),
+    "licitacoes": EndpointSpec(
+        "/api-de-dados/licitacoes", Bidding, "data_abertura", ("valor_estimado", "valor_homologado"), "orgao.codigo"
+    ),
+    "convenios": EndpointSpec(
+        "/api-de-dados/convenios", Agreement, "data_assinatura", ("valor_global", "valor_repasse"), "orgao_superior.codigo"
+    ),
+}
+
+# Column types as in transparency_models; strings are stored dictionary-encoded
+# (int32 codes into a per-partition list, -1 = null)
+VALUE_STAT = "_value"
+DELETED = "_deleted.npy"
+UNKNOWN = "unknown"
+# <root>/_ids/<endpoint>/org=<code>.json: live record id -> parts holding it
+ID_INDEX_DIR = "_ids"
+
+
+def _snake(key: str) -> str:
+    return re.sub(r"(?<!^)(?=[A-Z])", "_", key).lower()
+
+
+def _snake_keys(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {_snake(k): _snake_keys(v) for k, v in value.items()}
+    return value
+
+
+def _coerce_strings(data: Dict[str, Any], model: Type[BaseModel]) -> Dict[str, Any]:
+    """The API sends numeric ids and codes where the models declare strings."""
+    for name, field in model.model_fields.items():
+        if name not in data:
+            continue
+        args = typing.get_args(field.annotation) or (field.annotation,)
+        nested = next((a for a in args if isinstance(a, type) and issubclass(a, BaseModel)), None)
+        value = data[name]
+        if nested is not None and isinstance(value, dict):
+            data[name] = _coerce_strings(dict(value), nested)
+        elif str in args and int not in args and isinstance(value, (int, float)) and not isinstance(value, bool):
+            data[name] = str(value)
+    return data
+
+
+def _flatten(model: BaseModel, prefix: str = "") -> Dict[str, Any]:
+    row: Dict[str, Any] = {}
+    for name in type(model).model_fields:
+        value = getattr(model, name)
+        if isinstance(value, BaseModel):
+            row.update(_flatten(value, f"{prefix}{name}."))
+        else:
+            row[prefix + name] = value
+    return row
+
+
+def parse_date(value: Any) -> Optional[date]:
+    """Dates as the API sends them (DD/MM/YYYY) or ISO strings; ``date`` passes through."""
+    if value is None or isinstance(value, date):
+        return value.date() if isinstance(value, datetime) else value
+    for fmt in ("%d/%m/%Y", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognised date: {value!r}")
+
+
+def _column(values: List[Any], kind: str) -> Tuple[np.ndarray, Optional[List[str]]]:
+    if kind == FLOAT:
+        return np.array([np.nan if v is None else float(v) for v in values], dtype=np.float64), None
+    if kind == INT:
+        return np.array([INT_NULL if v is None else int(v) for v in values], dtype=np.int64), None
+    if kind == DATE:
+        return np.array([v.isoformat() if isinstance(v, date) else "NaT" for v in values], dtype="datetime64[D]"), None
+    dictionary: Dict[str, int] = {}
+    codes = np.array(
+        [-1 if v is None else dictionary.setdefault(str(v), len(dictionary)) for v in values],
+        dtype=np.int32,
+    )
+    return codes, list(dictionary)
+
+
+def _decode(array: np.ndarray, kind: str, dictionary: Optional[List[str]] = None) -> List[Any]:
+    """Inverse of ``_column``: Python values with None for nulls."""
+    if kind == DATE:
+        return [None if np.isnat(v) else v.item() for v in array]
+    if kind == FLOAT:
+        return [None if v != v else v for v in array.tolist()]
+    if kind == INT:
+        return [None if v == INT_NULL else v for v in array.tolist()]
+    return [None if code < 0 else dictionary[code] for code in array.tolist()]
+
+
+def _stats(array: np.ndarray, kind: str) -> Optional[List[Any]]:
+    if kind == FLOAT:
+        valid = array[~np.isnan(array)]
+    elif kind == INT:
+        valid = array[array != INT_NULL]
+    elif kind == DATE:
+        valid = array[~np.isnat(array)]
+    else:
+        return None
+    if not len(valid):
+        return None
+    low, high = valid.min(), valid.max()
+    if kind == DATE:
+        return [str(low), str(high)]
+    return [float(low), float(high)]
+
+
+class WarehouseTable:
+    """Result of a warehouse scan: decoded columns of equal length."""
+
+    def __init__(self, endpoint: str, columns: Dict[str, np.ndarray], schema: Dict[str, str]):
+        self.endpoint = endpoint
+        self.columns = columns
+        self.schema = schema
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.columns[column]
+
+    def slice(self, start: int, stop: int) -> "WarehouseTable":
+        """Rows ``start:stop`` as a table sharing this one's arrays."""
+        return WarehouseTable(
+            self.endpoint, {name: array[start:stop] for name, array in self.columns.items()}, self.schema
+        )
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """
+        Rows shaped like the API payload (camelCase, nested, DD/MM/YYYY
+        dates), so agents can consume warehouse and API data alike.
+        """
+        converted = []
+        for name, array in self.columns.items():
+            kind = self.schema.get(name, STR)
+            if kind == DATE:
+                values = [None if np.isnat(v) else v.item().strftime("%d/%m/%Y") for v in array]
+            elif kind == FLOAT:
+                values = [None if v != v else v for v in array.tolist()]
+            elif kind == INT:
+                values = [None if v == INT_NULL else v for v in array.tolist()]
+            else:
+                values = array.tolist()
+            converted.append((name, values))
+
+        records = []
+        for i in range(len(self)):
+            record: Dict[str, Any] = {}
+            for name, values in converted:
+                value = values[i]
+                if value is None:
+                    continue
+                if name.startswith("_"):
+                    record[name] = value
+                    continue
+                *parents, leaf = name.split(".")
+                target = record
+                for parent in parents:
+                    target = target.setdefault(_camel(parent), {})
+                target[_camel(leaf)] = value
+            records.append(record)
+        return records
+
+
+class TransparencyWarehouse:
+    """
+    Partitioned columnar store for Portal da Transparência records.
+
+    Layout: ``<root>/<endpoint>/year=<YYYY>/org=<code>/part-<id>/`` with one
+    ``.npy`` file per column (plus a ``.dict.json`` string dictionary for
+    text columns) and a small ``_meta.json`` with the schema and per-column
+    min/max. Scans prune partitions by path
+    (year, organization) and by min/max statistics (date range, value
+    threshold), then read only the columns they need, memory-mapped.
+
+    Parts are immutable; upserts mark superseded rows in a per-part
+    ``_deleted.npy`` deletion vector that scans apply. A per-organization
+    index of record ids (``_ids/``) tells an upsert which parts hold the
+    ids it replaces, and a partition that accumulates more than
+    ``compact_after`` parts is merged into one, dropping deleted rows.
+    """
+
+    def __init__(self, root: Union[str, Path], compact_after: int = 8):
+        self.root = Path(root)
+        self.compact_after = compact_after
+
+    # Writing -------------------------------------------------------------
+
+    def write(
+        self,
+        endpoint: str,
+        records: Sequence[Dict[str, Any]],
+        org_code: Optional[str] = None,
+        replace: bool = False,
+        upsert: bool = False,
+    ) -> Dict[str, int]:
+        """
+        Land raw API records, one part per (year, organization).
+
+        Records are validated through the endpoint's transparency model;
+        rejected ones are counted and skipped. ``org_code`` is the code the
+        data was requested with, used when records don't carry their own.
+        With ``replace`` the written partitions drop their previous parts;
+        with ``upsert`` rows already stored under the same organization and
+        ``id`` (in any year) are marked deleted, so changed records replace
+        their older version without rewriting the parts that hold it.
+        """
+        spec = ENDPOINTS[endpoint]
+        schema = model_schema(spec.model)
+        groups: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        rejected = 0
+        for raw in records:
+            try:
+                model = spec.model.model_validate(_coerce_strings(_snake_keys(raw), spec.model))
+            except ValidationError:
+                rejected += 1
+                continue
+            row = _flatten(model)
+            signed = parse_date(row.get(spec.date_column))
+            year = str(signed.year) if signed else str(row.get("ano") or UNKNOWN)
+            org = row.get(spec.org_column) or org_code or UNKNOWN
+            row["_org_code"] = org_code or org
+            groups.setdefault((year, str(org)), []).append(row)
+
+        indexes = {org: self._load_id_index(endpoint, org) for _, org in groups}
+        if upsert:
+            self._mark_superseded(endpoint, groups, indexes)
+
+        written = 0
+        for (year, org), rows in groups.items():
+            partition = self.root / endpoint / f"year={year}" / f"org={org}"
+            part = self._write_part(partition, spec, schema, rows, replace)
+            written += len(rows)
+            index = indexes[org]
+            if replace:
+                self._sync_id_index(endpoint, org, index)
+            else:
+                self._index_part(index, self._part_key(endpoint, part), self._part_ids(part))
+            if sum(1 for _ in partition.glob("part-*")) > self.compact_after:
+                self._compact_partition(partition, spec)
+                self._sync_id_index(endpoint, org, index)
+        for org, index in indexes.items():
+            self._save_id_index(endpoint, org, index)
+
+        logger.info(
+            "warehouse_records_written",
+            endpoint=endpoint,
+            written=written,
+            rejected=rejected,
+            partitions=len(groups),
+        )
+        return {"written": written, "rejected": rejected, "partitions": len(groups)}
+
+    def _write_part(self, partition: Path, spec: EndpointSpec, schema: Dict[str, str], rows, replace: bool) -> Path:
+        partition.mkdir(parents=True, exist_ok=True)
+        previous = [p for p in partition.iterdir() if p.name.startswith("part-")] if replace else []
+        full_schema = {**schema, "_org_code": STR}
+        columns = {name: [row.get(name) for row in rows] for name in full_schema}
+        return self._write_columns(partition, spec, full_schema, columns, len(rows), previous)
+
+    def _write_columns(
+        self,
+        partition: Path,
+        spec: EndpointSpec,
+        schema: Dict[str, str],
+        columns: Dict[str, List[Any]],
+        rows: int,
+        previous: Sequence[Path] = (),
+    ) -> Path:
+        """Write one part from Python column values, then drop ``previous`` parts."""
+        partition.mkdir(parents=True, exist_ok=True)
+        staging = partition / f".tmp-{uuid.uuid4().hex[:12]}"
+        staging.mkdir()
+
+        meta: Dict[str, Any] = {"rows": rows, "schema": schema, "stats": {}}
+        for name, kind in schema.items():
+            array, dictionary = _column(columns[name], kind)
+            np.save(staging / f"{name}.npy", array)
+            if dictionary is not None:
+                with open(staging / f"{name}.dict.json", "w", encoding="utf-8") as f:
+                    json.dump(dictionary, f, ensure_ascii=False)
+            stats = _stats(array, kind)
+            if stats is not None:
+                meta["stats"][name] = stats
+
+        value = self._coalesce(lambda c: np.load(staging / f"{c}.npy"), spec)
+        value_stats = _stats(value, FLOAT)
+        if value_stats is not None:
+            meta["stats"][VALUE_STAT] = value_stats
+
+        with open(staging / "_meta.json", "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        part = partition / f"part-{datetime.utcnow():%Y%m%d%H%M%S}-{uuid.uuid4().hex[:8]}"
+        os.replace(staging, part)
+        for old in previous:
+            shutil.rmtree(old, ignore_errors=True)
+        return part
+
+    def _mark_superseded(
+        self,
+        endpoint: str,
+        groups: Dict[Tuple[str, str], List[Dict[str, Any]]],
+        indexes: Dict[str, Dict[str, Any]],
+    ):
+        """Mark stored rows whose id is being rewritten, touching only the parts the id index names."""
+        incoming: Dict[str, set] = {}
+        for (_, org), rows in groups.items():
+            incoming.setdefault(org, set()).update(str(row["id"]) for row in rows if row.get("id") is not None)
+        for org, ids in incoming.items():
+            located: Dict[str, set] = {}
+            for record_id in ids:
+                # Rows being superseded are no longer live anywhere
+                for key in indexes[org]["ids"].pop(record_id, ()):
+                    located.setdefault(key, set()).add(record_id)
+            for key, part_ids in located.items():
+                part = self.root / endpoint / key
+                if not part.is_dir():
+                    continue
+                with open(part / "id.dict.json", encoding="utf-8") as f:
+                    dictionary = json.load(f)
+                hits = [code for code, value in enumerate(dictionary) if value in part_ids]
+                if not hits:
+                    continue
+                superseded = np.isin(np.load(part / "id.npy"), hits)
+                deleted_path = part / DELETED
+                if deleted_path.exists():
+                    superseded |= np.load(deleted_path)
+                staging = part / f".tmp-{DELETED}"
+                with open(staging, "wb") as f:
+                    np.save(f, superseded)
+                os.replace(staging, deleted_path)
+
+    def _compact_partition(self, partition: Path, spec: EndpointSpec) -> Optional[Path]:
+        """Merge a partition's parts into one, dropping rows marked deleted."""
+        parts = sorted(partition.glob("part-*"))
+        if len(parts) < 2:
+            return None
+        schema: Dict[str, str] = {}
+        columns: Dict[str, List[Any]] = {}
+        total = 0
+        for part in parts:
+            with open(part / "_meta.json", encoding="utf-8") as f:
+                meta = json.load(f)
+            keep = np.ones(meta["rows"], dtype=bool)
+            if (part / DELETED).exists():
+                keep &= ~np.load(part / DELETED)
+            rows = np.flatnonzero(keep)
+            for name, kind in meta["schema"].items():
+                schema.setdefault(name, kind)
+                dictionary = None
+                if kind == STR:
+                    with open(part / f"{name}.dict.json", encoding="utf-8") as f:
+                        dictionary = json.load(f)
+                values = _decode(np.load(part / f"{name}.npy")[rows], kind, dictionary)
+                columns.setdefault(name, [None] * total).extend(values)
+            total += len(rows)
+            # Columns absent from this part's (older) schema
+            for values in columns.values():
+                values.extend([None] * (total - len(values)))
+
+        merged = self._write_columns(partition, spec, schema, columns, total, parts)
+        logger.info("warehouse_partition_compacted", partition=str(partition), parts=len(parts), rows=total)
+        return merged
+
+    def compact(self, endpoint: str, org_codes: Optional[Sequence[str]] = None) -> int:
+        """Merge every multi-part partition of ``endpoint`` into a single part; returns partitions compacted."""
+        spec = ENDPOINTS[endpoint]
+        partitions = sorted({part.parent for part in self.partitions(endpoint, org_codes)})
+        compacted = 0
+        orgs = set()
+        for partition in partitions:
+            if self._compact_partition(partition, spec) is not None:
+                compacted += 1
+                orgs.add(partition.name[len("org="):])
+        for org in orgs:
+            self._save_id_index(endpoint, org, self._load_id_index(endpoint, org))
+        return compacted
+
+    # Id index ------------------------------------------------------------
+
+    def _id_index_path(self, endpoint: str, org: str) -> Path:
+        return self.root / ID_INDEX_DIR / endpoint / f"org={org}.json"
+
+    def _part_key(self, endpoint: str, part: Path) -> str:
+        return part.relative_to(self.root / endpoint).as_posix()
+
+    @staticmethod
+    def _part_ids(part: Path) -> List[str]:
+        """Ids of the part's live (not deleted) rows."""
+        if not (part / "id.npy").exists():
+            return []
+        with open(part / "id.dict.json", encoding="utf-8") as f:
+            dictionary = json.load(f)
+        codes = np.load(part / "id.npy")
+        if (part / DELETED).exists():
+            codes = codes[~np.load(part / DELETED)]
+        return [dictionary[code] for code in np.unique(codes[codes >= 0]).tolist()]
+
+    @staticmethod
+    def _index_part(index: Dict[str, Any], key: str, ids: List[str]):
+        index["parts"].append(key)
+        for record_id in ids:
+            index["ids"].setdefault(record_id, []).append(key)
+
+    def _load_id_index(self, endpoint: str, org: str) -> Dict[str, Any]:
+        """The organization's id index, reconciled with the parts actually on disk."""
+        path = self._id_index_path(endpoint, org)
+        index: Dict[str, Any] = {"parts": [], "ids": {}}
+        if path.exists():
+            with open(path, encoding="utf-8") as f:
+                index = json.load(f)
+        self._sync_id_index(endpoint, org, index)
+        return index
+
+    def _sync_id_index(self, endpoint: str, org: str, index: Dict[str, Any]):
+        """Drop parts that were replaced or compacted away and index parts written without it."""
+        on_disk = {self._part_key(endpoint, part): part for part in self.partitions(endpoint, [org])}
+        known = set(index["parts"])
+        gone = known - on_disk.keys()
+        if gone:
+            index["parts"] = [key for key in index["parts"] if key not in gone]
+            for record_id in list(index["ids"]):
+                keys = [key for key in index["ids"][record_id] if key not in gone]
+                if keys:
+                    index["ids"][record_id] = keys
+                else:
+                    del index["ids"][record_id]
+        for key, part in on_disk.items():
+            if key not in known:
+                self._index_part(index, key, self._part_ids(part))
+
+    def _save_id_index(self, endpoint: str, org: str, index: Dict[str, Any]):
+        path = self._id_index_path(endpoint, org)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        staging = path.with_name(f".tmp-{path.name}")
+        with open(staging, "w", encoding="utf-8") as f:
+            json.dump(index, f, ensure_ascii=False)
+        os.replace(staging, path)
+
+    # Reading -------------------------------------------------------------
+
+    @staticmethod
+    def _coalesce(load, spec: EndpointSpec) -> np.ndarray:
+        value = np.array(load(spec.value_columns[0]), dtype=np.float64)
+        for column in spec.value_columns[1:]:
+            missing = np.isnan(value)
+            if missing.any():
+                value[missing] = load(column)[missing]
+        return value
+
+    def partitions(
+        self,
+        endpoint: str,
+        org_codes: Optional[Sequence[str]] = None,
+        years: Optional[Tuple[int, int]] = None,
+    ) -> Iterator[Path]:
+        """Part directories whose path matches the organization and year filters."""
+        base = self.root / endpoint
+        if not base.is_dir():
+            return
+        orgs = {str(code) for code in org_codes} if org_codes else None
+        for year_dir in sorted(base.glob("year=*")):
+            year = year_dir.name[len("year="):]
+            if years is not None and (not year.isdigit() or not years[0] <= int(year) <= years[1]):
+                continue
+            for org_dir in sorted(year_dir.glob("org=*")):
+                if orgs is not None and org_dir.name[len("org="):] not in orgs:
+                    continue
+                yield from sorted(org_dir.glob("part-*"))
+
+    def has_data(self, endpoint: str) -> bool:
+        return next(self.partitions(endpoint), None) is not None
+
+    def scan(
+        self,
+        endpoint: str,
+        org_codes: Optional[Sequence[str]] = None,
+        start_date: Optional[Union[str, date]] = None,
+        end_date: Optional[Union[str, date]] = None,
+        min_value: Optional[float] = None,
+        max_value: Optional[float] = None,
+        columns: Optional[Sequence[str]] = None,
+        limit: Optional[int] = None,
+    ) -> WarehouseTable:
+        """
+        Rows matching the predicates, reading as little as possible.
+
+        Dates accept ``date`` objects, DD/MM/YYYY or ISO strings; the value
+        predicates apply to the endpoint's value columns coalesced in order
+        (e.g. ``valor_inicial`` then ``valor_global`` for contracts).
+        """
+        collected: Dict[str, List[np.ndarray]] = {}
+        schema: Dict[str, str] = {}
+        for table in self.scan_parts(
+            endpoint, org_codes, start_date, end_date, min_value, max_value, columns, limit
+        ):
+            schema.update(table.schema)
+            for column, values in table.columns.items():
+                collected.setdefault(column, []).append(values)
+
+        table_columns = {
+            column: np.concatenate(chunks) for column, chunks in collected.items()
+        }
+        if not table_columns and columns is not None:
+            table_columns = {column: np.empty(0) for column in columns}
+        return WarehouseTable(endpoint, table_columns, schema)
+
+    def scan_parts(
+        self,
+        endpoint: str,
+        org_codes: Optional[Sequence[str]] = None,
+        start_date: Optional[Union[str, date]] = None,
+        end_date: Optional[Union[str, date]] = None,
+        min_value: Optional[float] = None,
+        max_value: Optional[float] = None,
+        columns: Optional[Sequence[str]] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[WarehouseTable]:
+        """
+        The rows of ``scan``, as one table per part with matching rows.
+
+        A part is only read when the next table is requested, so consumers
+        can process the rows of one part before the next is loaded.
+        """
+        spec = ENDPOINTS[endpoint]
+        start, end = parse_date(start_date), parse_date(end_date)
+        years = None
+        if start or end:
+            years = (start.year if start else 0, end.year if end else 9999)
+        start64 = np.datetime64(start, "D") if start else None
+        end64 = np.datetime64(end, "D") if end else None
+
+        remaining = limit
+        pruned = scanned = 0
+        for part in self.partitions(endpoint, org_codes, years):
+            with open(part / "_meta.json", encoding="utf-8") as f:
+                meta = json.load(f)
+            if not self._may_match(meta, spec, start, end, min_value, max_value):
+                pruned += 1
+                continue
+            scanned += 1
+
+            def load(column, _part=part):
+                return np.load(_part / f"{column}.npy", mmap_mode="r")
+
+            mask = np.ones(meta["rows"], dtype=bool)
+            if (part / DELETED).exists():
+                mask &= ~np.load(part / DELETED)
+            if start64 is not None or end64 is not None:
+                dates = load(spec.date_column)
+                mask &= ~np.isnat(dates)
+                if start64 is not None:
+                    mask &= dates >= start64
+                if end64 is not None:
+                    mask &= dates <= end64
+            if min_value is not None or max_value is not None:
+                value = self._coalesce(load, spec)
+                if min_value is not None:
+                    mask &= value >= min_value
+                if max_value is not None:
+                    mask &= value <= max_value
+            rows = np.flatnonzero(mask)
+            if remaining is not None:
+                rows = rows[:remaining]
+                remaining -= len(rows)
+            if not len(rows):
+                continue
+
+            part_columns: Dict[str, np.ndarray] = {}
+            schema: Dict[str, str] = {}
+            wanted = list(columns) if columns is not None else list(meta["schema"])
+            for column in wanted:
+                kind = meta["schema"][column]
+                schema[column] = kind
+                values = np.asarray(load(column)[rows])
+                if kind == STR:
+                    with open(part / f"{column}.dict.json", encoding="utf-8") as f:
+                        dictionary = np.array(json.load(f) + [None], dtype=object)
+                    values = dictionary[values]
+                part_columns[column] = values
+            yield WarehouseTable(endpoint, part_columns, schema)
+            if remaining == 0:
+                break
+
+        logger.debug("warehouse_scan", endpoint=endpoint, scanned_parts=scanned, pruned_parts=pruned)
+
+    @staticmethod
+    def _may_match(meta, spec: EndpointSpec, start, end, min_value, max_value) -> bool:
+        """Zone-map check: can any row of this part satisfy the predicates?"""
+        stats = meta["stats"]
+        if start or end:
+            date_range = stats.get(spec.date_column)
+            if date_range is None:
+                return False
+            if start and date.fromisoformat(date_range[1]) < start:
+                return False
+            if end and date.fromisoformat(date_range[0]) > end:
+                return False
+        if min_value is not None or max_value is not None:
+            value_range = stats.get(VALUE_STAT)
+            if value_range is None:
+                return False
+            if min_value is not None and value_range[1] < min_value:
+                return False
+            if max_value is not None and value_range[0] > max_value:
+                return False
+        return True
+
+    async def query_records(self, endpoint: str, **predicates: Any) -> List[Dict[str, Any]]:
+        """``scan(...).to_records()`` off the event loop, for agents."""
+        return await asyncio.to_thread(lambda: self.scan(endpoint, **predicates).to_records())
+
+
+def get_warehouse() -> Optional[TransparencyWarehouse]:
+    """Warehouse at ``settings.transparency_warehouse_path``, or None when not configured."""
+    path = settings.transparency_warehouse_path
+    return TransparencyWarehouse(path) if path else None
+
+
+async def ingest(
+    warehouse: TransparencyWarehouse,
+    endpoint: str,
+    org_codes: Sequence[str],
+    year: int,
+    page_size: int = 500,
+    max_pages: int = 10,
+    client: Optional[TransparencyAPIClient] = None,
+) -> Dict[str, int]:
+    """Fetch every page for each organization and year and land it, replacing older parts."""
+    spec = ENDPOINTS[endpoint]
+    totals = {"written": 0, "rejected": 0, "partitions": 0}
+
+    async def run(api: TransparencyAPIClient):
+        for org_code in org_codes:
+            filters = TransparencyAPIFilter(codigo_orgao=org_code, ano=year, tamanho_pagina=page_size)
+            records = await api.get_all_pages(spec.path, filters, max_pages=max_pages)
+            result = await asyncio.to_thread(warehouse.write, endpoint, records, org_code, True)
+            for key in totals:
+                totals[key] += result[key]
+
+    if client is not None:
+        await run(client)
+    else:
+        async with TransparencyAPIClient() as api:
+            await run(api)
+    return totals
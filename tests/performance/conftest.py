@@ -0,0 +1,34 @@
+"""
+Fixtures for the performance benchmarks.
+"""
+
+import pytest
+
+from tests.performance.harness import BenchmarkRecorder, measure
+
+
+@pytest.fixture(scope="session")
+def benchmark_recorder():
+    recorder = BenchmarkRecorder.from_env()
+    yield recorder
+    recorder.write()
+
+
+@pytest.fixture
+def perf_benchmark(benchmark_recorder):
+    """
+    ``await perf_benchmark(name, fn, repeat=5, **params)`` times ``fn``, records
+    the result and fails when it regressed past the threshold.
+    """
+
+    async def run(name, fn, repeat=5, warmup=1, **params):
+        result = benchmark_recorder.record(name, await measure(fn, repeat, warmup), **params)
+        change = "" if result.change is None else f" ({result.change:+.1%} vs baseline)"
+        print(f"\n{name}: median {result.median_ms:.2f}ms over {repeat} runs{change}")
+        assert not result.regressed(benchmark_recorder.regression_threshold), (
+            f"{name} regressed {result.change:.1%} (median {result.median_ms:.2f}ms, "
+            f"baseline {result.baseline_ms:.2f}ms)"
+        )
+        return result
+
+    return run
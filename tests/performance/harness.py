@@ -0,0 +1,127 @@
+"""
+Timing harness for the hot-path benchmarks.
+
+Results are written as JSON and compared against a baseline file from an
+earlier run; a benchmark fails when its median is slower than the
+baseline by more than the regression threshold. Configured through
+environment variables:
+
+- ``BENCHMARK_OUTPUT``: results file (default ``.benchmarks/latest.json``)
+- ``BENCHMARK_BASELINE``: baseline file (default ``.benchmarks/baseline.json``,
+  skipped when missing)
+- ``BENCHMARK_REGRESSION_THRESHOLD``: allowed slowdown, e.g. ``0.2`` for 20%
+
+Promote a run to baseline by copying its results file.
+"""
+
+import asyncio
+import json
+import os
+import platform
+import statistics
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    samples_ms: List[float]
+    params: Dict[str, Any] = field(default_factory=dict)
+    baseline_ms: Optional[float] = None
+
+    @property
+    def median_ms(self) -> float:
+        return statistics.median(self.samples_ms)
+
+    @property
+    def change(self) -> Optional[float]:
+        """Relative change of the median against the baseline (0.1 = 10% slower)."""
+        if not self.baseline_ms:
+            return None
+        return self.median_ms / self.baseline_ms - 1
+
+    def regressed(self, threshold: float) -> bool:
+        return self.change is not None and self.change > threshold
+
+    def to_dict(self) -> Dict[str, Any]:
+        ordered = sorted(self.samples_ms)
+        return {
+            "median_ms": round(self.median_ms, 4),
+            "min_ms": round(ordered[0], 4),
+            "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 4),
+            "mean_ms": round(statistics.fmean(ordered), 4),
+            "runs": len(ordered),
+            "params": self.params,
+            "baseline_ms": self.baseline_ms,
+            "change": None if self.change is None else round(self.change, 4),
+        }
+
+
+async def measure(fn: Callable[[], Any], repeat: int = 5, warmup: int = 1) -> List[float]:
+    """Wall time in milliseconds of ``repeat`` calls (awaited when they return a coroutine)."""
+    samples = []
+    for run in range(warmup + repeat):
+        start = time.perf_counter()
+        result = fn()
+        if asyncio.iscoroutine(result):
+            await result
+        elapsed = (time.perf_counter() - start) * 1000
+        if run >= warmup:
+            samples.append(elapsed)
+    return samples
+
+
+class BenchmarkRecorder:
+    """Collects results for a session, compares them with the baseline and writes them out."""
+
+    def __init__(
+        self,
+        output_path: Path,
+        baseline_path: Optional[Path] = None,
+        regression_threshold: float = 0.2,
+    ):
+        self.output_path = Path(output_path)
+        self.regression_threshold = regression_threshold
+        self.baseline: Dict[str, Dict[str, Any]] = {}
+        if baseline_path is not None and Path(baseline_path).exists():
+            with open(baseline_path, encoding="utf-8") as f:
+                self.baseline = json.load(f).get("results", {})
+        self.results: Dict[str, BenchmarkResult] = {}
+
+    @classmethod
+    def from_env(cls) -> "BenchmarkRecorder":
+        return cls(
+            Path(os.environ.get("BENCHMARK_OUTPUT", ".benchmarks/latest.json")),
+            Path(os.environ.get("BENCHMARK_BASELINE", ".benchmarks/baseline.json")),
+            float(os.environ.get("BENCHMARK_REGRESSION_THRESHOLD", "0.2")),
+        )
+
+    def record(self, name: str, samples_ms: List[float], **params) -> BenchmarkResult:
+        baseline = self.baseline.get(name, {}).get("median_ms")
+        result = BenchmarkResult(name, samples_ms, params, baseline)
+        self.results[name] = result
+        return result
+
+    def regressions(self) -> List[BenchmarkResult]:
+        return [r for r in self.results.values() if r.regressed(self.regression_threshold)]
+
+    def write(self):
+        if not self.results:
+            return
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "created_at": datetime.utcnow().isoformat(),
+            "environment": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+            },
+            "regression_threshold": self.regression_threshold,
+            "results": {name: result.to_dict() for name, result in sorted(self.results.items())},
+        }
+        with open(self.output_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, indent=2, ensure_ascii=False)
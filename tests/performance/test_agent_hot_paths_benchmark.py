@@ -0,0 +1,142 @@
+"""
+Benchmark: agent hot paths over synthetic contracts - Zumbi detectors,
+Anita pattern and spectral analysis, Tiradentes rendering.
+
+Run with ``pytest tests/performance -m performance -s`` to see the numbers;
+results go to ``BENCHMARK_OUTPUT`` and are gated against ``BENCHMARK_BASELINE``
+(see ``tests/performance/harness.py``).
+"""
+
+import pytest
+
+from src.agents.anita import AnalysisRequest, AnalystAgent
+from src.agents.deodoro import AgentContext
+from src.agents.tiradentes import ReportFormat, ReporterAgent, ReportRequest, ReportType
+from src.agents.zumbi import InvestigatorAgent
+from tests.utils.synthetic_contracts import SyntheticContracts
+
+
+ORGANIZATIONS = 3
+CONTRACTS_PER_ORG = 1000
+
+DETECTORS = [
+    "price_anomaly",
+    "vendor_concentration",
+    "temporal_patterns",
+    "spectral_patterns",
+    "duplicate_contracts",
+    "payment_patterns",
+]
+PATTERN_ANALYSES = [
+    "spending_trends",
+    "organizational_patterns",
+    "vendor_behavior",
+    "seasonal_patterns",
+    "value_distribution",
+]
+
+
+@pytest.fixture(scope="module")
+def contracts():
+    return SyntheticContracts(
+        organizations=ORGANIZATIONS,
+        contracts_per_org=CONTRACTS_PER_ORG,
+        duplicate_rate=0.05,
+    ).generate()
+
+
+@pytest.fixture
+def context():
+    return AgentContext(investigation_id="benchmark")
+
+
+@pytest.mark.performance
+@pytest.mark.parametrize("detector", DETECTORS)
+@pytest.mark.asyncio
+async def test_investigator_detectors(perf_benchmark, contracts, context, detector):
+    agent = InvestigatorAgent()
+    detect = agent.anomaly_detectors[detector]
+    await perf_benchmark(
+        f"zumbi.{detector}",
+        lambda: detect(contracts, context),
+        repeat=3,
+        records=len(contracts),
+    )
+
+
+@pytest.mark.performance
+@pytest.mark.asyncio
+async def test_analyst_pattern_analysis(perf_benchmark, contracts, context):
+    agent = AnalystAgent()
+    request = AnalysisRequest(query="benchmark", analysis_types=PATTERN_ANALYSES)
+    await perf_benchmark(
+        "anita.pattern_analysis",
+        lambda: agent._run_pattern_analysis(contracts, request, context),
+        repeat=3,
+        records=len(contracts),
+    )
+
+
+@pytest.mark.performance
+@pytest.mark.asyncio
+async def test_analyst_spectral_analysis(perf_benchmark, contracts, context):
+    agent = AnalystAgent()
+    request = AnalysisRequest(query="benchmark", analysis_types=["spectral_patterns"])
+    await perf_benchmark(
+        "anita.spectral_patterns",
+        lambda: agent._analyze_spectral_patterns(contracts, request, context),
+        repeat=3,
+        records=len(contracts),
+    )
+
+
+def _investigation_results(contracts):
+    anomalies = [
+        {
+            "type": DETECTORS[i % len(DETECTORS)],
+            "severity": (i % 10) / 10,
+            "confidence": 0.8,
+            "description": f"Anomalia sintética {i}",
+            "explanation": contract["objeto"],
+            "evidence": {"value": contract["valorInicial"]},
+            "recommendations": [f"Revisar contrato {contract['numero']}", "Auditar fornecedor"],
+            "affected_entities": [contract["fornecedor"]],
+            "financial_impact": contract["valorInicial"],
+        }
+        for i, contract in enumerate(contracts[::20])
+    ]
+    return {
+        "query": "benchmark",
+        "anomalies": anomalies,
+        "summary": {
+            "total_records": len(contracts),
+            "anomalies_found": len(anomalies),
+            "total_value": sum(c["valorInicial"] for c in contracts),
+            "suspicious_value": sum(a["financial_impact"] for a in anomalies),
+            "risk_score": 5.0,
+            "high_severity_count": len([a for a in anomalies if a["severity"] > 0.7]),
+            "medium_severity_count": len([a for a in anomalies if 0.3 < a["severity"] <= 0.7]),
+            "low_severity_count": len([a for a in anomalies if a["severity"] <= 0.3]),
+        },
+        "metadata": {"timestamp": "2024-01-01T00:00:00"},
+    }
+
+
+@pytest.mark.performance
+@pytest.mark.parametrize("report_format", [ReportFormat.MARKDOWN, ReportFormat.HTML, ReportFormat.JSON])
+@pytest.mark.asyncio
+async def test_reporter_rendering(perf_benchmark, contracts, context, report_format):
+    agent = ReporterAgent()
+    request = ReportRequest(
+        report_type=ReportType.INVESTIGATION_REPORT,
+        format=report_format,
+        investigation_results=_investigation_results(contracts),
+    )
+    sections = await agent._generate_report_content(request, context)
+    await perf_benchmark(
+        f"tiradentes.render.{report_format.value}",
+        lambda: agent._render_report(sections, request, context),
+        repeat=10,
+        sections=len(sections),
+        anomalies=len(request.investigation_results["anomalies"]),
+    )
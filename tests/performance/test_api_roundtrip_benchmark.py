@@ -0,0 +1,91 @@
+"""
+Benchmark: investigation API round-trip (start, status, results) through
+the full middleware stack, served in-process over ASGI.
+
+The agent behind the route is replaced by a stub returning synthetic
+findings, so the numbers cover routing, middleware, auth, background task
+bookkeeping and serialization; detector cost is measured in
+``test_agent_hot_paths_benchmark.py``.
+
+Run with ``pytest tests/performance -m performance -s`` to see the numbers;
+results go to ``BENCHMARK_OUTPUT`` and are gated against ``BENCHMARK_BASELINE``
+(see ``tests/performance/harness.py``).
+"""
+
+import itertools
+from types import SimpleNamespace
+
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+
+from src.api.app import app
+from src.api.middleware.authentication import get_current_user
+from src.api.routes import investigations
+from tests.utils.synthetic_contracts import SyntheticContracts
+
+
+ROUND_TRIPS = 20
+FINDINGS = 50
+
+
+class StubInvestigator:
+    """Answers the route's ``investigate`` action with synthetic findings."""
+
+    findings = [
+        {
+            "type": "price_anomaly",
+            "severity": 0.8,
+            "confidence": 0.9,
+            "description": f"Contrato com valor suspeito: R$ {contract['valorInicial']:,.2f}",
+            "explanation": contract["objeto"],
+            "evidence": {"z_score": 3.1},
+            "recommendations": ["Verificar justificativa para o valor contratado"],
+            "affected_entities": [{"contract_id": contract["id"], "value": contract["valorInicial"]}],
+            "financial_impact": contract["valorInicial"],
+        }
+        for contract in SyntheticContracts(organizations=1, contracts_per_org=FINDINGS).generate()
+    ]
+
+    async def execute(self, action, payload, context):
+        assert action == "investigate"
+        return SimpleNamespace(result={
+            "status": "completed",
+            "anomalies": self.findings,
+            "summary": {"total_records": 10 * FINDINGS, "anomalies_found": FINDINGS},
+        })
+
+
+@pytest_asyncio.fixture
+async def client(monkeypatch):
+    monkeypatch.setattr(investigations, "InvestigatorAgent", StubInvestigator)
+    app.dependency_overrides[get_current_user] = lambda: {"user_id": "benchmark"}
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://testserver") as ac:
+            yield ac
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+
+
+@pytest.mark.performance
+@pytest.mark.asyncio
+async def test_investigation_round_trip(perf_benchmark, client):
+    # One client address per round trip, so the rate limiters see distinct callers
+    addresses = (f"10.1.{i // 256}.{i % 256}" for i in itertools.count())
+
+    async def round_trip():
+        headers = {"X-Forwarded-For": next(addresses)}
+        started = await client.post(
+            "/api/v1/investigations/start",
+            json={"query": "Contratos com sobrepreço", "data_source": "contracts"},
+            headers=headers,
+        )
+        assert started.status_code == 200, started.text
+        investigation_id = started.json()["investigation_id"]
+
+        status = await client.get(f"/api/v1/investigations/{investigation_id}/status", headers=headers)
+        assert status.json()["status"] == "completed"
+        results = await client.get(f"/api/v1/investigations/{investigation_id}/results", headers=headers)
+        assert results.json()["anomalies_found"] == FINDINGS
+
+    await perf_benchmark("api.investigation_round_trip", round_trip, repeat=ROUND_TRIPS, findings=FINDINGS)
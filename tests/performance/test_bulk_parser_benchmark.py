@@ -0,0 +1,57 @@
+"""
+Benchmark: columnar bulk parsing of 100k contract records versus building
+one pydantic model per record with parse_api_data.
+
+Run with ``pytest tests/performance -m performance -s`` to see the numbers.
+"""
+
+import time
+
+import numpy as np
+import pytest
+
+from src.tools.transparency_models import parse_api_columns, parse_api_data
+
+
+N_RECORDS = 100_000
+
+
+def _contracts(n):
+    return [
+        {
+            "id": str(i),
+            "numero": f"{i}/2024",
+            "ano": 2024,
+            "data_assinatura": f"{1 + i % 28:02d}/{1 + i % 12:02d}/2024",
+            "data_inicio_vigencia": f"2024-{1 + i % 12:02d}-{1 + i % 28:02d}",
+            "valor_inicial": 1000.0 + (i * 7919) % 250000,
+            "valor_global": 1500.0 + (i * 104729) % 900000,
+            "objeto": f"Aquisição de insumos para a unidade {i % 97}",
+            "orgao": {"codigo": "26000", "nome": "Ministério da Educação"},
+            "fornecedor": {"nome": f"Distribuidora {i % 41} LTDA", "cnpj": f"{i:014d}"},
+        }
+        for i in range(n)
+    ]
+
+
+@pytest.mark.performance
+def test_bulk_parse_vs_models():
+    records = _contracts(N_RECORDS)
+
+    start = time.perf_counter()
+    models = parse_api_data(records, "contratos")
+    model_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = parse_api_columns(records, "contratos")
+    column_seconds = time.perf_counter() - start
+
+    print(
+        f"\n{N_RECORDS} records: pydantic models {model_seconds * 1000:.0f}ms, "
+        f"columns {column_seconds * 1000:.0f}ms ({model_seconds / column_seconds:.1f}x)"
+    )
+
+    assert len(models) == len(batch) == N_RECORDS and batch.errors == []
+    assert float(models[-1].valor_global) == batch["valor_global"][-1]
+    assert np.datetime64(models[-1].data_assinatura, "D") == batch["data_assinatura"][-1]
+    assert column_seconds < model_seconds
@@ -0,0 +1,100 @@
+"""
+Benchmark: L2 batch reads with the self-describing value header versus the
+previous ``compressed:{key}`` naming scheme, against a local Redis stand-in.
+
+Run with ``pytest tests/performance -m performance -s`` to see the numbers.
+"""
+
+import gzip
+import time
+
+import msgpack
+import pytest
+
+from src.infrastructure.cache_system import AdvancedCacheManager, CacheConfig
+from tests.utils.fake_redis import FakeRedis
+
+
+N_KEYS = 500
+ROUNDS = 20
+# Rough per-command server cost so that command count shows up in wall time
+COMMAND_LATENCY = 0.00002
+
+
+def _contract(i: int) -> dict:
+    return {
+        "id": f"CT-{i:06d}",
+        "objeto": "Aquisição de material de expediente para a unidade " * (1 + i % 40),
+        "valor": 1000.0 + i,
+        "fornecedor": {"nome": f"Fornecedor {i % 37}", "cnpj": f"{i:014d}"},
+    }
+
+
+async def _legacy_batch_set(redis: FakeRedis, items: dict, threshold: int):
+    pipe = redis.pipeline()
+    for key, value in items.items():
+        payload = msgpack.packb(value, use_bin_type=True)
+        if len(payload) > threshold:
+            payload = gzip.compress(payload)
+            key = f"compressed:{key}"
+        pipe.setex(key, 3600, payload)
+    await pipe.execute()
+
+
+async def _legacy_batch_get(redis: FakeRedis, keys: list) -> dict:
+    pipe = redis.pipeline()
+    for key in keys:
+        pipe.get(key)
+        pipe.get(f"compressed:{key}")
+    values = await pipe.execute()
+
+    results = {}
+    for i, key in enumerate(keys):
+        value, compressed = values[i * 2], values[i * 2 + 1]
+        if compressed:
+            results[key] = msgpack.unpackb(gzip.decompress(compressed), raw=False)
+        elif value:
+            results[key] = msgpack.unpackb(value, raw=False)
+    return results
+
+
+@pytest.mark.performance
+@pytest.mark.asyncio
+async def test_batch_get_header_vs_key_prefix():
+    config = CacheConfig()
+    items = {f"contract:{i}": _contract(i) for i in range(N_KEYS)}
+    keys = list(items)
+
+    legacy_redis = FakeRedis(command_latency=COMMAND_LATENCY)
+    await _legacy_batch_set(legacy_redis, items, config.compression_threshold)
+    legacy_redis.commands.clear()
+
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        legacy_results = await _legacy_batch_get(legacy_redis, keys)
+    legacy_time = time.perf_counter() - start
+
+    manager = AdvancedCacheManager(config)
+    manager.l2_cache = FakeRedis(command_latency=COMMAND_LATENCY)
+    await manager._batch_set_l2(items)
+    manager.l2_cache.commands.clear()
+
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        header_results = await manager._batch_get_l2(keys)
+    header_time = time.perf_counter() - start
+
+    legacy_gets = legacy_redis.commands["get"] / ROUNDS
+    header_gets = manager.l2_cache.commands["get"] / ROUNDS
+    stored_legacy = sum(len(v) for v in legacy_redis.data.values())
+    stored_header = sum(len(v) for v in manager.l2_cache.data.values())
+
+    print(
+        f"\nL2 batch_get ({N_KEYS} keys x {ROUNDS} rounds, codecs={[c.name for c in manager.codec.available_codecs()]}):"
+        f"\n  key prefix: {legacy_time * 1000:.1f}ms, {legacy_gets:.0f} GETs/batch, {stored_legacy} bytes stored"
+        f"\n  header:     {header_time * 1000:.1f}ms, {header_gets:.0f} GETs/batch, {stored_header} bytes stored"
+    )
+
+    assert header_results == legacy_results == items
+    assert header_gets == legacy_gets / 2
+    assert header_time < legacy_time
@@ -0,0 +1,120 @@
+"""
+Benchmark: infrastructure hot paths - cache get/set through both layers
+and the request rate limiters.
+
+Run with ``pytest tests/performance -m performance -s`` to see the numbers;
+results go to ``BENCHMARK_OUTPUT`` and are gated against ``BENCHMARK_BASELINE``
+(see ``tests/performance/harness.py``).
+"""
+
+import time
+
+import pytest
+import pytest_asyncio
+
+from src.api.middleware.rate_limiting import RateLimitMiddleware
+from src.api.middleware.security import RateLimiter
+from src.infrastructure.cache_system import AdvancedCacheManager, CacheConfig
+from src.tools.transparency_api import APIRateLimit
+from tests.utils.fake_redis import FakeRedis
+from tests.utils.synthetic_contracts import SyntheticContracts
+
+
+N_KEYS = 1000
+N_CLIENTS = 200
+REQUESTS_PER_CLIENT = 25
+# APIRateLimit rescans its whole window on every call
+API_RATE_CHECKS = 2000
+
+
+@pytest.fixture(scope="module")
+def items():
+    contracts = SyntheticContracts(organizations=1, contracts_per_org=N_KEYS).generate()
+    return {f"contract:{c['id']}": c for c in contracts}
+
+
+@pytest_asyncio.fixture
+async def cache_manager():
+    manager = AdvancedCacheManager(CacheConfig())
+    await manager._init_l1_cache()
+    manager.l2_cache = FakeRedis()
+    return manager
+
+
+@pytest.mark.performance
+@pytest.mark.asyncio
+async def test_cache_set(perf_benchmark, cache_manager, items):
+    async def set_all():
+        for key, value in items.items():
+            await cache_manager.set(key, value)
+
+    await perf_benchmark("cache.set", set_all, repeat=5, keys=len(items))
+
+
+@pytest.mark.performance
+@pytest.mark.asyncio
+async def test_cache_get_l1(perf_benchmark, cache_manager, items):
+    for key, value in items.items():
+        await cache_manager.set(key, value)
+
+    async def get_all():
+        for key in items:
+            await cache_manager.get(key)
+
+    await perf_benchmark("cache.get.l1", get_all, repeat=5, keys=len(items))
+
+
+@pytest.mark.performance
+@pytest.mark.asyncio
+async def test_cache_get_l2(perf_benchmark, cache_manager, items):
+    for key, value in items.items():
+        await cache_manager.set(key, value)
+
+    async def get_all():
+        await cache_manager.l1_cache.clear()
+        for key in items:
+            await cache_manager.get(key)
+
+    await perf_benchmark("cache.get.l2", get_all, repeat=5, keys=len(items))
+
+
+@pytest.mark.performance
+@pytest.mark.asyncio
+async def test_security_rate_limiter(perf_benchmark):
+    def hammer():
+        limiter = RateLimiter()
+        for _ in range(REQUESTS_PER_CLIENT):
+            for client in range(N_CLIENTS):
+                limiter.is_allowed(f"10.0.{client // 256}.{client % 256}")
+
+    await perf_benchmark(
+        "rate_limit.security", hammer, repeat=5, checks=N_CLIENTS * REQUESTS_PER_CLIENT
+    )
+
+
+@pytest.mark.performance
+@pytest.mark.asyncio
+async def test_middleware_rate_limiter(perf_benchmark):
+    def hammer():
+        middleware = RateLimitMiddleware(app=None, per_minute=10_000, per_hour=100_000, per_day=1_000_000)
+        now = time.time()
+        for i in range(REQUESTS_PER_CLIENT):
+            for client in range(N_CLIENTS):
+                ip = f"10.0.{client // 256}.{client % 256}"
+                if middleware._check_rate_limits(ip, now + i * 0.01):
+                    middleware._record_request(ip, now + i * 0.01)
+
+    await perf_benchmark(
+        "rate_limit.middleware", hammer, repeat=5, checks=N_CLIENTS * REQUESTS_PER_CLIENT
+    )
+
+
+@pytest.mark.performance
+@pytest.mark.asyncio
+async def test_transparency_api_rate_limit(perf_benchmark):
+    async def hammer():
+        limiter = APIRateLimit(max_requests_per_minute=API_RATE_CHECKS + 1)
+        for _ in range(API_RATE_CHECKS):
+            await limiter.wait_if_needed()
+
+    await perf_benchmark("rate_limit.transparency_api", hammer, repeat=3, checks=API_RATE_CHECKS)
@@ -0,0 +1,73 @@
+"""
+Benchmark: request body scanning with the case-folded byte scanner versus
+decoding the body and running every pattern with ``re.IGNORECASE``.
+
+Run with ``pytest tests/performance -m performance -s`` to see the numbers.
+"""
+
+import json
+import re
+import time
+
+import pytest
+
+from src.api.middleware.security import RequestValidator, SecurityConfig
+
+
+ROUNDS = 20
+
+
+def _investigation_body(n_contracts: int) -> bytes:
+    """JSON payload shaped like an investigation request carrying contract data."""
+    return json.dumps({
+        "query": "Analisar contratos emergenciais do Ministério da Saúde em 2024",
+        "data_source": "contracts",
+        "filters": {"codigo_orgao": "36000", "ano": 2024, "modalidade": [6, 7]},
+        "anomaly_types": ["price", "vendor", "temporal", "duplicate"],
+        "include_explanations": True,
+        "contracts": [
+            {
+                "id": f"CT-{i:06d}",
+                "objeto": "Aquisição de insumos hospitalares e material de consumo "
+                          f"para atendimento da unidade {i % 97}",
+                "valor": 15000.0 + i * 3.5,
+                "dataAssinatura": f"2024-{1 + i % 12:02d}-{1 + i % 28:02d}",
+                "fornecedor": {"nome": f"Distribuidora Médica {i % 41} LTDA", "cnpj": f"{i:014d}"},
+                "fonte": "https://api.portaldatransparencia.gov.br/api-de-dados/contratos",
+            }
+            for i in range(n_contracts)
+        ],
+    }, ensure_ascii=False).encode("utf-8")
+
+
+def _legacy_scan(patterns, body: bytes) -> bool:
+    body_text = body.decode("utf-8", errors="ignore")
+    return not any(pattern.search(body_text) for pattern in patterns)
+
+
+@pytest.mark.performance
+@pytest.mark.parametrize("n_contracts", [10, 500, 5000])
+@pytest.mark.asyncio
+async def test_body_scan_folded_vs_ignorecase(n_contracts):
+    body = _investigation_body(n_contracts)
+    validator = RequestValidator()
+    legacy_patterns = [re.compile(p, re.IGNORECASE) for p in SecurityConfig.SUSPICIOUS_PATTERNS]
+
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        legacy_ok = _legacy_scan(legacy_patterns, body)
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        folded_ok, _ = await validator.scan_request_body(body, "application/json")
+    folded_time = time.perf_counter() - start
+
+    print(
+        f"\nbody scan ({len(body) / 1024:.0f} KiB x {ROUNDS} rounds):"
+        f"\n  ignorecase: {legacy_time * 1000:.1f}ms"
+        f"\n  folded:     {folded_time * 1000:.1f}ms"
+    )
+
+    assert legacy_ok and folded_ok
+    assert folded_time < legacy_time
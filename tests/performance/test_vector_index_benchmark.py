@@ -0,0 +1,74 @@
+"""
+Benchmark: recall and query latency of the IVF index against the exact
+brute-force scan of src.memory.vector_index.
+
+Run with ``pytest tests/performance -m performance -s`` to see the numbers.
+"""
+
+import time
+
+import numpy as np
+import pytest
+
+from src.memory.vector_index import HashingEmbedder, VectorIndex
+
+
+QUERIES = 100
+K = 10
+
+
+def _clustered(rng, n, dimension, centers):
+    labels = rng.integers(0, len(centers), n)
+    return (centers[labels] + rng.normal(scale=0.8, size=(n, dimension))).astype(np.float32)
+
+
+@pytest.mark.performance
+@pytest.mark.parametrize("n_vectors", [20000, 100000])
+def test_ivf_recall_and_latency(n_vectors):
+    rng = np.random.default_rng(42)
+    dimension = 384
+    centers = rng.normal(size=(500, dimension))
+    index = VectorIndex(dimension, exact_threshold=10000)
+    index.add([f"doc-{i}" for i in range(n_vectors)], _clustered(rng, n_vectors, dimension, centers))
+    queries = _clustered(rng, QUERIES, dimension, centers)
+
+    start = time.perf_counter()
+    index.train()
+    train_time = time.perf_counter() - start
+
+    exact, exact_time = [], 0.0
+    approx, approx_time = [], 0.0
+    for query in queries:
+        start = time.perf_counter()
+        exact.append({hit.id for hit in index.search(query, K, exact=True)})
+        exact_time += time.perf_counter() - start
+        start = time.perf_counter()
+        approx.append({hit.id for hit in index.search(query, K)})
+        approx_time += time.perf_counter() - start
+
+    recall = sum(len(a & e) for a, e in zip(approx, exact)) / (K * QUERIES)
+    print(
+        f"\n{n_vectors} x {dimension} vectors, recall@{K} = {recall:.3f}"
+        f"\n  train: {train_time * 1000:.0f}ms"
+        f"\n  exact: {exact_time / QUERIES * 1000:.2f}ms/query"
+        f"\n  ivf:   {approx_time / QUERIES * 1000:.2f}ms/query"
+    )
+
+    assert recall >= 0.9
+    assert approx_time < exact_time
+
+
+@pytest.mark.performance
+def test_hashing_embedder_throughput():
+    embedder = HashingEmbedder()
+    texts = [
+        f"Contrato emergencial {i} do Ministério da Saúde com a Distribuidora Médica {i % 41} LTDA"
+        for i in range(5000)
+    ]
+
+    start = time.perf_counter()
+    vectors = embedder.embed(texts)
+    elapsed = time.perf_counter() - start
+
+    print(f"\nhashing embedder: {len(texts) / elapsed:.0f} texts/s")
+    assert vectors.shape == (len(texts), embedder.dimension)
@@ -0,0 +1,83 @@
+"""
+Benchmark: predicate scan over the columnar warehouse versus loading the
+raw JSON pages and filtering lists of dicts, as the agents do today.
+
+Run with ``pytest tests/performance -m performance -s`` to see the numbers.
+"""
+
+import json
+import time
+from datetime import datetime
+
+import pytest
+
+from src.tools.warehouse import TransparencyWarehouse
+
+
+ORGS = ["26000", "25000", "20000", "36000"]
+
+
+def _contracts(n, org):
+    return [
+        {
+            "id": i,
+            "numero": f"{i}/2024",
+            "dataAssinatura": f"{1 + i % 28:02d}/{1 + i % 12:02d}/2024",
+            "valorInicial": 1000.0 + (i * 7919) % 250000,
+            "objeto": f"Aquisição de insumos para a unidade {i % 97}",
+            "fornecedor": {"nome": f"Distribuidora {i % 41} LTDA", "cnpj": f"{i:014d}"},
+            "_org_code": org,
+        }
+        for i in range(n)
+    ]
+
+
+@pytest.mark.performance
+def test_scan_vs_json(tmp_path):
+    raw_dir = tmp_path / "raw"
+    raw_dir.mkdir()
+    warehouse = TransparencyWarehouse(tmp_path / "warehouse")
+    for org in ORGS:
+        records = _contracts(50000, org)
+        (raw_dir / f"{org}.json").write_text(json.dumps(records, ensure_ascii=False), encoding="utf-8")
+        warehouse.write("contratos", records, org_code=org)
+
+    start = time.perf_counter()
+    matches = []
+    for org in ["26000", "25000"]:
+        for contract in json.loads((raw_dir / f"{org}.json").read_text(encoding="utf-8")):
+            signed = datetime.strptime(contract["dataAssinatura"], "%d/%m/%Y")
+            if 3 <= signed.month <= 5 and contract["valorInicial"] >= 200000:
+                matches.append(contract)
+    json_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    table = warehouse.scan(
+        "contratos",
+        org_codes=["26000", "25000"],
+        start_date="01/03/2024",
+        end_date="31/05/2024",
+        min_value=200000,
+        columns=["id", "valor_inicial", "data_assinatura"],
+    )
+    scan_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    records = warehouse.scan(
+        "contratos",
+        org_codes=["26000", "25000"],
+        start_date="01/03/2024",
+        end_date="31/05/2024",
+        min_value=200000,
+    ).to_records()
+    records_time = time.perf_counter() - start
+
+    print(
+        f"\n200k contracts, {len(matches)} matches:"
+        f"\n  json load + filter:   {json_time * 1000:.0f}ms"
+        f"\n  columnar scan:        {scan_time * 1000:.1f}ms"
+        f"\n  scan + to_records:    {records_time * 1000:.0f}ms"
+    )
+
+    assert len(table) == len(matches) == len(records)
+    assert scan_time < json_time
@@ -0,0 +1,101 @@
+"""
+Unit tests for the sorted-set memory indexes and eviction of ContextMemoryAgent.
+"""
+
+import pytest
+
+from src.agents.deodoro import AgentContext
+from src.agents.nana import ContextMemoryAgent
+from src.core import MemoryImportance
+from tests.utils.fake_redis import FakeRedis
+
+
+def _entry(memory_id, importance=MemoryImportance.MEDIUM):
+    return {
+        "id": memory_id,
+        "content": {"type": "investigation_result", "query": f"contratos {memory_id}"},
+        "importance": importance,
+    }
+
+
+@pytest.fixture
+def redis():
+    return FakeRedis()
+
+
+@pytest.fixture
+def agent(redis):
+    return ContextMemoryAgent(redis_client=redis, max_episodic_memories=5, max_conversation_turns=3)
+
+
+@pytest.fixture
+def context():
+    return AgentContext(session_id="sessao-1")
+
+
+class TestEpisodicEviction:
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_never_scans_the_keyspace(self, agent, redis, context):
+        for i in range(20):
+            await agent._store_episodic_memory({"memory_entry": _entry(f"m{i}")}, context)
+        await agent._get_recent_memories(5)
+
+        assert redis.commands["keys"] == 0
+        assert await redis.zcard(agent.episodic_retention_key) == 5
+        assert await redis.zcard(agent.episodic_timeline_key) == 5
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_low_importance_memories_are_evicted_first(self, agent, redis, context):
+        await agent._store_episodic_memory({"memory_entry": _entry("critical", MemoryImportance.CRITICAL)}, context)
+        for i in range(6):
+            importance = MemoryImportance.LOW if i % 2 else MemoryImportance.HIGH
+            await agent._store_episodic_memory({"memory_entry": _entry(f"m{i}", importance)}, context)
+
+        kept = [m["id"] for m in await agent._get_recent_memories(10)]
+        assert "critical" in kept
+        assert "m1" not in kept and "m3" not in kept
+        assert await redis.get(f"{agent.episodic_key}:m1") is None
+        assert "m1" not in {r["id"] for r in await agent.vector_store.similarity_search("contratos m1", limit=10)}
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_eviction_is_pipelined(self, agent, redis, context):
+        for i in range(5):
+            await agent._store_episodic_memory({"memory_entry": _entry(f"m{i}")}, context)
+
+        redis.round_trips = 0
+        await agent._store_episodic_memory({"memory_entry": _entry("m5")}, context)
+        # store, index scan, ZPOPMIN, delete
+        assert redis.round_trips == 4
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_recent_memories_come_newest_first(self, agent, context):
+        for i in range(4):
+            await agent._store_episodic_memory({"memory_entry": _entry(f"m{i}")}, context)
+
+        assert [m["id"] for m in await agent._get_recent_memories(2)] == ["m3", "m2"]
+
+    @pytest.mark.unit
+    def test_retention_scales_with_importance(self, agent):
+        medium = agent._retention_seconds(MemoryImportance.MEDIUM)
+
+        assert medium == agent.memory_decay_days * 86400
+        assert agent._retention_seconds(MemoryImportance.CRITICAL) == 2 * medium
+        assert agent._retention_seconds("low") < medium
+        assert agent._retention_seconds(None) == medium
+
+
+class TestConversationEviction:
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_keeps_latest_turns_without_keys(self, agent, redis, context):
+        for i in range(6):
+            await agent._store_conversation_memory({"message": f"pergunta {i}"}, context)
+
+        turns = await agent._get_conversation_context({"limit": 10}, context)
+        assert [t["message"] for t in turns] == ["pergunta 3", "pergunta 4", "pergunta 5"]
+        assert await redis.get(f"{agent.conversation_key}:sessao-1:1") is None
+        assert redis.commands["keys"] == 0
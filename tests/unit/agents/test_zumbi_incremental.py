@@ -0,0 +1,119 @@
+"""
+Unit tests for InvestigatorAgent's incremental detection path against a full recompute.
+"""
+
+from collections import OrderedDict
+
+import pytest
+
+from src.agents import zumbi
+from src.agents.deodoro import AgentContext
+from src.agents.zumbi import InvestigationRequest, InvestigatorAgent
+from src.core import settings
+from tests.utils.synthetic_contracts import SyntheticContracts
+
+
+def _rounded(value):
+    # Running sums and a from-scratch numpy pass differ in the last bits
+    if isinstance(value, float):
+        return float(f"{value:.9g}")
+    if isinstance(value, dict):
+        return {k: _rounded(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_rounded(v) for v in value]
+    return value
+
+
+def _comparable(agent, anomalies):
+    """Anomalies as sortable dicts, without the wall-clock timestamps detectors attach."""
+    rows = []
+    for anomaly in anomalies:
+        row = agent._anomaly_to_dict(anomaly)
+        row["evidence"] = {k: v for k, v in row["evidence"].items() if k != "timestamp"}
+        rows.append(repr(sorted(_rounded(row).items())))
+    return sorted(rows)
+
+
+@pytest.fixture(autouse=True)
+def scopes(monkeypatch):
+    monkeypatch.setattr(settings, "models_api_enabled", False)
+    scopes = OrderedDict()
+    monkeypatch.setattr(zumbi, "_incremental_scopes", scopes)
+    return scopes
+
+
+@pytest.fixture
+def agent():
+    return InvestigatorAgent()
+
+
+@pytest.fixture
+def contracts():
+    return SyntheticContracts(
+        organizations=1, contracts_per_org=300, duplicate_rate=0.1, outlier_rate=0.03, seed=5
+    ).generate()
+
+
+@pytest.mark.unit
+class TestIncrementalDetection:
+    @pytest.mark.asyncio
+    async def test_matches_full_detection_after_a_delta(self, agent, contracts):
+        request = InvestigationRequest(query="contratos", organization_codes=["26000"], incremental=True)
+        context = AgentContext(investigation_id="incremental")
+        await agent._run_incremental_detection(contracts, request, context)
+
+        # Drop some contracts, reprice others and add a few new ones
+        extra = SyntheticContracts(organizations=1, contracts_per_org=40, seed=11).generate()
+        delta = [dict(contract) for contract in contracts[20:]]
+        for contract in delta[:10]:
+            contract["valorInicial"] = contract["valorInicial"] * 40
+        for i, contract in enumerate(extra[:15]):
+            delta.append({**contract, "id": f"novo-{i}"})
+
+        incremental, stats = await agent._run_incremental_detection(delta, request, context)
+        full = await agent._run_anomaly_detection(delta, request, context)
+
+        assert (stats["added"], stats["changed"], stats["removed"]) == (15, 10, 20)
+        assert incremental
+        assert _comparable(agent, incremental) == _comparable(agent, full)
+        assert [a.severity for a in incremental] == sorted((a.severity for a in incremental), reverse=True)
+
+    @pytest.mark.asyncio
+    async def test_unchanged_input_reuses_every_detector(self, agent, contracts):
+        request = InvestigationRequest(query="contratos", organization_codes=["26000"], incremental=True)
+        context = AgentContext(investigation_id="incremental")
+        first, _ = await agent._run_incremental_detection(contracts, request, context)
+
+        again, stats = await agent._run_incremental_detection(contracts, request, context)
+
+        assert stats["changed"] == stats["added"] == stats["removed"] == 0
+        assert set(stats["reused_detectors"]) == set(agent.anomaly_detectors)
+        assert _comparable(agent, again) == _comparable(agent, first)
+
+    @pytest.mark.asyncio
+    async def test_state_is_shared_by_agents_of_the_process(self, contracts):
+        request = InvestigationRequest(query="contratos", organization_codes=["26000"], incremental=True)
+        context = AgentContext(investigation_id="incremental")
+        await InvestigatorAgent()._run_incremental_detection(contracts, request, context)
+
+        _, stats = await InvestigatorAgent()._run_incremental_detection(contracts, request, context)
+
+        assert stats["added"] == 0 and stats["unchanged"] == len(contracts)
+
+    @pytest.mark.asyncio
+    async def test_state_dir_carries_the_state_to_a_new_process(self, contracts, scopes, tmp_path):
+        request = InvestigationRequest(query="contratos", organization_codes=["26000"], incremental=True)
+        context = AgentContext(investigation_id="incremental")
+        await InvestigatorAgent(incremental_state_dir=tmp_path)._run_incremental_detection(
+            contracts, request, context
+        )
+        assert len(list(tmp_path.glob("scope-*.pkl"))) == 1
+
+        scopes.clear()  # As in a fresh process
+        agent = InvestigatorAgent(incremental_state_dir=tmp_path)
+        again, stats = await agent._run_incremental_detection(contracts[5:], request, context)
+
+        assert (stats["added"], stats["removed"], stats["unchanged"]) == (0, 5, len(contracts) - 5)
+        assert _comparable(agent, again) == _comparable(
+            agent, await agent._run_anomaly_detection(contracts[5:], request, context)
+        )
@@ -0,0 +1,162 @@
+"""
+Unit tests for InvestigatorAgent's streaming detection path, fed by a fake page source.
+"""
+
+import random
+
+import pytest
+
+from src.agents import zumbi
+from src.agents.deodoro import AgentContext
+from src.agents.zumbi import InvestigationRequest, InvestigatorAgent
+from src.core import settings
+from src.tools.warehouse import TransparencyWarehouse
+from tests.unit.ml.test_streaming_detection import _contract, _pages
+from tests.unit.tools import test_warehouse
+
+
+STREAM_TYPES = ["price_anomaly", "duplicate_contracts", "vendor_concentration", "payment_patterns"]
+
+
+class FakePages:
+    """Async page iterator that records how far it was consumed."""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.served = 0
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.served == len(self.pages):
+            raise StopAsyncIteration
+        self.served += 1
+        return self.pages[self.served - 1]
+
+
+def _ids(anomaly):
+    return tuple(entity.get("contract_id") or entity.get("name") for entity in anomaly.affected_entities)
+
+
+def _findings(anomalies):
+    return sorted((anomaly.anomaly_type, _ids(anomaly)) for anomaly in anomalies)
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    monkeypatch.setattr(settings, "models_api_enabled", False)
+    return InvestigatorAgent()
+
+
+@pytest.fixture
+def context():
+    return AgentContext(investigation_id="streaming")
+
+
+@pytest.fixture
+def contracts():
+    rng = random.Random(8)
+    contracts = [_contract(i, rng) for i in range(150)]
+    contracts[120]["valorInicial"] = 2_000_000.0
+    return contracts
+
+
+@pytest.mark.unit
+class TestStreamAnomalies:
+    @pytest.mark.asyncio
+    async def test_completed_anomalies_match_full_detection(self, agent, context, contracts):
+        request = InvestigationRequest(query="contratos", anomaly_types=STREAM_TYPES)
+        pages = FakePages(_pages(contracts, 40))
+
+        events = [event async for event in agent.stream_anomalies(request, context, pages=pages)]
+        full = await agent._run_anomaly_detection(contracts, request, context)
+
+        kind, completed = events[-1]
+        assert kind == "completed"
+        assert [k for k, _ in events[:-1]] == ["anomaly"] * (len(events) - 1)
+        assert pages.served == 4
+        assert _findings(completed["anomalies"]) == _findings(full)
+        assert {"price_anomaly", "duplicate_contracts", "vendor_concentration"} <= {a.anomaly_type for a in full}
+        assert completed["summary"]["total_records"] == len(contracts)
+        assert completed["summary"]["streaming"] == {
+            "pages": 4, "retracted": 0, "skipped_detectors": [],
+        }
+
+    @pytest.mark.asyncio
+    async def test_duplicates_are_yielded_before_the_stream_ends(self, agent, context, contracts):
+        request = InvestigationRequest(query="contratos", anomaly_types=["duplicate_contracts"])
+        pages = FakePages(_pages(contracts, 40))
+
+        async for kind, anomaly in agent.stream_anomalies(request, context, pages=pages):
+            assert kind == "anomaly"
+            assert anomaly.anomaly_type == "duplicate_contracts"
+            # Both contracts of the pair were in the pages served so far
+            assert all(int(i) < 40 * pages.served for i in _ids(anomaly))
+            assert pages.served < len(pages.pages)
+            break
+
+    @pytest.mark.asyncio
+    async def test_provisional_prices_unsupported_at_the_end_are_retracted(self, agent, context):
+        rng = random.Random(4)
+        early = [_contract(i, rng) for i in range(40)] + [_contract(40, rng, valorInicial=5000.0)]
+        middle = [_contract(41 + i, rng, valorInicial=rng.uniform(3000, 7000)) for i in range(60)]
+        late = [_contract(200, rng, valorInicial=60000.0)]
+        request = InvestigationRequest(query="contratos", anomaly_types=["price_anomaly", "spectral_patterns"])
+        pages = FakePages([early] + _pages(middle + late, 20))
+
+        events = [event async for event in agent.stream_anomalies(request, context, pages=pages)]
+
+        retracted = [anomaly for kind, anomaly in events if kind == "retracted"]
+        assert [_ids(anomaly) for anomaly in retracted] == [("40",)]
+        # The retraction refers to the provisional finding yielded after the first page
+        assert events[0] == ("anomaly", retracted[0])
+        kind, completed = events[-1]
+        assert _findings(completed["anomalies"]) == [("price_anomaly", ("200",))]
+        assert completed["summary"]["streaming"] == {
+            "pages": 5, "retracted": 1, "skipped_detectors": ["spectral_patterns"],
+        }
+
+
+@pytest.mark.unit
+class TestRunStreamingDetection:
+    @pytest.mark.asyncio
+    async def test_drains_the_investigation_pages(self, agent, context, contracts, monkeypatch):
+        pages = FakePages(_pages(contracts, 40))
+        monkeypatch.setattr(agent, "_iter_investigation_pages", lambda request, context: pages)
+        request = InvestigationRequest(query="contratos", anomaly_types=STREAM_TYPES, streaming=True)
+
+        anomalies, summary = await agent._run_streaming_detection(request, context)
+
+        assert pages.served == 4
+        assert summary["total_records"] == len(contracts)
+        assert summary["anomalies_found"] == len(anomalies) > 0
+        assert [a.severity for a in anomalies] == sorted((a.severity for a in anomalies), reverse=True)
+
+    @pytest.mark.asyncio
+    async def test_no_pages_gives_an_empty_summary(self, agent, context, monkeypatch):
+        monkeypatch.setattr(agent, "_iter_investigation_pages", lambda request, context: FakePages([]))
+        request = InvestigationRequest(query="contratos", streaming=True)
+
+        anomalies, summary = await agent._run_streaming_detection(request, context)
+
+        assert anomalies == []
+        assert summary["total_records"] == 0
+
+
+@pytest.mark.unit
+class TestIterInvestigationPages:
+    @pytest.mark.asyncio
+    async def test_warehouse_pages_are_read_part_by_part(self, agent, context, tmp_path, monkeypatch):
+        warehouse = TransparencyWarehouse(tmp_path / "warehouse")
+        warehouse.write("contratos", [test_warehouse._contract(i) for i in range(1, 241)], org_code="26000")
+        warehouse.write("contratos", [test_warehouse._contract(i, year=2023) for i in range(1, 61)], org_code="26000")
+        warehouse.write("contratos", [test_warehouse._contract(i) for i in range(1, 121)], org_code="25000")
+        monkeypatch.setattr(zumbi, "get_warehouse", lambda: warehouse)
+        monkeypatch.setattr(warehouse, "scan", None)  # The full result is never materialized
+        request = InvestigationRequest(query="contratos", organization_codes=["26000", "25000"], max_records=1000)
+
+        pages = [page async for page in agent._iter_investigation_pages(request, context, page_size=100)]
+
+        assert [len(page) for page in pages] == [60, 100, 20, 100, 100, 40]
+        assert {record["_org_code"] for record in pages[1]} == {"25000"}
@@ -0,0 +1,81 @@
+"""
+Tests for the request metrics hook in LoggingMiddleware.
+"""
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from src.api.middleware import logging_middleware
+from src.api.middleware.logging_middleware import (
+    LoggingMiddleware,
+    add_request_observer,
+    remove_request_observer,
+)
+
+
+@pytest.fixture
+def recorded():
+    calls = []
+
+    def observer(duration, endpoint, status_code):
+        calls.append((duration, endpoint, status_code))
+
+    add_request_observer(observer)
+    yield calls
+    remove_request_observer(observer)
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(LoggingMiddleware)
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        if item_id == 404:
+            raise HTTPException(status_code=404, detail="not found")
+        return {"id": item_id}
+
+    @app.get("/boom")
+    async def boom():
+        raise RuntimeError("boom")
+
+    return TestClient(app, raise_server_exceptions=False)
+
+
+@pytest.mark.unit
+class TestRequestObservers:
+    def test_reports_route_template_and_status(self, client, recorded):
+        assert client.get("/items/1").status_code == 200
+        assert client.get("/items/404").status_code == 404
+
+        assert [(e, s) for _, e, s in recorded] == [
+            ("/items/{item_id}", 200),
+            ("/items/{item_id}", 404),
+        ]
+        assert all(duration >= 0 for duration, _, _ in recorded)
+
+    def test_unhandled_error_reported_as_500(self, client, recorded):
+        assert client.get("/boom").status_code == 500
+        assert [(e, s) for _, e, s in recorded] == [("/boom", 500)]
+
+    def test_unmatched_path_uses_fixed_label(self, client, recorded):
+        client.get("/nope/123")
+        assert [(e, s) for _, e, s in recorded] == [("unmatched", 404)]
+
+    def test_failing_observer_does_not_break_request(self, client, recorded):
+        def broken(*_):
+            raise ValueError("observer down")
+
+        add_request_observer(broken)
+        try:
+            assert client.get("/items/1").status_code == 200
+        finally:
+            remove_request_observer(broken)
+        assert len(recorded) == 1
+
+    def test_observer_registered_once(self, recorded):
+        observer = logging_middleware._request_observers[-1]
+        add_request_observer(observer)
+        assert logging_middleware._request_observers.count(observer) == 1
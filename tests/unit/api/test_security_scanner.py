@@ -0,0 +1,109 @@
+"""
+Unit tests for the suspicious-pattern scanner in the security middleware.
+"""
+
+import re
+
+import pytest
+
+from src.api.middleware.security import (
+    RequestValidator,
+    SecurityConfig,
+    SuspiciousPatternScanner,
+)
+
+
+@pytest.fixture
+def scanner():
+    return SuspiciousPatternScanner(SecurityConfig.SUSPICIOUS_PATTERNS)
+
+
+SAMPLES = [
+    '{"query": "contratos de saúde em 2024"}',
+    '<img src=x onerror=alert(1)>',
+    "1' UNION   SELECT senha FROM usuarios",
+    "../../etc/passwd",
+    "..\\windows\\system32",
+    "<SCRIPT type='text/javascript'>alert(1)</SCRIPT>",
+    "https://api.portaldatransparencia.gov.br/api-de-dados/contratos",
+    "update contratos set valor = 0",
+    "file:///etc/shadow",
+]
+
+
+class TestSuspiciousPatternScanner:
+    @pytest.mark.unit
+    @pytest.mark.parametrize("sample", SAMPLES)
+    def test_matches_same_inputs_as_individual_patterns(self, scanner, sample):
+        expected = any(
+            re.search(p, sample, re.IGNORECASE) for p in SecurityConfig.SUSPICIOUS_PATTERNS
+        )
+
+        assert (scanner.search_text(sample) is not None) == expected
+        assert (scanner.search_bytes(sample.encode("utf-8")) is not None) == expected
+
+    @pytest.mark.unit
+    def test_reports_the_matching_pattern(self, scanner):
+        assert scanner.search_text("x; DROP TABLE t") == r"drop\s+table"
+
+    @pytest.mark.unit
+    def test_matches_across_window_boundaries(self):
+        scanner = SuspiciousPatternScanner(
+            SecurityConfig.SUSPICIOUS_PATTERNS, chunk_size=64, overlap=16
+        )
+        for offset in range(50, 70):
+            body = b"a" * offset + b"DROP TABLE" + b"b" * 200
+            assert scanner.search_bytes(body) == r"drop\s+table"
+
+    @pytest.mark.unit
+    def test_binary_content_types_are_not_scanned(self, scanner):
+        payload = b"\x89PNG\r\n../../"
+
+        assert scanner.scan_body(payload, "image/png") is None
+        assert scanner.scan_body(payload, "application/json; charset=utf-8") is not None
+        assert scanner.scan_body(payload, None) is not None
+
+    @pytest.mark.unit
+    def test_multipart_skips_binary_parts_only(self, scanner):
+        def body(field_value: bytes) -> bytes:
+            return (
+                b"--XYZ\r\n"
+                b'Content-Disposition: form-data; name="file"; filename="a.png"\r\n'
+                b"Content-Type: image/png\r\n\r\n"
+                b"\x00\x01../..\\\r\n"
+                b"--XYZ\r\n"
+                b'Content-Disposition: form-data; name="q"\r\n\r\n'
+                + field_value
+                + b"\r\n--XYZ--\r\n"
+            )
+
+        content_type = 'multipart/form-data; boundary="XYZ"'
+        assert scanner.scan_body(body(b"licitacoes"), content_type) is None
+        assert scanner.scan_body(body(b"eval(atob(x))"), content_type) == r"eval\s*\("
+
+    @pytest.mark.unit
+    def test_declared_binary_content_that_sniffs_as_text_is_scanned(self, scanner):
+        payload = b"GIF89a;<script>alert(1)</script>"
+        upload = (
+            b"--XYZ\r\n"
+            b'Content-Disposition: form-data; name="file"; filename="a.gif"\r\n'
+            b"Content-Type: image/gif\r\n\r\n"
+            + payload
+            + b"\r\n--XYZ--\r\n"
+        )
+
+        assert scanner.scan_body(payload, "image/gif") == r"<script[^>]*>.*?</script>"
+        assert scanner.scan_body(payload, "application/octet-stream") == r"<script[^>]*>.*?</script>"
+        assert scanner.scan_body(upload, 'multipart/form-data; boundary="XYZ"') == r"<script[^>]*>.*?</script>"
+        # A multi-byte character cut by the sniff window is still text
+        assert not scanner.looks_binary(b"a" + "á".encode("utf-8") * 300)
+        assert scanner.looks_binary(b"\xff\xfe" + payload)
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_request_validator_scans_body(self):
+        validator = RequestValidator()
+
+        assert await validator.scan_request_body(b'{"orgao": "26000"}', "application/json") == (True, None)
+        valid, error = await validator.scan_request_body(b'{"q": "<script>x</script>"}', "application/json")
+        assert not valid and error == "Suspicious pattern in request body"
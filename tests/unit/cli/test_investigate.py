@@ -0,0 +1,104 @@
+"""
+Tests for the investigate CLI command running over an offline contract dump.
+"""
+
+import json
+import threading
+from collections import OrderedDict
+
+import pytest
+from click.testing import CliRunner
+
+from src.agents import zumbi
+from src.cli.commands.investigate import investigate_command
+from src.core import settings
+from tests.utils.synthetic_contracts import SyntheticContracts
+
+
+@pytest.fixture
+def dump(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "models_api_enabled", False)
+    contracts = SyntheticContracts(
+        organizations=2, contracts_per_org=80, outlier_rate=0.05, seed=7
+    ).generate()
+    path = tmp_path / "dump.json"
+    path.write_text(json.dumps(contracts, ensure_ascii=False), encoding="utf-8")
+    return path
+
+
+@pytest.mark.unit
+class TestInvestigateCommand:
+    def test_offline_dump_renders_markdown_report_and_timings(self, dump, tmp_path):
+        report_path = tmp_path / "report.md"
+
+        result = CliRunner().invoke(
+            investigate_command,
+            [
+                "contratos suspeitos", "--offline", "--data", str(dump),
+                "--org", "26000", "--out", str(report_path),
+            ],
+        )
+
+        assert result.exit_code == 0, result.output
+        assert "✅ 80 contratos analisados em 1 órgão(s)" in result.output
+        assert "⏱️  Tempo por etapa" in result.output
+        for span in ("load:", "org [26000]:", "zumbi.investigate:", "detector.price_anomaly:", "tiradentes.report:"):
+            assert span in result.output
+
+        report = report_path.read_text(encoding="utf-8")
+        assert report.startswith("# Relatório")
+        assert "## Resumo Executivo" in report
+        assert "Anomalias de Preço" in report
+
+    def test_report_printed_when_no_output_file(self, dump):
+        result = CliRunner().invoke(
+            investigate_command,
+            ["contratos suspeitos", "--offline", "--data", str(dump), "--org", "26000", "--output", "json"],
+        )
+
+        assert result.exit_code == 0, result.output
+        assert '"type": "investigation_report"' in result.output
+        assert '"title": "Resumo Executivo"' in result.output
+
+    def test_organizations_run_in_worker_threads(self, dump, monkeypatch):
+        threads = []
+        process = zumbi.InvestigatorAgent.process
+
+        async def recording_process(self, message, context):
+            threads.append(threading.get_ident())
+            return await process(self, message, context)
+
+        monkeypatch.setattr(zumbi.InvestigatorAgent, "process", recording_process)
+        result = CliRunner().invoke(
+            investigate_command, ["contratos suspeitos", "--offline", "--data", str(dump), "--output", "json"]
+        )
+
+        assert result.exit_code == 0, result.output
+        assert "em 2 órgão(s)" in result.output
+        assert len(threads) == 2 and threading.get_ident() not in threads
+
+    def test_incremental_runs_keep_state_between_invocations(self, dump, tmp_path, monkeypatch):
+        monkeypatch.setattr(zumbi, "_incremental_scopes", OrderedDict())
+        state_dir = tmp_path / "state"
+        args = [
+            "contratos suspeitos", "--offline", "--data", str(dump), "--org", "26000",
+            "--output", "json", "--incremental", "--state-dir", str(state_dir),
+        ]
+
+        first = CliRunner().invoke(investigate_command, args)
+        zumbi._incremental_scopes.clear()  # Only the state dir carries over, as between processes
+        again = CliRunner().invoke(investigate_command, args)
+
+        assert first.exit_code == 0, first.output
+        assert "♻️  26000: 0 contrato(s) inalterado(s), 80 novo(s) ou alterado(s)" in first.output
+        assert again.exit_code == 0, again.output
+        assert "♻️  26000: 80 contrato(s) inalterado(s), 0 novo(s) ou alterado(s)" in again.output
+        assert len(list(state_dir.glob("scope-*.pkl"))) == 1
+
+    def test_offline_requires_local_data(self, monkeypatch):
+        monkeypatch.setattr(settings, "transparency_warehouse_path", None)
+
+        result = CliRunner().invoke(investigate_command, ["contratos", "--offline"])
+
+        assert result.exit_code == 2
+        assert "--offline requer --data" in result.output
@@ -0,0 +1,55 @@
+"""
+Smoke tests for the cidadao CLI entry point.
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from src.cli.main import app
+
+ROOT = Path(__file__).resolve().parents[3]
+
+COMMANDS = ["investigate", "analyze", "report", "watch", "ingest", "version", "status"]
+
+
+@pytest.mark.unit
+class TestCliEntryPoint:
+    def test_help_lists_every_command(self):
+        result = CliRunner().invoke(app, ["--help"])
+
+        assert result.exit_code == 0, result.output
+        for name in COMMANDS:
+            assert name in result.output
+
+    @pytest.mark.parametrize("name", COMMANDS)
+    def test_subcommand_help(self, name):
+        result = CliRunner().invoke(app, [name, "--help"], prog_name="cidadao")
+
+        assert result.exit_code == 0, result.output
+        assert f"Usage: cidadao {name}" in result.output
+
+    def test_status_runs(self):
+        result = CliRunner().invoke(app, ["status"])
+
+        assert result.exit_code == 0, result.output
+        assert "Sistema operacional" in result.output
+
+    def test_module_entry_point(self):
+        env = {
+            "DATABASE_URL": "sqlite://",
+            "SECRET_KEY": "test",
+            "JWT_SECRET_KEY": "test",
+            **os.environ,
+        }
+        result = subprocess.run(
+            [sys.executable, "-m", "src.cli.main", "--help"],
+            cwd=ROOT, env=env, capture_output=True, text=True, timeout=120,
+        )
+
+        assert result.returncode == 0, result.stderr
+        assert "investigate" in result.stdout
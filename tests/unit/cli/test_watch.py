@@ -0,0 +1,77 @@
+"""
+Tests for the watch CLI command polling a fake Portal da Transparência client.
+"""
+
+import json
+import random
+from datetime import date
+
+import pytest
+from click.testing import CliRunner
+
+from src.agents.zumbi import InvestigatorAgent
+from src.cli.commands import watch
+from src.cli.commands.watch import watch_command
+from src.core import settings
+from tests.unit.tools.test_contract_monitor import FakePortal, _contract, _history
+
+
+class FakeClient(FakePortal):
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+@pytest.fixture
+def portal(monkeypatch):
+    monkeypatch.setattr(settings, "models_api_enabled", False)
+    client = FakeClient()
+    monkeypatch.setattr("src.tools.contract_monitor.TransparencyAPIClient", lambda: client)
+    return client
+
+
+@pytest.mark.unit
+class TestWatchCommand:
+    def test_once_polls_and_escalates_to_zumbi(self, portal, tmp_path):
+        year = date.today().year
+        portal.add(_history(random.Random(3), date(year, 1, 1), 120))
+        log_file = tmp_path / "alerts.jsonl"
+        args = [
+            "--once", "--org", "26000", "--notify", "--threshold", "0.5",
+            "--state-dir", str(tmp_path / "state"), "--log-file", str(log_file),
+        ]
+
+        first = CliRunner().invoke(watch_command, args)
+        assert first.exit_code == 0, first.output
+        assert "⏹️  Monitor parado" in first.output
+        assert not log_file.exists()  # the first sync only primes the baseline
+
+        portal.add([_contract(5000, date(year, 1, 20), 250000.0)])
+        second = CliRunner().invoke(watch_command, args)
+
+        assert second.exit_code == 0, second.output
+        alerts = [json.loads(line) for line in log_file.read_text(encoding="utf-8").splitlines()]
+        assert ("price_anomaly", "cheap") in [(a["anomaly_type"], a["source"]) for a in alerts]
+        assert "full" in {a["source"] for a in alerts}
+        assert "🚨 [26000]" in second.output
+
+    @pytest.mark.asyncio
+    async def test_escalations_do_not_accumulate_agent_history(self, portal, monkeypatch):
+        agents = []
+
+        class RecordingInvestigator(InvestigatorAgent):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                agents.append(self)
+
+        monkeypatch.setattr(watch, "InvestigatorAgent", RecordingInvestigator)
+        contracts = _history(random.Random(5), date(date.today().year, 1, 1), 40)
+
+        for _ in range(5):
+            await watch._escalate("26000", contracts)
+
+        assert len(agents) == 5
+        assert [len(agent._message_history) for agent in agents] == [1] * 5
+        assert [len(agent._response_history) for agent in agents] == [1] * 5
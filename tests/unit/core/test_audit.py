@@ -0,0 +1,557 @@
+"""
+Unit tests for the segmented audit store, batched writer, hash-chain
+verification and streaming export behind AuditLogger.
+"""
+
+import asyncio
+import csv
+import gzip
+import io
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import pytest_asyncio
+
+from src.core.audit import (
+    AuditContext,
+    AuditEvent,
+    AuditEventType,
+    AuditFilter,
+    AuditLogger,
+    AuditSeverity,
+)
+from src.core.audit_store import (
+    GENESIS_HASH,
+    AuditSegmentStore,
+    AuditWriteError,
+    AuditWriter,
+    chain_hash,
+)
+
+
+BASE = datetime(2025, 3, 10, 12, 0, tzinfo=timezone.utc)
+
+
+def _event(minutes: int, event_type=AuditEventType.API_CALL, user="u1", ip="10.0.0.1", **kwargs) -> AuditEvent:
+    return AuditEvent(
+        timestamp=BASE + timedelta(minutes=minutes),
+        event_type=event_type,
+        message=f"event {minutes}",
+        user_id=user,
+        user_email=f"{user}@example.org",
+        context=AuditContext(ip_address=ip),
+        **kwargs,
+    )
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = AuditSegmentStore(tmp_path, parse_event=AuditEvent.model_validate_json)
+    yield store
+    store.close()
+
+
+@pytest_asyncio.fixture
+async def audit(tmp_path):
+    logger = AuditLogger(audit_path=tmp_path)
+    yield logger
+    await logger.close()
+
+
+class TestAuditSegmentStore:
+    @pytest.mark.unit
+    def test_events_are_split_into_daily_segments(self, store):
+        store.append_many([_event(0), _event(24 * 60), _event(24 * 60 + 5)])
+
+        assert store.segment_days() == ["20250310", "20250311"]
+
+    @pytest.mark.unit
+    def test_queries_stream_newest_first_and_only_touch_matching_lines(self, store, monkeypatch):
+        events = [_event(i, user="u1" if i % 10 == 0 else "u2") for i in range(200)]
+        store.append_many(events)
+
+        parsed = []
+        parse = store.parse_event
+        monkeypatch.setattr(store, "parse_event", lambda line: parsed.append(1) or parse(line))
+
+        result = list(store.iter_events(AuditFilter(user_id="u1")))
+
+        assert [e.id for e in result] == [e.id for e in reversed(events) if e.user_id == "u1"]
+        assert len(parsed) == 20
+
+    @pytest.mark.unit
+    def test_time_range_and_type_filters_combine(self, store):
+        store.append_many([
+            _event(i, event_type=AuditEventType.LOGIN_FAILURE if i % 2 else AuditEventType.API_CALL)
+            for i in range(60)
+        ])
+        filter_options = AuditFilter(
+            event_types=[AuditEventType.LOGIN_FAILURE],
+            start_date=BASE + timedelta(minutes=10),
+            end_date=BASE + timedelta(minutes=19),
+        )
+
+        assert store.count(filter_options) == 5
+        assert len(list(store.iter_events(filter_options))) == 5
+
+    @pytest.mark.unit
+    def test_closed_segments_are_reloaded_from_sidecar(self, tmp_path):
+        store = AuditSegmentStore(tmp_path, parse_event=AuditEvent.model_validate_json)
+        target = _event(3, user="target")
+        store.append_many([_event(0), target, _event(5)])
+        store.close()
+
+        reopened = AuditSegmentStore(tmp_path, parse_event=AuditEvent.model_validate_json)
+        assert (tmp_path / "audit_20250310.idx.json").exists()
+        assert reopened.get(target.id).id == target.id
+        assert reopened.count(AuditFilter(user_id="target")) == 1
+
+    @pytest.mark.unit
+    def test_segments_without_sidecar_are_indexed_on_demand(self, tmp_path):
+        legacy = tmp_path / "audit_20250310.jsonl"
+        legacy.write_text("".join(_event(i).model_dump_json() + "\n" for i in range(5)))
+
+        store = AuditSegmentStore(tmp_path, parse_event=AuditEvent.model_validate_json)
+        assert store.count(AuditFilter()) == 5
+
+        store.append(_event(10))
+        assert len(list(store.iter_events(AuditFilter()))) == 6
+
+    @pytest.mark.unit
+    def test_sidecar_checkpoints_double_and_tail_is_rebuilt_on_open(self, tmp_path, monkeypatch):
+        store = AuditSegmentStore(tmp_path, parse_event=AuditEvent.model_validate_json, index_flush_every=5)
+        saved = []
+        save_index = store._save_index
+        monkeypatch.setattr(store, "_save_index", lambda index: saved.append(len(index)) or save_index(index))
+
+        for minutes in range(100):
+            store.append(_event(minutes))
+
+        assert saved == [5, 10, 20, 40, 80]
+        # Not closed: the 20 events after the last checkpoint come from the segment
+        reopened = AuditSegmentStore(tmp_path, parse_event=AuditEvent.model_validate_json)
+        assert reopened.count(AuditFilter()) == 100
+        store.close()
+
+    @pytest.mark.unit
+    def test_only_recent_segment_indexes_stay_in_memory(self, tmp_path):
+        store = AuditSegmentStore(tmp_path, parse_event=AuditEvent.model_validate_json, cached_segments=2)
+        store.append_many([_event(day * 24 * 60) for day in range(10)])
+
+        assert store.count(AuditFilter()) == 10
+        assert len(store._cache) <= 2
+
+    @pytest.mark.unit
+    def test_statistics_use_hourly_counters_and_exact_edges(self, store):
+        store.append_many([_event(i * 10, success=i % 3 != 0, error_code="E1") for i in range(18)])
+
+        totals, by_hour = store.statistics()
+        assert totals["total"] == 18
+        assert sum(by_hour.values()) == 18
+
+        totals, _ = store.statistics(BASE + timedelta(minutes=25), BASE + timedelta(minutes=95))
+        assert totals["total"] == 7  # Minutes 30..90
+
+
+class TestAuditWriter:
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_events_are_group_committed(self, store):
+        writer = AuditWriter(store, batch_size=50, flush_interval=0.05)
+
+        for i in range(120):
+            await writer.submit(_event(i))
+        await writer.flush()
+
+        assert writer.stats["events_written"] == 120
+        assert writer.stats["batches"] <= 4
+        assert store.count(AuditFilter()) == 120
+        await writer.close()
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_submit_does_not_wait_for_disk(self, store, monkeypatch):
+        release = threading.Event()
+        append_many = store.append_many
+
+        def slow_append(events, sync=False):
+            release.wait(5)
+            append_many(events, sync)
+
+        monkeypatch.setattr(store, "append_many", slow_append)
+        writer = AuditWriter(store, flush_interval=0)
+
+        started = time.perf_counter()
+        for i in range(20):
+            await writer.submit(_event(i))
+        assert time.perf_counter() - started < 0.5
+
+        release.set()
+        await writer.close()
+        assert store.count(AuditFilter()) == 20
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_count_includes_pending_events_exactly_once(self, store, monkeypatch):
+        writer = AuditWriter(store, batch_size=100, flush_interval=10)
+        append_many = store.append_many
+        counts_in_flight = []
+
+        def counting_append(events, sync=False):
+            # Handed to the store but not indexed yet
+            counts_in_flight.append(writer.count(AuditFilter()))
+            append_many(events, sync)
+
+        monkeypatch.setattr(store, "append_many", counting_append)
+        for i in range(5):
+            await writer.submit(_event(i))
+        await asyncio.sleep(0)
+
+        assert store.count(AuditFilter()) == 0
+        assert writer.count(AuditFilter()) == 5
+        assert writer.count(AuditFilter(user_id="nobody")) == 0
+
+        await writer.close()
+        assert counts_in_flight == [5]
+        assert writer.count(AuditFilter()) == 5
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_full_queue_applies_backpressure(self, store):
+        writer = AuditWriter(store, queue_size=2, flush_interval=0)
+        await asyncio.gather(*(writer.submit(_event(i)) for i in range(10)))
+        await writer.close()
+
+        assert store.count(AuditFilter()) == 10
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_flush_returns_under_steady_traffic(self, store):
+        writer = AuditWriter(store, queue_size=256, batch_size=32, flush_interval=0.01)
+        stop = asyncio.Event()
+        submitted = 0
+
+        async def produce(producer):
+            nonlocal submitted
+            while not stop.is_set():
+                await writer.submit(_event(producer))
+                submitted += 1
+
+        producers = [asyncio.create_task(produce(i)) for i in range(20)]
+        try:
+            await asyncio.sleep(0.05)
+            before_flush = submitted
+            await asyncio.wait_for(writer.flush(), timeout=5)
+            assert store.count(AuditFilter()) >= before_flush
+        finally:
+            stop.set()
+            await asyncio.gather(*producers)
+            await writer.close()
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_failed_batch_is_retried(self, store, monkeypatch):
+        append_many = store.append_many
+        failures = []
+
+        def flaky_append(events, sync=False):
+            if len(failures) < 2:
+                failures.append(len(events))
+                raise OSError("disk busy")
+            append_many(events, sync)
+
+        monkeypatch.setattr(store, "append_many", flaky_append)
+        writer = AuditWriter(store, flush_interval=0, retry_backoff=0)
+        for i in range(10):
+            await writer.submit(_event(i))
+        await writer.close()
+
+        assert failures and writer.stats["write_errors"] == 2
+        assert store.count(AuditFilter()) == 10
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_persistent_failure_surfaces_to_flush(self, store, monkeypatch):
+        append_many = store.append_many
+        broken = True
+
+        def failing_append(events, sync=False):
+            if broken:
+                raise OSError("disk full")
+            append_many(events, sync)
+
+        monkeypatch.setattr(store, "append_many", failing_append)
+        writer = AuditWriter(store, flush_interval=0, max_write_retries=1, retry_backoff=0)
+        for i in range(5):
+            await writer.submit(_event(i))
+
+        with pytest.raises(AuditWriteError):
+            await writer.flush()
+        assert writer.pending == 5
+
+        broken = False
+        await writer.flush()
+        await writer.close()
+
+        assert store.count(AuditFilter()) == 5
+        assert store.verify_segment("20250310", full=True)["valid"]
+
+    @pytest.mark.unit
+    def test_unknown_fsync_policy_is_rejected(self, store):
+        with pytest.raises(ValueError):
+            AuditWriter(store, fsync_policy="sometimes")
+
+    @pytest.mark.unit
+    def test_segment_is_resolved_only_on_day_change(self, store, monkeypatch):
+        opened = []
+        open_segment = store._open_segment
+        monkeypatch.setattr(store, "_open_segment", lambda day: opened.append(day) or open_segment(day))
+
+        store.append_many([_event(i) for i in range(100)], sync=True)
+        store.append_many([_event(24 * 60 + i) for i in range(100)])
+
+        assert opened == ["20250310", "20250311"]
+
+
+def _rewrite(path, transform):
+    lines = path.read_text().splitlines(keepends=True)
+    path.write_text("".join(transform(lines)))
+
+
+class TestHashChain:
+    @pytest.mark.unit
+    def test_events_are_chained_in_write_order_across_segments(self, store):
+        events = [_event(0), _event(5), _event(24 * 60)]
+        store.append_many(events)
+
+        assert events[0].chain_hash == chain_hash(GENESIS_HASH, events[0].checksum)
+        assert events[2].chain_hash == chain_hash(events[1].chain_hash, events[2].checksum)
+        assert store.chain_head_before("20250311") == events[1].chain_hash
+
+    @pytest.mark.unit
+    def test_failed_write_does_not_advance_chain(self, store):
+        store.append_many([_event(0), _event(1)])
+        head = store._head
+
+        class TornFile:
+            """Writes half of the data, then fails."""
+
+            def __init__(self, f):
+                self.f = f
+
+            def write(self, data):
+                self.f.write(data[: len(data) // 2])
+                raise OSError("disk full")
+
+            def __getattr__(self, name):
+                return getattr(self.f, name)
+
+        store._current_file = TornFile(store._current_file)
+        with pytest.raises(AuditWriteError) as excinfo:
+            store.append_many([_event(2), _event(3)])
+        assert excinfo.value.written == 0
+        assert store._head == head
+
+        store.append_many([_event(4)])
+
+        assert store.count(AuditFilter()) == 3
+        report = store.verify_segment("20250310", full=True)
+        assert report["valid"], report
+
+    @pytest.mark.unit
+    def test_verification_is_incremental(self, store):
+        store.append_many([_event(i) for i in range(50)])
+
+        first = store.verify_segment("20250310")
+        assert first["valid"] and first["checked"] == 50
+
+        store.append_many([_event(60 + i) for i in range(3)])
+        second = store.verify_segment("20250310")
+        assert second["valid"] and second["checked"] == 3
+        assert store.verify_segment("20250310", full=True)["checked"] == 53
+
+    @pytest.mark.unit
+    def test_deleted_event_breaks_chain(self, tmp_path):
+        store = AuditSegmentStore(tmp_path, parse_event=AuditEvent.model_validate_json)
+        store.append_many([_event(i) for i in range(5)])
+        store.close()
+        segment = tmp_path / "audit_20250310.jsonl"
+        _rewrite(segment, lambda lines: lines[:2] + lines[3:])
+        (tmp_path / "audit_20250310.idx.json").unlink()  # Attacker rebuilds the index
+
+        report = AuditSegmentStore(tmp_path, parse_event=AuditEvent.model_validate_json).verify_segment("20250310")
+
+        assert not report["valid"]
+        assert report["chain_breaks"][0]["reason"] == "chain_mismatch"
+
+    @pytest.mark.unit
+    def test_reordered_events_break_chain(self, tmp_path):
+        store = AuditSegmentStore(tmp_path, parse_event=AuditEvent.model_validate_json)
+        store.append_many([_event(i) for i in range(5)])
+        store.close()
+        _rewrite(tmp_path / "audit_20250310.jsonl", lambda lines: [lines[1], lines[0]] + lines[2:])
+
+        report = AuditSegmentStore(tmp_path, parse_event=AuditEvent.model_validate_json).verify_segment("20250310", full=True)
+
+        assert any(b["reason"] == "chain_mismatch" for b in report["chain_breaks"])
+
+    @pytest.mark.unit
+    def test_edited_event_fails_checksum(self, tmp_path):
+        store = AuditSegmentStore(tmp_path, parse_event=AuditEvent.model_validate_json)
+        store.append_many([_event(i) for i in range(3)])
+        store.close()
+        _rewrite(tmp_path / "audit_20250310.jsonl",
+                 lambda lines: [lines[0].replace("event 0", "event X")] + lines[1:])
+
+        report = AuditSegmentStore(tmp_path, parse_event=AuditEvent.model_validate_json).verify_segment("20250310", full=True)
+
+        assert len(report["invalid"]) == 1
+        assert report["chain_breaks"] == []
+
+    @pytest.mark.unit
+    def test_deleted_segment_is_detected_incrementally(self, tmp_path):
+        store = AuditSegmentStore(tmp_path, parse_event=AuditEvent.model_validate_json)
+        store.append_many([_event(day * 24 * 60) for day in range(3)])
+        store.close()
+        for day in store.segment_days():
+            assert store.verify_segment(day)["valid"]
+
+        (tmp_path / "audit_20250311.jsonl").unlink()
+        (tmp_path / "audit_20250311.idx.json").unlink()
+        report = AuditSegmentStore(tmp_path, parse_event=AuditEvent.model_validate_json).verify_segment("20250312")
+
+        assert report["checked"] == 0
+        assert report["chain_breaks"] == [{"reason": "segment_link_mismatch"}]
+
+
+class TestAuditLogger:
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_query_events_paginates_newest_first(self, audit):
+        for i in range(5):
+            await audit.log_event(AuditEventType.API_CALL, f"call {i}", user_id="u1")
+
+        page = await audit.query_events(AuditFilter(user_id="u1", limit=2, offset=1))
+
+        assert [e.message for e in page] == ["call 3", "call 2"]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_statistics_and_lookup(self, audit):
+        event = await audit.log_event(
+            AuditEventType.LOGIN_FAILURE, "bad password",
+            user_email="a@example.org", success=False, error_code="AUTH",
+            severity=AuditSeverity.LOW,
+        )
+
+        stats = await audit.get_statistics()
+        assert stats.total_events == 1
+        assert stats.events_by_user == {"a@example.org": 1}
+        assert stats.most_common_errors == [{"error_code": "AUTH", "count": 1}]
+        assert (await audit.get_event(event.id)).message == "bad password"
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_brute_force_detection_uses_index(self, audit):
+        context = AuditContext(ip_address="203.0.113.9")
+        for _ in range(5):
+            await audit.log_event(AuditEventType.LOGIN_FAILURE, "bad password", success=False, context=context)
+
+        alerts = await audit.query_events(AuditFilter(event_types=[AuditEventType.BRUTE_FORCE_DETECTED]))
+        assert len(alerts) == 1
+        assert alerts[0].details["failure_count"] == 5
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_brute_force_check_does_not_flush_the_writer(self, audit, monkeypatch):
+        flushes = []
+        flush = audit.writer.flush
+
+        async def recording_flush():
+            flushes.append(1)
+            await flush()
+
+        monkeypatch.setattr(audit.writer, "flush", recording_flush)
+        context = AuditContext(ip_address="203.0.113.10")
+        for _ in range(5):
+            await audit.log_event(AuditEventType.LOGIN_FAILURE, "bad password", success=False, context=context)
+
+        assert flushes == []
+        assert audit.writer.count(AuditFilter(event_types=[AuditEventType.BRUTE_FORCE_DETECTED])) == 1
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_verify_integrity_reports_chain_status(self, audit):
+        for i in range(3):
+            await audit.log_event(AuditEventType.API_CALL, f"call {i}")
+
+        report = await audit.verify_integrity()
+        assert report["chain_valid"] is True
+        assert report["valid_events"] == report["total_events"] == 3
+
+        again = await audit.verify_integrity()
+        assert again["events_checked"] == 0
+
+
+async def _collect(stream) -> bytes:
+    return b"".join([chunk async for chunk in stream])
+
+
+class TestStreamingExport:
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_ndjson_export_streams_in_chunks_oldest_first(self, audit):
+        for i in range(25):
+            await audit.log_event(AuditEventType.API_CALL, f"call {i}")
+
+        chunks = [c async for c in await audit.export_stream(AuditFilter(), "ndjson", chunk_size=10)]
+
+        assert len(chunks) == 3
+        lines = b"".join(chunks).decode().splitlines()
+        assert [json.loads(line)["message"] for line in lines] == [f"call {i}" for i in range(25)]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_export_resumes_after_cursor(self, audit):
+        events = [await audit.log_event(AuditEventType.API_CALL, f"call {i}") for i in range(10)]
+
+        data = await _collect(await audit.export_stream(AuditFilter(), "ndjson", after=events[6].id))
+
+        assert [json.loads(line)["id"] for line in data.decode().splitlines()] == [e.id for e in events[7:]]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_unknown_cursor_is_rejected_before_streaming(self, audit):
+        with pytest.raises(KeyError):
+            await audit.export_stream(AuditFilter(), "ndjson", after="missing")
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_gzip_csv_and_json_exports(self, audit):
+        for i in range(3):
+            await audit.log_event(AuditEventType.API_CALL, f"call, {i}", user_email="a@example.org")
+
+        csv_data = gzip.decompress(await _collect(await audit.export_stream(AuditFilter(), "csv", compress=True)))
+        rows = list(csv.reader(io.StringIO(csv_data.decode())))
+        assert rows[0][0] == "id" and len(rows) == 4
+        assert rows[1][4] == "call, 0"
+
+        json_data = await _collect(await audit.export_stream(AuditFilter(), "json", chunk_size=2))
+        assert [e["message"] for e in json.loads(json_data)] == ["call, 0", "call, 1", "call, 2"]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_only_one_chunk_is_read_at_a_time(self, audit, monkeypatch):
+        for i in range(30):
+            await audit.log_event(AuditEventType.API_CALL, f"call {i}")
+        parsed = []
+        parse = audit.store.parse_event
+        monkeypatch.setattr(audit.store, "parse_event", lambda line: parsed.append(1) or parse(line))
+
+        stream = await audit.export_stream(AuditFilter(), "ndjson", chunk_size=10)
+        await stream.__anext__()
+        assert len(parsed) == 10
+        await stream.aclose()
@@ -0,0 +1,238 @@
+"""
+Unit tests for the cache-aside decorator and key derivation in src.core.cache.
+"""
+
+import asyncio
+from datetime import date
+
+import pytest
+
+from src.core.cache import (
+    NEGATIVE_CACHE_MARKER,
+    SingleFlight,
+    cache_aside,
+    function_cache_key,
+    jittered_ttl,
+)
+from src.tools.transparency_api import TransparencyAPIFilter
+
+
+class DictBackend:
+    """Flat in-memory backend recording the TTLs it receives."""
+
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ttl):
+        self.data[key] = value
+        self.ttls[key] = ttl
+
+
+@pytest.fixture
+def backend():
+    return DictBackend()
+
+
+class TestKeyDerivation:
+    @pytest.mark.unit
+    def test_pydantic_filters_with_equal_fields_share_key(self):
+        async def fetch(filters):
+            return filters
+
+        a = TransparencyAPIFilter(ano=2024, codigo_orgao="26000")
+        b = TransparencyAPIFilter(codigo_orgao="26000", ano=2024, pagina=1)
+        c = TransparencyAPIFilter(ano=2023, codigo_orgao="26000")
+
+        assert function_cache_key(fetch, (a,), {}) == function_cache_key(fetch, (b,), {})
+        assert function_cache_key(fetch, (a,), {}) != function_cache_key(fetch, (c,), {})
+
+    @pytest.mark.unit
+    def test_positional_keyword_and_default_arguments_share_key(self):
+        async def fetch(org, year=2024, *, since=date(2024, 1, 1)):
+            return org
+
+        key = function_cache_key(fetch, ("26000",), {})
+        assert function_cache_key(fetch, (), {"org": "26000", "year": 2024}) == key
+        assert function_cache_key(fetch, ("26000", 2023), {}) != key
+
+    @pytest.mark.unit
+    def test_instances_do_not_share_keys(self):
+        class Client:
+            async def fetch(self, org):
+                return org
+
+            @classmethod
+            async def lookup(cls, org):
+                return org
+
+        client, other = Client(), Client()
+
+        key = function_cache_key(Client.fetch, (client, "1"), {})
+        assert function_cache_key(Client.fetch, (client, "1"), {}) == key
+        assert function_cache_key(Client.fetch, (other, "1"), {}) != key
+        assert function_cache_key(Client.lookup.__func__, (Client, "1"), {}) == (
+            function_cache_key(Client.lookup.__func__, (Client, "1"), {})
+        )
+
+    @pytest.mark.unit
+    def test_cache_identity_and_opt_in_receiver_sharing(self):
+        class Client:
+            def __init__(self, base_url):
+                self.cache_identity = base_url
+
+            async def fetch(self, org):
+                return org
+
+        a, b, c = Client("https://a"), Client("https://a"), Client("https://c")
+
+        assert function_cache_key(Client.fetch, (a, "1"), {}) == function_cache_key(Client.fetch, (b, "1"), {})
+        assert function_cache_key(Client.fetch, (a, "1"), {}) != function_cache_key(Client.fetch, (c, "1"), {})
+        assert function_cache_key(Client.fetch, (a, "1"), {}, ignore_receiver=True) == (
+            function_cache_key(Client.fetch, (c, "1"), {}, ignore_receiver=True)
+        )
+
+    @pytest.mark.unit
+    def test_jittered_ttl_never_exceeds_base(self):
+        values = {jittered_ttl(1000, 0.2) for _ in range(200)}
+        assert all(800 <= v <= 1000 for v in values)
+        assert len(values) > 1
+        assert jittered_ttl(1000, 0) == 1000
+
+
+class TestCacheAside:
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_compute_once(self, backend):
+        calls = 0
+
+        @cache_aside(backend, ttl=60)
+        async def expensive(org):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"org": org}
+
+        results = await asyncio.gather(*(expensive("26000") for _ in range(20)))
+
+        assert calls == 1
+        assert all(r == {"org": "26000"} for r in results)
+        assert expensive.single_flight.coalesced == 19
+        assert await expensive("26000") == {"org": "26000"}
+        assert calls == 1
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_errors_propagate_to_all_waiters_and_are_not_cached(self, backend):
+        calls = 0
+
+        @cache_aside(backend, ttl=60)
+        async def failing():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            raise RuntimeError("portal indisponível")
+
+        results = await asyncio.gather(*(failing() for _ in range(5)), return_exceptions=True)
+
+        assert calls == 1
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert backend.data == {}
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_negative_results_are_cached_with_short_ttl(self, backend):
+        calls = 0
+
+        @cache_aside(backend, ttl=3600, negative_ttl=30, ttl_jitter=0)
+        async def lookup(contract_id):
+            nonlocal calls
+            calls += 1
+            return None
+
+        assert await lookup("missing") is None
+        assert await lookup("missing") is None
+        assert calls == 1
+
+        (key, stored), = backend.data.items()
+        assert stored[NEGATIVE_CACHE_MARKER] is True
+        assert backend.ttls[key] == 30
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_custom_negative_predicate_returns_original_value(self, backend):
+        @cache_aside(backend, ttl=3600, is_negative=lambda r: r == [])
+        async def search(term):
+            return []
+
+        assert await search("nada") == []
+        assert await search("nada") == []
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_negative_caching_can_be_disabled(self, backend):
+        @cache_aside(backend, ttl=3600, negative_ttl=None)
+        async def lookup():
+            return None
+
+        await lookup()
+        assert backend.data == {}
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_backend_factory_and_prefix(self, backend):
+        async def factory():
+            return backend
+
+        @cache_aside(backend_factory=factory, ttl=60, key_prefix="contracts")
+        async def fetch(org):
+            return [org]
+
+        await fetch("1")
+        assert all(k.startswith("contracts:") for k in backend.data)
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_methods_are_cached_per_instance(self, backend):
+        class Counter:
+            def __init__(self, step):
+                self.step = step
+
+            @cache_aside(backend, ttl=60)
+            async def next(self, value):
+                return value + self.step
+
+        assert await Counter(1).next(10) == 11
+        assert await Counter(5).next(10) == 15
+        assert len(backend.data) == 2
+
+    @pytest.mark.unit
+    def test_sync_functions_are_rejected(self, backend):
+        with pytest.raises(TypeError):
+            cache_aside(backend)(lambda: None)
+
+
+class TestSingleFlight:
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_waiters_retry_when_leader_is_cancelled(self):
+        flight = SingleFlight()
+        started = asyncio.Event()
+
+        async def slow():
+            started.set()
+            await asyncio.sleep(10)
+
+        async def fast():
+            return "ok"
+
+        leader = asyncio.create_task(flight.do("k", slow))
+        await started.wait()
+        waiter = asyncio.create_task(flight.do("k", fast))
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        assert await waiter == "ok"
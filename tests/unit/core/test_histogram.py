@@ -0,0 +1,128 @@
+"""
+Unit tests for the log-bucketed latency histograms in src.core.histogram.
+"""
+
+import json
+import math
+import random
+
+import pytest
+
+from src.core.histogram import (
+    HistogramFamily,
+    HistogramSnapshot,
+    LatencyHistogram,
+    bucket_index,
+    bucket_upper,
+)
+
+
+def _exact_quantile(values, q):
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(q * len(ordered))) - 1]
+
+
+@pytest.fixture
+def latencies():
+    rng = random.Random(7)
+    return [rng.lognormvariate(-3, 1.2) for _ in range(20000)]
+
+
+class TestBuckets:
+    @pytest.mark.unit
+    def test_index_and_upper_bound_are_consistent(self):
+        for ticks in list(range(2000)) + [10 ** 6, 3_600_000_000, 2 ** 40 + 12345]:
+            index = bucket_index(ticks, 8)
+            assert bucket_upper(index, 8) >= ticks
+            assert bucket_index(bucket_upper(index, 8), 8) == index
+            assert bucket_upper(index, 8) - ticks <= ticks / 128
+
+
+class TestLatencyHistogram:
+    @pytest.mark.unit
+    def test_quantiles_within_precision(self, latencies):
+        histogram = LatencyHistogram()
+        for value in latencies:
+            histogram.record(value)
+
+        for q in (0.5, 0.9, 0.95, 0.99, 0.999):
+            exact = _exact_quantile(latencies, q)
+            assert histogram.quantile(q) == pytest.approx(exact, rel=0.01)
+        assert histogram.total == len(latencies)
+        assert histogram.mean == pytest.approx(sum(latencies) / len(latencies))
+
+    @pytest.mark.unit
+    def test_memory_is_fixed_and_values_are_clamped(self):
+        histogram = LatencyHistogram(highest=10.0)
+        buckets = len(histogram._counts)
+        histogram.record(1e6)
+        histogram.record(0.0)
+
+        assert len(histogram._counts) == buckets
+        assert histogram.quantile(1.0) == pytest.approx(10.0, rel=0.01)
+        assert histogram.max == 1e6
+        assert histogram.quantile(0.5) == 0.0
+
+    @pytest.mark.unit
+    def test_worker_snapshots_merge_to_the_combined_distribution(self, latencies):
+        combined = LatencyHistogram()
+        workers = [LatencyHistogram() for _ in range(4)]
+        for i, value in enumerate(latencies):
+            combined.record(value)
+            workers[i % 4].record(value)
+
+        wire = [json.loads(json.dumps(w.snapshot().to_dict())) for w in workers]
+        merged = HistogramSnapshot.from_dict(wire[0])
+        for data in wire[1:]:
+            merged = merged.merge(HistogramSnapshot.from_dict(data))
+
+        assert merged.counts == combined.snapshot().counts
+        assert merged.quantiles((0.5, 0.99)) == combined.snapshot().quantiles((0.5, 0.99))
+
+        aggregated = LatencyHistogram()
+        aggregated.merge(merged)
+        assert aggregated.quantile(0.95) == combined.quantile(0.95)
+
+    @pytest.mark.unit
+    def test_subtract_isolates_an_interval(self):
+        histogram = LatencyHistogram()
+        for _ in range(100):
+            histogram.record(0.010)
+        before = histogram.snapshot()
+        for _ in range(50):
+            histogram.record(1.0)
+
+        interval = histogram.snapshot().subtract(before)
+        assert interval.total == 50
+        assert interval.mean == pytest.approx(1.0)
+        assert interval.quantile(0.5) == pytest.approx(1.0, rel=0.01)
+
+    @pytest.mark.unit
+    def test_cumulative_counts_for_export(self):
+        histogram = LatencyHistogram()
+        for value in (0.002, 0.02, 0.2, 2.0):
+            histogram.record(value)
+
+        assert histogram.snapshot().cumulative_counts((0.001, 0.01, 0.1, 1.0, 10.0)) == [0, 1, 2, 3, 4]
+
+
+class TestHistogramFamily:
+    @pytest.mark.unit
+    def test_per_key_histograms_and_merged_view(self):
+        family = HistogramFamily()
+        family.record("/api/v1/investigations", 0.5)
+        family.record("/api/v1/health", 0.001)
+
+        assert family.snapshot("/api/v1/health").total == 1
+        assert family.snapshot().total == 2
+        assert family.snapshot("/missing").total == 0
+
+    @pytest.mark.unit
+    def test_key_cardinality_is_capped(self):
+        family = HistogramFamily(max_keys=3)
+        for i in range(10):
+            family.record(f"/investigations/{i}", 0.1)
+
+        assert family.keys() == ["/investigations/0", "/investigations/1", "/investigations/2", "other"]
+        assert family.snapshot("other").total == 7
+        assert family.total == 10
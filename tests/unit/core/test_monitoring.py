@@ -0,0 +1,36 @@
+"""
+Unit tests for the request metrics in src.core.monitoring.
+"""
+
+import pytest
+
+from src.api.middleware import logging_middleware
+from src.core.monitoring import PerformanceMetrics, performance_metrics
+
+
+class TestPerformanceMetrics:
+    @pytest.mark.unit
+    def test_endpoint_cardinality_is_capped(self):
+        metrics = PerformanceMetrics(max_endpoints=3)
+        for i in range(10):
+            metrics.record_request(0.1, 500 if i % 2 else 200, f"/investigations/{i}")
+        metrics.record_request(0.1, 200, "/investigations/0")
+
+        assert list(metrics.request_counts) == [
+            "/investigations/0", "/investigations/1", "/investigations/2", "other",
+        ]
+        assert metrics.latency.keys() == list(metrics.request_counts)
+        assert metrics.request_counts["other"] == 7
+        assert metrics.error_rates["other"] == 4
+        assert metrics.get_error_rate() == pytest.approx(5 / 11)
+
+    @pytest.mark.unit
+    def test_fed_by_the_logging_middleware_observer(self):
+        assert performance_metrics.observe_request in logging_middleware._request_observers
+
+        metrics = PerformanceMetrics()
+        metrics.observe_request(0.25, "/health", 503)
+
+        assert metrics.request_counts == {"/health": 1}
+        assert metrics.get_error_rate("/health") == 1.0
+        assert metrics.latency.snapshot("/health").total == 1
@@ -0,0 +1,134 @@
+"""
+Unit tests for hierarchical investigation profiling in src.core.profiling.
+"""
+
+import asyncio
+import tracemalloc
+from contextlib import asynccontextmanager
+
+import pytest
+
+from src.core.profiling import (
+    ProfileRegistry,
+    ProfileSpan,
+    current_investigation_id,
+    get_profile,
+    profile_investigation,
+    profile_span,
+    record_external_call,
+    set_span_exporter,
+)
+
+
+class RecordingSpan:
+    def __init__(self, name):
+        self.name = name
+        self.attributes = {}
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+
+class TestProfileTree:
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_stages_nest_across_concurrent_tasks(self):
+        async def detector(name):
+            async with profile_span(f"detector.{name}"):
+                record_external_call("transparency_api")
+                await asyncio.sleep(0)
+
+        async with profile_investigation("inv-tree"):
+            assert current_investigation_id() == "inv-tree"
+            async with profile_span("fetch"):
+                record_external_call("transparency_api", 3)
+            async with profile_span("detect"):
+                await asyncio.gather(detector("price"), detector("vendor"))
+
+        profile = get_profile("inv-tree")
+        assert [c["name"] for c in profile["children"]] == ["fetch", "detect"]
+        detect = profile["children"][1]
+        assert sorted(c["name"] for c in detect["children"]) == ["detector.price", "detector.vendor"]
+        assert detect["total_calls"] == {"transparency_api": 2}
+        assert profile["total_calls"] == {"transparency_api": 5}
+        assert profile["finished"] and profile["wall_ms"] >= detect["wall_ms"]
+        assert current_investigation_id() is None
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_spans_are_noops_without_an_active_profile(self):
+        async with profile_span("orphan") as span:
+            record_external_call("llm")
+        assert span is None
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_nested_investigation_joins_the_active_tree(self):
+        async with profile_investigation("inv-outer"):
+            async with profile_investigation("inv-agent", name="zumbi.investigate"):
+                pass
+
+        assert get_profile("inv-agent") is None
+        child = get_profile("inv-outer")["children"][0]
+        assert child["name"] == "zumbi.investigate"
+        assert child["attributes"] == {"investigation_id": "inv-agent"}
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_errors_are_recorded_and_propagated(self):
+        with pytest.raises(ValueError):
+            async with profile_investigation("inv-error"):
+                async with profile_span("explanation"):
+                    raise ValueError("llm indisponível")
+
+        profile = get_profile("inv-error")
+        assert profile["children"][0]["error"] == "ValueError: llm indisponível"
+        assert profile["finished"]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_allocations_reported_while_tracemalloc_runs(self):
+        tracemalloc.start()
+        try:
+            async with profile_investigation("inv-alloc"):
+                async with profile_span("parse"):
+                    data = [bytearray(1024) for _ in range(100)]
+        finally:
+            tracemalloc.stop()
+
+        assert get_profile("inv-alloc")["children"][0]["allocated_bytes"] >= 100 * 1024
+        assert len(data) == 100
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_spans_are_mirrored_to_the_exporter(self):
+        exported = []
+
+        @asynccontextmanager
+        async def exporter(name, attributes):
+            span = RecordingSpan(name)
+            exported.append(span)
+            yield span
+
+        set_span_exporter(exporter)
+        try:
+            async with profile_investigation("inv-trace"):
+                async with profile_span("render", format="html"):
+                    record_external_call("llm")
+        finally:
+            set_span_exporter(None)
+
+        assert [s.name for s in exported] == ["investigation", "render"]
+        assert exported[1].attributes["profile.calls.llm"] == 1
+        assert exported[1].attributes["profile.wall_ms"] >= 0
+
+
+class TestProfileRegistry:
+    @pytest.mark.unit
+    def test_keeps_most_recent_profiles(self):
+        registry = ProfileRegistry(max_profiles=2)
+        for i in range(3):
+            registry.add(f"inv-{i}", ProfileSpan("investigation"))
+
+        assert "inv-0" not in registry
+        assert len(registry) == 2
@@ -0,0 +1,90 @@
+"""
+Unit tests for the in-process sampling profiler in src.core.sampling_profiler.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.core.profiling import profile_investigation, profile_span
+from src.core.sampling_profiler import (
+    TRUNCATED_STACK,
+    ProfilerBusyError,
+    SamplingProfiler,
+    capture_profile,
+)
+
+
+def _spin(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+class TestSamplingProfiler:
+    @pytest.mark.unit
+    def test_collapsed_stacks_include_worker_frames(self):
+        stop = threading.Event()
+
+        def busy_worker():
+            while not stop.is_set():
+                _spin(0.001)
+
+        worker = threading.Thread(target=busy_worker, name="busy-worker")
+        worker.start()
+        profiler = SamplingProfiler(interval=0.002)
+        profiler.start()
+        time.sleep(0.1)
+        result = profiler.stop()
+        stop.set()
+        worker.join()
+
+        assert result.samples > 10
+        lines = result.collapsed().splitlines()
+        worker_lines = [line for line in lines if line.startswith("thread:busy-worker;")]
+        assert worker_lines
+        assert any("busy_worker" in line for line in worker_lines)
+        stack, count = worker_lines[0].rsplit(" ", 1)
+        assert int(count) >= 1 and " " not in stack.split(";")[-1]
+        assert not any("sampling-profiler" in line for line in lines)
+
+    @pytest.mark.unit
+    def test_stack_table_is_bounded(self):
+        profiler = SamplingProfiler(max_stacks=2)
+        for stack in ("a;b", "a;c", "a;d", "a;b"):
+            profiler._count(stack)
+
+        assert profiler.result.stacks == {"a;b": 2, "a;c": 1, TRUNCATED_STACK: 1}
+        assert profiler.result.dropped_stacks == 1
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_loop_samples_are_tagged_with_investigation_and_agent(self):
+        async with profile_investigation("inv-sampled"):
+            async with profile_span("agent.zumbi"):
+                profiler = SamplingProfiler(
+                    loop=asyncio.get_running_loop(),
+                    loop_thread_id=threading.get_ident(),
+                )
+                sampler = threading.Thread(target=profiler.sample)
+                sampler.start()
+                _spin(0.05)
+                sampler.join()
+
+        prefix = "thread:event-loop;investigation:inv-sampled;agent:zumbi;"
+        assert any(stack.startswith(prefix) for stack in profiler.result.stacks)
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_only_one_capture_at_a_time(self):
+        first = asyncio.create_task(capture_profile(0.05, interval=0.005))
+        await asyncio.sleep(0)
+        with pytest.raises(ProfilerBusyError):
+            await capture_profile(0.01)
+
+        result = await first
+        assert result.samples >= 1
+        assert result.duration >= 0.05
+        assert 0 <= result.summary()["overhead_ratio"] < 1
@@ -0,0 +1,532 @@
+"""
+Unit tests for AgentPoolManager dispatching: ready queues, idle free lists,
+timer-wheel retries, per-type latency histograms, process execution and
+bounded result retention.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+import pytest
+import pytest_asyncio
+
+from src.infrastructure import agent_pool
+from src.infrastructure.agent_pool import (
+    AgentPoolManager,
+    AgentTask,
+    DurationHistogram,
+    PoolConfig,
+    ProcessTaskDescriptor,
+    ProcessTaskRunner,
+    SharedArrayRef,
+    TaskPriority,
+    TaskResultStore,
+    TimerWheel,
+    estimate_size,
+    export_shared_arrays,
+    import_shared_arrays,
+    run_cpu_bound,
+    run_process_task,
+)
+
+
+class EchoAgent:
+    def __init__(self):
+        self.calls = []
+
+    async def run(self, value, delay: float = 0.0):
+        self.calls.append(value)
+        if delay:
+            await asyncio.sleep(delay)
+        return value
+
+
+class FlakyAgent:
+    failures = 0
+
+    async def run(self, value):
+        if FlakyAgent.failures < 2:
+            FlakyAgent.failures += 1
+            raise RuntimeError("falha transitória")
+        return value
+
+
+async def _wait_completed(pool, task_ids, timeout=5.0):
+    async def wait():
+        while not all(task_id in pool.completed_tasks for task_id in task_ids):
+            await asyncio.sleep(0.005)
+    await asyncio.wait_for(wait(), timeout)
+
+
+@pytest_asyncio.fixture
+async def pool():
+    manager = AgentPoolManager(PoolConfig(
+        enable_multiprocessing=False,
+        enable_threading=False,
+        min_agents_per_type=1,
+        max_agents_per_type=2,
+        task_retry_delay=0.05,
+        retry_wheel_tick=0.01,
+    ))
+    yield manager
+    await manager.shutdown()
+
+
+class TestTimerWheel:
+    @pytest.mark.unit
+    def test_items_become_due_after_delay(self):
+        wheel = TimerWheel(tick=0.1, slots=8)
+        wheel.schedule(0.25, "a", now=wheel._origin)
+        wheel.schedule(2.0, "b", now=wheel._origin)  # Wraps around the wheel
+
+        assert wheel.advance(now=wheel._origin + 0.1) == []
+        assert wheel.advance(now=wheel._origin + 0.35) == ["a"]
+        assert wheel.advance(now=wheel._origin + 1.0) == []
+        assert wheel.advance(now=wheel._origin + 2.05) == ["b"]
+        assert len(wheel) == 0
+
+    @pytest.mark.unit
+    def test_large_jumps_collect_everything_due(self):
+        wheel = TimerWheel(tick=0.1, slots=4)
+        for i in range(10):
+            wheel.schedule(0.1 * (i + 1), i, now=wheel._origin)
+
+        assert sorted(wheel.advance(now=wheel._origin + 100)) == list(range(10))
+
+
+class TestDurationHistogram:
+    @pytest.mark.unit
+    def test_quantiles_follow_bucket_bounds(self):
+        histogram = DurationHistogram()
+        for _ in range(90):
+            histogram.record(0.004)
+        for _ in range(10):
+            histogram.record(2.0)
+
+        snapshot = histogram.snapshot()
+        assert snapshot["count"] == 100
+        assert snapshot["p50"] == 0.005
+        assert snapshot["p99"] == 2.5
+
+
+class TestDispatcher:
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_higher_priority_tasks_run_first(self, pool):
+        agent = EchoAgent()
+        pool.register_agent_factory("echo", lambda: agent)
+        await pool.create_agent_pool("echo", 1)
+        pool.config.max_agents_per_type = 1
+
+        ids = [
+            await pool.submit_task("echo", "run", "low", priority=TaskPriority.LOW),
+            await pool.submit_task("echo", "run", "normal"),
+            await pool.submit_task("echo", "run", "critical", priority=TaskPriority.CRITICAL),
+        ]
+        assert pool.get_pool_status()["pools"]["echo"]["queued_tasks"] == 3
+
+        await pool.initialize()
+        await _wait_completed(pool, ids)
+
+        assert agent.calls == ["critical", "normal", "low"]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_idle_agents_are_acquired_from_free_list(self, pool):
+        pool.register_agent_factory("echo", EchoAgent)
+        await pool.create_agent_pool("echo", 2)
+
+        first = pool._acquire_idle_agent("echo")
+        second = pool._acquire_idle_agent("echo")
+
+        assert first is not second
+        assert pool._acquire_idle_agent("echo") is None
+        pool._release_agent(first)
+        assert pool._acquire_idle_agent("echo") is first
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_workers_steal_work_from_other_types(self, pool):
+        pool.register_agent_factory("echo", EchoAgent)
+        pool.register_agent_factory("other", EchoAgent)
+        await pool.create_agent_pool("echo", 2)
+        await pool.create_agent_pool("other", 1)
+        await pool.initialize()
+
+        ids = [await pool.submit_task("echo", "run", i, delay=0.02) for i in range(6)]
+        await _wait_completed(pool, ids)
+
+        # Every worker may serve "echo": both echo agents were kept busy
+        assert sum(a.total_tasks for a in pool.agent_pools["echo"]) == 6
+        assert all(a.total_tasks > 0 for a in pool.agent_pools["echo"])
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_workers_prefer_their_home_queue(self, pool):
+        pool.register_agent_factory("echo", EchoAgent)
+        pool.register_agent_factory("other", EchoAgent)
+        await pool.create_agent_pool("echo", 1)
+        await pool.create_agent_pool("other", 1)
+        pool.config.max_agents_per_type = 1
+
+        await pool.submit_task("echo", "run", "echo-low", priority=TaskPriority.LOW)
+        await pool.submit_task("echo", "run", "echo-normal")
+        await pool.submit_task("other", "run", "other-critical", priority=TaskPriority.CRITICAL)
+
+        # Worker 0's home is "echo": served despite the critical task elsewhere
+        task, _, agent, _ = pool._take_task(0)
+        assert (task.args, agent.agent_type) == (("echo-normal",), "echo")
+
+        # The only echo agent is now busy, so worker 2 (home "echo") steals
+        task, _, agent, _ = pool._take_task(2)
+        assert (task.args, agent.agent_type) == (("other-critical",), "other")
+
+        # No capacity left anywhere
+        assert pool._take_task(1) is None
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_pool_scales_up_into_reserved_slot(self, pool):
+        pool.register_agent_factory("echo", EchoAgent)
+        await pool.create_agent_pool("echo", 1)
+        await pool.initialize()
+
+        ids = [await pool.submit_task("echo", "run", i, delay=0.05) for i in range(4)]
+        await _wait_completed(pool, ids)
+
+        assert len(pool.agent_pools["echo"]) == pool.config.max_agents_per_type
+        assert pool._pending_agents["echo"] == 0
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_retries_do_not_block_workers(self, pool):
+        FlakyAgent.failures = 0
+        pool.register_agent_factory("flaky", FlakyAgent)
+        pool.register_agent_factory("echo", EchoAgent)
+        await pool.create_agent_pool("flaky", 1)
+        await pool.create_agent_pool("echo", 1)
+        await pool.initialize()
+
+        flaky_id = await pool.submit_task("flaky", "run", "ok")
+        await asyncio.sleep(0.01)
+        echo_id = await pool.submit_task("echo", "run", "fast")
+        await _wait_completed(pool, [echo_id])
+
+        # The echo task finished while the flaky one was waiting to retry
+        assert flaky_id not in pool.completed_tasks
+        assert len(pool.retry_wheel) == 1
+
+        await _wait_completed(pool, [flaky_id])
+        task = pool.completed_tasks[flaky_id]
+        assert task.result == "ok"
+        assert task.error is None
+        assert task.retry_count == 2
+        assert pool.metrics["tasks_retried"] == 2
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_status_reports_histograms_per_agent_type(self, pool):
+        pool.register_agent_factory("echo", EchoAgent)
+        await pool.create_agent_pool("echo", 1)
+        await pool.initialize()
+
+        ids = [await pool.submit_task("echo", "run", i) for i in range(3)]
+        await _wait_completed(pool, ids)
+
+        status = pool.get_pool_status()["pools"]["echo"]
+        assert status["queue_wait"]["count"] == 3
+        assert status["execution"]["count"] == 3
+
+
+@dataclass
+class Spectrum:
+    label: str
+    power: np.ndarray
+
+
+class CountingAgent:
+    instances = 0
+
+    def __init__(self, scale: int = 1):
+        CountingAgent.instances += 1
+        self.scale = scale
+
+    def spectrum(self, n):
+        return Spectrum("fft", np.arange(n, dtype=float) * self.scale)
+
+    async def pid(self):
+        return os.getpid()
+
+
+class TestProcessExecution:
+    @pytest.mark.unit
+    def test_large_arrays_roundtrip_through_shared_memory(self):
+        result = {"spectra": [Spectrum("a", np.ones(1000)), Spectrum("b", np.ones(2))]}
+
+        exported = export_shared_arrays(result, min_bytes=1024)
+        assert isinstance(exported["spectra"][0].power, SharedArrayRef)
+        assert isinstance(exported["spectra"][1].power, np.ndarray)
+        assert isinstance(result["spectra"][0].power, np.ndarray)  # Original untouched
+
+        imported = import_shared_arrays(exported)
+        np.testing.assert_array_equal(imported["spectra"][0].power, np.ones(1000))
+
+    @pytest.mark.unit
+    def test_agents_are_created_once_per_process(self):
+        CountingAgent.instances = 0
+        descriptor = ProcessTaskDescriptor(
+            target=CountingAgent,
+            method="spectrum",
+            args=(4,),
+            factory_kwargs={"scale": 2},
+        )
+
+        first = run_process_task(descriptor)
+        second = run_process_task(descriptor)
+
+        assert CountingAgent.instances == 1
+        np.testing.assert_array_equal(second.power, first.power)
+        np.testing.assert_array_equal(first.power, [0.0, 2.0, 4.0, 6.0])
+
+    @pytest.mark.unit
+    def test_coroutine_methods_are_awaited(self):
+        descriptor = ProcessTaskDescriptor(target=CountingAgent, method="pid")
+
+        assert run_process_task(descriptor) == os.getpid()
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_runner_recycles_workers_and_returns_shared_arrays(self):
+        runner = ProcessTaskRunner(max_workers=1, max_tasks_per_child=2, shared_memory_min_bytes=1024)
+        try:
+            pids = [
+                await runner.run(ProcessTaskDescriptor(target="os:getpid"))
+                for _ in range(4)
+            ]
+            spectrum = await runner.run(ProcessTaskDescriptor(
+                target=CountingAgent, method="spectrum", args=(1000,)
+            ))
+        finally:
+            runner.shutdown()
+
+        assert len(set(pids)) == 2
+        assert os.getpid() not in pids
+        np.testing.assert_array_equal(spectrum.power, np.arange(1000, dtype=float))
+
+
+def _worker_pid(_lock=None):
+    return os.getpid()
+
+
+def _reject(value):
+    raise TypeError(f"valor inválido: {value}")
+
+
+@pytest.fixture
+def process_runner(monkeypatch):
+    runner = ProcessTaskRunner(max_workers=1)
+    monkeypatch.setattr(agent_pool, "_process_runner", runner)
+    yield runner
+    runner.shutdown()
+
+
+class TestRunCpuBound:
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_picklable_target_runs_in_worker(self, process_runner):
+        assert await run_cpu_bound(_worker_pid) != os.getpid()
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_local_function_runs_inline(self, process_runner):
+        def local_pid():
+            return os.getpid()
+
+        assert await run_cpu_bound(local_pid) == os.getpid()
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_lambda_runs_inline(self, process_runner):
+        assert await run_cpu_bound(lambda: os.getpid()) == os.getpid()
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_unpicklable_argument_runs_inline(self, process_runner):
+        assert await run_cpu_bound(_worker_pid, threading.Lock()) == os.getpid()
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_errors_raised_by_target_propagate(self, process_runner):
+        with pytest.raises(TypeError, match="valor inválido"):
+            await run_cpu_bound(_reject, 3)
+        assert process_runner.tasks_completed == 0
+
+
+class TestResultRetention:
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_result_future_resolves_for_queued_task(self, pool):
+        pool.register_agent_factory("echo", EchoAgent)
+        await pool.create_agent_pool("echo", 1)
+
+        # Submitted before workers exist: still only in the ready queue
+        task_id = await pool.submit_task("echo", "run", "ok")
+        waiter = asyncio.create_task(pool.get_task_result(task_id, timeout=5))
+        await pool.initialize()
+
+        assert await waiter == "ok"
+        assert await pool.get_task_result(task_id) == "ok"
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_failed_task_raises_through_future(self, pool):
+        pool.register_agent_factory("flaky", FlakyAgent)
+        await pool.create_agent_pool("flaky", 1)
+        await pool.initialize()
+        FlakyAgent.failures = -100  # Fails more often than it is retried
+
+        task_id = await pool.submit_task("flaky", "run", "x")
+        with pytest.raises(Exception, match="Task failed"):
+            await pool.get_task_result(task_id, timeout=5)
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_caller_timeout_does_not_cancel_task(self, pool):
+        pool.register_agent_factory("echo", EchoAgent)
+        await pool.create_agent_pool("echo", 1)
+        await pool.initialize()
+
+        task_id = await pool.submit_task("echo", "run", "slow", delay=0.05)
+        with pytest.raises(asyncio.TimeoutError):
+            await pool.get_task_result(task_id, timeout=0.001)
+
+        assert await pool.get_task_result(task_id, timeout=5) == "slow"
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_memory_stays_bounded_under_sustained_load(self):
+        manager = AgentPoolManager(PoolConfig(
+            enable_multiprocessing=False,
+            enable_threading=False,
+            min_agents_per_type=1,
+            max_completed_tasks=50,
+            max_result_memory_bytes=20_000,
+            result_offload_threshold=None,
+        ))
+        manager.register_agent_factory("echo", EchoAgent)
+        await manager.create_agent_pool("echo", 2)
+        await manager.initialize()
+        try:
+            ids = [await manager.submit_task("echo", "run", b"x" * 1000) for _ in range(300)]
+            assert await manager.get_task_result(ids[-1], timeout=5) == b"x" * 1000
+            await _wait_completed(manager, ids[-5:])
+        finally:
+            await manager.shutdown()
+
+        stats = manager.get_pool_status()["result_store"]
+        assert stats["memory_bytes"] <= 20_000
+        assert stats["entries"] <= 20
+        assert ids[0] not in manager.completed_tasks
+        assert not manager._task_futures
+
+
+class TestTaskResultStore:
+    @pytest.mark.unit
+    def test_large_results_are_offloaded_to_disk(self, tmp_path):
+        store = TaskResultStore(offload_threshold=1024, offload_dir=str(tmp_path))
+        store.put(AgentTask(id="big", result=list(range(10_000))))
+        store.put(AgentTask(id="small", result={"ok": True}))
+
+        assert store.stats()["offloaded_entries"] == 1
+        assert store.stats()["memory_bytes"] < 1024
+        assert store["big"].result == list(range(10_000))
+        assert store["small"].result == {"ok": True}
+
+        store.pop("big")
+        assert list(tmp_path.iterdir()) == []
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_offload_pickles_off_the_event_loop(self, tmp_path, monkeypatch):
+        dumps = agent_pool.pickle.dumps
+        threads = []
+
+        def recording_dumps(*args, **kwargs):
+            threads.append(threading.get_ident())
+            return dumps(*args, **kwargs)
+
+        monkeypatch.setattr(agent_pool.pickle, "dumps", recording_dumps)
+        store = TaskResultStore(offload_threshold=1024, offload_dir=str(tmp_path))
+        store.put(AgentTask(id="big", result=list(range(10_000))))
+        store.put(AgentTask(id="small", result={"ok": True}))
+
+        # Readable from memory while the thread writes it
+        assert store.stats()["offloading_entries"] == 1
+        assert store["big"].result == list(range(10_000))
+        await asyncio.gather(*store._pending_offloads)
+
+        assert threads and threading.get_ident() not in threads
+        assert store.stats()["offloaded_entries"] == 1
+        assert store.stats()["memory_bytes"] < 1024
+        assert store["big"].result == list(range(10_000))
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_entries_discarded_while_offloading_leave_no_files(self, tmp_path):
+        store = TaskResultStore(offload_threshold=1024, offload_dir=str(tmp_path))
+        store.put(AgentTask(id="big", result=list(range(10_000))))
+        pending = list(store._pending_offloads)
+        store.pop("big")
+
+        await asyncio.gather(*pending)
+
+        assert list(tmp_path.iterdir()) == []
+        assert store.stats()["offloaded_bytes"] == store.offloading_bytes == 0
+
+    @pytest.mark.unit
+    def test_results_are_never_pickled_without_an_offload_threshold(self, monkeypatch):
+        def fail(*args, **kwargs):
+            raise AssertionError("pickled")
+
+        monkeypatch.setattr(agent_pool.pickle, "dumps", fail)
+        store = TaskResultStore(offload_threshold=None)
+        store.put(AgentTask(id="a", result=[{"value": i} for i in range(50_000)]))
+
+        assert store["a"].result[10] == {"value": 10}
+
+    @pytest.mark.unit
+    def test_size_estimate_tracks_payload_size(self):
+        rows = [{"id": str(i), "value": float(i)} for i in range(10_000)]
+
+        exact = sys.getsizeof(rows) + sum(
+            sys.getsizeof(row) + sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in row.items())
+            for row in rows
+        )
+
+        assert estimate_size(b"x" * 5000) == sys.getsizeof(b"x" * 5000)
+        assert estimate_size(np.zeros(1000)) == 8000
+        # Sampled, so close to the exact in-memory footprint rather than equal
+        assert 0.8 < estimate_size(rows) / exact < 1.25
+
+    @pytest.mark.unit
+    def test_expired_entries_are_dropped(self):
+        store = TaskResultStore(ttl=0)
+        store.put(AgentTask(id="a", result=1))
+
+        assert "a" not in store
+        assert store.get("a") is None
+        assert len(store) == 0
+
+    @pytest.mark.unit
+    def test_oldest_entries_are_evicted_first(self):
+        store = TaskResultStore(max_entries=2)
+        for task_id in ("a", "b", "c"):
+            store.put(AgentTask(id=task_id, result=task_id))
+
+        assert "a" not in store
+        assert store["c"].result == "c"
+        assert store.stats()["evictions"] == 1
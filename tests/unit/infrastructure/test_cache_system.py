@@ -0,0 +1,139 @@
+"""
+Unit tests for the self-describing L2 value encoding in AdvancedCacheManager
+and the cached_result decorator.
+"""
+
+import gzip
+
+import msgpack
+import pytest
+
+from src.infrastructure.cache_system import (
+    AdvancedCacheManager,
+    CacheConfig,
+    CompressionCodec,
+    SerializationType,
+    ValueCodec,
+    cached_result,
+)
+from tests.utils.fake_redis import FakeRedis
+
+
+@pytest.fixture
+def cache_manager():
+    manager = AdvancedCacheManager(CacheConfig(compression_threshold=64))
+    manager.l2_cache = FakeRedis()
+    return manager
+
+
+class TestValueCodec:
+    @pytest.mark.unit
+    def test_small_values_are_not_compressed(self):
+        codec = ValueCodec(compression_threshold=1024)
+        raw = codec.encode(b"small", SerializationType.MSGPACK)
+
+        assert raw[:2] == ValueCodec.MAGIC
+        assert raw[2] == CompressionCodec.NONE.value
+        assert codec.decode(raw) == (b"small", SerializationType.MSGPACK)
+
+    @pytest.mark.unit
+    def test_large_values_roundtrip_compressed(self):
+        codec = ValueCodec(compression_threshold=64, large_value_threshold=1024)
+        payload = b"contrato " * 1000
+        raw = codec.encode(payload, SerializationType.PICKLE)
+
+        assert raw[2] != CompressionCodec.NONE.value
+        assert len(raw) < len(payload)
+        assert codec.decode(raw) == (payload, SerializationType.PICKLE)
+
+    @pytest.mark.unit
+    def test_incompressible_values_are_stored_raw(self):
+        codec = ValueCodec(compression_threshold=8)
+        payload = bytes(range(256))
+        raw = codec.encode(payload, SerializationType.MSGPACK)
+
+        assert raw[2] == CompressionCodec.NONE.value
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("codec_id", ValueCodec.available_codecs())
+    def test_every_available_codec_roundtrips(self, codec_id):
+        codec = ValueCodec(compression_threshold=0, preferred_codec=codec_id)
+        payload = b"abc" * 500
+
+        assert codec.decode(codec.encode(payload, SerializationType.JSON))[0] == payload
+
+    @pytest.mark.unit
+    def test_legacy_values_without_header_are_passed_through(self):
+        legacy = msgpack.packb({"a": 1})
+
+        assert ValueCodec().decode(legacy) == (legacy, None)
+
+
+class TestAdvancedCacheManagerL2:
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_batch_get_issues_one_get_per_key(self, cache_manager):
+        items = {f"k{i}": {"payload": "x" * (i * 50)} for i in range(10)}
+        await cache_manager._batch_set_l2(items)
+        redis = cache_manager.l2_cache
+        redis.commands.clear()
+        redis.round_trips = 0
+
+        results = await cache_manager._batch_get_l2(list(items) + ["missing"])
+
+        assert results == items
+        assert redis.commands["get"] == len(items) + 1
+        assert redis.round_trips == 1
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_get_reads_compressed_values_under_plain_key(self, cache_manager):
+        value = {"objeto": "Aquisição de equipamentos " * 100}
+        assert await cache_manager._set_to_l2("contract", value)
+
+        stored = cache_manager.l2_cache.data["contract"]
+        assert stored[2] != CompressionCodec.NONE.value
+        assert await cache_manager._get_from_l2("contract") == value
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_header_serialization_overrides_requested_one(self, cache_manager):
+        await cache_manager._set_to_l2("k", [1, 2, 3], serialization=SerializationType.PICKLE)
+
+        assert await cache_manager._get_from_l2("k", SerializationType.MSGPACK) == [1, 2, 3]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_legacy_uncompressed_values_remain_readable(self, cache_manager):
+        await cache_manager.l2_cache.set("legacy", msgpack.packb({"v": 1}))
+
+        assert await cache_manager._batch_get_l2(["legacy"]) == {"legacy": {"v": 1}}
+
+    @pytest.mark.unit
+    def test_gzip_fallback_is_always_available(self):
+        assert CompressionCodec.GZIP in ValueCodec.available_codecs()
+        assert gzip.decompress(
+            ValueCodec().compress(b"data", CompressionCodec.GZIP)
+        ) == b"data"
+
+
+class TestCachedResult:
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_sync_functions_become_cached_coroutines(self, cache_manager, monkeypatch):
+        async def get_cache_manager():
+            return cache_manager
+
+        monkeypatch.setattr("src.infrastructure.cache_system.get_cache_manager", get_cache_manager)
+        calls = []
+
+        @cached_result(ttl=60, key_prefix="sync")
+        def total(values):
+            calls.append(values)
+            return sum(values)
+
+        assert await total([1, 2, 3]) == 6
+        assert await total([1, 2, 3]) == 6
+        assert await total([4]) == 4
+        assert calls == [[1, 2, 3], [4]]
+        assert total.__name__ == "total"
@@ -0,0 +1,182 @@
+"""
+Unit tests for the embedded vector index in src.memory.vector_index.
+"""
+
+import numpy as np
+import pytest
+
+from src.memory.semantic import SemanticMemory
+from src.memory.vector_index import (
+    HashingEmbedder,
+    LocalVectorStore,
+    VectorIndex,
+    matches_filter,
+)
+
+
+@pytest.fixture
+def vectors():
+    rng = np.random.default_rng(3)
+    centers = rng.normal(size=(40, 32))
+    labels = rng.integers(0, 40, 4000)
+    return (centers[labels] + rng.normal(scale=0.5, size=(4000, 32))).astype(np.float32)
+
+
+def _ids(n):
+    return [f"v{i}" for i in range(n)]
+
+
+class TestVectorIndex:
+    @pytest.mark.unit
+    def test_exact_search_returns_nearest_first(self, vectors):
+        index = VectorIndex(32)
+        index.add(_ids(len(vectors)), vectors)
+
+        hits = index.search(vectors[7], k=5)
+        assert hits[0].id == "v7"
+        assert hits[0].score == pytest.approx(1.0, abs=1e-5)
+        assert [h.score for h in hits] == sorted((h.score for h in hits), reverse=True)
+
+    @pytest.mark.unit
+    def test_ivf_search_agrees_with_exact_scan(self, vectors):
+        index = VectorIndex(32, exact_threshold=1000, n_probe=8)
+        index.add(_ids(len(vectors)), vectors)
+
+        recall = 0
+        for query in vectors[:50]:
+            exact = {h.id for h in index.search(query, k=10, exact=True)}
+            approx = {h.id for h in index.search(query, k=10)}
+            recall += len(exact & approx)
+        assert index.uses_ivf
+        assert recall / 500 >= 0.9
+
+    @pytest.mark.unit
+    def test_incremental_adds_are_searchable_after_training(self, vectors):
+        index = VectorIndex(32, exact_threshold=1000)
+        index.add(_ids(3000), vectors[:3000])
+        index.search(vectors[0], k=1)
+        index.add(["late"], vectors[3500])
+
+        assert index.search(vectors[3500], k=1)[0].id == "late"
+
+    @pytest.mark.unit
+    def test_delete_replace_and_compaction(self, vectors):
+        index = VectorIndex(32)
+        index.add(_ids(2000), vectors[:2000])
+        assert index.delete(_ids(1500)) == 1500
+        assert index.delete(["v0", "missing"]) == 0
+
+        assert len(index) == 500 and index._size == 500
+        assert all(int(h.id[1:]) >= 1500 for h in index.search(vectors[10], k=20))
+
+        index.add(["v1600"], vectors[5], metadata=[{"replaced": True}])
+        assert len(index) == 500
+        assert index.search(vectors[5], k=1)[0].metadata == {"replaced": True}
+
+    @pytest.mark.unit
+    def test_duplicate_ids_in_one_batch_keep_the_last_entry(self, vectors):
+        index = VectorIndex(32)
+        index.add(["a", "b", "a"], vectors[:3], metadata=[{"n": 0}, {"n": 1}, {"n": 2}])
+
+        assert len(index) == 2 and index._size == 2
+        assert index.get("a").metadata == {"n": 2}
+        hits = index.search(vectors[0], k=3)
+        assert [h.id for h in hits].count("a") == 1
+        assert index.search(vectors[2], k=1)[0].id == "a"
+
+        index.delete(["a"])
+        assert [h.id for h in index.search(vectors[2], k=3)] == ["b"]
+
+    @pytest.mark.unit
+    def test_metadata_filters(self, vectors):
+        index = VectorIndex(32, exact_threshold=1000)
+        index.add(
+            _ids(2000),
+            vectors[:2000],
+            metadata=[{"orgao": "saude" if i % 10 == 0 else "educacao", "tags": ["contrato"]} for i in range(2000)],
+        )
+
+        hits = index.search(vectors[1], k=10, filter={"orgao": "saude", "tags": "contrato"})
+        assert len(hits) == 10
+        assert all(h.metadata["orgao"] == "saude" for h in hits)
+        assert index.search(vectors[1], k=3, filter={"orgao": "defesa"}) == []
+
+    @pytest.mark.unit
+    def test_save_and_load_memory_mapped(self, vectors, tmp_path):
+        index = VectorIndex(32)
+        index.add(_ids(100), vectors[:100], documents=[f"doc {i}" for i in range(100)])
+        index.delete(["v3"])
+        index.save(tmp_path / "memory" / "index")
+
+        loaded = VectorIndex.load(tmp_path / "memory" / "index")
+        assert isinstance(loaded._vectors, np.memmap)
+        assert len(loaded) == 99 and "v3" not in loaded
+        assert loaded.search(vectors[4], k=1)[0].document == "doc 4"
+
+        loaded.add(["new"], vectors[200])
+        assert loaded.search(vectors[200], k=1)[0].id == "new"
+
+
+class TestFilters:
+    @pytest.mark.unit
+    def test_operators_and_dotted_paths(self):
+        metadata = {"content": {"type": "investigation_result"}, "concept": "preço", "score": 3}
+
+        assert matches_filter(metadata, {"content.type": "investigation_result"})
+        assert matches_filter(metadata, {"concept": {"$exists": True}})
+        assert not matches_filter(metadata, {"missing": {"$exists": True}})
+        assert matches_filter(metadata, {"score": {"$in": [1, 3]}, "concept": {"$ne": "x"}})
+        assert not matches_filter(metadata, {"score": {"$nin": [3]}})
+        with pytest.raises(ValueError):
+            matches_filter(metadata, {"score": {"$gt": 1}})
+
+
+class TestHashingEmbedder:
+    @pytest.mark.unit
+    def test_accent_insensitive_and_deterministic(self):
+        embedder = HashingEmbedder()
+        a, b, c = embedder.embed([
+            "Contrato emergencial do Ministério da Saúde",
+            "contrato emergencial ministerio saude",
+            "merenda escolar",
+        ])
+
+        assert float(a @ b) > 0.8
+        assert float(a @ c) < 0.3
+        assert np.array_equal(HashingEmbedder().embed_one("licitação"), embedder.embed_one("licitacao"))
+
+
+class TestLocalVectorStore:
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_documents_roundtrip_through_persistence(self, tmp_path):
+        store = LocalVectorStore(path=tmp_path / "store")
+        await store.initialize()
+        await store.add_documents([
+            {"id": "sem_1", "content": "superfaturamento em contratos de saúde", "metadata": {"concept": "preço"}},
+            {"id": "inv_1", "content": "investigação de fornecedores de merenda", "metadata": {"content": {"type": "investigation_result"}}},
+        ])
+        await store.close()
+
+        reopened = LocalVectorStore(path=tmp_path / "store")
+        await reopened.initialize()
+        results = await reopened.similarity_search(
+            "contratos de saúde", limit=5, filter_metadata={"concept": {"$exists": True}}
+        )
+        assert [r["id"] for r in results] == ["sem_1"]
+        assert results[0]["content"] == "superfaturamento em contratos de saúde"
+        assert await reopened.delete(["sem_1"]) == 1
+
+
+class TestSemanticMemorySearch:
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_ranks_by_similarity_across_all_items(self):
+        memory = SemanticMemory()
+        for i in range(30):
+            await memory.store(f"fact:{i}", f"pagamento de diárias número {i}")
+        await memory.store_pattern("sobrepreco", {"descricao": "sobrepreço em licitações de medicamentos"})
+
+        results = await memory.search("licitacoes de medicamentos", limit=3)
+        assert results[0]["key"] == "pattern:sobrepreco"
+        assert await memory.search("") == []
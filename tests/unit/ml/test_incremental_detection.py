@@ -0,0 +1,128 @@
+"""
+Unit tests for incremental detector aggregates in src.ml.incremental_detection.
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from src.ml.incremental_detection import IncrementalDetectionState, extract_features
+
+
+WORDS = "aquisição de material hospitalar serviço limpeza manutenção predial locação veículos obras".split()
+
+
+def _contract(i, rng, **overrides):
+    contract = {
+        "id": str(i),
+        "valorInicial": round(rng.lognormvariate(10, 1.5), 2),
+        "dataAssinatura": f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/2024",
+        "objeto": " ".join(rng.sample(WORDS, rng.randint(3, 7))) + f" lote {i % 5}",
+        "fornecedor": {"nome": f"Fornecedor {rng.randint(1, 6)}", "cnpj": "123"},
+    }
+    contract.update(overrides)
+    return contract
+
+
+def _brute_force(contracts, threshold):
+    features = [extract_features(c) for c in contracts]
+    prices = np.array([f.price for f in features if f.price is not None])
+    vendors, months = {}, {}
+    for f in features:
+        if f.value is not None:
+            vendors[f.vendor_key] = vendors.get(f.vendor_key, 0) + f.value
+        if f.month is not None:
+            months[f.month] = months.get(f.month, 0) + 1
+    pairs = set()
+    for i, a in enumerate(features):
+        for j in range(i + 1, len(features)):
+            b = features[j]
+            if a.words and b.words:
+                similarity = len(a.words & b.words) / len(a.words | b.words)
+                if similarity > threshold:
+                    pairs.add(tuple(sorted((f"id:{contracts[i]['id']}", f"id:{contracts[j]['id']}"))))
+    return prices, vendors, months, pairs
+
+
+def _assert_matches_full_recompute(state, contracts, threshold):
+    prices, vendors, months, pairs = _brute_force(contracts, threshold)
+    baseline = state.price_baseline()
+    assert baseline.count == len(prices)
+    assert baseline.mean == pytest.approx(prices.mean(), rel=1e-9)
+    assert baseline.std == pytest.approx(prices.std(), rel=1e-6)
+    assert {k: s["total_value"] for k, s in state.vendor_stats.items()} == pytest.approx(vendors)
+    assert {k: s["count"] for k, s in state.month_stats.items()} == months
+    assert set(state.duplicate_pairs) == pairs
+
+
+class TestIncrementalDetectionState:
+    @pytest.mark.unit
+    def test_delta_classifies_contracts(self):
+        rng = random.Random(1)
+        contracts = [_contract(i, rng) for i in range(50)]
+        state = IncrementalDetectionState(duplicate_threshold=0.6)
+
+        first = state.update(contracts)
+        assert (len(first.added), first.changed, first.removed) == (50, [], [])
+
+        assert state.update(contracts).empty
+        version = state.version
+
+        rerun = contracts[10:] + [_contract(100, rng)]
+        rerun[0] = dict(rerun[0], valorInicial=1.0)
+        delta = state.update(rerun)
+        assert (delta.added, delta.changed, len(delta.removed), delta.unchanged) == (["id:100"], ["id:10"], 10, 39)
+        assert state.version == version + 1 and len(state) == 41
+
+    @pytest.mark.unit
+    def test_aggregates_match_a_full_recompute_after_deltas(self):
+        rng = random.Random(7)
+        threshold = 0.6
+        contracts = [_contract(i, rng) for i in range(300)]
+        state = IncrementalDetectionState(duplicate_threshold=threshold)
+        state.update(contracts)
+        _assert_matches_full_recompute(state, contracts, threshold)
+
+        for round_ in range(5):
+            contracts = [c for c in contracts if rng.random() > 0.1]
+            for i in rng.sample(range(len(contracts)), 20):
+                contracts[i] = _contract(int(contracts[i]["id"]), rng)
+            contracts += [_contract(1000 * (round_ + 1) + i, rng) for i in range(30)]
+            state.update(contracts)
+            _assert_matches_full_recompute(state, contracts, threshold)
+
+    @pytest.mark.unit
+    def test_price_outliers(self):
+        rng = random.Random(3)
+        contracts = [_contract(i, rng, valorInicial=1000.0 + i) for i in range(30)]
+        contracts.append(_contract(99, rng, valorInicial=1_000_000.0))
+        state = IncrementalDetectionState(duplicate_threshold=0.85)
+        state.update(contracts)
+
+        outliers = state.price_outliers(2.5)
+        assert [(key, value) for key, value, _ in outliers] == [("id:99", 1_000_000.0)]
+        values = np.array([c["valorInicial"] for c in contracts])
+        assert outliers[0][2] == pytest.approx(abs(1_000_000.0 - values.mean()) / values.std())
+
+        state.update(contracts[:5])
+        assert state.price_outliers(2.5) == []  # fewer than 10 samples
+
+    @pytest.mark.unit
+    def test_cached_outputs_follow_the_delta(self):
+        rng = random.Random(5)
+        contracts = [_contract(i, rng) for i in range(20)]
+        state = IncrementalDetectionState(duplicate_threshold=0.85)
+        state.update(contracts)
+        state.store("payment_patterns", "id:1", "kept")
+        state.store("payment_patterns", "id:2", "dropped")
+        state.store_group_result("vendor_concentration", ["result"])
+
+        state.update(contracts)
+        assert state.group_result("vendor_concentration") == ["result"]
+
+        contracts[2] = dict(contracts[2], objeto="objeto alterado pela retificação")
+        state.update(contracts)
+        assert state.group_result("vendor_concentration") is None
+        assert state.cached("payment_patterns", "id:1") == "kept"
+        assert state.cached("payment_patterns", "id:2") is None
@@ -0,0 +1,115 @@
+"""
+Unit tests for the page-by-page pipeline in src.ml.streaming_detection.
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from src.ml.streaming_detection import RunningStats, StreamingDetectionPipeline
+
+
+WORDS = "aquisição de material hospitalar serviço limpeza manutenção predial locação veículos obras".split()
+
+
+def _contract(i, rng, **overrides):
+    contract = {
+        "id": str(i),
+        "valorInicial": round(rng.uniform(900, 1100), 2),
+        "dataAssinatura": f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/2024",
+        "objeto": " ".join(rng.sample(WORDS, rng.randint(3, 7))) + f" lote {i % 5}",
+        "fornecedor": {"nome": f"Fornecedor {rng.randint(1, 6)}", "cnpj": "123"},
+    }
+    contract.update(overrides)
+    return contract
+
+
+def _pages(contracts, size):
+    return [contracts[i:i + size] for i in range(0, len(contracts), size)]
+
+
+class TestRunningStats:
+    @pytest.mark.unit
+    def test_matches_numpy(self):
+        rng = np.random.default_rng(0)
+        values = rng.lognormal(10, 2, 5000)
+        stats = RunningStats()
+        for value in values:
+            stats.add(float(value))
+        assert stats.count == len(values)
+        assert stats.mean == pytest.approx(values.mean(), rel=1e-12)
+        assert stats.std == pytest.approx(values.std(), rel=1e-9)
+
+
+class TestStreamingDetectionPipeline:
+    @pytest.mark.unit
+    def test_duplicates_are_emitted_as_soon_as_both_contracts_are_seen(self):
+        rng = random.Random(2)
+        contracts = [_contract(i, rng) for i in range(200)]
+        pipeline = StreamingDetectionPipeline(duplicate_threshold=0.6, anomaly_types=["duplicate_contracts"])
+
+        emitted = []
+        for page in _pages(contracts, 37):
+            findings = pipeline.add_page(page)
+            seen = {c["id"] for c in page}
+            assert all(f.data["contract2"]["id"] in seen for f in findings)
+            emitted.extend(findings)
+
+        expected = set()
+        words = [set(c["objeto"].lower().split()) for c in contracts]
+        for i in range(len(contracts)):
+            for j in range(i + 1, len(contracts)):
+                if len(words[i] & words[j]) / len(words[i] | words[j]) > 0.6:
+                    expected.add((str(i), str(j)))
+        assert {(f.data["contract1"]["id"], f.data["contract2"]["id"]) for f in emitted} == expected
+
+        reconciliation = pipeline.finish()
+        assert reconciliation.confirmed == emitted
+        assert reconciliation.retracted == reconciliation.final == []
+
+    @pytest.mark.unit
+    def test_provisional_prices_are_reconciled_with_the_final_baseline(self):
+        rng = random.Random(4)
+        # An early spike that stops standing out once larger values arrive,
+        # and a late outlier that only the complete baseline exposes.
+        early = [_contract(i, rng) for i in range(40)] + [_contract(40, rng, valorInicial=5000.0)]
+        middle = [_contract(41 + i, rng, valorInicial=rng.uniform(3000, 7000)) for i in range(60)]
+        late = [_contract(200, rng, valorInicial=60000.0)]
+        contracts = early + middle + late
+        pipeline = StreamingDetectionPipeline(anomaly_types=["price_anomaly"])
+
+        provisional = pipeline.add_page(early)
+        assert [f.data["contract"]["id"] for f in provisional] == ["40"]
+        for page in _pages(middle + late, 20):
+            provisional += pipeline.add_page(page)
+
+        reconciliation = pipeline.finish()
+        values = np.array([c["valorInicial"] for c in contracts])
+        outliers = {str(c["id"]) for c, z in zip(contracts, np.abs(values - values.mean()) / values.std()) if z > 2.5}
+
+        assert "40" in {f.data["contract"]["id"] for f in reconciliation.retracted}
+        settled = reconciliation.confirmed + reconciliation.final
+        assert {f.data["contract"]["id"] for f in settled} == outliers == {"200"}
+        assert settled[0].data["z_score"] == pytest.approx(abs(60000.0 - values.mean()) / values.std())
+
+    @pytest.mark.unit
+    def test_population_findings_are_decided_at_the_end(self):
+        rng = random.Random(6)
+        contracts = [_contract(i, rng, dataAssinatura=f"10/{1 + i % 6:02d}/2024") for i in range(60)]
+        contracts += [
+            _contract(100 + i, rng, dataAssinatura="15/07/2024", fornecedor={"nome": "Dominante", "cnpj": "9"},
+                      valorInicial=500000.0)
+            for i in range(40)
+        ]
+        pipeline = StreamingDetectionPipeline(anomaly_types=["vendor_concentration", "temporal_patterns"])
+
+        for page in _pages(contracts, 25):
+            assert pipeline.add_page(page) == []
+        reconciliation = pipeline.finish()
+
+        by_type = {f.anomaly_type: f for f in reconciliation.final}
+        assert by_type["vendor_concentration"].data["stats"]["name"] == "Dominante"
+        assert by_type["vendor_concentration"].data["stats"]["contract_count"] == 40
+        assert by_type["temporal_patterns"].key == "2024-07"
+        assert pipeline.records == 100
@@ -0,0 +1,251 @@
+"""
+Unit tests for the pre-tokenized data path in src.ml.training_pipeline.
+"""
+
+import json
+import pickle
+
+import numpy as np
+import pytest
+import torch
+
+from src.ml.training_pipeline import (
+    IGNORE_LABEL,
+    CidadaoTrainer,
+    DynamicPaddingCollator,
+    LengthBucketSampler,
+    PretokenizedTransparencyDataset,
+    pretokenize_transparency_data,
+)
+
+
+class TinyTokenizer:
+    """Word-level tokenizer: BOS + one id per distinct word, learned on the fly."""
+
+    pad_token_id = 0
+    eos_token_id = 1
+
+    def __init__(self):
+        self.vocab = {"[PAD]": 0, "[EOS]": 1, "[BOS]": 2}
+
+    def add_special_tokens(self, tokens):
+        for token in tokens["additional_special_tokens"]:
+            self.vocab.setdefault(token, len(self.vocab))
+
+    def __len__(self):
+        return len(self.vocab)
+
+    def __call__(self, texts, truncation=True, max_length=None):
+        input_ids = []
+        for text in texts:
+            ids = [2] + [self.vocab.setdefault(word, len(self.vocab)) for word in text.split()]
+            input_ids.append(ids[:max_length] if truncation else ids)
+        return {"input_ids": input_ids}
+
+
+EXAMPLES = [
+    {
+        "text": "contrato emergencial sem licitação",
+        "anomaly_label": 2,
+        "financial_risk": 4,
+        "legal_compliance": 0,
+        "entity_types": [1, 2, 4],
+        "corruption_indicators": [1, 3, 5],
+    },
+    {
+        # No financial label; more entity types than tokens
+        "text": "aquisição de equipamentos médicos no valor previsto",
+        "anomaly_label": 0,
+        "legal_compliance": 1,
+        "entity_types": list(range(1, 11)),
+    },
+    {"text": "pregão eletrônico", "anomaly_label": 1, "financial_risk": 2},
+]
+
+
+@pytest.fixture
+def pretokenized(tmp_path):
+    data_path = tmp_path / "train.jsonl"
+    data_path.write_text("\n".join(json.dumps(e, ensure_ascii=False) for e in EXAMPLES), encoding="utf-8")
+    tokenizer = TinyTokenizer()
+    output_dir = pretokenize_transparency_data(
+        str(data_path), tokenizer, str(tmp_path / "pretokenized"), max_length=6, chunk_size=2
+    )
+    return output_dir, tokenizer
+
+
+@pytest.mark.unit
+class TestPretokenize:
+    def test_writes_concatenated_tokens_labels_and_features(self, pretokenized):
+        output_dir, tokenizer = pretokenized
+
+        tokens = np.load(output_dir / "tokens.npy")
+        offsets = np.load(output_dir / "offsets.npy")
+        labels = np.load(output_dir / "labels.npy")
+        metadata = json.loads((output_dir / "metadata.json").read_text(encoding="utf-8"))
+
+        # BOS + words, truncated at max_length
+        assert offsets.tolist() == [0, 5, 11, 14]
+        assert tokens.dtype == np.int32
+        assert tokens[offsets[2]:offsets[3]].tolist() == tokenizer(["pregão eletrônico"])["input_ids"][0]
+        assert labels.tolist() == [
+            [2, 4, 0],
+            [0, IGNORE_LABEL, 1],
+            [1, 2, IGNORE_LABEL],
+        ]
+        assert np.diff(np.load(output_dir / "entity_types_offsets.npy")).tolist() == [3, 6, 0]
+        assert np.load(output_dir / "corruption_indicators.npy").tolist() == [1, 3, 5]
+        assert metadata["labels"] == ["anomaly_labels", "financial_risk_labels", "legal_compliance_labels"]
+        assert metadata["features"] == ["entity_types", "corruption_indicators"]
+        assert metadata["pad_token_id"] == 0
+        assert metadata["vocab_size"] == len(tokenizer)
+        assert metadata["total_tokens"] == 14
+
+
+@pytest.mark.unit
+class TestPretokenizedDataset:
+    def test_items_come_back_unpadded_with_their_labels(self, pretokenized):
+        output_dir, _ = pretokenized
+        dataset = PretokenizedTransparencyDataset(str(output_dir))
+
+        item = dataset[1]
+
+        assert len(dataset) == 3
+        assert dataset.lengths.tolist() == [5, 6, 3]
+        assert item["input_ids"].dtype == torch.long
+        assert len(item["input_ids"]) == 6
+        assert item["financial_risk_labels"].item() == IGNORE_LABEL
+        assert item["entity_types"].tolist() == [1, 2, 3, 4, 5, 6]
+        assert item["corruption_indicators"].tolist() == []
+
+    def test_pickling_drops_the_mmaps_and_reopens_them(self, pretokenized):
+        output_dir, _ = pretokenized
+        dataset = PretokenizedTransparencyDataset(str(output_dir))
+        expected = dataset[0]
+        assert isinstance(dataset._arrays["tokens"], np.memmap)
+
+        clone = pickle.loads(pickle.dumps(dataset))
+
+        assert clone._arrays is None
+        item = clone[0]
+        assert all(isinstance(array, np.memmap) for array in clone._arrays.values())
+        assert item.keys() == expected.keys()
+        assert all(torch.equal(item[key], expected[key]) for key in item)
+
+
+@pytest.mark.unit
+class TestLengthBucketSampler:
+    @pytest.mark.parametrize("num_examples", [0, 7, 64, 203, 1000])
+    @pytest.mark.parametrize("shuffle", [True, False])
+    @pytest.mark.parametrize("drop_last", [True, False])
+    def test_len_matches_iteration(self, num_examples, shuffle, drop_last):
+        lengths = np.random.default_rng(num_examples).integers(1, 512, num_examples)
+        sampler = LengthBucketSampler(
+            lengths, batch_size=8, shuffle=shuffle, bucket_multiplier=4, drop_last=drop_last
+        )
+
+        batches = list(sampler)
+
+        assert len(batches) == len(sampler)
+        indices = [i for batch in batches for i in batch]
+        assert len(set(indices)) == len(indices)
+        if drop_last:
+            assert all(len(batch) == 8 for batch in batches)
+        else:
+            assert sorted(indices) == list(range(num_examples))
+
+    def test_batches_group_similar_lengths(self):
+        lengths = np.random.default_rng(3).integers(1, 512, 800)
+        sampler = LengthBucketSampler(lengths, batch_size=16, bucket_multiplier=10)
+
+        padded = sum(len(batch) * lengths[batch].max() for batch in sampler)
+        random_batches = np.random.default_rng(3).permutation(800).reshape(-1, 16)
+        random_padded = sum(16 * lengths[batch].max() for batch in random_batches)
+
+        assert padded < 0.75 * random_padded
+
+    def test_epochs_are_reproducible_and_distinct(self):
+        lengths = np.arange(100)
+        sampler = LengthBucketSampler(lengths, batch_size=10, bucket_multiplier=2, seed=1)
+
+        first = list(sampler)
+        sampler.set_epoch(1)
+        second = list(sampler)
+        sampler.set_epoch(0)
+
+        assert list(sampler) == first
+        assert second != first
+
+
+@pytest.mark.unit
+class TestDynamicPaddingCollator:
+    def test_pads_to_the_longest_item_rounded_up(self):
+        items = [
+            {
+                "input_ids": torch.tensor([5, 6, 7]),
+                "anomaly_labels": torch.tensor(1),
+                "financial_risk_labels": torch.tensor(IGNORE_LABEL),
+                "entity_types": torch.tensor([1, 2]),
+            },
+            {
+                "input_ids": torch.tensor([8, 9, 10, 11, 12]),
+                "anomaly_labels": torch.tensor(2),
+                "financial_risk_labels": torch.tensor(IGNORE_LABEL),
+                "entity_types": torch.tensor([3, 3, 3, 3, 3]),
+            },
+        ]
+
+        batch = DynamicPaddingCollator(pad_token_id=0, pad_to_multiple_of=4)(items)
+
+        assert batch["input_ids"].tolist() == [[5, 6, 7, 0, 0, 0, 0, 0], [8, 9, 10, 11, 12, 0, 0, 0]]
+        assert batch["attention_mask"].tolist() == [[1, 1, 1, 0, 0, 0, 0, 0], [1, 1, 1, 1, 1, 0, 0, 0]]
+        assert batch["anomaly_labels"].tolist() == [1, 2]
+        # No item is labelled for the task, so the loss and metrics skip it
+        assert "financial_risk_labels" not in batch
+        assert batch["entity_types"].tolist() == [[1, 2, 0, 0, 0, 0, 0, 0], [3, 3, 3, 3, 3, 0, 0, 0]]
+
+    def test_collates_the_pretokenized_dataset(self, pretokenized):
+        output_dir, _ = pretokenized
+        dataset = PretokenizedTransparencyDataset(str(output_dir))
+
+        batch = DynamicPaddingCollator(dataset.pad_token_id)([dataset[i] for i in range(len(dataset))])
+
+        assert batch["input_ids"].shape == (3, 6)
+        assert batch["attention_mask"].sum(dim=1).tolist() == [5, 6, 3]
+        assert batch["financial_risk_labels"].tolist() == [4, IGNORE_LABEL, 2]
+
+
+class StubModel:
+    """Returns one fixed prediction per row for every task."""
+
+    def detect_anomalies(self, input_ids, attention_mask):
+        return {"predictions": [{"anomaly_type": "Suspeito"}] * len(input_ids)}
+
+    def analyze_financial_risk(self, input_ids, attention_mask):
+        return {"predictions": [{"risk_level": "Alto"}] * len(input_ids)}
+
+    def check_legal_compliance(self, input_ids, attention_mask):
+        return {"predictions": [{"is_compliant": True}] * len(input_ids)}
+
+
+@pytest.mark.unit
+class TestCollectPredictions:
+    def test_unlabelled_rows_are_left_out_of_the_metrics(self):
+        trainer = CidadaoTrainer.__new__(CidadaoTrainer)
+        trainer.model = StubModel()
+        batch = {
+            "input_ids": torch.zeros((3, 4), dtype=torch.long),
+            "attention_mask": torch.ones((3, 4), dtype=torch.long),
+            "anomaly_labels": torch.tensor([2, 0, 1]),
+            "financial_risk_labels": torch.tensor([4, IGNORE_LABEL, 2]),
+            "legal_compliance_labels": torch.tensor([IGNORE_LABEL, 1, IGNORE_LABEL]),
+        }
+        all_predictions = {task: {"preds": [], "labels": []} for task in ("anomaly", "financial", "legal")}
+
+        trainer._collect_predictions(batch, all_predictions)
+
+        assert all_predictions == {
+            "anomaly": {"preds": [1, 1, 1], "labels": [2, 0, 1]},
+            "financial": {"preds": [3, 3], "labels": [4, 2]},
+            "legal": {"preds": [1], "labels": [1]},
+        }
@@ -0,0 +1,164 @@
+"""
+Unit tests for the batched task runner and the metrics in src.ml.transparency_benchmark.
+"""
+
+import json
+
+import numpy as np
+import pytest
+import torch
+from transformers import BatchEncoding
+
+from src.ml.model_api import CidadaoAIManager
+from src.ml.transparency_benchmark import BenchmarkConfig, TransparencyBenchmarkSuite
+
+
+ANOMALY_NAMES = ["Normal", "Suspeito", "Anômalo"]
+FAILING_TOKEN = 99
+
+
+class WordTokenizer:
+    """One token per word: digits map to themselves + 1, "falha" to FAILING_TOKEN."""
+
+    def __call__(self, texts, truncation=True, max_length=None):
+        input_ids = [[self._token(word) for word in text.split()][:max_length] for text in texts]
+        return {"input_ids": input_ids}
+
+    def pad(self, encoded, return_tensors="pt"):
+        rows = encoded["input_ids"]
+        width = max(len(row) for row in rows)
+        return BatchEncoding({
+            "input_ids": [row + [0] * (width - len(row)) for row in rows],
+            "attention_mask": [[1] * len(row) + [0] * (width - len(row)) for row in rows],
+        }, tensor_type=return_tensors)
+
+    @staticmethod
+    def _token(word):
+        if word == "falha":
+            return FAILING_TOKEN
+        return int(word) + 1 if word.isdigit() else 50
+
+
+class StubModel:
+    """Predicts the class given by each row's first token; fails on FAILING_TOKEN."""
+
+    def __init__(self):
+        self.batches = []
+
+    def detect_anomalies(self, input_ids, attention_mask):
+        lengths = attention_mask.sum(dim=1).tolist()
+        self.batches.append(lengths)
+        if (input_ids == FAILING_TOKEN).any():
+            raise RuntimeError("lote inválido")
+        return {"predictions": [
+            {"anomaly_type": ANOMALY_NAMES[int(row[0]) - 1], "confidence": length / 100}
+            for row, length in zip(input_ids, lengths)
+        ]}
+
+
+def _case(label, length, filler="x"):
+    return {"text": " ".join([str(label)] + [filler] * (length - 1)), "expected_anomaly": label}
+
+
+@pytest.fixture
+def suite(tmp_path):
+    # Labels and lengths deliberately out of length order
+    cases = [_case(2, 3), _case(0, 7), _case(1, 5), _case(1, 2), _case(2, 6), _case(0, 4)]
+    data_path = tmp_path / "test_data.json"
+    data_path.write_text(json.dumps({"anomaly_detection": cases}), encoding="utf-8")
+    config = BenchmarkConfig(
+        test_data_path=str(data_path),
+        output_dir=str(tmp_path / "results"),
+        tasks=["anomaly_detection"],
+        batch_size=2,
+        max_length=16,
+        time_limit_per_sample=10.0,
+    )
+    return TransparencyBenchmarkSuite(config)
+
+
+@pytest.fixture
+def manager():
+    manager = CidadaoAIManager()
+    manager.device = torch.device("cpu")
+    manager.model = StubModel()
+    manager.tokenizer = WordTokenizer()
+    return manager
+
+
+@pytest.fixture
+def recorded(suite, monkeypatch):
+    """Capture the per-example lists handed to ``_calculate_task_metrics``."""
+    calls = []
+    calculate = suite._calculate_task_metrics
+
+    def spy(predictions, ground_truth, confidence_scores, processing_times, task_name, wall_time=None):
+        calls.append({
+            "predictions": predictions,
+            "confidence_scores": confidence_scores,
+            "processing_times": processing_times,
+        })
+        return calculate(predictions, ground_truth, confidence_scores, processing_times, task_name, wall_time)
+
+    monkeypatch.setattr(suite, "_calculate_task_metrics", spy)
+    return calls
+
+
+@pytest.mark.unit
+class TestBenchmarkTask:
+    @pytest.mark.asyncio
+    async def test_batches_follow_length_order_and_results_map_back(self, suite, manager, recorded):
+        token_cache = suite._tokenize_test_texts(manager)
+
+        metrics = await suite._benchmark_task(manager, "anomaly_detection", token_cache)
+
+        # order sorts by token count, so each batch only pads to its own longest text
+        assert manager.model.batches == [[2, 3], [4, 5], [6, 7]]
+        cases = suite.test_datasets["anomaly_detection"]
+        assert recorded[0]["predictions"] == [case["expected_anomaly"] for case in cases]
+        assert recorded[0]["confidence_scores"] == pytest.approx([0.03, 0.07, 0.05, 0.02, 0.06, 0.04])
+        assert all(latency < suite.config.time_limit_per_sample for latency in recorded[0]["processing_times"])
+        assert metrics.accuracy == 1.0
+        assert metrics.sample_count == 6
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_keeps_the_defaults(self, suite, manager, recorded):
+        # The length-5 case shares the second batch with the length-4 one
+        suite.test_datasets["anomaly_detection"][2] = _case(1, 5, filler="falha")
+        token_cache = suite._tokenize_test_texts(manager)
+
+        metrics = await suite._benchmark_task(manager, "anomaly_detection", token_cache)
+
+        assert manager.model.batches == [[2, 3], [4, 5], [6, 7]]
+        assert recorded[0]["predictions"] == [2, 0, 0, 1, 2, 0]
+        assert recorded[0]["confidence_scores"][2] == recorded[0]["confidence_scores"][5] == 0.5
+        latencies = recorded[0]["processing_times"]
+        assert latencies[2] == latencies[5] == suite.config.time_limit_per_sample
+        assert all(latencies[i] < suite.config.time_limit_per_sample for i in (0, 1, 3, 4))
+        assert metrics.sample_count == 6
+
+
+@pytest.mark.unit
+class TestTaskMetrics:
+    def test_throughput_and_latency_percentiles(self, suite):
+        latencies = [i / 100 for i in range(1, 101)]
+        predictions = ground_truth = [0, 1] * 50
+
+        metrics = suite._calculate_task_metrics(
+            predictions, ground_truth, [0.9] * 100, latencies, "anomaly_detection", wall_time=2.0
+        )
+
+        assert metrics.throughput == pytest.approx(50.0)
+        assert metrics.processing_time == pytest.approx(0.02)
+        assert metrics.latency_p50 == pytest.approx(0.505)
+        assert metrics.latency_p95 == pytest.approx(0.9505)
+        assert metrics.latency_p99 == pytest.approx(0.9901)
+
+    def test_wall_time_defaults_to_the_summed_latencies(self, suite):
+        latencies = [0.5, 0.25, 0.25]
+
+        metrics = suite._calculate_task_metrics([0, 1, 0], [0, 1, 0], [0.5] * 3, latencies, "legal_compliance")
+
+        assert metrics.throughput == pytest.approx(3.0)
+        assert metrics.processing_time == pytest.approx(np.sum(latencies) / 3)
+        assert metrics.latency_p50 == pytest.approx(0.25)
@@ -0,0 +1,91 @@
+"""
+Unit tests for columnar bulk parsing in src.tools.transparency_models.
+"""
+
+from datetime import date
+
+import numpy as np
+import pytest
+
+from src.tools.transparency_models import INT_NULL, parse_api_columns, parse_api_data
+
+
+def _record(**overrides):
+    record = {
+        "id": 42,
+        "numero": "42/2024",
+        "ano": 2024,
+        "dataAssinatura": "15/03/2024",
+        "dataPublicacao": "2024-03-20",
+        "valorInicial": 1234.56,
+        "valorGlobal": "1.500.000,10",
+        "orgao": {"codigo": 26000, "nome": "Ministério da Educação"},
+        "fornecedor": {"cnpj": "12.345.678/0001-90", "nome": "ACME LTDA"},
+    }
+    record.update(overrides)
+    return record
+
+
+class TestParseApiColumns:
+    @pytest.mark.unit
+    def test_page_becomes_typed_columns(self):
+        batch = parse_api_columns([_record(), _record(id=43, valorInicial=None, dataPublicacao=None)], "contratos")
+
+        assert len(batch) == 2 and batch.errors == []
+        assert batch["data_assinatura"].dtype == np.dtype("datetime64[D]")
+        assert batch["data_assinatura"][0] == np.datetime64("2024-03-15")
+        assert np.isnat(batch["data_publicacao"][1])
+        assert batch["valor_inicial"][0] == 1234.56 and np.isnan(batch["valor_inicial"][1])
+        assert batch["valor_global"][0] == 1500000.10
+        assert batch["ano"].dtype == np.int64 and batch["ano"][0] == 2024
+        assert batch["id"].tolist() == ["42", "43"]
+        assert batch["orgao.codigo"].tolist() == ["26000", "26000"]
+        assert batch["fornecedor.nome"][0] == "ACME LTDA"
+
+    @pytest.mark.unit
+    def test_snake_case_keys_are_accepted(self):
+        batch = parse_api_columns([{"data_assinatura": "01-02-2024", "valor_inicial": 10}], "contracts")
+
+        assert batch["data_assinatura"][0] == np.datetime64("2024-02-01")
+        assert batch["valor_inicial"][0] == 10.0
+
+    @pytest.mark.unit
+    def test_bad_values_are_reported_per_row(self):
+        records = [
+            _record(),
+            _record(dataAssinatura="31/02/2024", valorInicial="abc"),
+            _record(ano=2024.5, dataPublicacao="01/02/2024xyz"),
+            "not a record",
+        ]
+        batch = parse_api_columns(records, "contratos")
+
+        report = batch.errors_by_row()
+        assert sorted(report) == [1, 2, 3]
+        assert {e.column for e in report[1]} == {"data_assinatura", "valor_inicial"}
+        assert {e.column for e in report[2]} == {"ano", "data_publicacao"}
+        assert report[3][0].column == "*"
+        assert batch.valid.tolist() == [True, False, False, False]
+        assert np.isnat(batch["data_assinatura"][1]) and np.isnan(batch["valor_inicial"][1])
+        assert batch["ano"][2] == INT_NULL
+
+    @pytest.mark.unit
+    def test_dates_match_the_model_parser(self):
+        values = ["29/02/2024", "2023-12-31", "31-12-1999", "2024-06-01T10:30:00", date(2020, 5, 4), None, ""]
+        batch = parse_api_columns([{"dataAssinatura": v} for v in values], "contratos")
+        models = parse_api_data([{"data_assinatura": v} for v in values[:3]], "contratos")
+
+        parsed = batch["data_assinatura"]
+        assert [parsed[i].item() for i in range(3)] == [m.data_assinatura for m in models]
+        assert parsed[3] == np.datetime64("2024-06-01") and parsed[4] == np.datetime64("2020-05-04")
+        assert np.isnat(parsed[5]) and np.isnat(parsed[6]) and batch.errors == []
+
+    @pytest.mark.unit
+    def test_cents_are_exact(self):
+        batch = parse_api_columns([_record(valorInicial=0.1), _record(valorInicial=None)], "contratos")
+
+        assert batch.cents("valor_inicial").tolist() == [10, INT_NULL]
+
+    @pytest.mark.unit
+    def test_unknown_type_is_rejected(self):
+        with pytest.raises(ValueError):
+            parse_api_columns([], "unknown")
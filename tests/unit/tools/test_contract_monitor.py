@@ -0,0 +1,141 @@
+"""
+Unit tests for the polling monitor in src.tools.contract_monitor.
+"""
+
+import json
+import random
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pytest
+
+from src.tools.contract_monitor import ContractMonitor, JsonlAlertSink, OrgBaseline
+from src.tools.transparency_api import TransparencyAPIResponse
+
+
+def _contract(i, signed, value, vendor="Fornecedor 1"):
+    return {
+        "id": i,
+        "dataAssinatura": signed.strftime("%d/%m/%Y"),
+        "valorInicial": value,
+        "objeto": f"Serviços de manutenção predial lote {i}",
+        "fornecedor": {"nome": vendor, "cnpj": vendor},
+    }
+
+
+class FakePortal:
+    """Serves the contracts added so far, honouring the date window and paging."""
+
+    def __init__(self):
+        self.records = []
+
+    def add(self, records):
+        self.records.extend(records)
+
+    async def search_data(self, endpoint, filters=None, custom_params=None):
+        window_start = datetime.strptime(filters.data_inicio, "%d/%m/%Y").date()
+        matching = [
+            r for r in self.records
+            if datetime.strptime(r["dataAssinatura"], "%d/%m/%Y").date() >= window_start
+        ]
+        size = filters.tamanho_pagina
+        page = matching[(filters.pagina - 1) * size:filters.pagina * size]
+        return TransparencyAPIResponse(
+            data=[dict(r) for r in page],
+            total_records=len(matching),
+            current_page=filters.pagina,
+            total_pages=max(1, -(-len(matching) // size)),
+        )
+
+
+def _history(rng, start, count, first_id=1):
+    return [
+        _contract(first_id + i, start + timedelta(days=i // 10), round(rng.uniform(900, 1100), 2),
+                  vendor=f"Fornecedor {rng.randint(1, 8)}")
+        for i in range(count)
+    ]
+
+
+class TestOrgBaseline:
+    @pytest.mark.unit
+    def test_matches_cumulative_statistics_until_span(self):
+        values = np.random.default_rng(0).lognormal(8, 1, 500)
+        baseline = OrgBaseline()
+        for value in values:
+            baseline.add_price(float(value), span=1000)
+        assert baseline.mean == pytest.approx(values.mean(), rel=1e-9)
+        assert baseline.variance == pytest.approx(values.var(), rel=1e-6)
+
+    @pytest.mark.unit
+    def test_vendor_values_decay_and_stay_bounded(self):
+        baseline = OrgBaseline()
+        now = datetime(2024, 1, 1)
+        baseline.decay(now, half_life_days=30)
+        for i in range(1000):
+            baseline.add_vendor(f"v{i}", f"Fornecedor {i}", 1.0 + i)
+        baseline.prune_vendors(50)
+        assert len(baseline.vendor_values) == len(baseline.vendor_names) == 50
+        share = baseline.share("v999")
+
+        baseline.decay(now + timedelta(days=30), half_life_days=30)
+        assert baseline.vendor_values["v999"] == pytest.approx(500.0)
+        assert baseline.share("v999") == pytest.approx(share)
+
+
+class TestContractMonitor:
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_alerts_only_on_new_suspicious_contracts(self, tmp_path):
+        rng = random.Random(1)
+        portal = FakePortal()
+        portal.add(_history(rng, date(2024, 1, 1), 200))
+        escalations = []
+
+        async def escalate(org_code, contracts):
+            escalations.append((org_code, len(contracts)))
+            return [{"type": "duplicate_contracts", "severity": 0.9, "description": "Contratos duplicados"}]
+
+        monitor = ContractMonitor(
+            tmp_path / "watch", ["26000"], sinks=[JsonlAlertSink(tmp_path / "alerts.jsonl")],
+            escalate=escalate, client=portal, page_size=50, window_size=100,
+        )
+
+        assert await monitor.poll(year=2024) == []  # first sync only primes the baseline
+        assert await monitor.poll(year=2024) == []  # nothing new
+
+        portal.add([_contract(1000, date(2024, 1, 25), 1010.0), _contract(1001, date(2024, 1, 25), 250000.0)])
+        alerts = await monitor.poll(year=2024)
+        assert [(a.anomaly_type, a.source, a.evidence.get("contract_id")) for a in alerts] == [
+            ("price_anomaly", "cheap", 1001),
+            ("duplicate_contracts", "full", None),
+        ]
+        assert escalations == [("26000", 100)]
+
+        portal.add([_contract(1002, date(2024, 1, 26), 240000.0, vendor="Fornecedor 2")])
+        alerts = await monitor.poll(year=2024)
+        # The escalated finding was already reported
+        assert [a.evidence.get("contract_id") for a in alerts] == [1002]
+
+        lines = (tmp_path / "alerts.jsonl").read_text(encoding="utf-8").splitlines()
+        assert [json.loads(line)["anomaly_type"] for line in lines] == [
+            "price_anomaly", "duplicate_contracts", "price_anomaly",
+        ]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_baselines_survive_a_restart(self, tmp_path):
+        rng = random.Random(2)
+        portal = FakePortal()
+        portal.add(_history(rng, date(2024, 1, 1), 100))
+        monitor = ContractMonitor(tmp_path, ["26000", "20000"], client=portal)
+        await monitor.poll(year=2024)
+
+        restarted = ContractMonitor(tmp_path, ["26000", "20000"], client=portal)
+        assert restarted.baselines.keys() == monitor.baselines.keys()
+        baseline = restarted.baselines["26000"]
+        assert baseline.primed and baseline.count == 100 and baseline.polls == 1
+        assert baseline.mean == pytest.approx(monitor.baselines["26000"].mean)
+
+        portal.add([_contract(500, date(2024, 1, 20), 90000.0)])
+        alerts = await restarted.poll(year=2024)
+        assert {(a.org_code, a.evidence["contract_id"]) for a in alerts} == {("26000", 500), ("20000", 500)}
@@ -0,0 +1,173 @@
+"""
+Unit tests for incremental sync in src.tools.delta_sync.
+"""
+
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from src.tools.delta_sync import DeltaSync, sync_to_warehouse
+from src.tools.transparency_api import TransparencyAPIResponse
+from src.tools.warehouse import TransparencyWarehouse
+
+
+def _contract(i, signed, value=1000.0):
+    return {
+        "id": i,
+        "numero": f"{i}/2024",
+        "dataAssinatura": signed.strftime("%d/%m/%Y"),
+        "valorInicial": value,
+        "objeto": "Serviços de manutenção",
+    }
+
+
+class FakePortal:
+    """Serves contracts sorted by signing date, honouring the date window and paging."""
+
+    def __init__(self, count=100):
+        start = date(2024, 1, 1)
+        self.records = [_contract(i, start + timedelta(days=i * 3)) for i in range(1, count + 1)]
+        self.requests = []
+        self.served = 0
+
+    async def search_data(self, endpoint, filters=None, custom_params=None):
+        self.requests.append((filters.data_inicio, filters.pagina))
+        window_start = datetime.strptime(filters.data_inicio, "%d/%m/%Y").date()
+        window_end = datetime.strptime(filters.data_fim, "%d/%m/%Y").date()
+        matching = [
+            r for r in self.records
+            if window_start <= datetime.strptime(r["dataAssinatura"], "%d/%m/%Y").date() <= window_end
+        ]
+        size = filters.tamanho_pagina
+        page = matching[(filters.pagina - 1) * size:filters.pagina * size]
+        self.served += len(page)
+        return TransparencyAPIResponse(
+            data=[dict(r) for r in page],
+            total_records=len(matching),
+            current_page=filters.pagina,
+            total_pages=max(1, -(-len(matching) // size)),
+        )
+
+
+class Collector:
+    def __init__(self, fail_on_call=None):
+        self.batches = []
+        self.fail_on_call = fail_on_call
+
+    def __call__(self, records):
+        if self.fail_on_call is not None and len(self.batches) + 1 == self.fail_on_call:
+            self.fail_on_call = None
+            raise ConnectionError("sink unavailable")
+        self.batches.append(records)
+
+    @property
+    def ids(self):
+        return [r["id"] for batch in self.batches for r in batch]
+
+
+class TestDeltaSync:
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_nightly_runs_only_read_the_lookback_window(self, tmp_path):
+        portal = FakePortal()
+        syncer = DeltaSync(tmp_path, client=portal, page_size=20, lookback_days=30)
+
+        first = await syncer.sync("contratos", "26000", 2024, sink=(sink := Collector()))
+        assert first.complete and first.records_new == 100
+        assert sorted(sink.ids) == list(range(1, 101))
+        assert first.watermark == "2024-10-27"
+
+        portal.served = 0
+        second = await syncer.sync("contratos", "26000", 2024, sink=(sink := Collector()))
+        assert sink.ids == []
+        assert second.records_new == second.records_changed == 0
+        assert portal.served == 11  # only contracts signed in the 30-day lookback
+
+        third = await syncer.sync("contratos", "26000", 2024, sink=(sink := Collector()))
+        assert third.pages_fetched == third.pages_unchanged == 1
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_new_and_changed_records_are_emitted_once(self, tmp_path):
+        portal = FakePortal()
+        syncer = DeltaSync(tmp_path, client=portal, page_size=20)
+        await syncer.sync("contratos", "26000", 2024)
+
+        portal.records[-1]["valorInicial"] = 2500.0
+        portal.records.append(_contract(101, date(2024, 11, 2)))
+        report = await syncer.sync("contratos", "26000", 2024, sink=(sink := Collector()))
+
+        assert (report.records_new, report.records_changed) == (1, 1)
+        assert sorted(sink.ids) == [100, 101]
+        assert report.watermark == "2024-11-02"
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_interrupted_run_resumes_from_the_failed_page(self, tmp_path):
+        portal = FakePortal()
+        syncer = DeltaSync(tmp_path, client=portal, page_size=20)
+
+        with pytest.raises(ConnectionError):
+            await syncer.sync("contratos", "26000", 2024, sink=Collector(fail_on_call=3))
+        state = syncer.state("contratos", "26000", 2024)
+        assert state.in_progress and state.next_page == 3 and state.watermark is None
+
+        portal.requests.clear()
+        report = await syncer.sync("contratos", "26000", 2024, sink=(sink := Collector()))
+        assert report.resumed and report.complete
+        assert [page for _, page in portal.requests] == [3, 4, 5]
+        assert sorted(sink.ids) == list(range(41, 101))
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_max_pages_leaves_the_sync_resumable(self, tmp_path):
+        portal = FakePortal()
+        syncer = DeltaSync(tmp_path, client=portal, page_size=20, max_pages=2)
+
+        report = await syncer.sync("contratos", "26000", 2024, sink=(sink := Collector()))
+        assert not report.complete and report.records_new == 40
+        while not report.complete:
+            report = await syncer.sync("contratos", "26000", 2024, sink=sink)
+
+        assert sorted(sink.ids) == list(range(1, 101))
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_dedup_keys_survive_log_compaction(self, tmp_path):
+        portal = FakePortal(count=0)
+        portal.records = [_contract(i, date(2024, 1 + i % 12, 1)) for i in range(1, 1501)]
+        portal.records.sort(key=lambda r: r["dataAssinatura"][3:])
+        syncer = DeltaSync(tmp_path, client=portal, page_size=500, lookback_days=10000)
+        await syncer.sync("contratos", "26000", 2024)
+
+        scope = tmp_path / "contratos" / "org=26000" / "year=2024"
+        assert (scope / "keys.json").exists()
+        report = await syncer.sync("contratos", "26000", 2024)
+        assert report.records_unchanged > 0 and report.records_new == 0
+
+
+class TestWarehouseUpsert:
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_sync_upserts_changed_contracts(self, tmp_path):
+        warehouse = TransparencyWarehouse(tmp_path / "warehouse")
+        portal = FakePortal()
+        await sync_to_warehouse(warehouse, "contratos", ["26000"], 2024, page_size=20, client=portal)
+
+        portal.records[-1]["valorInicial"] = 2500.0
+        totals = await sync_to_warehouse(warehouse, "contratos", ["26000"], 2024, page_size=20, client=portal)
+        assert totals["records_changed"] == 1
+
+        table = warehouse.scan("contratos", org_codes=["26000"], columns=["id", "valor_inicial"])
+        assert len(table) == 100
+        values = dict(zip(table["id"], table["valor_inicial"]))
+        assert values["100"] == 2500.0
+
+    @pytest.mark.unit
+    def test_upsert_supersedes_rows_in_other_years(self, tmp_path):
+        warehouse = TransparencyWarehouse(tmp_path)
+        warehouse.write("contratos", [_contract(1, date(2023, 12, 30))], org_code="26000")
+        warehouse.write("contratos", [_contract(1, date(2024, 1, 2), 99.0)], org_code="26000", upsert=True)
+
+        table = warehouse.scan("contratos", columns=["id", "valor_inicial"])
+        assert table["valor_inicial"].tolist() == [99.0]
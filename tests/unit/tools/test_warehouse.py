@@ -0,0 +1,226 @@
+"""
+Unit tests for the local columnar warehouse in src.tools.warehouse.
+"""
+
+import shutil
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+from src.tools.transparency_models import Contract
+from src.tools.warehouse import TransparencyWarehouse, ingest, model_schema
+
+
+def _contract(i, year=2024, org=None):
+    record = {
+        "id": i,
+        "numero": f"{i}/{year}",
+        "dataAssinatura": f"{1 + i % 28:02d}/{1 + i % 12:02d}/{year}",
+        "valorInicial": 1000.0 * i if i % 5 else None,
+        "valorGlobal": 500.0 * i,
+        "objeto": "Aquisição de insumos hospitalares",
+        "fornecedor": {"nome": f"Fornecedor {i % 7}", "cnpj": "12.345.678/0001-90"},
+    }
+    if org:
+        record["orgao"] = {"codigo": org, "nome": "Ministério"}
+    return record
+
+
+@pytest.fixture
+def warehouse(tmp_path):
+    warehouse = TransparencyWarehouse(tmp_path / "warehouse")
+    warehouse.write("contratos", [_contract(i) for i in range(1, 241)], org_code="26000")
+    warehouse.write("contratos", [_contract(i, year=2023) for i in range(1, 61)], org_code="26000")
+    warehouse.write("contratos", [_contract(i) for i in range(1, 121)], org_code="25000")
+    return warehouse
+
+
+class TestSchema:
+    @pytest.mark.unit
+    def test_columns_follow_the_transparency_model(self):
+        schema = model_schema(Contract)
+
+        assert schema["data_assinatura"] == "date"
+        assert schema["valor_inicial"] == "float"
+        assert schema["ano"] == "int"
+        assert schema["fornecedor.cnpj"] == "str"
+        assert "orgao" not in schema and schema["orgao.codigo"] == "str"
+
+
+class TestWarehouse:
+    @pytest.mark.unit
+    def test_partitioned_by_year_and_organization(self, warehouse, tmp_path):
+        base = tmp_path / "warehouse" / "contratos"
+        assert sorted(p.name for p in base.iterdir()) == ["year=2023", "year=2024"]
+        assert sorted(p.name for p in (base / "year=2024").iterdir()) == ["org=25000", "org=26000"]
+
+    @pytest.mark.unit
+    def test_predicates_match_a_plain_filter(self, warehouse):
+        table = warehouse.scan(
+            "contratos",
+            org_codes=["26000"],
+            start_date="01/03/2024",
+            end_date=date(2024, 6, 30),
+            min_value=50000,
+        )
+
+        expected = set()
+        for i in range(1, 241):
+            record = _contract(i)
+            month = 1 + i % 12
+            value = record["valorInicial"] or record["valorGlobal"]
+            if 3 <= month <= 6 and value >= 50000:
+                expected.add(str(i))
+        assert set(table["id"]) == expected
+
+    @pytest.mark.unit
+    def test_statistics_prune_partitions(self, warehouse):
+        assert len(warehouse.scan("contratos", min_value=10_000_000)) == 0
+        assert len(warehouse.scan("contratos", start_date="2022-01-01", end_date="2022-12-31")) == 0
+        assert len(warehouse.scan("contratos", org_codes=["99999"])) == 0
+        assert len(warehouse.scan("licitacoes")) == 0
+
+    @pytest.mark.unit
+    def test_records_keep_the_api_shape(self, warehouse):
+        record = warehouse.scan("contratos", org_codes=["25000"], limit=1).to_records()[0]
+
+        assert record["id"] == "1"
+        assert record["dataAssinatura"] == "02/02/2024"
+        assert record["valorInicial"] == 1000.0
+        assert record["fornecedor"] == {"nome": "Fornecedor 1", "cnpj": "12345678000190"}
+        assert record["_org_code"] == "25000"
+
+    @pytest.mark.unit
+    def test_scan_parts_reads_one_part_per_step(self, warehouse, monkeypatch):
+        checked = []
+        may_match = warehouse._may_match
+        monkeypatch.setattr(warehouse, "_may_match", lambda meta, *args: checked.append(meta) or may_match(meta, *args))
+
+        parts = warehouse.scan_parts("contratos", columns=["id"], limit=250)
+        first = next(parts)
+        assert len(checked) == 1
+
+        tables = [first, *parts]
+        assert [len(table) for table in tables] == [60, 120, 70]
+        ids = [i for table in tables for i in table["id"]]
+        assert ids == list(warehouse.scan("contratos", columns=["id"], limit=250)["id"])
+
+    @pytest.mark.unit
+    def test_projection_and_limit(self, warehouse):
+        table = warehouse.scan("contratos", columns=["valor_global"], limit=10)
+
+        assert list(table.columns) == ["valor_global"]
+        assert len(table) == 10
+
+    @pytest.mark.unit
+    def test_replace_drops_previous_parts_and_rejects_invalid_records(self, tmp_path):
+        warehouse = TransparencyWarehouse(tmp_path)
+        warehouse.write("contratos", [_contract(i) for i in range(1, 11)], org_code="26000")
+        result = warehouse.write(
+            "contratos",
+            [_contract(1), {"id": 2, "ano": "não é ano"}],
+            org_code="26000",
+            replace=True,
+        )
+
+        assert result == {"written": 1, "rejected": 1, "partitions": 1}
+        assert len(warehouse.scan("contratos", org_codes=["26000"])) == 1
+
+    @pytest.mark.unit
+    def test_record_organization_wins_for_partitioning(self, tmp_path):
+        warehouse = TransparencyWarehouse(tmp_path)
+        warehouse.write("contratos", [_contract(1, org="36000")])
+
+        assert len(warehouse.scan("contratos", org_codes=["36000"])) == 1
+
+
+class TestUpsert:
+    @pytest.mark.unit
+    def test_upsert_reads_only_parts_holding_the_ids(self, tmp_path, monkeypatch):
+        warehouse = TransparencyWarehouse(tmp_path)
+        for year in (2021, 2022, 2023):
+            warehouse.write("contratos", [_contract(year * 100 + i, year=year) for i in range(10)], org_code="26000")
+        opened = []
+        real_open = open
+
+        def spy(file, *args, **kwargs):
+            if str(file).endswith("id.dict.json") and "w" not in (args[0] if args else kwargs.get("mode", "r")):
+                opened.append(Path(file).parent.parent.parent.name)
+            return real_open(file, *args, **kwargs)
+
+        monkeypatch.setattr("builtins.open", spy)
+        changed = _contract(202205, year=2022)
+        changed["valorInicial"] = 1.0
+        warehouse.write("contratos", [changed], org_code="26000", upsert=True)
+
+        # The part holding the id, then the new part being indexed
+        assert opened == ["year=2022", "year=2022"]
+        table = warehouse.scan("contratos", columns=["id", "valor_inicial"])
+        assert len(table) == 30
+        assert table["valor_inicial"][list(table["id"]).index("202205")] == 1.0
+
+    @pytest.mark.unit
+    def test_repeated_upserts_are_compacted(self, tmp_path):
+        warehouse = TransparencyWarehouse(tmp_path, compact_after=3)
+        warehouse.write("contratos", [_contract(i) for i in range(1, 21)], org_code="26000")
+        for round_ in range(1, 8):
+            changed = [_contract(i) for i in range(round_, round_ + 3)]
+            for record in changed:
+                record["valorGlobal"] = float(round_)
+            warehouse.write("contratos", changed, org_code="26000", upsert=True)
+
+        partition = tmp_path / "contratos" / "year=2024" / "org=26000"
+        assert len(list(partition.glob("part-*"))) <= 3
+        table = warehouse.scan("contratos", columns=["id", "valor_global"])
+        values = dict(zip(table["id"], table["valor_global"]))
+        assert len(table) == 20
+        assert values["1"] == 1.0 and values["9"] == 7.0 and values["20"] == 10000.0
+
+    @pytest.mark.unit
+    def test_compact_merges_parts_and_drops_deleted_rows(self, warehouse, tmp_path):
+        warehouse.write("contratos", [_contract(1)], org_code="26000", upsert=True)
+        before = warehouse.scan("contratos").to_records()
+
+        assert warehouse.compact("contratos", org_codes=["26000"]) == 1
+
+        parts = list((tmp_path / "warehouse" / "contratos" / "year=2024" / "org=26000").glob("part-*"))
+        assert len(parts) == 1 and not (parts[0] / "_deleted.npy").exists()
+        after = warehouse.scan("contratos").to_records()
+        key = lambda record: (record["_org_code"], record["id"], record["dataAssinatura"])
+        assert sorted(after, key=key) == sorted(before, key=key)
+
+    @pytest.mark.unit
+    def test_missing_id_index_is_rebuilt(self, tmp_path):
+        warehouse = TransparencyWarehouse(tmp_path)
+        warehouse.write("contratos", [_contract(i) for i in range(1, 6)], org_code="26000")
+        shutil.rmtree(tmp_path / "_ids")
+
+        warehouse.write("contratos", [_contract(3)], org_code="26000", upsert=True)
+
+        assert sorted(warehouse.scan("contratos")["id"]) == ["1", "2", "3", "4", "5"]
+
+
+class FakeClient:
+    def __init__(self):
+        self.calls = []
+
+    async def get_all_pages(self, endpoint, filters, max_pages=10):
+        self.calls.append((endpoint, filters.codigo_orgao, filters.ano))
+        return [_contract(i) for i in range(1, 6)]
+
+
+class TestIngest:
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_ingest_lands_each_organization(self, tmp_path):
+        warehouse = TransparencyWarehouse(tmp_path)
+        client = FakeClient()
+
+        totals = await ingest(warehouse, "contratos", ["26000", "25000"], 2024, client=client)
+        again = await ingest(warehouse, "contratos", ["26000"], 2024, client=client)
+
+        assert client.calls[0] == ("/api-de-dados/contratos", "26000", 2024)
+        assert totals == {"written": 10, "rejected": 0, "partitions": 2}
+        assert again["written"] == 5
+        assert len(warehouse.scan("contratos")) == 10
@@ -0,0 +1,283 @@
+"""
+In-memory stand-in for ``redis.asyncio.Redis`` used by unit and performance tests.
+
+Only the commands exercised by the code under test are implemented. Every
+command and every network round trip is counted, and optional per-round-trip
+and per-command latencies can be simulated to make pipelining and command
+count effects visible in benchmarks.
+"""
+
+import asyncio
+import fnmatch
+import time
+from collections import Counter
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class FakeRedis:
+    """Minimal async Redis double with command accounting."""
+
+    def __init__(self, latency: float = 0.0, command_latency: float = 0.0):
+        self.latency = latency
+        self.command_latency = command_latency
+        self.data: Dict[str, Any] = {}
+        self.expires: Dict[str, float] = {}
+        self.commands: Counter = Counter()
+        self.round_trips = 0
+        self.bytes_read = 0
+
+    # Connection --------------------------------------------------------
+
+    async def _round_trip(self, n_commands: int = 1):
+        self.round_trips += 1
+        delay = self.latency + self.command_latency * n_commands
+        if delay:
+            await asyncio.sleep(delay)
+
+    async def ping(self) -> bool:
+        await self._round_trip()
+        return True
+
+    async def close(self):
+        return None
+
+    def pipeline(self, transaction: bool = False) -> "FakePipeline":
+        return FakePipeline(self)
+
+    # Internal command implementations (no round trip) -------------------
+
+    def _key(self, key: Any) -> str:
+        return key.decode() if isinstance(key, bytes) else key
+
+    def _alive(self, key: str) -> bool:
+        expiry = self.expires.get(key)
+        if expiry is not None and expiry <= time.monotonic():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+            return False
+        return key in self.data
+
+    def _get(self, key):
+        key = self._key(key)
+        self.commands["get"] += 1
+        if not self._alive(key):
+            return None
+        value = self.data[key]
+        if isinstance(value, (bytes, str)):
+            self.bytes_read += len(value)
+        return value
+
+    def _store(self, key, value, ex: Optional[int] = None):
+        key = self._key(key)
+        self.data[key] = value
+        if isinstance(ex, timedelta):
+            ex = ex.total_seconds()
+        if ex:
+            self.expires[key] = time.monotonic() + ex
+        else:
+            self.expires.pop(key, None)
+        return True
+
+    def _set(self, key, value, ex: Optional[int] = None):
+        self.commands["set"] += 1
+        return self._store(key, value, ex=ex)
+
+    def _setex(self, key, ttl, value):
+        self.commands["setex"] += 1
+        return self._store(key, value, ex=ttl)
+
+    def _delete(self, *keys):
+        self.commands["delete"] += 1
+        removed = 0
+        for key in keys:
+            key = self._key(key)
+            if self._alive(key):
+                removed += 1
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return removed
+
+    def _keys(self, pattern: str = "*") -> List[bytes]:
+        self.commands["keys"] += 1
+        return [
+            key.encode() for key in list(self.data)
+            if self._alive(key) and fnmatch.fnmatchcase(key, pattern)
+        ]
+
+    def _incr(self, key):
+        self.commands["incr"] += 1
+        key = self._key(key)
+        value = int(self.data[key]) + 1 if self._alive(key) else 1
+        self.data[key] = value
+        return value
+
+    def _expire(self, key, ttl):
+        self.commands["expire"] += 1
+        key = self._key(key)
+        if not self._alive(key):
+            return False
+        if isinstance(ttl, timedelta):
+            ttl = ttl.total_seconds()
+        self.expires[key] = time.monotonic() + ttl
+        return True
+
+    # Sorted sets: a dict member -> score, ordered on read
+
+    def _zset(self, key) -> Dict[str, float]:
+        key = self._key(key)
+        return self.data[key] if self._alive(key) else {}
+
+    def _sorted(self, key) -> List[Tuple[str, float]]:
+        return sorted(self._zset(key).items(), key=lambda item: (item[1], item[0]))
+
+    def _zadd(self, key, mapping: Dict[Any, float]):
+        self.commands["zadd"] += 1
+        key = self._key(key)
+        zset = self.data[key] if self._alive(key) else self.data.setdefault(key, {})
+        added = 0
+        for member, score in mapping.items():
+            member = self._key(member)
+            added += member not in zset
+            zset[member] = float(score)
+        return added
+
+    def _zcard(self, key):
+        self.commands["zcard"] += 1
+        return len(self._zset(key))
+
+    def _zrem(self, key, *members):
+        self.commands["zrem"] += 1
+        zset = self._zset(key)
+        removed = 0
+        for member in members:
+            removed += zset.pop(self._key(member), None) is not None
+        return removed
+
+    def _zpopmin(self, key, count: int = 1):
+        self.commands["zpopmin"] += 1
+        popped = self._sorted(key)[:count]
+        zset = self._zset(key)
+        for member, _ in popped:
+            del zset[member]
+        return [(member.encode(), score) for member, score in popped]
+
+    def _slice(self, items, start: int, end: int):
+        end = len(items) if end == -1 else end + 1
+        return items[start:end]
+
+    def _zrange(self, key, start: int, end: int, withscores: bool = False):
+        self.commands["zrange"] += 1
+        items = self._slice(self._sorted(key), start, end)
+        return [(m.encode(), s) for m, s in items] if withscores else [m.encode() for m, _ in items]
+
+    def _zrevrange(self, key, start: int, end: int, withscores: bool = False):
+        self.commands["zrevrange"] += 1
+        items = self._slice(self._sorted(key)[::-1], start, end)
+        return [(m.encode(), s) for m, s in items] if withscores else [m.encode() for m, _ in items]
+
+    def _zrangebyscore(self, key, min, max):
+        self.commands["zrangebyscore"] += 1
+        low, high = float(min), float(max)
+        return [m.encode() for m, score in self._sorted(key) if low <= score <= high]
+
+    def _zremrangebyscore(self, key, min, max):
+        self.commands["zremrangebyscore"] += 1
+        low, high = float(min), float(max)
+        zset = self._zset(key)
+        doomed = [m for m, score in zset.items() if low <= score <= high]
+        for member in doomed:
+            del zset[member]
+        return len(doomed)
+
+    # Public async API ----------------------------------------------------
+
+    async def get(self, key):
+        await self._round_trip()
+        return self._get(key)
+
+    async def set(self, key, value, ex: Optional[int] = None):
+        await self._round_trip()
+        return self._set(key, value, ex=ex)
+
+    async def setex(self, key, ttl, value):
+        await self._round_trip()
+        return self._setex(key, ttl, value)
+
+    async def delete(self, *keys):
+        await self._round_trip()
+        return self._delete(*keys)
+
+    async def keys(self, pattern: str = "*"):
+        await self._round_trip()
+        return self._keys(pattern)
+
+    async def incr(self, key):
+        await self._round_trip()
+        return self._incr(key)
+
+    async def expire(self, key, ttl):
+        await self._round_trip()
+        return self._expire(key, ttl)
+
+    async def zadd(self, key, mapping):
+        await self._round_trip()
+        return self._zadd(key, mapping)
+
+    async def zcard(self, key):
+        await self._round_trip()
+        return self._zcard(key)
+
+    async def zrem(self, key, *members):
+        await self._round_trip()
+        return self._zrem(key, *members)
+
+    async def zpopmin(self, key, count: int = 1):
+        await self._round_trip()
+        return self._zpopmin(key, count)
+
+    async def zrange(self, key, start: int, end: int, withscores: bool = False):
+        await self._round_trip()
+        return self._zrange(key, start, end, withscores=withscores)
+
+    async def zrevrange(self, key, start: int, end: int, withscores: bool = False):
+        await self._round_trip()
+        return self._zrevrange(key, start, end, withscores=withscores)
+
+    async def zrangebyscore(self, key, min, max):
+        await self._round_trip()
+        return self._zrangebyscore(key, min, max)
+
+    async def zremrangebyscore(self, key, min, max):
+        await self._round_trip()
+        return self._zremrangebyscore(key, min, max)
+
+
+class FakePipeline:
+    """Buffers commands and executes them in a single round trip."""
+
+    def __init__(self, redis: FakeRedis):
+        self.redis = redis
+        self._queued: List[Tuple[str, tuple, dict]] = []
+
+    def __getattr__(self, name: str):
+        method = getattr(self.redis, f"_{name}", None)
+        if method is None:
+            raise AttributeError(name)
+
+        def queue(*args, **kwargs):
+            self._queued.append((name, args, kwargs))
+            return self
+
+        return queue
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self._queued.clear()
+
+    async def execute(self) -> List[Any]:
+        queued, self._queued = self._queued, []
+        await self.redis._round_trip(len(queued))
+        return [getattr(self.redis, f"_{name}")(*args, **kwargs) for name, args, kwargs in queued]
@@ -0,0 +1,90 @@
+"""
+Synthetic Portal da Transparência contracts for benchmarks.
+
+Records are shaped like API payloads (camelCase, nested ``fornecedor`` and
+``orgao``, DD/MM/YYYY dates), so they can be fed to agents, the warehouse
+and the parsers alike.
+"""
+
+import random
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Dict, List
+
+
+OBJECT_WORDS = (
+    "aquisição contratação serviços material equipamentos manutenção preventiva corretiva "
+    "limpeza vigilância predial hospitalar escolar informática consultoria locação veículos "
+    "obras reforma ampliação fornecimento medicamentos insumos expediente alimentação"
+).split()
+
+
+@dataclass
+class SyntheticContracts:
+    """
+    Generator for ``organizations`` x ``contracts_per_org`` contracts.
+
+    - ``duplicate_rate``: share of contracts whose description repeats an
+      earlier one of the same organization, with one word changed.
+    - ``value_distribution``: ``lognormal``, ``pareto`` or ``uniform``.
+    - ``outlier_rate``: share of contracts priced 20-50x the typical value.
+    """
+
+    organizations: int = 3
+    contracts_per_org: int = 1000
+    duplicate_rate: float = 0.05
+    value_distribution: str = "lognormal"
+    outlier_rate: float = 0.01
+    vendors_per_org: int = 40
+    year: int = 2024
+    seed: int = 0
+
+    def _value(self, rng: random.Random) -> float:
+        if self.value_distribution == "lognormal":
+            value = rng.lognormvariate(11, 1.2)
+        elif self.value_distribution == "pareto":
+            value = 10_000 * rng.paretovariate(1.5)
+        elif self.value_distribution == "uniform":
+            value = rng.uniform(1_000, 500_000)
+        else:
+            raise ValueError(f"Unknown value distribution: {self.value_distribution}")
+        if rng.random() < self.outlier_rate:
+            value *= rng.uniform(20, 50)
+        return round(value, 2)
+
+    def generate(self) -> List[Dict[str, Any]]:
+        rng = random.Random(self.seed)
+        first_day = date(self.year, 1, 1)
+        contracts = []
+        for org in range(self.organizations):
+            org_code = str(26000 + org * 1000)
+            descriptions: List[str] = []
+            for i in range(self.contracts_per_org):
+                if descriptions and rng.random() < self.duplicate_rate:
+                    words = rng.choice(descriptions).split()
+                    words[rng.randrange(len(words))] = rng.choice(OBJECT_WORDS)
+                    objeto = " ".join(words)
+                else:
+                    objeto = " ".join(rng.sample(OBJECT_WORDS, rng.randint(5, 10)))
+                    objeto += f" processo {rng.randint(1000, 99999)}"
+                descriptions.append(objeto)
+
+                vendor = rng.randrange(self.vendors_per_org)
+                valor_inicial = self._value(rng)
+                signed = first_day + timedelta(days=rng.randrange(365))
+                contracts.append({
+                    "id": f"{org_code}-{i}",
+                    "numero": f"{i}/{self.year}",
+                    "objeto": objeto,
+                    "valorInicial": valor_inicial,
+                    "valorGlobal": round(valor_inicial * rng.uniform(1.0, 1.3), 2),
+                    "dataAssinatura": signed.strftime("%d/%m/%Y"),
+                    "dataInicioVigencia": (signed + timedelta(days=rng.randint(0, 30))).strftime("%d/%m/%Y"),
+                    "fornecedor": {
+                        "nome": f"Fornecedor {org}-{vendor} LTDA",
+                        "cnpj": f"{org:02d}{vendor:06d}000100",
+                    },
+                    "orgao": {"codigo": org_code, "nome": f"Órgão {org_code}"},
+                    "_org_code": org_code,
+                })
+        return contracts